@@ -21,6 +21,7 @@ from django.test import RequestFactory
 from django.utils.text import get_valid_filename
 from django.utils.translation import ugettext as _
 from djcelery.common import respect_language
+from fs.errors import NoSysPathError, UnsupportedError
 from opaque_keys.edx.keys import CourseKey
 from opaque_keys.edx.locator import LibraryLocator
 from organizations.models import OrganizationCourse
@@ -45,7 +46,12 @@ from xmodule.exceptions import SerializationError
 from xmodule.modulestore import COURSE_ROOT, LIBRARY_ROOT
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import DuplicateCourseError, ItemNotFoundError
-from xmodule.modulestore.xml_exporter import export_course_to_xml, export_library_to_xml
+from xmodule.modulestore.xml_exporter import (
+    export_course_to_tar_stream,
+    export_course_to_xml,
+    export_library_to_tar_stream,
+    export_library_to_xml
+)
 from xmodule.modulestore.xml_importer import import_course_from_xml, import_library_from_xml
 
 LOGGER = get_task_logger(__name__)
@@ -208,7 +214,7 @@ class CourseExportTask(UserTask):  # pylint: disable=abstract-method
         For reference, these are:
 
         1. Exporting
-        2. Compressing
+        2. Saving
         """
         return 2
 
@@ -253,6 +259,8 @@ def export_olx(self, user_id, course_key_string, language):
     try:
         self.status.set_state(u'Exporting')
         tarball = create_export_tarball(courselike_module, courselike_key, {}, self.status)
+        self.status.set_state(u'Saving')
+        self.status.increment_completed_steps()
         artifact = UserTaskArtifact(status=self.status, name=u'Output')
         artifact.file.save(name=tarball.name, content=File(tarball))  # pylint: disable=no-member
         artifact.save()
@@ -272,20 +280,23 @@ def create_export_tarball(course_module, course_key, context, status=None):
     """
     name = course_module.url_name
     export_file = NamedTemporaryFile(prefix=name + '.', suffix=".tar.gz")
-    root_dir = path(mkdtemp())
 
     try:
-        if isinstance(course_key, LibraryLocator):
-            export_library_to_xml(modulestore(), contentstore(), course_key, root_dir, name)
-        else:
-            export_course_to_xml(modulestore(), contentstore(), course_module.id, root_dir, name)
-
-        if status:
-            status.set_state(u'Compressing')
-            status.increment_completed_steps()
+        # The content is compressed as it's exported, straight into the tar file.
         LOGGER.debug(u'tar file being generated at %s', export_file.name)
-        with tarfile.open(name=export_file.name, mode='w:gz') as tar_file:
-            tar_file.add(root_dir / name, arcname=name)
+        try:
+            if isinstance(course_key, LibraryLocator):
+                export_library_to_tar_stream(modulestore(), contentstore(), course_key, export_file, name)
+            else:
+                export_course_to_tar_stream(modulestore(), contentstore(), course_module.id, export_file, name)
+        except (NoSysPathError, UnsupportedError):
+            # A block needs to read the files it exports, or their paths on disk.
+            LOGGER.warning(u'Exporting %s to disk, as it can\'t be streamed', course_key, exc_info=True)
+            export_file.seek(0)
+            export_file.truncate()
+            _export_to_disk_tarball(course_module, course_key, export_file, name)
+        export_file.flush()
+        export_file.seek(0)
 
     except SerializationError as exc:
         LOGGER.exception(u'There was an error exporting %s', course_key)
@@ -318,13 +329,26 @@ def create_export_tarball(course_module, course_key, context, status=None):
         if status:
             status.fail(json.dumps({'raw_error_msg': context['raw_err_msg']}))
         raise
-    finally:
-        if os.path.exists(root_dir / name):
-            shutil.rmtree(root_dir / name)
 
     return export_file
 
 
+def _export_to_disk_tarball(course_module, course_key, export_file, name):
+    """
+    Exports the course or library to a temporary directory, then archives it into the file.
+    """
+    root_dir = path(mkdtemp())
+    try:
+        if isinstance(course_key, LibraryLocator):
+            export_library_to_xml(modulestore(), contentstore(), course_key, root_dir, name)
+        else:
+            export_course_to_xml(modulestore(), contentstore(), course_module.id, root_dir, name)
+        with tarfile.open(fileobj=export_file, mode='w:gz') as tar_file:
+            tar_file.add(root_dir / name, arcname=name)
+    finally:
+        shutil.rmtree(root_dir, ignore_errors=True)
+
+
 class CourseImportTask(UserTask):  # pylint: disable=abstract-method
     """
     Base class for course and library import tasks.
@@ -5,12 +5,14 @@ from __future__ import absolute_import, division, print_function
 
 import copy
 import json
+import tarfile
 from uuid import uuid4
 
 import mock
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.test.utils import override_settings
+from fs.errors import NoSysPathError
 from opaque_keys.edx.locator import CourseLocator
 from organizations.models import OrganizationCourse
 from organizations.tests.factories import OrganizationFactory
@@ -53,7 +55,21 @@ class ExportCourseTestCase(CourseTestCase):
         output = artifacts[0]
         self.assertEqual(output.name, 'Output')
 
-    @mock.patch('contentstore.tasks.export_course_to_xml', side_effect=side_effect_exception)
+    @mock.patch('contentstore.tasks.export_course_to_tar_stream', side_effect=NoSysPathError('course.xml'))
+    def test_disk_fallback(self, mock_export):  # pylint: disable=unused-argument
+        """
+        Verify that a course which can't be streamed is exported to disk
+        """
+        key = str(self.course.location.course_key)
+        result = export_olx.delay(self.user.id, key, u'en')
+        status = UserTaskStatus.objects.get(task_id=result.id)
+        self.assertEqual(status.state, UserTaskStatus.SUCCEEDED)
+        self.assertEqual(status.completed_steps, 2)
+        output = UserTaskArtifact.objects.get(status=status, name='Output')
+        with tarfile.open(fileobj=output.file, mode='r:gz') as tar_file:
+            self.assertIn(u'{}/course.xml'.format(self.course.url_name), tar_file.getnames())
+
+    @mock.patch('contentstore.tasks.export_course_to_tar_stream', side_effect=side_effect_exception)
     def test_exception(self, mock_export):  # pylint: disable=unused-argument
         """
         The export task should fail gracefully if an exception is thrown
@@ -17,6 +17,7 @@ from contentstore.utils import reverse_course_url
 from contentstore.views.exception import AssetNotFoundException
 from edxmako.shortcuts import render_to_response
 from openedx.core.djangoapps.contentserver.caching import del_cached_content
+from static_replace import invalidate_static_url_memo
 from student.auth import has_course_author_access
 from util.date_utils import get_default_time_display
 from util.json_request import JsonResponse
@@ -277,6 +278,7 @@ def _upload_asset(request, course_key):
     # then commit the content
     contentstore().save(content)
     del_cached_content(content.location)
+    invalidate_static_url_memo(course_key)
 
     # readback the saved content - we need the database timestamp
     readback = contentstore().find(content.location)
@@ -325,6 +327,7 @@ def _update_asset(request, course_key, asset_key):
             contentstore().set_attr(asset_key, 'locked', modified_asset['locked'])
             # Delete the asset from the cache so we check the lock status the next time it is requested.
             del_cached_content(asset_key)
+            invalidate_static_url_memo(course_key)
             return JsonResponse(modified_asset, status=201)
 
 
@@ -360,6 +363,7 @@ def delete_asset(course_key, asset_key):
     contentstore().delete(content.get_id())
     # remove from cache
     del_cached_content(content.location)
+    invalidate_static_url_memo(course_key)
 
 
 def _get_asset_json(display_name, content_type, date, location, thumbnail_location, locked):
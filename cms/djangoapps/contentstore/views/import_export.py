@@ -346,7 +346,7 @@ def export_status_handler(request, course_key_string):
         -X : Export unsuccessful due to some error with X as stage [0-3]
         0 : No status info found (export done or task not yet created)
         1 : Exporting
-        2 : Compressing
+        2 : Saving
         3 : Export successful
 
     If the export was successful, a URL for the generated .tar.gz file is also
@@ -1372,6 +1372,7 @@ PROCTORING_SETTINGS = {}
 
 DATABASE_ROUTERS = [
     'openedx.core.lib.django_courseware_routers.StudentModuleHistoryExtendedRouter',
+    'openedx.core.lib.django_courseware_routers.UserStateWriteQueueRouter',
 ]
 
 ############################ OAUTH2 Provider ###################################
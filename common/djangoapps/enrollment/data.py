@@ -46,7 +46,13 @@ def get_course_enrollments(user_id):
         is_active=True
     ).order_by('created')
 
-    enrollments = CourseEnrollmentSerializer(qset, many=True).data
+    # Preload the CourseOverviews of the enrollments, which are otherwise loaded one at a time.
+    course_enrollments = list(qset)
+    overviews = CourseOverview.get_from_ids(enrollment.course_id for enrollment in course_enrollments)
+    for enrollment in course_enrollments:
+        enrollment._course_overview = overviews.get(enrollment.course_id)  # pylint: disable=protected-access
+
+    enrollments = CourseEnrollmentSerializer(course_enrollments, many=True).data
 
     # Find deleted courses and filter them out of the results
     deleted = []
@@ -1,9 +1,12 @@
 import logging
 import re
+import time
+from uuid import uuid4
 
 from django.contrib.staticfiles.storage import staticfiles_storage
 from django.contrib.staticfiles import finders
 from django.conf import settings
+from django.core.cache import cache
 
 from static_replace.models import AssetBaseUrlConfig, AssetExcludedExtensionsConfig
 from xmodule.modulestore.django import modulestore
@@ -11,10 +14,23 @@ from xmodule.modulestore import ModuleStoreEnum
 from xmodule.contentstore.content import StaticContent
 
 from opaque_keys.edx.locator import AssetLocator
+from openedx.core.lib.cache_utils import SizeBoundedLRUCache
 
 log = logging.getLogger(__name__)
 XBLOCK_STATIC_RESOURCE_PREFIX = '/static/xblock'
 
+# Maximum number of rewritten static urls memoized by each process.
+STATIC_URL_MEMO_SIZE = 20000
+
+# Seconds after which a memoized static url is resolved again, so that
+# changes to the asset configuration are eventually picked up.  Changes to
+# the assets of a course, e.g. locking them, are picked up at once, as the
+# urls are memoized per version of the course's assets.
+STATIC_URL_MEMO_TIMEOUT = 300
+
+# Compiled url patterns, by the regex function and its arguments.
+_compiled_patterns = {}
+
 
 def _url_replace_regex(prefix):
     """
@@ -32,6 +48,131 @@ def _url_replace_regex(prefix):
         """.format(prefix=prefix)
 
 
+def _replace_urls_regex(static_prefix):
+    """
+    Match static, course and jump_to_id urls in quotes, as _url_replace_regex
+    does for each of their prefixes, naming the group of the matched prefix.
+    """
+    return ur"""
+        (?x)                      # flags=re.VERBOSE
+        (?P<quote>\\?['"])        # the opening quotes
+        (?P<prefix>               # the prefix, one of
+            (?P<static>{static_prefix})
+            |(?P<course>/course/)
+            |(?P<jump_to_id>/jump_to_id/)
+        )
+        (?P<rest>.*?)             # everything else in the url
+        (?P=quote)                # the first matching closing quote
+        """.format(static_prefix=static_prefix)
+
+
+def _compiled(regex_function, *args):
+    """
+    Return the compiled pattern of the regex returned by regex_function for
+    the given arguments, compiling it only the first time.
+    """
+    key = (regex_function.__name__,) + args
+    pattern = _compiled_patterns.get(key)
+    if pattern is None:
+        pattern = _compiled_patterns[key] = re.compile(regex_function(*args))
+    return pattern
+
+
+def _url_replace_pattern(prefix):
+    """
+    Return the compiled pattern of _url_replace_regex for the given prefix.
+    """
+    return _compiled(_url_replace_regex, prefix)
+
+
+def _static_prefix(data_dir):
+    """
+    Return the regex of the prefix of static urls not in the given data directory.
+    """
+    return u'(?:{static_url}|/static/)(?!{data_dir})'.format(
+        static_url=settings.STATIC_URL,
+        data_dir=data_dir
+    )
+
+
+def _is_xblock_resource_url(full_url):
+    """
+    Return whether the given static url is a link to an XBlock resource.
+
+    Probably wasn't a good idea that /static works for actual static assets
+    and for magical course asset URLs....
+    """
+    starts_with_static_url = full_url.startswith(unicode(settings.STATIC_URL))
+    starts_with_prefix = full_url.startswith(XBLOCK_STATIC_RESOURCE_PREFIX)
+    contains_prefix = XBLOCK_STATIC_RESOURCE_PREFIX in full_url
+    return starts_with_prefix or (starts_with_static_url and contains_prefix)
+
+
+# The rewritten static urls of versioned courses, with the time they expire at,
+# by course, course version, version of the course's assets and original url.
+STATIC_URL_MEMO = SizeBoundedLRUCache(STATIC_URL_MEMO_SIZE, get_size=lambda entry: 1)
+
+
+def _assets_version_cache_key(course_id):
+    """
+    Return the cache key of the version of the assets of the given course.
+    """
+    return u'static_replace.assets_version.{}'.format(course_id)
+
+
+def _get_assets_version(course_id):
+    """
+    Return the version of the assets of the given course, which is shared by
+    all processes through the cache, and changes whenever they are modified.
+    """
+    key = _assets_version_cache_key(course_id)
+    version = cache.get(key)
+    if version is None:
+        # Start a new version, so that urls memoized before the version was
+        # evicted from the cache aren't used again.
+        cache.add(key, uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_static_url_memo(course_id):
+    """
+    Resolve the static urls of the assets of the given course again, in all
+    processes, e.g. after an asset was uploaded, locked or deleted.
+    """
+    cache.set(_assets_version_cache_key(course_id), uuid4().hex, None)
+
+
+class _AssetUrlConfig(object):
+    """
+    The asset base url and excluded extensions, and the version of the
+    assets of the course, looked up once per rewritten text, when first needed.
+    """
+    def __init__(self, course_id=None):
+        self.course_id = course_id
+        self._values = None
+        self._assets_version = None
+
+    def get(self):
+        """
+        Return the asset base url and excluded extensions.
+        """
+        if self._values is None:
+            self._values = (
+                AssetBaseUrlConfig.get_base_url(),
+                AssetExcludedExtensionsConfig.get_excluded_extensions(),
+            )
+        return self._values
+
+    def get_assets_version(self):
+        """
+        Return the version of the assets of the course.
+        """
+        if self._assets_version is None:
+            self._assets_version = _get_assets_version(self.course_id)
+        return self._assets_version
+
+
 def try_staticfiles_lookup(path):
     """
     Try to lookup a path in staticfiles_storage.  If it fails, return
@@ -73,7 +214,7 @@ def replace_jump_to_id_urls(text, course_id, jump_to_id_base_url):
         rest = match.group('rest')
         return "".join([quote, jump_to_id_base_url + rest, quote])
 
-    return re.sub(_url_replace_regex('/jump_to_id/'), replace_jump_to_id_url, text)
+    return _url_replace_pattern('/jump_to_id/').sub(replace_jump_to_id_url, text)
 
 
 def replace_course_urls(text, course_key):
@@ -93,7 +234,7 @@ def replace_course_urls(text, course_key):
         rest = match.group('rest')
         return "".join([quote, '/courses/' + course_id + '/', rest, quote])
 
-    return re.sub(_url_replace_regex('/course/'), replace_course_url, text)
+    return _url_replace_pattern('/course/').sub(replace_course_url, text)
 
 
 def process_static_urls(text, replacement_function, data_dir=None):
@@ -111,26 +252,13 @@ def process_static_urls(text, replacement_function, data_dir=None):
         quote = match.group('quote')
         rest = match.group('rest')
 
-        # Don't rewrite XBlock resource links.  Probably wasn't a good idea that /static
-        # works for actual static assets and for magical course asset URLs....
-        full_url = prefix + rest
-
-        starts_with_static_url = full_url.startswith(unicode(settings.STATIC_URL))
-        starts_with_prefix = full_url.startswith(XBLOCK_STATIC_RESOURCE_PREFIX)
-        contains_prefix = XBLOCK_STATIC_RESOURCE_PREFIX in full_url
-        if starts_with_prefix or (starts_with_static_url and contains_prefix):
+        # Don't rewrite XBlock resource links.
+        if _is_xblock_resource_url(prefix + rest):
             return original
 
         return replacement_function(original, prefix, quote, rest)
 
-    return re.sub(
-        _url_replace_regex(u'(?:{static_url}|/static/)(?!{data_dir})'.format(
-            static_url=settings.STATIC_URL,
-            data_dir=data_dir
-        )),
-        wrap_part_extraction,
-        text
-    )
+    return _url_replace_pattern(_static_prefix(data_dir)).sub(wrap_part_extraction, text)
 
 
 def make_static_urls_absolute(request, html):
@@ -162,57 +290,124 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
     course_id: The course identifier used to distinguish static content for this course in studio
     static_asset_path: Path for static assets, which overrides data_directory and course_namespace, if nonempty
     """
+    asset_url_config = _AssetUrlConfig()
 
     def replace_static_url(original, prefix, quote, rest):
         """
         Replace a single matched url.
         """
-        # Don't mess with things that end in '?raw'
-        if rest.endswith('?raw'):
-            return original
+        return _replace_static_url(
+            original, prefix, quote, rest, data_directory, course_id, static_asset_path, asset_url_config
+        )
 
-        # In debug mode, if we can find the url as is,
-        if settings.DEBUG and finders.find(rest, True):
-            return original
-        # if we're running with a MongoBacked store course_namespace is not None, then use studio style urls
-        elif (not static_asset_path) and course_id:
-            # first look in the static file pipeline and see if we are trying to reference
-            # a piece of static content which is in the edx-platform repo (e.g. JS associated with an xmodule)
-
-            exists_in_staticfiles_storage = False
-            try:
-                exists_in_staticfiles_storage = staticfiles_storage.exists(rest)
-            except Exception as err:
-                log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
-                    rest, str(err)))
-
-            if exists_in_staticfiles_storage:
+    return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
+
+
+def _replace_static_url(original, prefix, quote, rest, data_directory, course_id, static_asset_path, asset_url_config):
+    """
+    Replace a single matched static url, as described for replace_static_urls.
+    """
+    # Don't mess with things that end in '?raw'
+    if rest.endswith('?raw'):
+        return original
+
+    # In debug mode, if we can find the url as is,
+    if settings.DEBUG and finders.find(rest, True):
+        return original
+    # if we're running with a MongoBacked store course_namespace is not None, then use studio style urls
+    elif (not static_asset_path) and course_id:
+        # first look in the static file pipeline and see if we are trying to reference
+        # a piece of static content which is in the edx-platform repo (e.g. JS associated with an xmodule)
+
+        exists_in_staticfiles_storage = False
+        try:
+            exists_in_staticfiles_storage = staticfiles_storage.exists(rest)
+        except Exception as err:
+            log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
+                rest, str(err)))
+
+        if exists_in_staticfiles_storage:
+            url = staticfiles_storage.url(rest)
+        else:
+            # if not, then assume it's courseware specific content and then look in the
+            # Mongo-backed database
+            base_url, excluded_exts = asset_url_config.get()
+            url = StaticContent.get_canonicalized_asset_path(course_id, rest, base_url, excluded_exts)
+
+            if AssetLocator.CANONICAL_NAMESPACE in url:
+                url = url.replace('block@', 'block/', 1)
+
+    # Otherwise, look the file up in staticfiles_storage, and append the data directory if needed
+    else:
+        course_path = "/".join((static_asset_path or data_directory, rest))
+
+        try:
+            if staticfiles_storage.exists(rest):
                 url = staticfiles_storage.url(rest)
             else:
-                # if not, then assume it's courseware specific content and then look in the
-                # Mongo-backed database
-                base_url = AssetBaseUrlConfig.get_base_url()
-                excluded_exts = AssetExcludedExtensionsConfig.get_excluded_extensions()
-                url = StaticContent.get_canonicalized_asset_path(course_id, rest, base_url, excluded_exts)
+                url = staticfiles_storage.url(course_path)
+        # And if that fails, assume that it's course content, and add manually data directory
+        except Exception as err:
+            log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
+                rest, str(err)))
+            url = "".join([prefix, course_path])
 
-                if AssetLocator.CANONICAL_NAMESPACE in url:
-                    url = url.replace('block@', 'block/', 1)
+    return "".join([quote, url, quote])
 
-        # Otherwise, look the file up in staticfiles_storage, and append the data directory if needed
-        else:
-            course_path = "/".join((static_asset_path or data_directory, rest))
 
-            try:
-                if staticfiles_storage.exists(rest):
-                    url = staticfiles_storage.url(rest)
-                else:
-                    url = staticfiles_storage.url(course_path)
-            # And if that fails, assume that it's course content, and add manually data directory
-            except Exception as err:
-                log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
-                    rest, str(err)))
-                url = "".join([prefix, course_path])
+def replace_urls(text, course_id, jump_to_id_base_url, data_directory=None, static_asset_path='', course_version=None):
+    """
+    Replace the static, course and jump_to_id urls of the text in a single
+    pass, as replace_static_urls, replace_course_urls and
+    replace_jump_to_id_urls would in turn.
 
-        return "".join([quote, url, quote])
+    text: The source text to do the substitution in
+    course_id: The course identifier
+    jump_to_id_base_url: The url that jump_to_id urls are relative to
+    data_directory: The directory in which course data is stored
+    static_asset_path: Path for static assets, which overrides data_directory and course_namespace, if nonempty
+    course_version: The version of the course content, if it is versioned.  Rewritten static
+        urls are memoized for versioned courses, per version and version of the course's assets,
+        for STATIC_URL_MEMO_TIMEOUT seconds.
+    """
+    data_dir = static_asset_path or data_directory
+    pattern = _compiled(_replace_urls_regex, _static_prefix(data_dir))
+    course_url = '/courses/' + course_id.to_deprecated_string() + '/'
+    asset_url_config = _AssetUrlConfig(course_id)
 
-    return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
+    def replace_url(match):
+        """
+        Replace a single matched url.
+        """
+        original = match.group(0)
+        quote = match.group('quote')
+        rest = match.group('rest')
+
+        if match.group('course') is not None:
+            return "".join([quote, course_url + rest, quote])
+        if match.group('jump_to_id') is not None:
+            return "".join([quote, jump_to_id_base_url + rest, quote])
+
+        prefix = match.group('prefix')
+        # Don't rewrite XBlock resource links.
+        if _is_xblock_resource_url(prefix + rest):
+            return original
+
+        if course_version is None:
+            return _replace_static_url(
+                original, prefix, quote, rest, data_directory, course_id, static_asset_path, asset_url_config
+            )
+
+        key = (
+            course_id, course_version, asset_url_config.get_assets_version(), data_directory, static_asset_path,
+            original,
+        )
+        url, expires = STATIC_URL_MEMO.get(key, (None, None))
+        if url is None or expires < time.time():
+            url = _replace_static_url(
+                original, prefix, quote, rest, data_directory, course_id, static_asset_path, asset_url_config
+            )
+            STATIC_URL_MEMO.set(key, (url, time.time() + STATIC_URL_MEMO_TIMEOUT))
+        return url
+
+    return pattern.sub(replace_url, text)
@@ -0,0 +1,111 @@
+"""
+Performance test comparing the time to rewrite the urls of course HTML with
+replace_static_urls, replace_course_urls and replace_jump_to_id_urls in
+turn, and with replace_urls, for unversioned and versioned courses.
+"""
+from __future__ import print_function
+
+import glob
+import os
+import time
+import timeit
+import unittest
+
+from django.conf import settings
+from mock import patch
+from opaque_keys.edx.locator import CourseLocator
+
+from static_replace import (
+    STATIC_URL_MEMO,
+    replace_course_urls,
+    replace_jump_to_id_urls,
+    replace_static_urls,
+    replace_urls
+)
+
+COURSE_KEY = CourseLocator('org', 'course', 'run')
+JUMP_TO_ID_BASE_URL = '/courses/course-v1:org+course+run/jump_to_id/'
+
+# Approximate time, in seconds, of looking up an asset in the contentstore.
+ASSET_LOOKUP_TIME = 0.0005
+
+# Number of times the HTML of the test courses is rewritten.
+NUM_REWRITES = 20
+
+
+def _canonicalized_asset_path(course_key, path, base_url, excluded_exts):  # pylint: disable=unused-argument
+    """
+    Returns the asset url of the path, after the time of a contentstore lookup.
+    """
+    time.sleep(ASSET_LOOKUP_TIME)
+    return u'/asset-v1:org+course+run+type@asset+block/' + path
+
+
+# Eventually, exclude this attribute from regular unittests while running *only* tests
+# with this attribute during regular performance tests.
+# @attr("perf_test")
+@unittest.skip
+class ReplaceUrlsPerf(unittest.TestCase):
+    """
+    This class exists to time the rewriting of the urls of the HTML of the
+    test courses, by chained rewriters, and in a single pass.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    def setUp(self):
+        super(ReplaceUrlsPerf, self).setUp()
+        self.fragments = []
+        for path in glob.glob(os.path.join(settings.COMMON_TEST_DATA_ROOT, '*', 'html', '*.html')):
+            with open(path) as html_file:
+                self.fragments.append(html_file.read().decode('utf-8'))
+
+        for target, kwargs in (
+            ('static_replace.staticfiles_storage.exists', {'return_value': False}),
+            ('static_replace.StaticContent.get_canonicalized_asset_path', {'side_effect': _canonicalized_asset_path}),
+            ('static_replace.AssetBaseUrlConfig.get_base_url', {'return_value': u''}),
+            ('static_replace.AssetExcludedExtensionsConfig.get_excluded_extensions', {'return_value': []}),
+        ):
+            patcher = patch(target, **kwargs)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        STATIC_URL_MEMO.clear()
+        self.addCleanup(STATIC_URL_MEMO.clear)
+
+    def _chained(self, text):
+        """
+        Rewrites the urls of the text with the three rewriters in turn.
+        """
+        text = replace_static_urls(text, None, COURSE_KEY)
+        text = replace_course_urls(text, COURSE_KEY)
+        return replace_jump_to_id_urls(text, COURSE_KEY, JUMP_TO_ID_BASE_URL)
+
+    def _time_rewrites(self, rewrite):
+        """
+        Returns the average wall time, in milliseconds, of rewriting the
+        urls of all the fragments with the given function.
+        """
+        def rewrite_all():
+            """
+            Rewrites the urls of all the fragments.
+            """
+            for fragment in self.fragments:
+                rewrite(fragment)
+        return timeit.timeit(rewrite_all, number=NUM_REWRITES) * 1000 / NUM_REWRITES
+
+    def test_rewrite_timings(self):
+        results = [
+            ('chained', self._time_rewrites(self._chained)),
+            ('single pass', self._time_rewrites(
+                lambda text: replace_urls(text, COURSE_KEY, JUMP_TO_ID_BASE_URL)
+            )),
+            ('memoized', self._time_rewrites(
+                lambda text: replace_urls(text, COURSE_KEY, JUMP_TO_ID_BASE_URL, course_version='version')
+            )),
+        ]
+
+        print('\nFragments: {}, rewrites: {}'.format(len(self.fragments), NUM_REWRITES))
+        print('{:<14}{:>22}'.format('mode', 'per rewrite (ms)'))
+        for result in results:
+            print('{:<14}{:>22.1f}'.format(*result))
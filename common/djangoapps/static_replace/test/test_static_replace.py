@@ -2,10 +2,12 @@
 """Tests for static_replace"""
 
 import re
+import time
 from cStringIO import StringIO
 from urlparse import parse_qsl, urlparse, urlunparse
 
 import ddt
+from django.core.cache.backends.locmem import LocMemCache
 from django.test import override_settings
 from django.utils.http import urlencode, urlquote
 from mock import Mock, patch
@@ -14,11 +16,16 @@ from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from PIL import Image
 
 from static_replace import (
+    STATIC_URL_MEMO,
+    STATIC_URL_MEMO_TIMEOUT,
     _url_replace_regex,
+    invalidate_static_url_memo,
     make_static_urls_absolute,
     process_static_urls,
     replace_course_urls,
-    replace_static_urls
+    replace_jump_to_id_urls,
+    replace_static_urls,
+    replace_urls
 )
 from xmodule.assetstore.assetmgr import AssetManager
 from xmodule.contentstore.content import StaticContent
@@ -229,6 +236,105 @@ def test_static_url_with_xblock_resource_on_cdn(mock_modulestore, mock_storage):
     assert_equals(post_text, replace_static_urls(pre_text, DATA_DIRECTORY, COURSE_KEY))
 
 
+@patch('static_replace.staticfiles_storage', autospec=True)
+@patch('static_replace.modulestore', autospec=True)
+def test_replace_urls(mock_modulestore, mock_storage):
+    """
+    Make sure that replace_urls rewrites urls as replace_static_urls,
+    replace_course_urls and replace_jump_to_id_urls do in turn.
+    """
+    mock_storage.exists.return_value = False
+    mock_modulestore.return_value = Mock(MongoModuleStore)
+    STATIC_URL_MEMO.clear()
+    jump_to_id_base_url = '/courses/org/course/run/jump_to_id/'
+
+    text = (
+        '<a href="/static/file.png">file</a> <img src=\'/static/image.png\'/> '
+        '<a href="/course/info">info</a> <a href="/jump_to_id/intro">intro</a> '
+        '<a href="/static/foo.png?raw">raw</a> '
+        '<img src="/static/xblock/resources/babys_first.lil_xblock/public/images/pacifier.png"/> '
+        '<a href=\\"/static/escaped.png\\">escaped</a> <a href="/static/data_dir/file.png">data dir</a>'
+    )
+    chained = replace_jump_to_id_urls(
+        replace_course_urls(replace_static_urls(text, DATA_DIRECTORY, COURSE_KEY), COURSE_KEY),
+        COURSE_KEY,
+        jump_to_id_base_url,
+    )
+    assert_equals(chained, replace_urls(text, COURSE_KEY, jump_to_id_base_url, DATA_DIRECTORY))
+    assert_equals(chained, replace_urls(text, COURSE_KEY, jump_to_id_base_url, DATA_DIRECTORY, course_version='v1'))
+    assert_true('"/courses/org/course/run/info"' in chained)
+    assert_true('"/courses/org/course/run/jump_to_id/intro"' in chained)
+    assert_true('"/c4x/org/course/asset/file.png"' in chained)
+
+
+@patch('static_replace.StaticContent', autospec=True)
+@patch('static_replace.modulestore', autospec=True)
+@patch('static_replace.AssetBaseUrlConfig.get_base_url')
+@patch('static_replace.AssetExcludedExtensionsConfig.get_excluded_extensions')
+def test_replace_urls_memoized(mock_get_excluded_extensions, mock_get_base_url, mock_modulestore, mock_static_content):
+    """
+    Make sure that replace_urls resolves each static url of a versioned
+    course once per course version, and looks up the asset configuration
+    once per text.
+    """
+    mock_modulestore.return_value = Mock(MongoModuleStore)
+    mock_static_content.get_canonicalized_asset_path.return_value = "c4x://mock_url"
+    mock_get_base_url.return_value = u''
+    mock_get_excluded_extensions.return_value = ['foobar']
+    STATIC_URL_MEMO.clear()
+    text = STATIC_SOURCE + ' "/static/other.png" ' + STATIC_SOURCE
+
+    for _ in range(2):
+        assert_equals(
+            '"c4x://mock_url" "c4x://mock_url" "c4x://mock_url"',
+            replace_urls(text, COURSE_KEY, '/jump_to_id/', DATA_DIRECTORY, course_version='v1')
+        )
+    assert_equals(mock_static_content.get_canonicalized_asset_path.call_count, 2)
+    assert_equals(mock_get_base_url.call_count, 1)
+
+    # Another version of the course is resolved again.
+    replace_urls(text, COURSE_KEY, '/jump_to_id/', DATA_DIRECTORY, course_version='v2')
+    assert_equals(mock_static_content.get_canonicalized_asset_path.call_count, 4)
+
+    # Unversioned courses aren't memoized.
+    replace_urls(text, COURSE_KEY, '/jump_to_id/', DATA_DIRECTORY)
+    assert_equals(mock_static_content.get_canonicalized_asset_path.call_count, 7)
+
+    # Expired urls are resolved again.
+    with patch('static_replace.time.time', return_value=time.time() + STATIC_URL_MEMO_TIMEOUT + 1):
+        replace_urls(text, COURSE_KEY, '/jump_to_id/', DATA_DIRECTORY, course_version='v1')
+    assert_equals(mock_static_content.get_canonicalized_asset_path.call_count, 9)
+    STATIC_URL_MEMO.clear()
+
+
+@patch('static_replace.cache', LocMemCache('static_replace', {}))
+@patch('static_replace.StaticContent', autospec=True)
+@patch('static_replace.modulestore', autospec=True)
+@patch('static_replace.AssetBaseUrlConfig.get_base_url', Mock(return_value=u''))
+@patch('static_replace.AssetExcludedExtensionsConfig.get_excluded_extensions', Mock(return_value=[]))
+def test_replace_urls_memo_invalidated(mock_modulestore, mock_static_content):
+    """
+    Make sure that the memoized static urls of a course are resolved again
+    once its assets are modified, e.g. locked.
+    """
+    mock_modulestore.return_value = Mock(MongoModuleStore)
+    mock_static_content.get_canonicalized_asset_path.return_value = "c4x://mock_url"
+    STATIC_URL_MEMO.clear()
+
+    replace_urls(STATIC_SOURCE, COURSE_KEY, '/jump_to_id/', DATA_DIRECTORY, course_version='v1')
+    replace_urls(STATIC_SOURCE, COURSE_KEY, '/jump_to_id/', DATA_DIRECTORY, course_version='v1')
+    assert_equals(mock_static_content.get_canonicalized_asset_path.call_count, 1)
+
+    mock_static_content.get_canonicalized_asset_path.return_value = "/asset-v1:mock_url"
+    invalidate_static_url_memo(COURSE_KEY)
+    assert_equals(
+        '"/asset-v1:mock_url"',
+        replace_urls(STATIC_SOURCE, COURSE_KEY, '/jump_to_id/', DATA_DIRECTORY, course_version='v1')
+    )
+    assert_equals(mock_static_content.get_canonicalized_asset_path.call_count, 2)
+    STATIC_URL_MEMO.clear()
+
+
 @ddt.ddt
 class CanonicalContentTest(SharedModuleStoreTestCase):
     """
@@ -0,0 +1,18 @@
+"""
+This module contains various configuration settings via
+waffle switches for the Student app.
+"""
+from openedx.core.djangoapps.waffle_utils import WaffleSwitchNamespace
+
+# Namespace
+WAFFLE_NAMESPACE = u'student'
+
+# Switches
+ENROLLMENT_COUNTERS = u'enrollment_counters'
+
+
+def waffle():
+    """
+    Returns the namespaced, cached, audited Waffle class for Student.
+    """
+    return WaffleSwitchNamespace(name=WAFFLE_NAMESPACE, log_prefix=u'Student: ')
@@ -0,0 +1,58 @@
+"""
+Command to reconcile the enrollment counters of courses with their enrollments.
+"""
+from __future__ import print_function, unicode_literals
+
+from django.core.management.base import BaseCommand, CommandError
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+from student.models import CourseEnrollmentCount
+
+
+class Command(BaseCommand):
+    """
+    Command to recount the active enrollments in each mode of courses, to
+    backfill the enrollment counters read by capacity checks and the
+    instructor dashboard, or to correct them after enrollments were changed
+    by queryset updates.
+
+    Example:
+    ./manage.py lms reconcile_enrollment_counts course-v1:edX+DemoX+Demo_Course
+    ./manage.py lms reconcile_enrollment_counts --all
+    """
+    help = 'Recount the active enrollments in each mode of courses for their enrollment counters.'
+
+    def add_arguments(self, parser):
+        """
+        Add arguments to the command parser.
+        """
+        parser.add_argument(
+            'course_ids',
+            nargs='*',
+            help='IDs of the courses whose enrollment counters to reconcile',
+        )
+
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            dest='all',
+            default=False,
+            help='Reconcile the enrollment counters of all courses.',
+        )
+
+    def handle(self, *args, **options):
+        if options['all']:
+            course_keys = CourseOverview.get_all_course_keys()
+        elif options['course_ids']:
+            try:
+                course_keys = [CourseKey.from_string(course_id) for course_id in options['course_ids']]
+            except InvalidKeyError as error:
+                raise CommandError("Invalid key: {}".format(error))
+        else:
+            raise CommandError("Specify course IDs or --all.")
+
+        for course_key in course_keys:
+            CourseEnrollmentCount.reconcile(course_key)
+            print("Reconciled the enrollment counters of {}.".format(course_key))
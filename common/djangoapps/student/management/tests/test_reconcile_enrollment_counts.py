@@ -0,0 +1,37 @@
+"""
+Tests for the `reconcile_enrollment_counts` management command
+"""
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from opaque_keys.edx.locator import CourseLocator
+
+from student.models import CourseEnrollment, CourseEnrollmentCount
+from student.tests.factories import CourseEnrollmentFactory
+
+
+@override_settings(ENROLLMENT_COUNT_RECONCILE_INTERVAL=None)
+class TestReconcileEnrollmentCountsCommand(TestCase):
+    """
+    Tests for the `reconcile_enrollment_counts` management command
+    """
+    def setUp(self):
+        super(TestReconcileEnrollmentCountsCommand, self).setUp()
+        self.course_key = CourseLocator('org', 'course', 'run')
+        for mode in ('audit', 'verified'):
+            CourseEnrollmentFactory.create(course_id=self.course_key, mode=mode)
+        # Enrollments changed without updating the counters.
+        CourseEnrollment.objects.filter(mode='verified').update(is_active=False)
+
+    def test_reconcile_course(self):
+        self.assertEqual(CourseEnrollmentCount.get_counts(self.course_key), {'audit': 1, 'verified': 1})
+        call_command('reconcile_enrollment_counts', unicode(self.course_key))
+        self.assertEqual(CourseEnrollmentCount.get_counts(self.course_key), {'audit': 1, 'verified': 0})
+
+    def test_no_courses(self):
+        with self.assertRaises(CommandError):
+            call_command('reconcile_enrollment_counts')
+
+    def test_invalid_course(self):
+        with self.assertRaises(CommandError):
+            call_command('reconcile_enrollment_counts', 'not a course')
@@ -13,6 +13,7 @@ file and check it in at the same time as your model changes. To do that,
 import hashlib
 import json
 import logging
+import random
 import uuid
 from collections import OrderedDict, defaultdict, namedtuple
 from datetime import datetime, timedelta
@@ -28,9 +29,9 @@ from django.contrib.auth.models import User
 from django.contrib.auth.signals import user_logged_in, user_logged_out
 from django.core.cache import cache
 from django.core.exceptions import MultipleObjectsReturned, ObjectDoesNotExist
-from django.db import IntegrityError, models
-from django.db.models import Count
-from django.db.models.signals import post_save, pre_save
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
 from django.dispatch import Signal, receiver
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
@@ -52,6 +53,7 @@ from eventtracking import tracker
 from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 from openedx.core.djangoapps.site_configuration import helpers as configuration_helpers
 from openedx.core.djangoapps.xmodule_django.models import CourseKeyField, NoneToEmptyManager
+from student.config.waffle import ENROLLMENT_COUNTERS, waffle
 from track import contexts
 from util.milestones_helpers import is_entrance_exams_enabled
 from util.model_utils import emit_field_changed_events, get_changed_fields_dict
@@ -874,6 +876,11 @@ class AlreadyEnrolledError(CourseEnrollmentException):
     pass
 
 
+# Seconds for which the count of enrollments of a course's staff is cached
+# for capacity checks.
+ENROLLMENT_ADMINS_CACHE_TIMEOUT = 5 * 60
+
+
 class CourseEnrollmentManager(models.Manager):
     """
     Custom manager for CourseEnrollment with Table-level filter methods.
@@ -903,6 +910,28 @@ class CourseEnrollmentManager(models.Manager):
         Returns:
             int: Count of enrollments excluding staff, instructors and CCX coaches.
 
+        """
+        staff, admins, coaches = self._course_admins(course_id)
+        return super(CourseEnrollmentManager, self).get_queryset().filter(
+            course_id=course_id,
+            is_active=1,
+        ).exclude(user__in=staff).exclude(user__in=admins).exclude(user__in=coaches).count()
+
+    def num_enrolled_admins(self, course_id):
+        """
+        Returns the count of active enrollments in a course of instructors, staff and CCX coaches.
+        """
+        staff, admins, coaches = self._course_admins(course_id)
+        return super(CourseEnrollmentManager, self).get_queryset().filter(
+            models.Q(user__in=staff) | models.Q(user__in=admins) | models.Q(user__in=coaches),
+            course_id=course_id,
+            is_active=1,
+        ).count()
+
+    @staticmethod
+    def _course_admins(course_id):
+        """
+        Returns the staff, instructors and CCX coaches of a course.
         """
         # To avoid circular imports.
         from student.roles import CourseCcxCoachRole, CourseInstructorRole, CourseStaffRole
@@ -914,22 +943,46 @@ class CourseEnrollmentManager(models.Manager):
         staff = CourseStaffRole(course_locator).users_with_role()
         admins = CourseInstructorRole(course_locator).users_with_role()
         coaches = CourseCcxCoachRole(course_locator).users_with_role()
+        return staff, admins, coaches
 
-        return super(CourseEnrollmentManager, self).get_queryset().filter(
-            course_id=course_id,
-            is_active=1,
-        ).exclude(user__in=staff).exclude(user__in=admins).exclude(user__in=coaches).count()
-
-    def is_course_full(self, course):
+    def is_course_full(self, course, lock=False):
         """
         Returns a boolean value regarding whether a course has already reached it's max enrollment
         capacity
-        """
-        is_course_full = False
-        if course.max_student_enrollments_allowed is not None:
-            is_course_full = self.num_enrolled_in_exclude_admins(course.id) >= course.max_student_enrollments_allowed
 
-        return is_course_full
+        When the student.enrollment_counters waffle switch is enabled, the
+        enrollments are read from the course's enrollment counters.  If
+        `lock` is True, and they are within ENROLLMENT_COUNT_STRICT_MARGIN
+        enrollments of the capacity, they are instead recounted under a lock
+        of the counters, held until the end of the current transaction, which
+        must then be the one creating the enrollment.
+        """
+        max_enrollments = course.max_student_enrollments_allowed
+        if max_enrollments is None:
+            return False
+        if not waffle().is_enabled(ENROLLMENT_COUNTERS):
+            return self.num_enrolled_in_exclude_admins(course.id) >= max_enrollments
+
+        num_enrolled = sum(CourseEnrollmentCount.get_counts(course.id).itervalues())
+        num_enrolled -= self._num_enrolled_admins(course.id)
+        strict_margin = getattr(settings, 'ENROLLMENT_COUNT_STRICT_MARGIN', None)
+        if lock and strict_margin is not None and max_enrollments - num_enrolled <= strict_margin:
+            # Serialize the enrollments in the course near its capacity.
+            CourseEnrollmentCount.lock(course.id)
+            num_enrolled = self.num_enrolled_in_exclude_admins(course.id)
+        return num_enrolled >= max_enrollments
+
+    def _num_enrolled_admins(self, course_id):
+        """
+        Returns and caches the count of active enrollments in a course of
+        instructors, staff and CCX coaches.
+        """
+        cache_key = u'student.enrollment_count.admins.{}'.format(course_id)
+        num_enrolled_admins = cache.get(cache_key)
+        if num_enrolled_admins is None:
+            num_enrolled_admins = self.num_enrolled_admins(course_id)
+            cache.set(cache_key, num_enrolled_admins, ENROLLMENT_ADMINS_CACHE_TIMEOUT)
+        return num_enrolled_admins
 
     def users_enrolled_in(self, course_id, include_inactive=False):
         """
@@ -948,7 +1001,17 @@ class CourseEnrollmentManager(models.Manager):
         """
         Returns a dictionary that stores the total enrollment count for a course, as well as the
         enrollment count for each individual mode.
+
+        When the student.enrollment_counters waffle switch is enabled, the
+        counts are read from the course's enrollment counters.
         """
+        if waffle().is_enabled(ENROLLMENT_COUNTERS):
+            enroll_dict = defaultdict(int, {
+                mode: count for mode, count in CourseEnrollmentCount.get_counts(course_id).iteritems() if count
+            })
+            enroll_dict['total'] = sum(enroll_dict.itervalues())
+            return enroll_dict
+
         # Unfortunately, Django's "group by"-style queries look super-awkward
         query = use_read_replica_if_available(
             super(CourseEnrollmentManager, self).get_queryset().filter(course_id=course_id, is_active=True).values(
@@ -1269,16 +1332,19 @@ class CourseEnrollment(models.Model):
                 log.warning(u"User %s failed to enroll in non-existent course %s", user.username, unicode(course_key))
                 raise NonExistentCourseError
 
-        if check_access:
-            if cls.is_enrollment_closed(user, course):
-                log.warning(
-                    u"User %s failed to enroll in course %s because enrollment is closed",
-                    user.username,
-                    course_key.to_deprecated_string()
-                )
-                raise EnrollmentClosedError
+        if check_access and cls.is_enrollment_closed(user, course):
+            log.warning(
+                u"User %s failed to enroll in course %s because enrollment is closed",
+                user.username,
+                course_key.to_deprecated_string()
+            )
+            raise EnrollmentClosedError
 
-            if cls.objects.is_course_full(course):
+        # Check the capacity of the course and create the enrollment in the
+        # same transaction, so that the lock of the course's enrollment
+        # counters taken near its capacity is held until the enrollment is.
+        with transaction.atomic():
+            if check_access and cls.objects.is_course_full(course, lock=True):
                 log.warning(
                     u"Course %s has reached its maximum enrollment of %d learners. User %s failed to enroll.",
                     course_key.to_deprecated_string(),
@@ -1286,18 +1352,18 @@ class CourseEnrollment(models.Model):
                     user.username,
                 )
                 raise CourseFullError
-        if cls.is_enrolled(user, course_key):
-            log.warning(
-                u"User %s attempted to enroll in %s, but they were already enrolled",
-                user.username,
-                course_key.to_deprecated_string()
-            )
-            if check_access:
-                raise AlreadyEnrolledError
+            if cls.is_enrolled(user, course_key):
+                log.warning(
+                    u"User %s attempted to enroll in %s, but they were already enrolled",
+                    user.username,
+                    course_key.to_deprecated_string()
+                )
+                if check_access:
+                    raise AlreadyEnrolledError
 
-        # User is allowed to enroll if they've reached this point.
-        enrollment = cls.get_or_create_enrollment(user, course_key)
-        enrollment.update_enrollment(is_active=True, mode=mode)
+            # User is allowed to enroll if they've reached this point.
+            enrollment = cls.get_or_create_enrollment(user, course_key)
+            enrollment.update_enrollment(is_active=True, mode=mode)
         enrollment.send_signal(EnrollStatusChange.enroll)
 
         return enrollment
@@ -1461,14 +1527,15 @@ class CourseEnrollment(models.Model):
         query for every enrollment when displaying something like the student
         dashboard. If some of the CourseOverviews are not found, we make no
         attempt to initialize them -- we just fall back to existing lazy-load
-        behavior. The goal is to optimize the most common case as simply as
-        possible, without changing any of the existing contracts.
+        behavior. Outdated CourseOverviews are returned, while they are
+        regenerated in the background. The goal is to optimize the most common
+        case as simply as possible, without changing any of the existing contracts.
 
         The name of this method is long, but was the end result of hashing out a
         number of alternatives, so pylint can stuff it (disable=invalid-name)
         """
         enrollments = list(cls.enrollments_for_user(user))
-        overviews = CourseOverview.get_from_ids_if_exists(
+        overviews = CourseOverview.get_from_ids(
             enrollment.course_id for enrollment in enrollments
         )
         for enrollment in enrollments:
@@ -1767,6 +1834,169 @@ def invalidate_enrollment_mode_cache(sender, instance, **kwargs):  # pylint: dis
     cache.delete(cache_key)
 
 
+class CourseEnrollmentCount(models.Model):
+    """
+    The number of active enrollments in each mode of a course, kept up to
+    date as CourseEnrollments are saved and deleted, so that capacity checks
+    and dashboards needn't count the course's enrollments.
+
+    The count of each mode is split across NUM_SHARDS rows, one of which,
+    picked at random, is updated by each enrollment, so that concurrent
+    enrollments in a course seldom wait for each other's transactions.
+
+    Enrollments changed by queryset updates aren't counted, so the counters
+    of a course are reconciled with its enrollments, in a celery task, at
+    most every ENROLLMENT_COUNT_RECONCILE_INTERVAL seconds when they are read.
+    """
+    NUM_SHARDS = 16
+
+    course_id = CourseKeyField(max_length=255, db_index=True)
+    mode = models.CharField(max_length=100)
+    shard = models.PositiveSmallIntegerField(default=0)
+    count = models.IntegerField(default=0)
+
+    class Meta(object):
+        unique_together = (('course_id', 'mode', 'shard'),)
+
+    @classmethod
+    def get_counts(cls, course_id):
+        """
+        Returns a dict of the number of active enrollments in each mode of the course.
+        """
+        reconcile_interval = getattr(settings, 'ENROLLMENT_COUNT_RECONCILE_INTERVAL', None)
+        if reconcile_interval and cache.add(u'student.enrollment_count.reconciled.{}'.format(course_id), True,
+                                            reconcile_interval):
+            from student.tasks import reconcile_enrollment_counts
+            reconcile_enrollment_counts.delay(unicode(course_id))
+        return cls._sum_counts(cls.objects.filter(course_id=course_id))
+
+    @staticmethod
+    def _sum_counts(counters):
+        """
+        Returns a dict of the sum of the given counters of each mode.
+        """
+        counts = defaultdict(int)
+        for mode, count in counters.values_list('mode', 'count'):
+            counts[mode] += count
+        return dict(counts)
+
+    @classmethod
+    def add(cls, course_id, mode, delta, shard=None):
+        """
+        Adds delta to the number of active enrollments in the mode of the
+        course, in the given shard, or a random one.
+        """
+        if shard is None:
+            shard = random.randrange(cls.NUM_SHARDS)
+        counter = cls.objects.filter(course_id=course_id, mode=mode, shard=shard)
+        if counter.update(count=F('count') + delta):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(course_id=course_id, mode=mode, shard=shard, count=delta)
+        except IntegrityError:
+            # Created by a concurrent update.
+            counter.update(count=F('count') + delta)
+
+    @classmethod
+    def lock(cls, course_id):
+        """
+        Locks the counters of the course until the end of the current
+        transaction, which then serializes with other enrollments in the course.
+        """
+        list(cls.objects.select_for_update().filter(course_id=course_id).values_list('id', flat=True))
+
+    @classmethod
+    def reconcile(cls, course_id):
+        """
+        Recounts the active enrollments in each mode of the course.
+
+        The enrollments are counted before locking the counters, so that
+        enrollments in the course needn't wait for the count.  The modes
+        whose counters were changed by enrollments meanwhile are left to be
+        reconciled the next time.
+        """
+        counters = cls.objects.filter(course_id=course_id)
+        counted_counts = cls._sum_counts(counters)
+        counts = dict(
+            CourseEnrollment.objects.filter(course_id=course_id, is_active=True).values_list(
+                'mode'
+            ).annotate(count=Count('id')).order_by()
+        )
+        with transaction.atomic():
+            for mode, counted_count in cls._sum_counts(counters.select_for_update()).iteritems():
+                count = counts.pop(mode, 0)
+                if counted_count != counted_counts.get(mode) or counted_count == count:
+                    continue
+                log.info(
+                    u'Reconciled the %s enrollment count of %s from %d to %d',
+                    mode, course_id, counted_count, count,
+                )
+                cls.add(course_id, mode, count - counted_count, shard=0)
+
+        for mode, count in counts.iteritems():
+            try:
+                with transaction.atomic():
+                    if not counters.filter(mode=mode).exists():
+                        cls.objects.create(course_id=course_id, mode=mode, shard=0, count=count)
+            except IntegrityError:
+                # Created by a concurrent enrollment.
+                pass
+
+
+def _loaded_state(enrollment):
+    """
+    Returns the (is_active, mode) state of the CourseEnrollment as last loaded or saved.
+    """
+    return getattr(enrollment, '_loaded_state', (None, None))
+
+
+def _counted_mode(enrollment_state):
+    """
+    Returns the mode an enrollment with the given (is_active, mode) state is counted in, if any.
+    """
+    is_active, mode = enrollment_state
+    return mode if is_active else None
+
+
+@receiver(post_init, sender=CourseEnrollment)
+def remember_loaded_enrollment_state(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Remembers the state a CourseEnrollment is loaded with, to update the
+    enrollment counters of its course when the state changes.
+    """
+    # pylint: disable=protected-access
+    instance._loaded_state = (instance.__dict__.get('is_active'), instance.__dict__.get('mode'))
+
+
+@receiver(post_save, sender=CourseEnrollment)
+def update_enrollment_count_on_save(sender, instance, created, raw=False, **kwargs):  # pylint: disable=unused-argument
+    """
+    Moves a saved CourseEnrollment from the counter of its previous mode to
+    that of its new mode, if it is active.
+    """
+    if raw:
+        return
+    previous_mode = None if created else _counted_mode(_loaded_state(instance))
+    mode = _counted_mode((instance.is_active, instance.mode))
+    if previous_mode != mode:
+        if previous_mode is not None:
+            CourseEnrollmentCount.add(instance.course_id, previous_mode, -1)
+        if mode is not None:
+            CourseEnrollmentCount.add(instance.course_id, mode, 1)
+    instance._loaded_state = (instance.is_active, instance.mode)  # pylint: disable=protected-access
+
+
+@receiver(post_delete, sender=CourseEnrollment)
+def update_enrollment_count_on_delete(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Removes a deleted CourseEnrollment from the counter of its mode.
+    """
+    previous_mode = _counted_mode(_loaded_state(instance))
+    if previous_mode is not None:
+        CourseEnrollmentCount.add(instance.course_id, previous_mode, -1)
+
+
 class ManualEnrollmentAudit(models.Model):
     """
     Table for tracking which enrollments were performed through manual enrollment.
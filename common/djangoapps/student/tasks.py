@@ -9,7 +9,8 @@ from celery.task import task  # pylint: disable=no-name-in-module, import-error
 from django.conf import settings
 from django.core import mail
 from mobileapps.models import MobileApp
-from student.models import CourseEnrollment
+from opaque_keys.edx.keys import CourseKey
+from student.models import CourseEnrollment, CourseEnrollmentCount
 from edx_notifications.lib.publisher import bulk_publish_notification_to_users
 
 
@@ -89,3 +90,11 @@ def publish_course_notifications_task(course_id, notification_msg, exclude_user_
         # Notifications are never critical, so we don't want to disrupt any
         # other logic processing. So log and continue.
         log.exception(ex)
+
+
+@task()
+def reconcile_enrollment_counts(course_id):
+    """
+    Reconciles the enrollment counters of the course with its enrollments.
+    """
+    CourseEnrollmentCount.reconcile(CourseKey.from_string(course_id))
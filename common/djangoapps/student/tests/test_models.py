@@ -4,9 +4,14 @@ import hashlib
 
 from django.contrib.auth.models import AnonymousUser
 from django.core.cache import cache
+from django.db.models import Count
 from django.db.models.functions import Lower
+from django.test import override_settings
+from mock import patch
 
-from student.models import CourseEnrollment
+from student.config.waffle import ENROLLMENT_COUNTERS, waffle
+from student.models import CourseEnrollment, CourseEnrollmentCount, CourseFullError
+from student.roles import CourseStaffRole
 from student.tests.factories import CourseEnrollmentFactory, UserFactory
 from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory
@@ -103,3 +108,140 @@ class CourseEnrollmentTests(SharedModuleStoreTestCase):
             CourseEnrollment.objects.users_enrolled_in(self.course.id, include_inactive=True)
         )
         self.assertListEqual([self.user, self.user_2], all_enrolled_users)
+
+
+@override_settings(ENROLLMENT_COUNT_RECONCILE_INTERVAL=None, ENROLLMENT_COUNT_STRICT_MARGIN=None)
+class CourseEnrollmentCountTests(SharedModuleStoreTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(CourseEnrollmentCountTests, cls).setUpClass()
+        cls.course = CourseFactory(max_student_enrollments_allowed=3)
+
+    def setUp(self):
+        super(CourseEnrollmentCountTests, self).setUp()
+        cache.clear()
+        override = waffle().override(ENROLLMENT_COUNTERS, active=True)
+        override.__enter__()
+        self.addCleanup(override.__exit__, None, None, None)
+
+    def assert_counts(self, expected):
+        self.assertEqual(CourseEnrollmentCount.get_counts(self.course.id), expected)
+
+    def test_counts_follow_enrollments(self):
+        users = [UserFactory.create() for _ in range(3)]
+        CourseEnrollment.enroll(users[0], self.course.id, mode='audit')
+        CourseEnrollment.enroll(users[1], self.course.id, mode='audit')
+        CourseEnrollment.enroll(users[2], self.course.id, mode='verified')
+        self.assert_counts({'audit': 2, 'verified': 1})
+
+        CourseEnrollment.unenroll(users[0], self.course.id)
+        self.assert_counts({'audit': 1, 'verified': 1})
+
+        CourseEnrollment.get_enrollment(users[1], self.course.id).update_enrollment(mode='verified')
+        self.assert_counts({'audit': 0, 'verified': 2})
+
+        CourseEnrollment.enroll(users[0], self.course.id, mode='audit')
+        CourseEnrollment.objects.filter(user=users[2]).delete()
+        self.assert_counts({'audit': 1, 'verified': 1})
+
+    def test_counts_are_sharded(self):
+        users = [UserFactory.create() for _ in range(2)]
+        with patch('student.models.random.randrange', side_effect=[3, 5, 7]):
+            for user in users:
+                CourseEnrollment.enroll(user, self.course.id, mode='audit')
+            CourseEnrollment.unenroll(users[0], self.course.id)
+        self.assertEqual(
+            sorted(CourseEnrollmentCount.objects.filter(course_id=self.course.id).values_list('shard', 'count')),
+            [(3, 1), (5, 1), (7, -1)],
+        )
+        self.assert_counts({'audit': 1})
+
+    def test_enrollment_counts(self):
+        for mode in ('audit', 'audit', 'verified'):
+            CourseEnrollmentFactory.create(course_id=self.course.id, mode=mode)
+        CourseEnrollmentFactory.create(course_id=self.course.id, mode='honor', is_active=False)
+
+        with self.assertNumQueries(1):
+            counts = CourseEnrollment.objects.enrollment_counts(self.course.id)
+        with waffle().override(ENROLLMENT_COUNTERS, active=False):
+            self.assertEqual(counts, CourseEnrollment.objects.enrollment_counts(self.course.id))
+        self.assertEqual(counts['total'], 3)
+
+    def test_reconcile(self):
+        for mode in ('audit', 'audit', 'verified'):
+            CourseEnrollmentFactory.create(course_id=self.course.id, mode=mode)
+        CourseEnrollment.objects.filter(course_id=self.course.id, mode='verified').update(mode='honor')
+        self.assert_counts({'audit': 2, 'verified': 1})
+
+        CourseEnrollmentCount.reconcile(self.course.id)
+        self.assert_counts({'audit': 2, 'honor': 1, 'verified': 0})
+
+    def test_reconcile_concurrent_enrollments(self):
+        CourseEnrollmentFactory.create(course_id=self.course.id, mode='audit')
+        CourseEnrollment.objects.filter(course_id=self.course.id).update(mode='honor')
+
+        def enroll_while_counting(field):
+            """Enrolls in the course after the counters were read, before the enrollments are counted."""
+            CourseEnrollmentFactory.create(course_id=self.course.id, mode='audit')
+            CourseEnrollmentFactory.create(course_id=self.course.id, mode='verified')
+            return Count(field)
+
+        with patch('student.models.Count', side_effect=enroll_while_counting):
+            CourseEnrollmentCount.reconcile(self.course.id)
+        # The audit counter, changed meanwhile, is left to be reconciled the
+        # next time, and the verified counter isn't created again.
+        self.assert_counts({'audit': 2, 'honor': 1, 'verified': 1})
+
+        CourseEnrollmentCount.reconcile(self.course.id)
+        self.assert_counts({'audit': 1, 'honor': 1, 'verified': 1})
+
+    @override_settings(ENROLLMENT_COUNT_RECONCILE_INTERVAL=60)
+    def test_reconciled_when_read(self):
+        CourseEnrollmentFactory.create(course_id=self.course.id)
+        CourseEnrollment.objects.filter(course_id=self.course.id).update(mode='honor')
+        with patch('student.tasks.reconcile_enrollment_counts.delay') as mock_reconcile:
+            CourseEnrollmentCount.get_counts(self.course.id)
+            CourseEnrollmentCount.get_counts(self.course.id)
+        mock_reconcile.assert_called_once_with(unicode(self.course.id))
+
+    def test_is_course_full(self):
+        staff = UserFactory.create()
+        CourseStaffRole(self.course.id).add_users(staff)
+        CourseEnrollmentFactory.create(course_id=self.course.id, user=staff)
+        for _ in range(2):
+            CourseEnrollmentFactory.create(course_id=self.course.id)
+        self.assertFalse(CourseEnrollment.objects.is_course_full(self.course))
+
+        # The count of staff enrollments is cached.
+        with self.assertNumQueries(1):
+            self.assertFalse(CourseEnrollment.objects.is_course_full(self.course))
+
+        CourseEnrollmentFactory.create(course_id=self.course.id)
+        self.assertTrue(CourseEnrollment.objects.is_course_full(self.course))
+
+    @override_settings(ENROLLMENT_COUNT_STRICT_MARGIN=1)
+    def test_is_course_full_strict(self):
+        CourseEnrollmentFactory.create(course_id=self.course.id)
+        with patch.object(CourseEnrollment.objects, 'num_enrolled_in_exclude_admins') as mock_count:
+            self.assertFalse(CourseEnrollment.objects.is_course_full(self.course, lock=True))
+        self.assertFalse(mock_count.called)
+
+        CourseEnrollmentFactory.create(course_id=self.course.id)
+        with patch.object(CourseEnrollment.objects, 'num_enrolled_in_exclude_admins', return_value=3) as mock_count:
+            with patch.object(CourseEnrollmentCount, 'lock') as mock_lock:
+                self.assertFalse(CourseEnrollment.objects.is_course_full(self.course))
+                self.assertFalse(mock_lock.called)
+                self.assertTrue(CourseEnrollment.objects.is_course_full(self.course, lock=True))
+        mock_lock.assert_called_once_with(self.course.id)
+        mock_count.assert_called_once_with(self.course.id)
+
+    @override_settings(ENROLLMENT_COUNT_STRICT_MARGIN=1)
+    def test_enroll_strict(self):
+        for _ in range(2):
+            CourseEnrollmentFactory.create(course_id=self.course.id)
+        with patch.object(CourseEnrollmentCount, 'lock', wraps=CourseEnrollmentCount.lock) as mock_lock:
+            CourseEnrollment.enroll(UserFactory.create(), self.course.id, check_access=True)
+        mock_lock.assert_called_once_with(self.course.id)
+
+        with self.assertRaises(CourseFullError):
+            CourseEnrollment.enroll(UserFactory.create(), self.course.id, check_access=True)
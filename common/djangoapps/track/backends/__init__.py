@@ -25,3 +25,8 @@ class BaseBackend(object):
     def send(self, event):
         """Send event to tracker."""
         pass
+
+    def send_batch(self, events):
+        """Send events to tracker, one at a time unless overridden."""
+        for event in events:
+            self.send(event)
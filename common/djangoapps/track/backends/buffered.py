@@ -0,0 +1,179 @@
+"""
+Event tracker backend that sends events to another backend in batches, from
+a background thread, so that requests don't wait for the backend's I/O.
+
+The wrapped backend is configured in the options of the buffered backend::
+
+  TRACKING_BACKENDS = {
+      'mongo': {
+          'ENGINE': 'track.backends.buffered.BufferedBackend',
+          'OPTIONS': {
+              'backend': {
+                  'ENGINE': 'track.backends.mongodb.MongoBackend',
+                  'OPTIONS': {...}
+              },
+              'max_buffer_size': 10000,
+              'batch_size': 100,
+              'flush_interval': 1,
+          }
+      }
+  }
+
+Events are dropped, and counted, when the buffer is full, rather than
+slowing down requests when the backend can't keep up.  Buffered events are
+sent when the process exits.
+"""
+
+from __future__ import absolute_import
+
+import atexit
+import logging
+import os
+import threading
+import time
+from Queue import Empty, Full, Queue
+
+from dogapi import dog_stats_api
+from django.db import close_old_connections
+
+from track.backends import BaseBackend
+
+log = logging.getLogger(__name__)
+
+# Seconds to wait for buffered events to be sent when the process exits.
+CLOSE_TIMEOUT = 5
+
+# Put in the buffer to stop the background thread.
+_STOP = object()
+
+
+class BufferedBackend(BaseBackend):
+    """
+    Event tracker backend that buffers events, and sends them in batches to
+    another backend from a background thread.
+    """
+
+    def __init__(self, backend, max_buffer_size=10000, batch_size=100, flush_interval=1, **kwargs):
+        """
+        Configure the buffer and the backend that events are sent to.
+
+        :Parameters:
+
+          - `backend`: dict with the 'ENGINE' and 'OPTIONS' of the backend
+            that events are sent to, as for TRACKING_BACKENDS.
+          - `max_buffer_size`: number of events buffered, beyond which
+            events are dropped.
+          - `batch_size`: maximum number of events sent in each batch.
+          - `flush_interval`: seconds to wait for more events before
+            sending a batch smaller than `batch_size`.
+
+        """
+        super(BufferedBackend, self).__init__(**kwargs)
+
+        # Imported here, since the tracker instantiates this backend.
+        from track.tracker import _instantiate_backend_from_name  # pylint: disable=protected-access
+        self.backend = _instantiate_backend_from_name(backend['ENGINE'], backend.get('OPTIONS', {}))
+        self.name = backend['ENGINE'].split('.')[-1]
+
+        self.max_buffer_size = max_buffer_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+
+        self._lock = threading.Lock()
+        self._pid = None
+        self._buffer = None
+        self._thread = None
+        atexit.register(self.close)
+
+    def send(self, event):
+        """Buffer the event, or drop it if the buffer is full."""
+        buffered_events = self._get_buffer()
+        try:
+            buffered_events.put_nowait(event)
+        except Full:
+            self.dropped += 1
+            dog_stats_api.increment('track.send.dropped', tags=['backend:{}'.format(self.name)])
+
+    def send_batch(self, events):
+        """Buffer the events, or drop them if the buffer is full."""
+        for event in events:
+            self.send(event)
+
+    def flush(self):
+        """Wait until all the buffered events have been sent."""
+        with self._lock:
+            buffered_events = self._buffer if self._pid == os.getpid() else None
+        if buffered_events is not None:
+            buffered_events.join()
+
+    def close(self, timeout=CLOSE_TIMEOUT):
+        """
+        Send the buffered events, waiting at most `timeout` seconds, and stop
+        the background thread.
+        """
+        with self._lock:
+            if self._pid != os.getpid() or self._thread is None:
+                return
+            buffered_events, thread = self._buffer, self._thread
+            self._thread = None
+        deadline = time.time() + timeout
+        try:
+            # Wait for room, as the buffer may be full.
+            buffered_events.put(_STOP, timeout=timeout)
+        except Full:
+            log.warning('Timed out sending %d buffered events to %s', buffered_events.qsize(), self.name)
+            return
+        thread.join(max(deadline - time.time(), 0))
+
+    def _get_buffer(self):
+        """
+        Return the buffer, starting the background thread first if needed,
+        e.g. in a new process forked from the one which started it.
+        """
+        with self._lock:
+            if self._pid != os.getpid() or self._thread is None:
+                self._pid = os.getpid()
+                self._buffer = Queue(self.max_buffer_size)
+                self._thread = threading.Thread(
+                    target=self._send_buffered_events, args=(self._buffer,), name='track-buffered-backend'
+                )
+                self._thread.daemon = True
+                self._thread.start()
+            return self._buffer
+
+    def _send_buffered_events(self, buffered_events):
+        """
+        Send the buffered events in batches until stopped.
+        """
+        stopped = False
+        while not stopped:
+            batch = [buffered_events.get()]
+            deadline = time.time() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not _STOP:
+                remaining = deadline - time.time()
+                try:
+                    if remaining > 0:
+                        event = buffered_events.get(timeout=remaining)
+                    else:
+                        event = buffered_events.get_nowait()
+                except Empty:
+                    break
+                batch.append(event)
+
+            if batch[-1] is _STOP:
+                stopped = True
+                batch.pop()
+            try:
+                if batch:
+                    # This thread isn't in a request, so, as at the end of each request,
+                    # discard its database connections that are unusable or obsolete.
+                    close_old_connections()
+                    with dog_stats_api.timer('track.send.batch.{}'.format(self.name)):
+                        self.backend.send_batch(batch)
+            except Exception:  # pylint: disable=broad-except
+                # The events are lost, but not those of the next batches.
+                log.exception('Error sending a batch of %d events to %s', len(batch), self.name)
+            finally:
+                for _ in xrange(len(batch) + stopped):
+                    buffered_events.task_done()
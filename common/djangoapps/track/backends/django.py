@@ -11,7 +11,7 @@ from __future__ import absolute_import
 
 import logging
 
-from django.db import models
+from django.db import OperationalError, connections, models
 
 from track.backends import BaseBackend
 
@@ -80,3 +80,16 @@ class DjangoBackend(BaseBackend):
             tldat.save(using=self.name)
         except Exception as e:  # pylint: disable=broad-except
             log.exception(e)
+
+    def send_batch(self, events):
+        tldats = [TrackingLog(**{x: event.get(x, '') for x in LOGFIELDS}) for event in events]
+        try:
+            try:
+                TrackingLog.objects.using(self.name).bulk_create(tldats)
+            except OperationalError:
+                # The connection may have been lost since the previous batch,
+                # so retry once with a new connection.
+                connections[self.name].close()
+                TrackingLog.objects.using(self.name).bulk_create(tldats)
+        except Exception as e:  # pylint: disable=broad-except
+            log.exception(e)
@@ -96,3 +96,11 @@ class MongoBackend(BaseBackend):
             # during the next event.
             msg = 'Error inserting to MongoDB event tracker backend'
             log.exception(msg)
+
+    def send_batch(self, events):
+        """Insert the events in to the Mongo collection, with a single request"""
+        try:
+            self.collection.insert(events, manipulate=False, continue_on_error=True)
+        except (PyMongoError, BSONError):
+            # As for `send`, the events that couldn't be inserted are lost.
+            log.exception('Error inserting %d events to MongoDB event tracker backend', len(events))
@@ -0,0 +1,99 @@
+from __future__ import absolute_import
+
+import threading
+
+from django.test import TestCase
+from mock import patch
+
+from track.backends import BaseBackend
+from track.backends.buffered import BufferedBackend
+
+
+class BatchBackend(BaseBackend):
+    """Records the batches of events sent, optionally waiting for an event before each."""
+
+    def __init__(self, **options):
+        super(BatchBackend, self).__init__(**options)
+        self.batches = []
+        self.proceed = threading.Event()
+        self.proceed.set()
+
+    def send(self, event):
+        self.send_batch([event])
+
+    def send_batch(self, events):
+        self.proceed.wait()
+        self.batches.append(list(events))
+
+
+class TestBufferedBackend(TestCase):
+    def setUp(self):
+        super(TestBufferedBackend, self).setUp()
+        self.backend = BufferedBackend(
+            backend={'ENGINE': 'track.backends.tests.test_buffered.BatchBackend'},
+            flush_interval=0,
+        )
+        self.addCleanup(self.backend.close)
+        self.batch_backend = self.backend.backend
+
+    def test_wrapped_backend(self):
+        self.assertIsInstance(self.batch_backend, BatchBackend)
+        self.assertEqual(self.backend.name, 'BatchBackend')
+
+    def test_batches(self):
+        self.backend.batch_size = 3
+        # Hold the first event, while the next ones are buffered.
+        self.batch_backend.proceed.clear()
+        for index in xrange(7):
+            self.backend.send({'index': index})
+        self.batch_backend.proceed.set()
+        self.backend.flush()
+
+        indexes = [[event['index'] for event in batch] for batch in self.batch_backend.batches]
+        self.assertEqual(sum(indexes, []), range(7))
+        self.assertTrue(all(len(batch) <= 3 for batch in indexes))
+        self.assertLess(len(indexes), 7)
+
+    def test_dropped_when_full(self):
+        self.backend.max_buffer_size = 2
+        self.backend.batch_size = 1
+        self.batch_backend.proceed.clear()
+        with patch('track.backends.buffered.dog_stats_api') as mock_dog_stats_api:
+            for index in xrange(10):
+                self.backend.send({'index': index})
+        self.assertGreaterEqual(self.backend.dropped, 7)
+        self.assertEqual(mock_dog_stats_api.increment.call_count, self.backend.dropped)
+        self.batch_backend.proceed.set()
+        self.backend.flush()
+
+        sent = sum(len(batch) for batch in self.batch_backend.batches)
+        self.assertEqual(sent + self.backend.dropped, 10)
+
+    def test_close(self):
+        self.backend.flush_interval = 60
+        for index in xrange(5):
+            self.backend.send({'index': index})
+        self.backend.close()
+        self.assertEqual(self.batch_backend.batches, [[{'index': index} for index in xrange(5)]])
+
+        # Events sent after closing are sent by a new thread.
+        self.backend.flush_interval = 0
+        self.backend.send({'index': 5})
+        self.backend.flush()
+        self.assertEqual(self.batch_backend.batches[-1], [{'index': 5}])
+
+    def test_backend_errors(self):
+        with patch.object(self.batch_backend, 'send_batch', side_effect=[ValueError, None]) as mock_send_batch:
+            self.backend.send({'index': 0})
+            self.backend.flush()
+            self.backend.send({'index': 1})
+            self.backend.flush()
+        self.assertEqual(mock_send_batch.call_count, 2)
+
+    def test_old_connections_closed(self):
+        with patch('track.backends.buffered.close_old_connections') as mock_close_old_connections:
+            self.backend.send({'index': 0})
+            self.backend.flush()
+            self.backend.send({'index': 1})
+            self.backend.flush()
+        self.assertEqual(mock_close_old_connections.call_count, 2)
@@ -1,6 +1,9 @@
 from __future__ import absolute_import
 
+from django.db import OperationalError
+from django.db.models.query import QuerySet
 from django.test import TestCase
+from mock import patch
 
 from track.backends.django import DjangoBackend, TrackingLog
 
@@ -24,3 +27,24 @@ class TestDjangoBackend(TestCase):
 
         # Check if time is stored in UTC
         self.assertEqual(str(results[0].time), '2013-01-01 17:01:00+00:00')
+
+    def test_django_backend_batch(self):
+        events = [
+            {'username': 'test{}'.format(index), 'time': '2013-01-01T12:01:00-05:00'}
+            for index in xrange(3)
+        ]
+        with self.assertNumQueries(1):
+            self.backend.send_batch(events)
+
+        results = TrackingLog.objects.order_by('username')
+
+        self.assertEqual([result.username for result in results], ['test0', 'test1', 'test2'])
+        self.assertEqual(str(results[0].time), '2013-01-01 17:01:00+00:00')
+
+    @patch('track.backends.django.connections')
+    def test_django_backend_batch_retry(self, mock_connections):
+        events = [{'username': 'test', 'time': '2013-01-01T12:01:00-05:00'}]
+        with patch.object(QuerySet, 'bulk_create', side_effect=[OperationalError, None]) as mock_bulk_create:
+            self.backend.send_batch(events)
+        self.assertEqual(mock_bulk_create.call_count, 2)
+        mock_connections['default'].close.assert_called_once_with()
@@ -1,10 +1,22 @@
+import logging
 import re
 
 from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import InvalidCacheBackendError
+
+from capa.safe_exec import set_worker_pool
+from capa.safe_exec.cache import DEFAULT_LOCAL_CACHE_MAX_BYTES, TieredCache
+from capa.safe_exec.pool import SandboxWorkerPool
+
+log = logging.getLogger(__name__)
 
 # We'll make assets named this be importable by Python code in the sandbox.
 PYTHON_LIB_ZIP = "python_lib.zip"
 
+# The cache of safe_exec results of this process, created upon first use.
+_SAFE_EXEC_CACHE = None
+
 
 def can_execute_unsafe_code(course_id):
     """
@@ -39,3 +51,49 @@ def get_python_lib_zip(contentstore, course_id):
         return zip_lib.data
     else:
         return None
+
+
+def get_safe_exec_cache():
+    """
+    Return the cache of safe_exec results of this process.
+
+    Results are kept in process, up to SAFE_EXEC_LOCAL_CACHE_MAX_BYTES, in
+    front of the "safe_exec" cache, which should be shared by all hosts, e.g.
+    a database or memcache cache. If it's not configured, the default cache is used, with
+    a warning.
+    """
+    global _SAFE_EXEC_CACHE  # pylint: disable=global-statement
+    if _SAFE_EXEC_CACHE is None:
+        try:
+            durable_cache = caches['safe_exec']
+        except InvalidCacheBackendError:
+            log.warning(u'No "safe_exec" cache is configured, so safe_exec results are kept in the default cache.')
+            durable_cache = caches['default']
+        _SAFE_EXEC_CACHE = TieredCache(
+            durable_cache,
+            getattr(settings, 'SAFE_EXEC_LOCAL_CACHE_MAX_BYTES', DEFAULT_LOCAL_CACHE_MAX_BYTES),
+        )
+    return _SAFE_EXEC_CACHE
+
+
+def configure_safe_exec_worker_pool():
+    """
+    Execute sandboxed code in a pool of warm interpreters, if enabled by the
+    "worker_pool" settings of CODE_JAIL.
+
+    The pool's interpreters run the sandboxed Python executable as the
+    sandbox user, with the same limits as codejail, and are started upon
+    first use, so in each process forked from this one.
+    """
+    code_jail = getattr(settings, 'CODE_JAIL', {})
+    pool_settings = code_jail.get('worker_pool', {})
+    if not (pool_settings.get('size') and code_jail.get('python_bin')):
+        set_worker_pool(None)
+        return
+
+    set_worker_pool(SandboxWorkerPool(
+        code_jail['python_bin'],
+        user=code_jail.get('user'),
+        limits=code_jail.get('limits'),
+        size=pool_settings['size'],
+    ))
@@ -2,12 +2,14 @@
 Tests for sandboxing.py in util app
 """
 
+from django.core.cache import caches
 from django.test import TestCase
 from django.test.utils import override_settings
+from mock import patch
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from opaque_keys.edx.locator import LibraryLocator
 
-from util.sandboxing import can_execute_unsafe_code
+from util.sandboxing import can_execute_unsafe_code, configure_safe_exec_worker_pool, get_safe_exec_cache
 
 
 class SandboxingTest(TestCase):
@@ -38,3 +40,61 @@ class SandboxingTest(TestCase):
         self.assertFalse(can_execute_unsafe_code(SlashSeparatedCourseKey('edX', 'full', '2012_Fall')))
         self.assertFalse(can_execute_unsafe_code(SlashSeparatedCourseKey('edX', 'full', '2013_Spring')))
         self.assertFalse(can_execute_unsafe_code(LibraryLocator('edX', 'test_bank')))
+
+
+class SafeExecCacheTest(TestCase):
+    """
+    Test the cache of safe_exec results
+    """
+    def setUp(self):
+        super(SafeExecCacheTest, self).setUp()
+        patcher = patch('util.sandboxing._SAFE_EXEC_CACHE', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @override_settings(
+        CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+            'safe_exec': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'safe_exec'},
+        },
+        SAFE_EXEC_LOCAL_CACHE_MAX_BYTES=1024,
+    )
+    def test_safe_exec_cache(self):
+        safe_exec_cache = get_safe_exec_cache()
+        self.assertIs(get_safe_exec_cache(), safe_exec_cache)
+        self.assertIs(safe_exec_cache.durable_cache, caches['safe_exec'])
+        self.assertEqual(safe_exec_cache.local_cache.max_size, 1024)
+
+    @override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+    })
+    def test_default_cache(self):
+        with patch('util.sandboxing.log') as mock_log:
+            self.assertIs(get_safe_exec_cache().durable_cache, caches['default'])
+        self.assertTrue(mock_log.warning.called)
+
+
+class SafeExecWorkerPoolTest(TestCase):
+    """
+    Test the configuration of the pool of sandboxed interpreters
+    """
+    @override_settings(CODE_JAIL={'python_bin': None, 'worker_pool': {'size': 2}})
+    def test_no_sandbox(self):
+        with patch('util.sandboxing.set_worker_pool') as mock_set_worker_pool:
+            configure_safe_exec_worker_pool()
+        mock_set_worker_pool.assert_called_once_with(None)
+
+    @override_settings(CODE_JAIL={
+        'python_bin': '/sandbox/bin/python',
+        'user': 'sandbox',
+        'limits': {'CPU': 2},
+        'worker_pool': {'size': 2},
+    })
+    def test_worker_pool(self):
+        with patch('util.sandboxing.set_worker_pool') as mock_set_worker_pool:
+            configure_safe_exec_worker_pool()
+        pool = mock_set_worker_pool.call_args[0][0]
+        self.assertEqual(pool.size, 2)
+        self.assertEqual(pool.limits['CPU'], 2)
+        cmdline = pool._cmdline  # pylint: disable=protected-access
+        self.assertEqual(cmdline[:4], ['sudo', '-u', 'sandbox', '/sandbox/bin/python'])
@@ -7,6 +7,8 @@ Uses pyparsing to parse. Main function as of now is evaluator().
 import math
 import numbers
 import operator
+from collections import OrderedDict
+from threading import Lock
 
 import numpy
 import scipy.constants
@@ -87,6 +89,10 @@ SUFFIXES = {
 }
 
 
+# Maximum number of compiled expressions kept by `compile_expression`.
+COMPILED_EXPRESSION_CACHE_SIZE = 1024
+
+
 class UndefinedVariable(Exception):
     """
     Indicate when a student inputs a variable which was not expected.
@@ -214,6 +220,74 @@ def eval_product(parse_result):
     return prod
 
 
+# The following functions are the evaluation actions for arrays of samples.
+# Operands may be arrays, which aren't `numbers.Number`s, so tell them apart
+# from the operator strings instead.
+
+def _operands(parse_result):
+    """
+    Return the numbers and arrays of the parse results, without the operators.
+    """
+    return [k for k in parse_result if not isinstance(k, basestring)]
+
+
+def eval_atom_array(parse_result):
+    """
+    Return the number or array wrapped by the atom.
+    """
+    return _operands(parse_result)[0]
+
+
+def eval_power_array(parse_result):
+    """
+    Exponentiate numbers and arrays, right to left.
+    """
+    return reduce(lambda a, b: b ** a, reversed(_operands(parse_result)))
+
+
+def eval_parallel_array(parse_result):
+    """
+    Compute numbers and arrays according to the parallel resistors operator.
+
+    `eval_parallel` returns NaN if there is a zero among the inputs; raise a
+    FloatingPointError instead, as other invalid operations do for arrays.
+    """
+    operands = _operands(parse_result)
+    if len(operands) == 1:
+        return operands[0]
+    if any(numpy.any(numpy.asarray(k) == 0) for k in operands):
+        raise FloatingPointError("invalid value encountered in parallel")
+    return 1. / sum(1. / k for k in operands)
+
+
+def eval_sum_array(parse_result):
+    """
+    Add the input numbers and arrays, keeping in mind their sign.
+    """
+    total = 0.0
+    current_op = operator.add
+    for token in parse_result:
+        if isinstance(token, basestring):
+            current_op = operator.sub if token == '-' else operator.add
+        else:
+            total = current_op(total, token)
+    return total
+
+
+def eval_product_array(parse_result):
+    """
+    Multiply the input numbers and arrays.
+    """
+    prod = 1.0
+    current_op = operator.mul
+    for token in parse_result:
+        if isinstance(token, basestring):
+            current_op = operator.truediv if token == '/' else operator.mul
+        else:
+            prod = current_op(prod, token)
+    return prod
+
+
 def add_defaults(variables, functions, case_sensitive):
     """
     Create dictionaries with both the default and user-defined variables.
@@ -242,34 +316,250 @@ def evaluator(variables, functions, math_expr, case_sensitive=False):
     if math_expr.strip() == "":
         return float('nan')
 
-    # Parse the tree.
-    math_interpreter = ParseAugmenter(math_expr, case_sensitive)
-    math_interpreter.parse_algebra()
+    return compile_expression(math_expr, case_sensitive).evaluate(variables, functions)
+
+
+_compiled_expressions = OrderedDict()
+_compiled_expressions_lock = Lock()
+
+
+def compile_expression(math_expr, case_sensitive=False):
+    """
+    Return the `CompiledExpression` for a string of math, to evaluate it
+    many times with different variables.
+
+    Compiled expressions are cached, so compiling the same expression again
+    doesn't parse it again.
+    """
+    cache_key = (math_expr, case_sensitive)
+    with _compiled_expressions_lock:
+        compiled = _compiled_expressions.pop(cache_key, None)
+        if compiled is not None:
+            _compiled_expressions[cache_key] = compiled
+            return compiled
+
+    compiled = CompiledExpression(math_expr, case_sensitive)
+    with _compiled_expressions_lock:
+        _compiled_expressions[cache_key] = compiled
+        while len(_compiled_expressions) > COMPILED_EXPRESSION_CACHE_SIZE:
+            _compiled_expressions.popitem(last=False)
+    return compiled
+
+
+class CompiledExpression(object):
+    """
+    A string of math, parsed once into a tree of evaluation functions.
+
+    Evaluate it with `OBJ.evaluate(variables, functions)`, as often as needed.
+    """
+    def __init__(self, math_expr, case_sensitive=False):
+        self.math_expr = math_expr
+        self.case_sensitive = case_sensitive
+        self.tree = None
+        self.variables_used = frozenset()
+        self.functions_used = frozenset()
+        self._evaluate_tree = None
+        self._evaluate_array_tree = None
+
+        if math_expr.strip() == "":
+            return
+
+        self.tree = _algebra_grammar().parseString(math_expr)[0]
+        variables_used, functions_used = set(), set()
+        self._evaluate_tree = self._compile_node(self.tree, EVALUATE_ACTIONS, variables_used, functions_used)
+        self.variables_used = frozenset(variables_used)
+        self.functions_used = frozenset(functions_used)
+
+    def evaluate(self, variables, functions):
+        """
+        Evaluate the expression with the given variables and functions, in
+        addition to the default ones, and return a float.
+
+        Raise an UndefinedVariable if any variable or function is undefined.
+        """
+        if self._evaluate_tree is None:
+            return float('nan')
+
+        all_variables, all_functions = add_defaults(variables, functions, self.case_sensitive)
+        check_variables(
+            self.variables_used, self.functions_used, all_variables, all_functions, self.case_sensitive,
+        )
+        return self._evaluate_tree(all_variables, all_functions)
+
+    def evaluate_array(self, variables, functions):
+        """
+        Evaluate the expression once for many samples of the variables, given
+        as NumPy arrays of equal length, and return an array of the results,
+        or a number if the expression uses none of the arrays.
+
+        Rather than giving infinite or NaN results, where `evaluate` may raise
+        errors for some samples, division by zero, overflow and invalid
+        operations raise a FloatingPointError; evaluate those samples one at a
+        time with `evaluate` instead.
+        """
+        if self._evaluate_tree is None:
+            return float('nan')
+
+        all_variables, all_functions = add_defaults(variables, functions, self.case_sensitive)
+        check_variables(
+            self.variables_used, self.functions_used, all_variables, all_functions, self.case_sensitive,
+        )
+        if self._evaluate_array_tree is None:
+            self._evaluate_array_tree = self._compile_node(self.tree, ARRAY_EVALUATE_ACTIONS, set(), set())
+        with numpy.errstate(divide='raise', over='raise', invalid='raise', under='ignore'):
+            return self._evaluate_array_tree(all_variables, all_functions)
+
+    def _casify(self, name):
+        """
+        Return the name as stored in the dictionaries of variables and functions.
+        """
+        return name if self.case_sensitive else name.lower()
+
+    def _compile_node(self, node, actions, variables_used, functions_used):
+        """
+        Return a function of the variables and functions which evaluates
+        the given node of the parse tree with the given evaluation actions,
+        recording the names of the variables and functions it uses.
+        """
+        if not isinstance(node, ParseResults):
+            # Then it's a terminal node, e.g. an operator.
+            return lambda all_variables, all_functions: node
+
+        node_name = node.getName()
+        if node_name == 'number':
+            value = eval_number(node)
+            return lambda all_variables, all_functions: value
+
+        if node_name == 'variable':
+            variables_used.add(node[0])
+            variable_name = self._casify(node[0])
+            return lambda all_variables, all_functions: all_variables[variable_name]
+
+        if node_name == 'function':
+            functions_used.add(node[0])
+            function_name = self._casify(node[0])
+            evaluate_argument = self._compile_node(node[1], actions, variables_used, functions_used)
+            return lambda all_variables, all_functions: all_functions[function_name](
+                evaluate_argument(all_variables, all_functions)
+            )
+
+        if node_name not in actions:  # pragma: no cover
+            raise Exception(u"Unknown branch name '{}'".format(node_name))
+
+        action = actions[node_name]
+        evaluate_kids = [self._compile_node(kid, actions, variables_used, functions_used) for kid in node]
+        return lambda all_variables, all_functions: action(
+            [evaluate_kid(all_variables, all_functions) for evaluate_kid in evaluate_kids]
+        )
+
+
+# Evaluation actions of the nodes, other than numbers, variables and
+# functions, of the parse tree.
+EVALUATE_ACTIONS = {
+    'atom': eval_atom,
+    'power': eval_power,
+    'parallel': eval_parallel,
+    'product': eval_product,
+    'sum': eval_sum
+}
+
+# Evaluation actions of the same nodes, for arrays of samples.
+ARRAY_EVALUATE_ACTIONS = {
+    'atom': eval_atom_array,
+    'power': eval_power_array,
+    'parallel': eval_parallel_array,
+    'product': eval_product_array,
+    'sum': eval_sum_array
+}
 
-    # Get our variables together.
-    all_variables, all_functions = add_defaults(variables, functions, case_sensitive)
 
-    # ...and check them
-    math_interpreter.check_variables(all_variables, all_functions)
+def check_variables(variables_used, functions_used, valid_variables, valid_functions, case_sensitive):
+    """
+    Confirm that all the variables and functions used are valid/defined.
 
-    # Create a recursion to evaluate the tree.
+    Otherwise, raise an UndefinedVariable containing all bad variables.
+    """
     if case_sensitive:
         casify = lambda x: x
     else:
         casify = lambda x: x.lower()  # Lowercase for case insens.
 
-    evaluate_actions = {
-        'number': eval_number,
-        'variable': lambda x: all_variables[casify(x[0])],
-        'function': lambda x: all_functions[casify(x[0])](x[1]),
-        'atom': eval_atom,
-        'power': eval_power,
-        'parallel': eval_parallel,
-        'product': eval_product,
-        'sum': eval_sum
-    }
+    # Test if casify(X) is valid, but return the actual bad input (i.e. X)
+    bad_vars = set(var for var in variables_used
+                   if casify(var) not in valid_variables)
+    bad_vars.update(func for func in functions_used
+                    if casify(func) not in valid_functions)
+
+    if bad_vars:
+        raise UndefinedVariable(' '.join(sorted(bad_vars)))
+
+
+_algebra_grammar_element = None
+
+
+def _algebra_grammar():
+    """
+    Return the pyparsing grammar of algebraic expressions, built once.
+
+    Parsing with the grammar yields a `pyparsing.ParseResult` with proper
+    groupings to reflect parenthesis and order of operations. All operators
+    are left in the tree and strings of numbers are not parsed into their
+    float versions.
+    """
+    global _algebra_grammar_element  # pylint: disable=global-statement
+    if _algebra_grammar_element is not None:
+        return _algebra_grammar_element
+
+    # 0.33 or 7 or .34 or 16.
+    number_part = Word(nums)
+    inner_number = (number_part + Optional("." + Optional(number_part))) | ("." + number_part)
+    # pyparsing allows spaces between tokens--`Combine` prevents that.
+    inner_number = Combine(inner_number)
+
+    # SI suffixes and percent.
+    number_suffix = MatchFirst(Literal(k) for k in SUFFIXES.keys())
+
+    # 0.33k or 17
+    plus_minus = Literal('+') | Literal('-')
+    number = Group(
+        Optional(plus_minus) +
+        inner_number +
+        Optional(CaselessLiteral("E") + Optional(plus_minus) + number_part) +
+        Optional(number_suffix)
+    )
+    number = number("number")
+
+    # Predefine recursive variables.
+    expr = Forward()
+
+    # Handle variables passed in. They must start with letters/underscores
+    # and may contain numbers afterward.
+    inner_varname = Word(alphas + "_", alphanums + "_")
+    varname = Group(inner_varname)("variable")
+
+    # Same thing for functions.
+    function = Group(inner_varname + Suppress("(") + expr + Suppress(")"))("function")
+
+    atom = number | function | varname | "(" + expr + ")"
+    atom = Group(atom)("atom")
+
+    # Do the following in the correct order to preserve order of operation.
+    pow_term = atom + ZeroOrMore("^" + atom)
+    pow_term = Group(pow_term)("power")
+
+    par_term = pow_term + ZeroOrMore('||' + pow_term)  # 5k || 4k
+    par_term = Group(par_term)("parallel")
+
+    prod_term = par_term + ZeroOrMore((Literal('*') | Literal('/')) + par_term)  # 7 * 5 / 4
+    prod_term = Group(prod_term)("product")
+
+    sum_term = Optional(plus_minus) + prod_term + ZeroOrMore(plus_minus + prod_term)  # -5 + 4 - 3
+    sum_term = Group(sum_term)("sum")
 
-    return math_interpreter.reduce_tree(evaluate_actions)
+    # Finish the recursion.
+    expr << sum_term  # pylint: disable=pointless-statement
+    _algebra_grammar_element = expr + stringEnd
+    return _algebra_grammar_element
 
 
 class ParseAugmenter(object):
@@ -292,23 +582,6 @@ class ParseAugmenter(object):
         self.variables_used = set()
         self.functions_used = set()
 
-        def vpa(tokens):
-            """
-            When a variable is recognized, store it in `variables_used`.
-            """
-            varname = tokens[0][0]
-            self.variables_used.add(varname)
-
-        def fpa(tokens):
-            """
-            When a function is recognized, store it in `functions_used`.
-            """
-            varname = tokens[0][0]
-            self.functions_used.add(varname)
-
-        self.variable_parse_action = vpa
-        self.function_parse_action = fpa
-
     def parse_algebra(self):
         """
         Parse an algebraic expression into a tree.
@@ -317,61 +590,20 @@ class ParseAugmenter(object):
         reflect parenthesis and order of operations. Leave all operators in the
         tree and do not parse any strings of numbers into their float versions.
 
+        The tree is shared with the cached `CompiledExpression` of the
+        expression, so don't modify it.
+
         Adding the groups and result names makes the `repr()` of the result
         really gross. For debugging, use something like
           print OBJ.tree.asXML()
         """
-        # 0.33 or 7 or .34 or 16.
-        number_part = Word(nums)
-        inner_number = (number_part + Optional("." + Optional(number_part))) | ("." + number_part)
-        # pyparsing allows spaces between tokens--`Combine` prevents that.
-        inner_number = Combine(inner_number)
-
-        # SI suffixes and percent.
-        number_suffix = MatchFirst(Literal(k) for k in SUFFIXES.keys())
-
-        # 0.33k or 17
-        plus_minus = Literal('+') | Literal('-')
-        number = Group(
-            Optional(plus_minus) +
-            inner_number +
-            Optional(CaselessLiteral("E") + Optional(plus_minus) + number_part) +
-            Optional(number_suffix)
-        )
-        number = number("number")
-
-        # Predefine recursive variables.
-        expr = Forward()
-
-        # Handle variables passed in. They must start with letters/underscores
-        # and may contain numbers afterward.
-        inner_varname = Word(alphas + "_", alphanums + "_")
-        varname = Group(inner_varname)("variable")
-        varname.setParseAction(self.variable_parse_action)
-
-        # Same thing for functions.
-        function = Group(inner_varname + Suppress("(") + expr + Suppress(")"))("function")
-        function.setParseAction(self.function_parse_action)
-
-        atom = number | function | varname | "(" + expr + ")"
-        atom = Group(atom)("atom")
-
-        # Do the following in the correct order to preserve order of operation.
-        pow_term = atom + ZeroOrMore("^" + atom)
-        pow_term = Group(pow_term)("power")
-
-        par_term = pow_term + ZeroOrMore('||' + pow_term)  # 5k || 4k
-        par_term = Group(par_term)("parallel")
-
-        prod_term = par_term + ZeroOrMore((Literal('*') | Literal('/')) + par_term)  # 7 * 5 / 4
-        prod_term = Group(prod_term)("product")
-
-        sum_term = Optional(plus_minus) + prod_term + ZeroOrMore(plus_minus + prod_term)  # -5 + 4 - 3
-        sum_term = Group(sum_term)("sum")
-
-        # Finish the recursion.
-        expr << sum_term  # pylint: disable=pointless-statement
-        self.tree = (expr + stringEnd).parseString(self.math_expr)[0]
+        compiled = compile_expression(self.math_expr, self.case_sensitive)
+        if compiled.tree is None:
+            # Blank expressions don't parse, as with the full grammar.
+            _algebra_grammar().parseString(self.math_expr)
+        self.tree = compiled.tree
+        self.variables_used = set(compiled.variables_used)
+        self.functions_used = set(compiled.functions_used)
 
     def reduce_tree(self, handle_actions, terminal_converter=None):
         """
@@ -417,16 +649,6 @@ class ParseAugmenter(object):
 
         Otherwise, raise an UndefinedVariable containing all bad variables.
         """
-        if self.case_sensitive:
-            casify = lambda x: x
-        else:
-            casify = lambda x: x.lower()  # Lowercase for case insens.
-
-        # Test if casify(X) is valid, but return the actual bad input (i.e. X)
-        bad_vars = set(var for var in self.variables_used
-                       if casify(var) not in valid_variables)
-        bad_vars.update(func for func in self.functions_used
-                        if casify(func) not in valid_functions)
-
-        if bad_vars:
-            raise UndefinedVariable(' '.join(sorted(bad_vars)))
+        check_variables(
+            self.variables_used, self.functions_used, valid_variables, valid_functions, self.case_sensitive,
+        )
@@ -0,0 +1,98 @@
+"""
+Performance test comparing the evaluation of expressions when parsed
+for every evaluation, when compiled and cached by `evaluator`, and when
+compiled once and evaluated with many variable bindings.
+"""
+from __future__ import print_function
+
+import timeit
+import unittest
+
+import numpy
+
+from calc import calc
+
+# numpy warns when functions are evaluated outside of their domain.
+numpy.seterr(all='ignore')
+
+# Expressions, with their variables and functions, of the calc unit tests.
+EXPRESSIONS = [
+    ({}, {}, '13'),
+    ({}, {}, '-.618033989'),
+    ({}, {}, '4.2%'),
+    ({}, {}, '8.3M'),
+    ({}, {}, '1||1||2'),
+    ({}, {}, '-pi/4'),
+    ({}, {}, '1.298 + 0.635*j'),
+    ({}, {}, 'arcsin(0.866)'),
+    ({}, {}, 'sech(0.5)'),
+    ({}, {}, 'factorial(5)'),
+    ({}, {}, '(2^2+1.0)/sqrt(5e0)*5-1'),
+    ({}, {}, '1+1/(1+1/(1+1/(1+1)))'),
+    ({}, {}, '10||sin(7+5)'),
+    ({}, {}, 'k*T/q'),
+    ({}, {}, 'e^(j*pi)'),
+    ({}, {}, '-1.6*10^(-3)'),
+    ({'x': 9.72, 'y': 7.91}, {}, '3*x-y'),
+    ({'R1': 2.0, 'R3': 4.0}, {}, 'r1*r3'),
+    ({'x': 4.712}, {'f': numpy.sin}, 'f(x)'),
+    ({}, {}, 'SiN(6)'),
+]
+
+# Number of times to repeat the evaluation of all expressions.
+NUM_REPEATS = 100
+
+
+# Eventually, exclude this attribute from regular unittests while running *only* tests
+# with this attribute during regular performance tests.
+# @attr("perf_test")
+@unittest.skip
+class EvaluatorPerf(unittest.TestCase):
+    """
+    This class exists to time the evaluation of the expressions of the
+    calc unit tests.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    def _time(self, func):
+        """
+        Returns the average wall time, in microseconds, of calling the given
+        function with each of the expressions.
+        """
+        def _evaluate_all():
+            """
+            Evaluates all the expressions with the given function.
+            """
+            for variables, functions, math_expr in EXPRESSIONS:
+                func(variables, functions, math_expr)
+
+        return timeit.timeit(_evaluate_all, number=NUM_REPEATS) * 1e6 / NUM_REPEATS / len(EXPRESSIONS)
+
+    def test_evaluator_timings(self):
+        compiled = {
+            math_expr: calc.compile_expression(math_expr)
+            for _, _, math_expr in EXPRESSIONS
+        }
+        results = [
+            (
+                'parsed',
+                self._time(
+                    lambda variables, functions, math_expr:
+                    calc.CompiledExpression(math_expr).evaluate(variables, functions)
+                ),
+            ),
+            ('evaluator', self._time(calc.evaluator)),
+            (
+                'compiled',
+                self._time(
+                    lambda variables, functions, math_expr: compiled[math_expr].evaluate(variables, functions)
+                ),
+            ),
+        ]
+
+        print('\nExpressions: {}, Repeats: {}'.format(len(EXPRESSIONS), NUM_REPEATS))
+        print('{:<12}{:>20}'.format('mode', 'per evaluation (us)'))
+        for result in results:
+            print('{:<12}{:>20.1f}'.format(*result))
@@ -559,3 +559,86 @@ class EvaluatorTest(unittest.TestCase):
             calc.evaluator({'r1': 5}, {}, "r1+r2")
         with self.assertRaisesRegexp(calc.UndefinedVariable, 'r1 r3'):
             calc.evaluator(variables, {}, "r1*r3", case_sensitive=True)
+
+
+class CompiledExpressionTest(unittest.TestCase):
+    """
+    Run tests for calc.compile_expression and calc.CompiledExpression
+    """
+
+    def test_compiled_once(self):
+        """
+        Compiling the same expression again returns the cached compilation.
+        """
+        compiled = calc.compile_expression('3*x-y')
+        self.assertIs(calc.compile_expression('3*x-y'), compiled)
+        self.assertIsNot(calc.compile_expression('3*x-y', case_sensitive=True), compiled)
+
+    def test_evaluate_many(self):
+        """
+        A compiled expression evaluates with different variables.
+        """
+        compiled = calc.compile_expression('3*x-y')
+        self.assertEqual(compiled.variables_used, {'x', 'y'})
+        self.assertEqual(compiled.functions_used, set())
+        for x_value, y_value in [(9.72, 7.91), (1.0, 2.0), (-3.5, 0.0)]:
+            self.assertEqual(
+                compiled.evaluate({'x': x_value, 'y': y_value}, {}),
+                calc.evaluator({'x': x_value, 'y': y_value}, {}, '3*x-y'),
+            )
+
+    def test_evaluate_functions(self):
+        """
+        A compiled expression evaluates with different functions.
+        """
+        compiled = calc.compile_expression('f(x)+sin(0)')
+        self.assertEqual(compiled.functions_used, {'f', 'sin'})
+        self.assertEqual(compiled.evaluate({'x': 2.0}, {'f': lambda x: x}), 2.0)
+        self.assertEqual(compiled.evaluate({'x': 2.0}, {'f': lambda x: x * 3}), 6.0)
+
+    def test_undefined_vars(self):
+        """
+        Undefined variables are checked at every evaluation.
+        """
+        compiled = calc.compile_expression('r1+r2')
+        self.assertEqual(compiled.evaluate({'r1': 1.0, 'r2': 2.0}, {}), 3.0)
+        with self.assertRaisesRegexp(calc.UndefinedVariable, 'r2'):
+            compiled.evaluate({'r1': 1.0}, {})
+
+    def test_blank(self):
+        """
+        Blank expressions compile, and evaluate to NaN.
+        """
+        self.assertTrue(numpy.isnan(calc.compile_expression('  ').evaluate({}, {})))
+
+    def test_parse_error(self):
+        """
+        Expressions that don't parse aren't cached.
+        """
+        with self.assertRaises(ParseException):
+            calc.compile_expression('1+.')
+        self.assertNotIn(('1+.', False), calc.calc._compiled_expressions)  # pylint: disable=protected-access
+
+    def test_evaluate_array(self):
+        """
+        Evaluating with arrays of samples gives the results of evaluating
+        each sample.
+        """
+        samples = {'x': numpy.array([-2.5, 0.5, 3.0]), 'y': numpy.array([1.0, -4.0, 7.5])}
+        for math_expr in ['3*x-y', 'x^2^y', 'x||y', 'sin(x)/y+j*x', '-x*(y-2)^-1', 'sqrt(y^2)+pi', '2']:
+            compiled = calc.compile_expression(math_expr)
+            results = compiled.evaluate_array(samples, {}) * numpy.ones(3)
+            for index in range(3):
+                expected = compiled.evaluate({'x': samples['x'][index], 'y': samples['y'][index]}, {})
+                self.assertAlmostEqual(results[index], expected, delta=1e-12 * abs(expected))
+
+    def test_evaluate_array_errors(self):
+        """
+        Floating point errors raise when evaluating with arrays of samples.
+        """
+        samples = {'x': numpy.array([1.0, 0.0]), 'y': numpy.array([-8.0, 2.0])}
+        for math_expr in ['1/x', 'x||y', 'y^0.5', '10^(1000*y)']:
+            with self.assertRaises(FloatingPointError):
+                calc.compile_expression(math_expr).evaluate_array(samples, {})
+        with self.assertRaises(calc.UndefinedVariable):
+            calc.compile_expression('x+z').evaluate_array(samples, {})
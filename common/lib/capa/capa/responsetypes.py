@@ -42,7 +42,7 @@ import capa.safe_exec as safe_exec
 import capa.xqueue_interface as xqueue_interface
 import dogstats_wrapper as dog_stats_api
 # specific library imports
-from calc import UndefinedVariable, evaluator
+from calc import UndefinedVariable, compile_expression, evaluator
 from cmath import isnan
 from openedx.core.djangolib.markup import HTML, Text
 
@@ -50,6 +50,7 @@ from . import correctmap
 from .registry import TagRegistry
 from .util import (
     compare_with_tolerance,
+    compare_with_tolerance_array,
     contextualize_text,
     convert_files_to_filenames,
     default_tolerance,
@@ -3174,16 +3175,52 @@ class FormulaResponse(LoncapaResponse):
         "correct" or "incorrect".
         """
         var_dict_list = self.randomize_variables(samples)
-        student_result = self.tupleize_answers(given, var_dict_list)
-        instructor_result = self.tupleize_answers(expected, var_dict_list)
+        correct = self.check_formula_samples(expected, given, var_dict_list)
+        if correct is None:
+            student_result = self.tupleize_answers(given, var_dict_list)
+            instructor_result = self.tupleize_answers(expected, var_dict_list)
 
-        correct = all(compare_with_tolerance(student, instructor, self.tolerance)
-                      for student, instructor in zip(student_result, instructor_result))
+            correct = all(compare_with_tolerance(student, instructor, self.tolerance)
+                          for student, instructor in zip(student_result, instructor_result))
         if correct:
             return "correct"
         else:
             return "incorrect"
 
+    def check_formula_samples(self, expected, given, var_dict_list):
+        """
+        Evaluate the expected and given answers for all the samples of
+        `var_dict_list` at once, with arrays of the sampled values, and return
+        whether they are equal within tolerance for all samples.
+
+        Return None if they need to be evaluated one sample at a time by
+        `tupleize_answers`, i.e. when the evaluation with arrays raises any
+        error, such as a division by zero, or gives results that are not finite,
+        so that errors and results are exactly those of evaluating each sample.
+        """
+        if not var_dict_list:
+            return None
+
+        variables = {
+            var: numpy.array([var_dict[var] for var_dict in var_dict_list])
+            for var in var_dict_list[0]
+        }
+        # pylint: disable=broad-except
+        try:
+            student_result = compile_expression(given, self.case_sensitive).evaluate_array(variables, dict())
+            instructor_result = compile_expression(expected, self.case_sensitive).evaluate_array(variables, dict())
+        except Exception:
+            return None
+
+        student_result, instructor_result, _ = numpy.broadcast_arrays(
+            student_result, instructor_result, numpy.empty(len(var_dict_list)),
+        )
+        for result in (student_result, instructor_result):
+            if result.dtype.kind not in 'fc' or not numpy.isfinite(result).all():
+                return None
+
+        return bool(compare_with_tolerance_array(student_result, instructor_result, self.tolerance).all())
+
     def compare_answer(self, ans1, ans2):
         """
         An external interface for comparing whether a and b are equal.
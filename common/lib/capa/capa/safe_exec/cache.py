@@ -0,0 +1,63 @@
+"""
+Two-tier cache of safe_exec results.
+
+safe_exec results are cached by the hash of the code, globals and random
+seed that produced them, so a result never changes for a given key, and
+can be kept by every process for as long as it's useful.
+
+The first tier is an in-process LRU cache of pickled results, bounded by
+the total size of the pickles, which saves the round trip to the shared
+cache for the results a process uses over and over, e.g. when rescoring
+a problem for all students of a course.  The second tier is a durable
+cache shared by all processes, such as a database or file based cache
+that outlives the eviction of results from memcached.
+"""
+import cPickle as pickle
+
+from dogapi import dog_stats_api
+
+from openedx.core.lib.cache_utils import SizeBoundedLRUCache
+
+# Default maximum size, in bytes, of the pickled results kept in process.
+DEFAULT_LOCAL_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+
+class TieredCache(object):
+    """
+    A cache for safe_exec, with an in-process LRU cache of pickled results,
+    bounded by the total size of the pickles, in front of the given durable
+    cache, an object with .get(key) and .set(key, value) methods.
+
+    Values are unpickled upon each local hit, so, as with any shared cache,
+    callers get their own copy of the cached value.
+    """
+    def __init__(self, durable_cache, max_local_bytes=DEFAULT_LOCAL_CACHE_MAX_BYTES):
+        self.durable_cache = durable_cache
+        self.local_cache = SizeBoundedLRUCache(max_local_bytes)
+
+    def get(self, key):
+        """
+        Returns the value cached for the given key in either tier, or None.
+        """
+        payload = self.local_cache.get(key)
+        if payload is not None:
+            dog_stats_api.increment('capa.safe_exec.cache.hit', tags=['tier:local'])
+            return pickle.loads(payload)
+
+        value = self.durable_cache.get(key)
+        if value is None:
+            dog_stats_api.increment('capa.safe_exec.cache.miss')
+            return None
+
+        dog_stats_api.increment('capa.safe_exec.cache.hit', tags=['tier:durable'])
+        self.local_cache.set(key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        return value
+
+    def set(self, key, value):
+        """
+        Caches the given value for the given key in both tiers.
+        """
+        payload = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        dog_stats_api.histogram('capa.safe_exec.cache.payload_size', len(payload))
+        self.local_cache.set(key, payload)
+        self.durable_cache.set(key, value)
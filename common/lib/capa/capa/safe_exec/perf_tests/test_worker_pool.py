@@ -0,0 +1,71 @@
+"""
+Performance test comparing the latency of executing code in a new sandbox
+for each execution, and in a pool of warm sandboxed interpreters.
+"""
+from __future__ import print_function
+
+import timeit
+import unittest
+
+from codejail import jail_code
+
+from capa.safe_exec import safe_exec, set_worker_pool
+from capa.safe_exec.pool import SandboxWorkerPool
+
+# Code of a typical CustomResponse check function.
+CODE = """
+def check_func(expect, ans):
+    return abs(float(ans) - numpy.sqrt(float(expect))) < 1e-3
+correct = check_func('2', '1.4142')
+"""
+
+# Number of executions to time.
+NUM_EXECUTIONS = 50
+
+
+# Eventually, exclude this attribute from regular unittests while running *only* tests
+# with this attribute during regular performance tests.
+# @attr("perf_test")
+@unittest.skip
+class WorkerPoolPerf(unittest.TestCase):
+    """
+    This class exists to time executions of code, in a new sandbox for
+    each execution, and in a pool of sandboxed interpreters.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    def setUp(self):
+        super(WorkerPoolPerf, self).setUp()
+        if not jail_code.is_configured("python"):
+            self.skipTest("Both modes need a sandboxed Python configured with codejail.")
+        command = jail_code.COMMANDS["python"]
+        self.pool = SandboxWorkerPool(
+            command["cmdline_start"][0], user=command["user"], limits=dict(jail_code.LIMITS), size=1,
+        )
+        self.addCleanup(self.pool.stop)
+
+    def _time_executions(self, pool):
+        """
+        Returns the average wall time, in milliseconds, of executing the code
+        with the given pool, or in a new sandbox if None.
+        """
+        set_worker_pool(pool)
+        try:
+            # Don't time the start of the pool's interpreter.
+            safe_exec(CODE, {})
+            return timeit.timeit(lambda: safe_exec(CODE, {}), number=NUM_EXECUTIONS) * 1000 / NUM_EXECUTIONS
+        finally:
+            set_worker_pool(None)
+
+    def test_execution_timings(self):
+        results = [
+            ('sandbox', self._time_executions(None)),
+            ('pool', self._time_executions(self.pool)),
+        ]
+
+        print('\nExecutions: {}'.format(NUM_EXECUTIONS))
+        print('{:<10}{:>22}'.format('mode', 'per execution (ms)'))
+        for result in results:
+            print('{:<10}{:>22.1f}'.format(*result))
@@ -0,0 +1,275 @@
+"""
+A pool of warm sandboxed Python interpreters to execute code in.
+
+codejail starts a new sandboxed interpreter for each execution, which then
+imports numpy and friends before running the few lines of a problem's code.
+The interpreters of a `SandboxWorkerPool` are started the same way, with
+the same user, AppArmor-confined Python executable and resource limits, and
+import the assumed modules once.
+
+Each interpreter is a fork server that never executes code itself: each
+execution happens in a new child process forked from it, which has the
+modules already imported, and exits when the execution is done.  So code
+can't leave any state behind for the code of later executions, of the same
+or other courses and students.  See worker.py.
+"""
+import base64
+from functools import partial
+import json
+import os
+import os.path
+import resource
+import select
+import subprocess
+import tempfile
+import threading
+import time
+
+from codejail.safe_exec import SafeExecException, json_safe
+from dogapi import dog_stats_api
+
+from . import worker
+
+# The source of the interpreters' main loop, read now as for lazymod.py.
+worker_py_file = worker.__file__
+if worker_py_file.endswith("c"):
+    worker_py_file = worker_py_file[:-1]
+
+WORKER_PY = open(worker_py_file).read()
+
+# Modules imported by the interpreters when they start.
+PRELOADED_MODULES = [
+    "numpy", "math", "scipy", "calc", "eia", "chem.chemcalc", "chem.chemtools", "chem.miller",
+    "verifiers.draganddrop",
+]
+
+# Default resource limits, as for codejail.  A limit of 0 means no limit.
+DEFAULT_LIMITS = {
+    # CPU seconds of each execution.
+    "CPU": 1,
+    # Real time seconds of each execution.
+    "REALTIME": 3,
+    # Virtual memory bytes of each execution.
+    "VMEM": 0,
+    # Bytes of the files each execution can write.
+    "FSIZE": 0,
+}
+
+# Seconds to wait for an interpreter's response beyond the real time limit
+# of the execution, which the interpreter enforces itself.
+RESPONSE_GRACE_TIME = 2
+
+
+class WorkerError(Exception):
+    """
+    An interpreter of the pool exited or didn't respond in time.
+    """
+    pass
+
+
+def set_process_limits(limits):
+    """
+    Set the resource limits of an interpreter, before it starts.
+
+    The limits of CPU time and new processes are set by the interpreter
+    in the child process of each execution, as it needs to fork them, and
+    that of file size too, as it writes the files of the executions.
+    """
+    if limits["VMEM"]:
+        resource.setrlimit(resource.RLIMIT_AS, (limits["VMEM"], limits["VMEM"]))
+
+
+def _read_files(path, destination):
+    """
+    Return the (destination path, contents) pairs of the file at the path,
+    or of the files in the directory at the path.
+    """
+    if not os.path.isdir(path):
+        with open(path, 'rb') as source_file:
+            return [(destination, source_file.read())]
+    files = []
+    for name in os.listdir(path):
+        files.extend(_read_files(os.path.join(path, name), os.path.join(destination, name)))
+    return files
+
+
+class SandboxWorker(object):
+    """
+    A sandboxed Python interpreter, running the main loop of worker.py.
+    """
+    def __init__(self, cmdline, limits):
+        self._buffer = ''
+        with open(os.devnull, 'w') as devnull:
+            self._process = subprocess.Popen(
+                cmdline,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=devnull,
+                preexec_fn=partial(set_process_limits, limits),
+                close_fds=True,
+                cwd=tempfile.gettempdir(),
+                env={},
+            )
+
+    def run(self, request, timeout):
+        """
+        Send the request to the interpreter and return its response.
+
+        Raise a WorkerError if the interpreter exits, or doesn't respond
+        within the given number of seconds.
+        """
+        try:
+            self._process.stdin.write(json.dumps(request) + '\n')
+            self._process.stdin.flush()
+        except IOError as error:
+            raise WorkerError("Couldn't send code to the interpreter: {}".format(error))
+
+        return json.loads(self._read_line(timeout))
+
+    def stop(self):
+        """
+        Kill the interpreter.
+        """
+        if self._process.poll() is None:
+            self._process.kill()
+        self._process.wait()
+
+    def _read_line(self, timeout):
+        """
+        Return the next line written by the interpreter, without the newline.
+        """
+        deadline = time.time() + timeout if timeout else None
+        stdout = self._process.stdout.fileno()
+        while '\n' not in self._buffer:
+            remaining = deadline - time.time() if deadline else None
+            if remaining is not None and remaining <= 0:
+                raise WorkerError("Execution timed out after {} seconds".format(timeout))
+            readable, _, _ = select.select([stdout], [], [], remaining)
+            if readable:
+                chunk = os.read(stdout, 65536)
+                if not chunk:
+                    raise WorkerError("Interpreter exited with status {}".format(self._process.wait()))
+                self._buffer += chunk
+        line, self._buffer = self._buffer.split('\n', 1)
+        return line
+
+
+class SandboxWorkerPool(object):
+    """
+    A pool of up to `size` sandboxed interpreters of `python_bin`, run as the
+    given user, if any, with the given resource limits.
+
+    Interpreters are started when needed, and kept until they fail.  Callers
+    wait for an interpreter when all are busy.
+    """
+    def __init__(self, python_bin, user=None, limits=None, size=2):
+        self.size = size
+        self.limits = dict(DEFAULT_LIMITS, **(limits or {}))
+
+        self._cmdline = []
+        if user:
+            self._cmdline.extend(['sudo', '-u', user])
+        # -E means ignore the environment variables PYTHON*, and
+        # -B means don't try to write .pyc files, as for codejail.
+        self._cmdline.extend([python_bin, '-E', '-B', '-c', WORKER_PY] + PRELOADED_MODULES)
+
+        self._lock = threading.Lock()
+        self._reset()
+
+    def safe_exec(self, code, globals_dict, python_path=None, extra_files=None,
+                  slug=None):  # pylint: disable=unused-argument
+        """
+        Execute code in an interpreter of the pool, as `codejail.safe_exec.safe_exec`
+        does in a new interpreter.
+
+        The JSON-safe values of `globals_dict` are available to the code, and
+        its JSON-safe results are updated in `globals_dict`.  Raise a
+        SafeExecException if the code raises an exception, or exceeds a limit.
+        """
+        extra_files = extra_files or []
+        files = list(extra_files)
+        extra_filenames = set(filename for filename, _ in extra_files)
+        run_path = []
+        for path in python_path or []:
+            if path not in extra_filenames:
+                files.extend(_read_files(path, os.path.basename(path)))
+            run_path.append(os.path.basename(path))
+
+        # The interpreter writes the files itself, in a directory only
+        # accessible to the sandbox user.
+        response = self._run({
+            'code': code,
+            'globals': json_safe(globals_dict),
+            'files': [[filename, base64.b64encode(contents)] for filename, contents in files],
+            'python_path': run_path,
+            'limits': {limit: self.limits[limit] for limit in ('CPU', 'REALTIME', 'FSIZE')},
+        })
+
+        if response['emsg']:
+            raise SafeExecException("Couldn't execute jailed code: {}".format(response['emsg']))
+        globals_dict.update(response['globals'])
+
+    def stop(self):
+        """
+        Kill all idle interpreters of the pool.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for sandbox_worker in idle:
+            sandbox_worker.stop()
+
+    def _reset(self):
+        """
+        Forget the interpreters of the pool, e.g. those of a parent process.
+        """
+        self._pid = os.getpid()
+        self._idle = []
+        self._available = threading.Semaphore(self.size)
+        self._waiting = 0
+
+    def _run(self, request):
+        """
+        Run the request in an idle interpreter, starting one if needed, and
+        return the response.
+        """
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            available = self._available
+            self._waiting += 1
+            dog_stats_api.histogram('capa.safe_exec.pool.waiting', self._waiting)
+
+        start = time.time()
+        available.acquire()
+        try:
+            with self._lock:
+                self._waiting -= 1
+                sandbox_worker = self._idle.pop() if self._idle else None
+            dog_stats_api.histogram('capa.safe_exec.pool.wait_time', time.time() - start)
+
+            if sandbox_worker is None:
+                sandbox_worker = SandboxWorker(self._cmdline, self.limits)
+            timeout = self.limits["REALTIME"] + RESPONSE_GRACE_TIME if self.limits["REALTIME"] else None
+            try:
+                response = sandbox_worker.run(request, timeout)
+            except (WorkerError, ValueError) as error:
+                self._recycle(sandbox_worker, 'error')
+                raise SafeExecException("Couldn't execute jailed code: {}".format(error))
+
+            with self._lock:
+                reused = available is self._available
+                if reused:
+                    self._idle.append(sandbox_worker)
+            if not reused:
+                sandbox_worker.stop()
+            return response
+        finally:
+            available.release()
+
+    @staticmethod
+    def _recycle(sandbox_worker, reason):
+        """
+        Kill the given interpreter, for the given reason.
+        """
+        dog_stats_api.increment('capa.safe_exec.pool.recycled', tags=['reason:{}'.format(reason)])
+        sandbox_worker.stop()
@@ -7,6 +7,7 @@ from . import lazymod
 from dogapi import dog_stats_api
 
 import hashlib
+import time
 
 # Establish the Python environment for Capa.
 # Capa assumes float-friendly division always.
@@ -50,6 +51,20 @@ for name, modname in ASSUMED_IMPORTS:
 LAZY_IMPORTS = "".join(LAZY_IMPORTS)
 
 
+# Pool of warm sandboxed interpreters to execute code in, instead of starting
+# a sandbox for each execution.  See `set_worker_pool`.
+WORKER_POOL = None
+
+
+def set_worker_pool(pool):
+    """
+    Execute safely run code in the given `pool.SandboxWorkerPool`, or, if
+    None, in a new sandbox for each execution.
+    """
+    global WORKER_POOL  # pylint: disable=global-statement
+    WORKER_POOL = pool
+
+
 def update_hash(hasher, obj):
     """
     Update a `hashlib` hasher with a nested object.
@@ -102,7 +117,7 @@ def safe_exec(
 
     `cache` is an object with .get(key) and .set(key, value) methods.  It will be used
     to cache the execution, taking into account the code, the values of the globals,
-    and the random seed.
+    and the random seed.  See `capa.safe_exec.cache.TieredCache`.
 
     `slug` is an arbitrary string, a description that's meaningful to the
     caller, that will be used in log messages.
@@ -133,10 +148,13 @@ def safe_exec(
     # Decide which code executor to use.
     if unsafely:
         exec_fn = codejail_not_safe_exec
+    elif WORKER_POOL is not None:
+        exec_fn = WORKER_POOL.safe_exec
     else:
         exec_fn = codejail_safe_exec
 
     # Run the code!  Results are side effects in globals_dict.
+    start = time.time()
     try:
         exec_fn(
             code_prolog + LAZY_IMPORTS + code, globals_dict,
@@ -146,6 +164,7 @@ def safe_exec(
         emsg = e.message
     else:
         emsg = None
+    dog_stats_api.histogram('capa.safe_exec.sandbox_time', time.time() - start)
 
     # Put the result back in the cache.  This is complicated by the fact that
     # the globals dict might not be entirely serializable.
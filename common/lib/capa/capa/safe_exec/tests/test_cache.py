@@ -0,0 +1,66 @@
+"""Test cache.py"""
+
+import cPickle as pickle
+import unittest
+
+from capa.safe_exec import safe_exec
+from capa.safe_exec.cache import TieredCache
+from capa.safe_exec.tests.test_safe_exec import DictCache
+
+
+class TestTieredCache(unittest.TestCase):
+    """Test the two-tier cache of safe_exec results."""
+
+    def setUp(self):
+        super(TestTieredCache, self).setUp()
+        self.durable = {}
+        self.cache = TieredCache(DictCache(self.durable))
+
+    def test_set_in_both_tiers(self):
+        self.cache.set('key', (None, {'a': [1, 2]}))
+        self.assertEqual(self.durable['key'], (None, {'a': [1, 2]}))
+        self.assertEqual(pickle.loads(self.cache.local_cache.get('key')), (None, {'a': [1, 2]}))
+
+    def test_local_hit(self):
+        self.cache.set('key', (None, {'a': 1}))
+        # The local tier is used even if the durable cache loses the value.
+        self.durable.clear()
+        self.assertEqual(self.cache.get('key'), (None, {'a': 1}))
+
+    def test_durable_hit(self):
+        self.durable['key'] = (None, {'a': 1})
+        self.assertEqual(self.cache.get('key'), (None, {'a': 1}))
+        # The value is now kept locally.
+        self.durable.clear()
+        self.assertEqual(self.cache.get('key'), (None, {'a': 1}))
+
+    def test_miss(self):
+        self.assertIsNone(self.cache.get('key'))
+
+    def test_local_cache_bounded_by_bytes(self):
+        cache = TieredCache(DictCache({}), max_local_bytes=100)
+        cache.set('small', 'x' * 10)
+        cache.set('large', 'x' * 100)
+        self.assertIn('small', cache.local_cache)
+        # The pickle of the large result doesn't fit in the local tier.
+        self.assertNotIn('large', cache.local_cache)
+        self.assertEqual(cache.get('large'), 'x' * 100)
+
+    def test_local_hits_are_copies(self):
+        self.cache.set('key', (None, {'a': [1, 2]}))
+        _, results = self.cache.get('key')
+        results['a'].append(3)
+        self.assertEqual(self.cache.get('key'), (None, {'a': [1, 2]}))
+
+    def test_safe_exec(self):
+        g = {}
+        safe_exec("a = int(math.pi)", g, cache=self.cache)
+        self.assertEqual(g['a'], 3)
+        self.assertEqual(self.durable.values()[0], (None, {'a': 3}))
+
+        # Cached in process, so the durable cache isn't needed anymore.
+        self.durable.clear()
+        g = {}
+        safe_exec("a = int(math.pi)", g, cache=self.cache)
+        self.assertEqual(g['a'], 3)
+        self.assertEqual(self.durable, {})
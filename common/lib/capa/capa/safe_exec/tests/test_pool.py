@@ -0,0 +1,125 @@
+"""Test pool.py"""
+
+import math
+import os
+import random
+import sys
+import threading
+import unittest
+
+from codejail.safe_exec import SafeExecException
+from mock import patch
+
+from capa.safe_exec import safe_exec, set_worker_pool
+from capa.safe_exec.pool import SandboxWorkerPool
+
+
+class TestSandboxWorkerPool(unittest.TestCase):
+    """Test executing code in a pool of interpreters."""
+
+    def setUp(self):
+        super(TestSandboxWorkerPool, self).setUp()
+        self.pool = SandboxWorkerPool(sys.executable, size=2, limits={'REALTIME': 5})
+        self.addCleanup(self.pool.stop)
+
+    def test_set_values(self):
+        g = {'a': 17}
+        self.pool.safe_exec("b = a + 1\nprint('not a response')", g)
+        self.assertEqual(g, {'a': 17, 'b': 18})
+
+    def test_raising_exceptions(self):
+        g = {}
+        with self.assertRaises(SafeExecException) as cm:
+            self.pool.safe_exec("1/0", g)
+        self.assertIn("ZeroDivisionError", cm.exception.message)
+        self.assertEqual(g, {})
+
+    def test_python_path(self):
+        g = {}
+        self.pool.safe_exec(
+            "import constant\nx = constant.VALUE",
+            g,
+            python_path=["constant.py"],
+            extra_files=[("constant.py", "VALUE = 42\n")],
+        )
+        self.assertEqual(g['x'], 42)
+
+        # Modules imported by executed code aren't kept.
+        self.pool.safe_exec("import sys\nimported = 'constant' in sys.modules", g)
+        self.assertFalse(g['imported'])
+
+    def test_run_dir(self):
+        g = {}
+        self.pool.safe_exec(
+            "import os\ncwd = os.getcwd()\nmode = os.stat(cwd).st_mode & 0o777\nfiles = sorted(os.listdir(cwd))",
+            g,
+            python_path=[os.path.join(os.path.dirname(__file__), "test_files", "pylib")],
+            extra_files=[("extra.txt", "extra")],
+        )
+        # The files are only accessible to the user of the interpreter, and removed afterwards.
+        self.assertEqual(g['mode'], 0o700)
+        self.assertEqual(g['files'], ['extra.txt', 'pylib'])
+        self.assertFalse(os.path.exists(g['cwd']))
+
+    def test_executions_are_isolated(self):
+        g = {}
+        self.pool.safe_exec(
+            "import math, os, __builtin__\nmath.pi = 3\n__builtin__.len = None\nos.chdir('/')\npid = os.getpid()", g,
+        )
+        pid = g['pid']
+
+        # Each execution runs in a new process, forked from the same interpreter.
+        g = {}
+        self.pool.safe_exec("import math, os\npi = math.pi\nsize = len('ab')\ncwd = os.getcwd()\npid = os.getpid()", g)
+        self.assertEqual(g['pi'], math.pi)
+        self.assertEqual(g['size'], 2)
+        self.assertNotEqual(g['cwd'], '/')
+        self.assertNotEqual(g['pid'], pid)
+
+    def test_response_streams_closed(self):
+        g = {}
+        self.pool.safe_exec(
+            "import os, stat\npipes = 0\nfor fd in range(256):\n"
+            "    try:\n        pipes += stat.S_ISFIFO(os.fstat(fd).st_mode)\n    except OSError:\n        pass\n",
+            g,
+        )
+        # Only the pipe of the execution's own response is open, not the
+        # request and response streams of the interpreter.
+        self.assertEqual(g['pipes'], 1)
+
+    def test_timeout(self):
+        self.pool.limits['REALTIME'] = 1
+        with self.assertRaises(SafeExecException) as cm:
+            self.pool.safe_exec("while True: pass", {})
+        self.assertIn("timed out", cm.exception.message)
+
+        # The interpreter keeps executing code.
+        g = {}
+        self.pool.safe_exec("a = 1", g)
+        self.assertEqual(g['a'], 1)
+
+    def test_concurrent_executions(self):
+        results = {}
+
+        def execute(value):
+            """Execute code with the given value in the pool."""
+            g = {'value': value}
+            self.pool.safe_exec("import time\ntime.sleep(0.1)\ndouble = value * 2", g)
+            results[value] = g['double']
+
+        threads = [threading.Thread(target=execute, args=(value,)) for value in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, {value: value * 2 for value in range(5)})
+
+    def test_safe_exec(self):
+        set_worker_pool(self.pool)
+        self.addCleanup(set_worker_pool, None)
+        g = {}
+        with patch.object(self.pool, 'safe_exec', wraps=self.pool.safe_exec) as mock_pool_safe_exec:
+            safe_exec("a = int(math.pi)\nr = random.randint(0, 1000)", g, random_seed=1)
+        self.assertTrue(mock_pool_safe_exec.called)
+        self.assertEqual(g['a'], 3)
+        self.assertEqual(g['r'], random.Random(1).randint(0, 1000))
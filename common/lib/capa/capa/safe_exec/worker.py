@@ -0,0 +1,201 @@
+"""
+The main loop of a sandboxed Python interpreter of a `SandboxWorkerPool`.
+
+The source of this module is given to the sandboxed interpreter by pool.py,
+so it must only use the standard library.  Each line read from stdin is a
+JSON request to execute code, and the JSON response is written as a line
+to stdout:
+
+    request:  {"code": ..., "globals": {...}, "files": [...], "python_path": [...], "limits": {...}}
+    response: {"emsg": ..., "globals": {...}}
+
+`files` are the [path, base64 contents] pairs of the files to execute the
+code among, and `emsg` is the traceback of the exception raised by the
+code, if any.
+
+The interpreter is a fork server: it imports the preloaded modules once, and
+never executes code itself.  Each request is executed in a child process
+forked from it, so no state left behind by code, e.g. in the modules, the
+builtins or the working directory, is seen by the code of later requests.
+The child closes the request and response streams, and is limited to its
+own CPU time, the size of the files it writes and to no new processes,
+before executing the code.  It
+returns the response through a pipe of its own, and is killed if it
+doesn't respond within the real time limit.
+
+The files of each request are written to a new directory, only accessible
+to the user of the interpreter, which is removed once the child exits.
+"""
+import base64
+import errno
+import json
+import os
+import resource
+import select
+import shutil
+import sys
+import tempfile
+import time
+import traceback
+
+
+def jsonable(value):
+    """
+    Return whether the value can be serialized as JSON.
+    """
+    try:
+        json.dumps(value)
+    except Exception:  # pylint: disable=broad-except
+        return False
+    return True
+
+
+def write_files(run_dir, files):
+    """
+    Write the given [path, base64 contents] pairs of files in the directory.
+    """
+    for path, contents in files:
+        file_path = os.path.join(run_dir, path)
+        if not os.path.isdir(os.path.dirname(file_path)):
+            os.makedirs(os.path.dirname(file_path))
+        with open(file_path, 'wb') as run_file:
+            run_file.write(base64.b64decode(contents))
+
+
+def run(request, run_dir):
+    """
+    Execute the code of the request in the given directory and return the
+    response.
+    """
+    globals_dict = request['globals']
+    os.chdir(run_dir)
+    sys.path[:0] = [os.path.join(run_dir, path) for path in request['python_path']]
+    try:
+        exec(request['code'], globals_dict)  # pylint: disable=exec-used
+    except BaseException:  # pylint: disable=broad-except
+        emsg = traceback.format_exc()
+    else:
+        emsg = None
+
+    return {
+        'emsg': emsg,
+        'globals': dict(
+            (name, value) for name, value in globals_dict.items()
+            if not name.startswith('__') and jsonable(value)
+        ),
+    }
+
+
+def set_child_limits(limits):
+    """
+    Set the resource limits of a child process executing a request.
+    """
+    # Prevent the executed code from creating new processes.
+    resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+    if limits['CPU']:
+        resource.setrlimit(resource.RLIMIT_CPU, (limits['CPU'], limits['CPU'] + 1))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (limits['FSIZE'], limits['FSIZE']))
+
+
+def run_in_child(request, server_fds):
+    """
+    Execute the request in a new child process, closing the given file
+    descriptors of the server in it, and return the response.
+    """
+    # mkdtemp creates the directory with mode 0700.
+    run_dir = tempfile.mkdtemp(prefix='codejail-')
+    try:
+        write_files(run_dir, request['files'])
+        return run_in_child_dir(request, run_dir, server_fds)
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+
+def run_in_child_dir(request, run_dir, server_fds):
+    """
+    Execute the request in a new child process, in the given directory.
+    """
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        status = 1
+        try:
+            os.close(read_fd)
+            for server_fd in server_fds:
+                os.close(server_fd)
+            set_child_limits(request['limits'])
+            response = json.dumps(run(request, run_dir))
+            while response:
+                response = response[os.write(write_fd, response):]
+            status = 0
+        finally:
+            os._exit(status)  # pylint: disable=protected-access
+
+    os.close(write_fd)
+    try:
+        output = read_until_closed(read_fd, request['limits']['REALTIME'])
+    except OSError as error:
+        if error.errno != errno.ETIMEDOUT:
+            raise
+        os.kill(pid, 9)
+        os.waitpid(pid, 0)
+        return {'emsg': 'Execution timed out after {} seconds'.format(request['limits']['REALTIME'])}
+    finally:
+        os.close(read_fd)
+
+    _, status = os.waitpid(pid, 0)
+    if status:
+        return {'emsg': 'Execution exited with status {}'.format(status)}
+    try:
+        return json.loads(output)
+    except ValueError:
+        # The executed code wrote to the pipe of its response.
+        return {'emsg': 'Execution returned an invalid response'}
+
+
+def read_until_closed(read_fd, timeout):
+    """
+    Return all that is written to the pipe until it's closed, or raise an
+    OSError with ETIMEDOUT after the given number of seconds, if set.
+    """
+    deadline = time.time() + timeout if timeout else None
+    chunks = []
+    while True:
+        remaining = deadline - time.time() if deadline else None
+        if remaining is not None and remaining <= 0:
+            raise OSError(errno.ETIMEDOUT, 'Timed out')
+        readable, _, _ = select.select([read_fd], [], [], remaining)
+        if readable:
+            chunk = os.read(read_fd, 65536)
+            if not chunk:
+                return ''.join(chunks)
+            chunks.append(chunk)
+
+
+def main(preloaded_modules):
+    """
+    Preload the given modules, then run requests until stdin is closed.
+    """
+    os.environ["OPENBLAS_NUM_THREADS"] = "1"    # See TNL-6456
+    for name in preloaded_modules:
+        try:
+            __import__(name)
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+    # Keep the request and response streams away from the executed code.
+    requests = os.fdopen(os.dup(0), 'r')
+    responses = os.fdopen(os.dup(1), 'w')
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+
+    for line in iter(requests.readline, ''):
+        response = run_in_child(json.loads(line), [requests.fileno(), responses.fileno()])
+        responses.write(json.dumps(response) + '\n')
+        responses.flush()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
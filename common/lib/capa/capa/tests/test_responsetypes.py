@@ -619,6 +619,30 @@ class FormulaResponseTest(ResponseTest):
         self.assertTrue(problem.responders.values()[0].validate_answer('14*x'))
         self.assertFalse(problem.responders.values()[0].validate_answer('3*y+2*x'))
 
+    def test_check_formula_samples(self):
+        """
+        Test that evaluating all samples at once gives the same correctness
+        as evaluating each sample, and is not used for errors.
+        """
+        sample_dict = {'x': (-10, 10), 'y': (1, 5)}
+        problem = self.build_problem(sample_dict=sample_dict,
+                                     num_samples=20,
+                                     tolerance="0.1%",
+                                     answer="x*sin(y)+j*y^2")
+        responder = problem.responders.values()[0]
+        var_dict_list = responder.randomize_variables(responder.samples)
+
+        for input_formula in ["x*sin(y)+j*y^2", "sin(y)*x + y*y*i", "x*sin(y)", "x*sin(y)+j*(y^2+1)", "2||y"]:
+            with mock.patch.object(responder, 'check_formula_samples', return_value=None):
+                expected = responder.check_formula(responder.correct_answer, input_formula, responder.samples)
+            self.assertEqual(expected == "correct", responder.check_formula_samples(
+                responder.correct_answer, input_formula, var_dict_list,
+            ))
+            self.assert_grade(problem, input_formula, expected)
+
+        for input_formula in ["1/0", "x+z", "(x-20)^0.5", "x+", "fact(x)", ""]:
+            self.assertIsNone(responder.check_formula_samples(responder.correct_answer, input_formula, var_dict_list))
+
 
 class StringResponseTest(ResponseTest):  # pylint: disable=missing-docstring
     xml_factory_class = StringResponseXMLFactory
@@ -2,10 +2,18 @@
 Tests capa util
 """
 import unittest
+
+import numpy
 from lxml import etree
 
 from capa.tests.helpers import test_capa_system
-from capa.util import compare_with_tolerance, sanitize_html, get_inner_html_from_xpath, remove_markup
+from capa.util import (
+    compare_with_tolerance,
+    compare_with_tolerance_array,
+    get_inner_html_from_xpath,
+    remove_markup,
+    sanitize_html
+)
 
 
 class UtilTest(unittest.TestCase):
@@ -106,6 +114,29 @@ class UtilTest(unittest.TestCase):
         result = compare_with_tolerance(111.0, complex(100.0, 0), '10%', True)
         self.assertTrue(result)
 
+    def test_compare_with_tolerance_array(self):
+        student = numpy.array([
+            100.0, 100.001, 101.0, 109.9, 110.1, 0.4, 100.01, 110.1, 111.0, 100.0000000001,
+            float('inf'), float('inf'), float('nan'), 1e-320, complex(3, 4), complex(3, 4.1), 1.7976931348623157e308,
+        ])
+        instructor = numpy.array([
+            100.0, 100.0, 100.0, 100.0, 100.0, complex(0.44, 0), complex(100.0, 0), 100.0, 100.0, 100.0,
+            float('inf'), -float('inf'), float('nan'), 0.0, complex(3, 4), complex(3, 4), -1.7976931348623157e308,
+        ])
+        for tolerance, relative_tolerance in [
+                ('0.001%', False), ('10%', False), ('10%', True), ('10.0', False), (0.01, False), (0.2, True),
+        ]:
+            expected = [
+                compare_with_tolerance(student_value, instructor_value, tolerance, relative_tolerance)
+                for student_value, instructor_value in zip(student.tolist(), instructor.tolist())
+            ]
+            result = compare_with_tolerance_array(student, instructor, tolerance, relative_tolerance)
+            self.assertEqual(result.tolist(), expected)
+
+        # Instructor results may be a single value.
+        result = compare_with_tolerance_array(numpy.array([100.0, 100.001, 101.0]), 100.0)
+        self.assertEqual(result.tolist(), [True, True, False])
+
     def test_sanitize_html(self):
         """
         Test for html sanitization with bleach.
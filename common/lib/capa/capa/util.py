@@ -5,6 +5,7 @@ import re
 from decimal import Decimal
 
 import bleach
+import numpy
 from lxml import etree
 
 from calc import evaluator
@@ -17,6 +18,10 @@ from openedx.core.djangolib.markup import HTML
 # Utility functions used in CAPA responsetypes
 default_tolerance = '0.001%'
 
+# Relative margin, from the tolerance, within which comparing results as
+# floats may not match comparing them as Decimals of their string values.
+DECIMAL_COMPARISON_MARGIN = 1e-10
+
 
 def compare_with_tolerance(student_complex, instructor_complex, tolerance=default_tolerance, relative_tolerance=False):
     """
@@ -94,6 +99,52 @@ def compare_with_tolerance(student_complex, instructor_complex, tolerance=defaul
         return abs(student_complex - instructor_complex) <= tolerance
 
 
+def compare_with_tolerance_array(student_complex, instructor_complex, tolerance=default_tolerance,
+                                 relative_tolerance=False):
+    """
+    Compare arrays of student and instructor results elementwise, as
+    `compare_with_tolerance` does, and return an array of booleans.
+
+    Results are compared with NumPy operations, except those which aren't
+    finite or are so close to the tolerance that comparing them as Decimals
+    could give another answer; those are compared with `compare_with_tolerance`.
+    """
+    student_array, instructor_array = numpy.broadcast_arrays(
+        numpy.atleast_1d(student_complex),
+        numpy.atleast_1d(instructor_complex),
+    )
+    student_abs = numpy.abs(student_array)
+    instructor_abs = numpy.abs(instructor_array)
+
+    array_tolerance = tolerance
+    relative = relative_tolerance
+    if isinstance(array_tolerance, str):
+        if array_tolerance == default_tolerance:
+            relative = True
+        if array_tolerance.endswith('%'):
+            array_tolerance = evaluator(dict(), dict(), array_tolerance[:-1]) * 0.01
+            if not relative:
+                array_tolerance = array_tolerance * instructor_abs
+        else:
+            array_tolerance = evaluator(dict(), dict(), array_tolerance)
+
+    with numpy.errstate(all='ignore'):
+        if relative:
+            array_tolerance = array_tolerance * numpy.maximum(student_abs, instructor_abs)
+        difference = numpy.abs(student_array - instructor_array)
+        result = difference <= array_tolerance
+        margin = DECIMAL_COMPARISON_MARGIN * (student_abs + instructor_abs + numpy.abs(array_tolerance))
+        undecided = ~(
+            numpy.isfinite(difference) & numpy.isfinite(margin) & (numpy.abs(difference - array_tolerance) > margin)
+        )
+
+    for index in zip(*numpy.nonzero(undecided)):
+        result[index] = compare_with_tolerance(
+            student_array[index].item(), instructor_array[index].item(), tolerance, relative_tolerance,
+        )
+    return result
+
+
 def contextualize_text(text, context):  # private
     """
     Takes a string with variables. E.g. $a+$b.
@@ -152,19 +152,36 @@ class MongoContentStore(ContentStore):
             else:
                 return None
 
+    @staticmethod
+    def _export_path(name, import_path, output_directory):
+        """
+        Returns the directory and the name to export the asset with the given
+        name and import path to, under output_directory.
+        """
+        if import_path is not None:
+            output_directory = output_directory + '/' + os.path.dirname(import_path)
+
+        # Escape invalid char from filename.
+        export_name = escape_invalid_characters(name=name, invalid_char_list=['/', '\\'])
+        return output_directory, export_name
+
+    @staticmethod
+    def _add_to_export_policy(policy, asset):
+        """
+        Adds the exported attributes of the asset to the assets policy.
+        """
+        for attr, value in asset.iteritems():
+            if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key']:
+                policy.setdefault(asset['asset_key'].name, {})[attr] = value
+
     def export(self, location, output_directory):
         content = self.find(location)
 
-        filename = content.name
-        if content.import_path is not None:
-            output_directory = output_directory + '/' + os.path.dirname(content.import_path)
+        output_directory, export_name = self._export_path(content.name, content.import_path, output_directory)
 
         if not os.path.exists(output_directory):
             os.makedirs(output_directory)
 
-        # Escape invalid char from filename.
-        export_name = escape_invalid_characters(name=filename, invalid_char_list=['/', '\\'])
-
         disk_fs = OSFS(output_directory)
 
         with disk_fs.open(export_name, 'wb') as asset_file:
@@ -194,13 +211,42 @@ class MongoContentStore(ContentStore):
             # When debugging course exports, this might be a good place
             # to look. -- pmitros
             self.export(asset['asset_key'], output_directory)
-            for attr, value in asset.iteritems():
-                if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key']:
-                    policy.setdefault(asset['asset_key'].name, {})[attr] = value
+            self._add_to_export_policy(policy, asset)
 
         with open(assets_policy_file, 'w') as f:
             json.dump(policy, f, sort_keys=True, indent=4)
 
+    def stream_all_for_course(self, course_key, export_fs, output_directory='static',
+                              assets_policy_file='policies/assets.json'):
+        """
+        Stream all of this course's assets, one GridFS chunk at a time, to the
+        output_directory of a streaming export filesystem, such as a `TarExportFS`,
+        so that no asset is held in memory or staged on disk.  Export all of the
+        assets' attributes to the policy file.
+
+        Args:
+            course_key (CourseKey): the :class:`CourseKey` identifying the course
+            export_fs: the export filesystem, with a `write_stream(path, stream, size, mtime)` method
+            output_directory: the directory of export_fs under which to put all the asset files
+            assets_policy_file: the path of the policy file in export_fs
+        """
+        policy = {}
+        assets, __ = self.get_all_content_for_course(course_key)
+
+        for asset in assets:
+            content_id, __ = self.asset_db_key(asset['asset_key'])
+            with self.fs.get(content_id) as fp:
+                asset_directory, export_name = self._export_path(
+                    fp.displayname, getattr(fp, 'import_path', None), output_directory
+                )
+                export_fs.write_stream(
+                    asset_directory + '/' + export_name, fp, fp.length, mtime=fp.uploadDate
+                )
+            self._add_to_export_policy(policy, asset)
+
+        with export_fs.open(assets_policy_file, 'w') as f:
+            json.dump(policy, f, sort_keys=True, indent=4)
+
     def get_all_content_thumbnails_for_course(self, course_key):
         return self._get_all_content_for_course(course_key, get_thumbnails=True)[0]
 
@@ -12,6 +12,7 @@ import sys
 from collections import OrderedDict
 from datetime import datetime
 
+import numpy
 from contracts import contract
 from pytz import UTC
 
@@ -242,6 +243,16 @@ class CourseGrader(object):
         '''Given a grade sheet, return a dict containing grading information'''
         raise NotImplementedError
 
+    def grade_batch(self, batch_grade_sheet):
+        """
+        Given a BatchGradeSheet with the scores of many learners, grades
+        all of the learners at once.  Returns a batch result with a
+        `percents` array of the learners' final percentages, and a
+        grade_result(learner_index) method returning the same dict
+        as grade() would for that learner.
+        """
+        raise NotImplementedError
+
 
 class WeightedSubsectionsGrader(CourseGrader):
     """
@@ -263,13 +274,33 @@ class WeightedSubsectionsGrader(CourseGrader):
         self.subgraders = subgraders
 
     def grade(self, grade_sheet, generate_random_scores=False):
+        return self._combine_subgrade_results(
+            (subgrader.grade(grade_sheet, generate_random_scores), assignment_type, weight)
+            for subgrader, assignment_type, weight in self.subgraders
+        )
+
+    def grade_batch(self, batch_grade_sheet):
+        total_percents = numpy.zeros(batch_grade_sheet.num_learners)
+        subgrade_batch_results = []
+
+        for subgrader, assignment_type, weight in self.subgraders:
+            subgrade_batch_result = subgrader.grade_batch(batch_grade_sheet)
+            total_percents = total_percents + subgrade_batch_result.percents * weight
+            subgrade_batch_results.append((subgrade_batch_result, assignment_type, weight))
+
+        return WeightedSubsectionsBatchResult(self, total_percents, subgrade_batch_results)
+
+    @staticmethod
+    def _combine_subgrade_results(subgrade_results):
+        """
+        Returns the grading information combined from the given
+        (subgrade_result, assignment_type, weight) tuples.
+        """
         total_percent = 0.0
         section_breakdown = []
         grade_breakdown = OrderedDict()
 
-        for subgrader, assignment_type, weight in self.subgraders:
-            subgrade_result = subgrader.grade(grade_sheet, generate_random_scores)
-
+        for subgrade_result, assignment_type, weight in subgrade_results:
             weighted_percent = subgrade_result['percent'] * weight
             section_detail = u"{0} = {1:.2%} of a possible {2:.2%}".format(assignment_type, weighted_percent, weight)
 
@@ -380,33 +411,111 @@ class AssignmentFormatGrader(CourseGrader):
                     possible = scores[i].graded_total.possible
                     section_name = scores[i].display_name
 
-                percentage = earned / possible
-                summary_format = u"{section_type} {index} - {name} - {percent:.0%} ({earned:.3n}/{possible:.3n})"
-                summary = summary_format.format(
-                    index=i + self.starting_index,
-                    section_type=self.section_type,
-                    name=section_name,
-                    percent=percentage,
-                    earned=float(earned),
-                    possible=float(possible)
-                )
+                breakdown.append(self._scored_section_breakdown(i, section_name, earned, possible))
             else:
-                percentage = 0.0
-                summary = u"{section_type} {index} Unreleased - 0% (?/?)".format(
-                    index=i + self.starting_index,
-                    section_type=self.section_type
-                )
-
-            short_label = u"{short_label} {index:02d}".format(
-                index=i + self.starting_index,
-                short_label=self.short_label
-            )
-
-            breakdown.append({'percent': percentage, 'label': short_label,
-                              'detail': summary, 'category': self.category})
+                breakdown.append(self._unreleased_section_breakdown(i))
 
         total_percent, dropped_indices = total_with_drops(breakdown, self.drop_count)
+        return self._grade_result(breakdown, total_percent, dropped_indices)
+
+    def grade_batch(self, batch_grade_sheet):
+        earned, possible, display_names = batch_grade_sheet.get_scores(self.type)
+        num_learners, num_subsections = possible.shape
+        learners = numpy.arange(num_learners)[:, numpy.newaxis]
+
+        # Move the subsections each learner has scores for to the front of
+        # their row, keeping their course order, as in their grade sheet.
+        has_score = possible > 0
+        subsections = numpy.argsort(numpy.logical_not(has_score).astype(numpy.int8), axis=1, kind='mergesort')
+        score_counts = has_score.sum(axis=1)
+        sorted_earned = earned[learners, subsections]
+        sorted_possible = possible[learners, subsections]
+
+        # The breakdown of each learner has max(min_count, score_count)
+        # sections; the sections past their scores have a percent of 0.
+        num_sections = max(self.min_count, num_subsections)
+        positions = numpy.arange(num_sections)
+        section_counts = numpy.maximum(self.min_count, score_counts)
+        in_breakdown = positions < section_counts[:, numpy.newaxis]
+        is_scored = positions[:num_subsections] < score_counts[:, numpy.newaxis]
+        section_subsections = -numpy.ones((num_learners, num_sections), dtype=int)
+        section_subsections[:, :num_subsections] = numpy.where(is_scored, subsections, -1)
+        section_percents = numpy.zeros((num_learners, num_sections))
+        section_percents[:, :num_subsections] = numpy.where(
+            is_scored, sorted_earned / numpy.where(is_scored, sorted_possible, 1.0), 0.0,
+        )
+
+        # Drop the lowest sections, which are the last ones when sorting the
+        # sections by descending percent while keeping the order of sections
+        # with equal percents, as in grade().  Sections not in the breakdown
+        # are sorted first, so they are never dropped.
+        dropped = numpy.zeros((num_learners, num_sections), dtype=bool)
+        if self.drop_count > 0 and num_sections:
+            sort_keys = numpy.where(in_breakdown, -section_percents, -numpy.inf)
+            sorted_positions = numpy.argsort(sort_keys, axis=1, kind='mergesort')
+            ranks = numpy.empty_like(sorted_positions)
+            ranks[learners, sorted_positions] = positions
+            dropped = in_breakdown & (ranks >= num_sections - self.drop_count)
+
+        # Sum the percents one section at a time, so they are added in the
+        # same order, and with the same rounding, as in grade().
+        counted = in_breakdown & numpy.logical_not(dropped)
+        totals = numpy.zeros(num_learners)
+        for position in xrange(num_sections):
+            totals = totals + numpy.where(counted[:, position], section_percents[:, position], 0.0)
+
+        denominators = section_counts - self.drop_count
+        has_denominator = denominators > 0
+        percents = numpy.where(has_denominator, totals / numpy.where(has_denominator, denominators, 1), totals)
+
+        return AssignmentFormatBatchResult(
+            self, percents, section_counts, section_subsections, dropped, earned, possible, display_names,
+        )
+
+    def _scored_section_breakdown(self, index, section_name, earned, possible):
+        """
+        Returns the breakdown entry for the index'th section, with the given score.
+        """
+        percentage = earned / possible
+        summary_format = u"{section_type} {index} - {name} - {percent:.0%} ({earned:.3n}/{possible:.3n})"
+        summary = summary_format.format(
+            index=index + self.starting_index,
+            section_type=self.section_type,
+            name=section_name,
+            percent=percentage,
+            earned=float(earned),
+            possible=float(possible)
+        )
+        return self._section_breakdown(index, percentage, summary)
+
+    def _unreleased_section_breakdown(self, index):
+        """
+        Returns the breakdown entry for the index'th section, which has no score.
+        """
+        percentage = 0.0
+        summary = u"{section_type} {index} Unreleased - 0% (?/?)".format(
+            index=index + self.starting_index,
+            section_type=self.section_type
+        )
+        return self._section_breakdown(index, percentage, summary)
+
+    def _section_breakdown(self, index, percentage, summary):
+        """
+        Returns the breakdown entry for the index'th section.
+        """
+        short_label = u"{short_label} {index:02d}".format(
+            index=index + self.starting_index,
+            short_label=self.short_label
+        )
+
+        return {'percent': percentage, 'label': short_label,
+                'detail': summary, 'category': self.category}
 
+    def _grade_result(self, breakdown, total_percent, dropped_indices):
+        """
+        Returns the grading information for the given section breakdown,
+        total percent and indices of the dropped sections.
+        """
         for dropped_index in dropped_indices:
             breakdown[dropped_index]['mark'] = {
                 'detail': u"The lowest {drop_count} {section_type} scores are dropped.".format(
@@ -446,6 +555,143 @@ class AssignmentFormatGrader(CourseGrader):
         }
 
 
+class BatchGradeSheet(object):
+    """
+    The graded subsection scores of many learners, for grading all of
+    them at once with a grader's grade_batch method.
+
+    For each assignment type, the earned and possible scores are held in
+    matrices with a row per learner and a column per graded subsection of
+    that type, in course order.  A subsection with a possible score that
+    is not greater than 0 is treated as absent from the learner's grade
+    sheet.
+    """
+    def __init__(self, num_learners):
+        self.num_learners = num_learners
+        self._scores = {}
+
+    def add_scores(self, assignment_type, earned, possible, display_names):
+        """
+        Sets the earned and possible score matrices, of shape
+        (num_learners, num_subsections), and the subsection display
+        names for the given assignment type.
+        """
+        shape = (self.num_learners, len(display_names))
+        earned = numpy.asarray(earned, dtype=float).reshape(shape)
+        possible = numpy.asarray(possible, dtype=float).reshape(shape)
+        self._scores[assignment_type] = (earned, possible, list(display_names))
+
+    def get_scores(self, assignment_type):
+        """
+        Returns the earned and possible score matrices, and the subsection
+        display names, for the given assignment type.
+        """
+        try:
+            return self._scores[assignment_type]
+        except KeyError:
+            no_scores = numpy.zeros((self.num_learners, 0))
+            return no_scores, no_scores, []
+
+    @classmethod
+    def from_grade_sheets(cls, grade_sheets, subsections_by_type):
+        """
+        Returns a BatchGradeSheet for the given list of grade sheets, as
+        passed to a grader's grade method, given a dict of assignment type
+        to the list of keys of its graded subsections, in course order.
+        """
+        batch_grade_sheet = cls(len(grade_sheets))
+        for assignment_type, subsection_keys in subsections_by_type.iteritems():
+            earned = numpy.zeros((len(grade_sheets), len(subsection_keys)))
+            possible = numpy.zeros((len(grade_sheets), len(subsection_keys)))
+            display_names = [None] * len(subsection_keys)
+            for learner_index, grade_sheet in enumerate(grade_sheets):
+                subsection_grades = grade_sheet.get(assignment_type, {})
+                for subsection_index, subsection_key in enumerate(subsection_keys):
+                    subsection_grade = subsection_grades.get(subsection_key)
+                    if subsection_grade is not None:
+                        earned[learner_index, subsection_index] = subsection_grade.graded_total.earned
+                        possible[learner_index, subsection_index] = subsection_grade.graded_total.possible
+                        display_names[subsection_index] = subsection_grade.display_name
+            batch_grade_sheet.add_scores(assignment_type, earned, possible, display_names)
+        return batch_grade_sheet
+
+
+class AssignmentFormatBatchResult(object):
+    """
+    The result of grading many learners at once with an AssignmentFormatGrader.
+    """
+    def __init__(
+            self, grader, percents, section_counts, section_subsections, dropped, earned, possible, display_names,
+    ):
+        self.grader = grader
+
+        # Percent of each learner
+        self.percents = percents
+
+        # Number of sections in the breakdown of each learner
+        self.section_counts = section_counts
+
+        # Subsection (column) of each learner's sections, or -1 for unscored sections
+        self.section_subsections = section_subsections
+
+        # Whether each learner's sections are dropped
+        self.dropped = dropped
+
+        self._earned = earned
+        self._possible = possible
+        self._display_names = display_names
+
+    def grade_result(self, learner_index):
+        """
+        Returns the grading information for the given learner, identical
+        to that returned by the grader's grade method.
+        """
+        breakdown = []
+        for index in xrange(self.section_counts[learner_index]):
+            subsection_index = self.section_subsections[learner_index, index]
+            if subsection_index >= 0:
+                breakdown.append(self.grader._scored_section_breakdown(  # pylint: disable=protected-access
+                    index,
+                    self._display_names[subsection_index],
+                    float(self._earned[learner_index, subsection_index]),
+                    float(self._possible[learner_index, subsection_index]),
+                ))
+            else:
+                breakdown.append(self.grader._unreleased_section_breakdown(index))  # pylint: disable=protected-access
+
+        if len(breakdown) - self.grader.drop_count > 0:
+            total_percent = float(self.percents[learner_index])
+        else:
+            # All sections are dropped, leaving an integer total.
+            total_percent = 0
+        dropped_indices = numpy.flatnonzero(self.dropped[learner_index]).tolist()
+        return self.grader._grade_result(breakdown, total_percent, dropped_indices)  # pylint: disable=protected-access
+
+
+class WeightedSubsectionsBatchResult(object):
+    """
+    The result of grading many learners at once with a WeightedSubsectionsGrader.
+    """
+    def __init__(self, grader, percents, subgrade_batch_results):
+        self.grader = grader
+
+        # Percent of each learner
+        self.percents = percents
+
+        # List of (subgrade_batch_result, assignment_type, weight) tuples
+        self.subgrade_batch_results = subgrade_batch_results
+
+    def grade_result(self, learner_index):
+        """
+        Returns the grading information for the given learner, identical
+        to that returned by the grader's grade method.
+        """
+        return self.grader._combine_subgrade_results(  # pylint: disable=protected-access
+            (subgrade_batch_result.grade_result(learner_index), assignment_type, weight)
+            for subgrade_batch_result, assignment_type, weight in self.subgrade_batch_results
+        )
+
+
 def _iter_graded(scores):
     """
     Yield the scores that belong to explicitly graded blocks
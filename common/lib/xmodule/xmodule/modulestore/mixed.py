@@ -593,6 +593,19 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         except NotImplementedError:
             return None, None
 
+    @strip_key
+    def get_blocks_changed_between_versions(self, course_key, old_version_guid, new_version_guid, **kwargs):
+        """
+        Returns the usage keys of all blocks that were added, removed or modified between the
+        given versions of the course, or None if the modulestore for the course does not
+        support versioned structures.
+        """
+        try:
+            store = self._verify_modulestore_support(course_key, 'get_blocks_changed_between_versions')
+        except NotImplementedError:
+            return None
+        return store.get_blocks_changed_between_versions(course_key, old_version_guid, new_version_guid)
+
     def get_modulestore_type(self, course_id):
         """
         Returns a type which identifies which modulestore is servicing the given course_id.
@@ -2,10 +2,13 @@
 Performance test for asset metadata in the modulestore.
 """
 from path import Path as path
+import os
+import tarfile
+import time
 import unittest
 from tempfile import mkdtemp
 import itertools
-from shutil import rmtree
+from shutil import copytree, rmtree
 from bson.code import Code
 import datetime
 import ddt
@@ -14,11 +17,14 @@ import ddt
 from nose.plugins.skip import SkipTest
 from xmodule.assetstore import AssetMetadata
 from xmodule.modulestore import ModuleStoreEnum
-from xmodule.modulestore.xml_importer import import_course_from_xml
-from xmodule.modulestore.xml_exporter import export_course_to_xml
+from xmodule.modulestore.xml_importer import (
+    CourseImportManager, DEFAULT_STATIC_IMPORT_THREADS, import_course_from_xml
+)
+from xmodule.modulestore.xml_exporter import export_course_to_tar_stream, export_course_to_xml
 from xmodule.modulestore.tests.utils import (
     MODULESTORE_SETUPS,
     SHORT_NAME_MAP,
+    SPLIT_MODULESTORE_SETUP,
     TEST_DATA_DIR,
 )
 from xmodule.modulestore.perf_tests.generate_asset_xml import make_asset_xml, validate_xml, ASSET_XSD_FILE
@@ -33,6 +39,10 @@ except ImportError:
 # Number of assets saved in the modulestore per test run.
 ASSET_AMOUNT_PER_TEST = (0, 1, 10, 100, 1000, 10000)
 
+# Number of static files imported per test run, and their size in bytes.
+STATIC_FILE_AMOUNT_PER_TEST = (100, 1000)
+STATIC_FILE_SIZE = 256 * 1024
+
 # Use only this course in asset metadata performance testing.
 COURSE_NAME = 'manual-testing-complete'
 
@@ -297,3 +307,140 @@ class TestModulestoreAssetSize(unittest.TestCase):
                 )
                 with open("bson_sizes.txt", "a") as f:
                     f.write(result_str)
+
+
+def make_course_with_assets(data_dir, num_assets):
+    """
+    Copy the test course to data_dir, with the given amount of fake asset metadata and static files.
+    """
+    course_dir = data_dir / COURSE_NAME
+    copytree(COURSE_DATA_DIR, course_dir)
+    asset_xml_path = course_dir / AssetMetadata.EXPORTED_ASSET_DIR / AssetMetadata.EXPORTED_ASSET_FILENAME
+    make_asset_xml(num_assets, asset_xml_path)
+    validate_xml(ASSET_XSD_PATH, asset_xml_path)
+    static_dir = course_dir / 'static' / 'generated'
+    static_dir.makedirs_p()
+    for index in xrange(num_assets):
+        (static_dir / 'asset{}.bin'.format(index)).write_bytes(os.urandom(STATIC_FILE_SIZE))
+
+
+@ddt.ddt
+# Eventually, exclude this attribute from regular unittests while running *only* tests
+# with this attribute during regular performance tests.
+# @attr("perf_test")
+@unittest.skip
+class ImportPipelineTimings(unittest.TestCase):
+    """
+    This class exists to time each phase of course import with different amounts
+    of assets, with static files imported one at a time and by a thread pool.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    def setUp(self):
+        super(ImportPipelineTimings, self).setUp()
+        self.data_dir = path(mkdtemp())
+        self.addCleanup(rmtree, self.data_dir, ignore_errors=True)
+
+    @ddt.data(*itertools.product(
+        STATIC_FILE_AMOUNT_PER_TEST,
+        (1, DEFAULT_STATIC_IMPORT_THREADS),
+    ))
+    @ddt.unpack
+    def test_import_phase_timings(self, num_assets, static_import_threads):
+        """
+        Print the time of each phase of import for the given amount of assets and threads.
+        """
+        make_course_with_assets(self.data_dir, num_assets)
+
+        with SPLIT_MODULESTORE_SETUP.build() as (content_store, store):
+            manager = CourseImportManager(
+                store,
+                'test_user',
+                self.data_dir,
+                source_dirs=TEST_COURSE,
+                static_content_store=content_store,
+                target_id=store.make_course_key('a', 'course', 'course'),
+                create_if_not_present=True,
+                raise_on_failure=True,
+                static_import_threads=static_import_threads,
+            )
+            list(manager.run_imports())
+
+        print("\nAssets: {}, threads: {}".format(num_assets, static_import_threads))
+        print("{:<16}{:>12}".format("phase", "seconds"))
+        for phase, seconds in manager.phase_times.items():
+            print("{:<16}{:>12.2f}".format(phase, seconds))
+
+
+class _CountingWriter(object):
+    """
+    A file-like object that only counts the bytes written to it.
+    """
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data):
+        """
+        Counts the written bytes.
+        """
+        self.size += len(data)
+
+
+@ddt.ddt
+# Eventually, exclude this attribute from regular unittests while running *only* tests
+# with this attribute during regular performance tests.
+# @attr("perf_test")
+@unittest.skip
+class ExportTimings(unittest.TestCase):
+    """
+    This class exists to time course export to a .tar.gz with different amounts of
+    assets, by exporting to a directory and then archiving it, and by streaming it.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    def setUp(self):
+        super(ExportTimings, self).setUp()
+        self.data_dir = path(mkdtemp())
+        self.addCleanup(rmtree, self.data_dir, ignore_errors=True)
+
+    @ddt.data(*STATIC_FILE_AMOUNT_PER_TEST)
+    def test_export_timings(self, num_assets):
+        """
+        Print the time and throughput of both kinds of export, for the given amount of assets.
+        """
+        make_course_with_assets(self.data_dir, num_assets)
+
+        with SPLIT_MODULESTORE_SETUP.build() as (content_store, store):
+            course_key = store.make_course_key('a', 'course', 'course')
+            import_course_from_xml(
+                store,
+                'test_user',
+                self.data_dir,
+                source_dirs=TEST_COURSE,
+                static_content_store=content_store,
+                target_id=course_key,
+                create_if_not_present=True,
+                raise_on_failure=True,
+            )
+
+            start = time.time()
+            export_dir = path(mkdtemp(dir=self.data_dir))
+            export_course_to_xml(store, content_store, course_key, export_dir, 'exported')
+            with tarfile.open(self.data_dir / 'exported.tar.gz', mode='w:gz') as tar_file:
+                tar_file.add(export_dir / 'exported', arcname='exported')
+            staged_time = time.time() - start
+            staged_size = os.path.getsize(self.data_dir / 'exported.tar.gz')
+
+            start = time.time()
+            writer = _CountingWriter()
+            export_course_to_tar_stream(store, content_store, course_key, writer, 'exported')
+            streamed_time = time.time() - start
+
+        print("\nAssets: {}".format(num_assets))
+        print("{:<10}{:>12}{:>12}".format("mode", "seconds", "MB/s"))
+        for mode, seconds, size in (('staged', staged_time, staged_size), ('streamed', streamed_time, writer.size)):
+            print("{:<10}{:>12.2f}{:>12.1f}".format(mode, seconds, size / seconds / 1024 / 1024))
@@ -87,6 +87,12 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
     @lazy
     @contract(returns="dict(BlockKey: BlockKey)")
     def _parent_map(self):
+        index = self.modulestore._get_structure_index(  # pylint: disable=protected-access
+            self.course_entry.course_key, self.course_entry.structure,
+        )
+        if index is not None:
+            return index.parent_map
+
         parent_map = {}
         for block_key, block in self.course_entry.structure['blocks'].iteritems():
             for child in block.fields.get('children', []):
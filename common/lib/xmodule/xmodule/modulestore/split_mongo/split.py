@@ -57,6 +57,7 @@ import copy
 import datetime
 import hashlib
 import logging
+import re
 import six
 from contracts import contract, new_contract
 from importlib import import_module
@@ -86,6 +87,7 @@ from .caching_descriptor_system import CachingDescriptorSystem
 from xmodule.partitions.partitions_service import PartitionService
 from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection, DuplicateKeyError
 from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope
+from xmodule.modulestore.split_mongo.structure_index import get_structure_index
 from xmodule.modulestore.store_utilities import DETACHED_XBLOCK_TYPES
 from xmodule.error_module import ErrorDescriptor
 from collections import defaultdict
@@ -256,16 +258,21 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
                 # append only, so if it's already been written, we can just keep going.
                 log.debug("Attempted to insert duplicate structure %s", _id)
 
-        for _id in bulk_write_record.definitions.viewkeys() - bulk_write_record.definitions_in_db:
+        new_definitions = [
+            bulk_write_record.definitions[_id]
+            for _id in bulk_write_record.definitions.viewkeys() - bulk_write_record.definitions_in_db
+        ]
+        if new_definitions:
             dirty = True
 
+            # Insert all the definitions in one batch, e.g. those of all the blocks of an import.
             try:
-                self.db_connection.insert_definition(bulk_write_record.definitions[_id], bulk_write_record.course_key)
+                self.db_connection.insert_definitions(new_definitions, bulk_write_record.course_key)
             except DuplicateKeyError:
-                # We may not have looked up this definition inside this bulk operation, and thus
-                # didn't realize that it was already in the database. That's OK, the store is
-                # append only, so if it's already been written, we can just keep going.
-                log.debug("Attempted to insert duplicate definition %s", _id)
+                # We may not have looked up some of these definitions inside this bulk operation, and thus
+                # didn't realize that they were already in the database. That's OK, the store is
+                # append only, so if they've already been written, we can just keep going.
+                log.debug("Attempted to insert duplicate definitions for %s", bulk_write_record.course_key)
 
         if bulk_write_record.index is not None and bulk_write_record.index != bulk_write_record.initial_index:
             dirty = True
@@ -642,6 +649,21 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
         return structures
 
 
+def _is_indexable_criteria(criteria):
+    """
+    Returns whether blocks matching the given get_items criteria can be
+    looked up by value in a StructureIndex, i.e. whether the criteria is a
+    plain hashable value rather than a regex, function or operator dict.
+    """
+    if isinstance(criteria, (dict, re._pattern_type)) or callable(criteria):  # pylint: disable=protected-access
+        return False
+    try:
+        hash(criteria)
+    except TypeError:
+        return False
+    return True
+
+
 class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
     """
     A Mongodb backed ModuleStore supporting versions, inheritance,
@@ -1230,11 +1252,12 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         path_cache = None
         parents_cache = None
 
-        if not include_orphans:
+        if not include_orphans and self._get_structure_index(course.course_key, course.structure) is None:
             path_cache = {}
             parents_cache = self.build_block_key_to_parents_mapping(course.structure)
 
-        for block_id, value in course.structure['blocks'].iteritems():
+        for block_id in self._get_items_candidates(course, qualifiers, settings):
+            value = course.structure['blocks'][block_id]
             if _block_matches_all(value):
                 if not include_orphans:
                     if (  # pylint: disable=bad-continuation
@@ -1250,6 +1273,40 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         else:
             return []
 
+    def _get_items_candidates(self, course, qualifiers, settings):
+        """
+        Returns the keys of the blocks of the course which may match the
+        given get_items qualifiers and settings, in structure order.
+
+        Uses the structure index, when available, to only return the blocks
+        of the qualified block type, or with the qualified settings value.
+        """
+        blocks = course.structure['blocks']
+        index = self._get_structure_index(course.course_key, course.structure)
+        if index is None:
+            return blocks.keys()
+
+        candidates = None
+        if isinstance(qualifiers.get('block_type'), six.string_types):
+            candidates = index.blocks_of_type(qualifiers['block_type'])
+        for field_name, criteria in settings.iteritems():
+            if _is_indexable_criteria(criteria):
+                field_candidates = index.blocks_with_field_value(field_name, criteria)
+                if candidates is None or len(field_candidates) < len(candidates):
+                    candidates = field_candidates
+        return blocks.keys() if candidates is None else candidates
+
+    def _get_structure_index(self, course_key, structure):
+        """
+        Returns the shared StructureIndex of the given structure of the given
+        course, or None if the structure was versioned in an active bulk
+        operation, and so may still change.
+        """
+        bulk_write_record = self._get_bulk_ops_record(course_key)
+        if bulk_write_record.active and structure['_id'] not in bulk_write_record.structures_in_db:
+            return None
+        return get_structure_index(structure)
+
     def build_block_key_to_parents_mapping(self, structure):
         """
         Given a structure, builds block_key to parents mapping for all block keys in structure
@@ -1280,6 +1337,10 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         :return Bool: whether or not component has path to the root
         """
 
+        index = self._get_structure_index(course.course_key, course.structure)
+        if index is not None:
+            return index.has_path_to_root(block_key)
+
         if path_cache and block_key in path_cache:
             return path_cache[block_key]
 
@@ -1318,7 +1379,11 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             raise ItemNotFoundError(locator)
 
         course = self._lookup_course(locator.course_key)
-        all_parent_ids = self._get_parents_from_structure(BlockKey.from_usage_key(locator), course.structure)
+        index = self._get_structure_index(course.course_key, course.structure)
+        if index is None:
+            all_parent_ids = self._get_parents_from_structure(BlockKey.from_usage_key(locator), course.structure)
+        else:
+            all_parent_ids = index.parents(BlockKey.from_usage_key(locator))
 
         # Check and verify the found parent_ids are not orphans; Remove parent which has no valid path
         # to the course root
@@ -1339,6 +1404,52 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             block_id=parent_ids[0].id,
         )
 
+    def get_blocks_changed_between_versions(self, course_key, old_version_guid, new_version_guid):
+        """
+        Return the usage keys of all blocks that were added, removed or modified between
+        the given structure versions of the course.
+
+        A block is considered modified if its fields (including its children), definition,
+        defaults or asides differ between the versions. Changes in edit info alone are ignored,
+        since publishing a subtree updates the edit info of every block in it.
+
+        Returns None if either structure version is not found.
+
+        :param course_key: CourseLocator of the course, used for the returned usage keys
+        :param old_version_guid: the version guid of the older structure
+        :param new_version_guid: the version guid of the newer structure
+        """
+        old_structure = self.get_structure(course_key, course_key.as_object_id(old_version_guid))
+        new_structure = self.get_structure(course_key, course_key.as_object_id(new_version_guid))
+        if old_structure is None or new_structure is None:
+            return None
+
+        old_blocks = old_structure['blocks']
+        new_blocks = new_structure['blocks']
+
+        def content_of(block_data):
+            """
+            Returns the versioned content of the given block, excluding its edit info.
+            """
+            return (
+                block_data.block_type,
+                block_data.fields,
+                block_data.definition,
+                block_data.defaults,
+                block_data.get_asides(),
+            )
+
+        changed_block_keys = set(old_blocks.viewkeys() ^ new_blocks.viewkeys())
+        changed_block_keys.update(
+            block_key
+            for block_key in old_blocks.viewkeys() & new_blocks.viewkeys()
+            if content_of(old_blocks[block_key]) != content_of(new_blocks[block_key])
+        )
+        return [
+            course_key.make_usage_key(block_key.type, block_key.id)
+            for block_key in changed_block_keys
+        ]
+
     def get_orphans(self, course_key, **kwargs):
         """
         Return an array of all of the orphans in the course.
@@ -0,0 +1,186 @@
+"""
+An index of the blocks of a split modulestore structure.
+
+Structures are stored append-only: once a structure has been saved, its
+blocks never change, and a new structure, with a new ``_id``, is created
+for every change. So an index built for a saved structure stays valid,
+and can be shared by all the runtimes and modulestore calls of a process
+that use the same version of a course.
+"""
+from collections import OrderedDict, defaultdict
+from threading import Lock
+
+# Maximum number of structure indexes kept in the process.
+STRUCTURE_INDEX_CACHE_SIZE = 64
+
+_structure_indexes = OrderedDict()
+_structure_indexes_lock = Lock()
+
+
+def get_structure_index(structure):
+    """
+    Returns the StructureIndex of the given saved structure, built upon
+    the first request for the structure's ``_id`` and shared thereafter.
+
+    Don't use this for a structure that may still be changed.
+    """
+    structure_id = structure['_id']
+    with _structure_indexes_lock:
+        index = _structure_indexes.pop(structure_id, None)
+        if index is not None:
+            _structure_indexes[structure_id] = index
+            return index
+
+    index = StructureIndex(structure)
+    with _structure_indexes_lock:
+        _structure_indexes[structure_id] = index
+        while len(_structure_indexes) > STRUCTURE_INDEX_CACHE_SIZE:
+            _structure_indexes.popitem(last=False)
+    return index
+
+
+def clear_structure_indexes():
+    """
+    Clears all structure indexes of the process.
+    """
+    with _structure_indexes_lock:
+        _structure_indexes.clear()
+
+
+class StructureIndex(object):
+    """
+    An immutable index of the blocks of a structure, with:
+
+      * the parents of each block, and a map of each block to one parent,
+      * the blocks of each block type,
+      * the blocks with a path to the root of the course,
+      * a topological order of the blocks, with parents before children,
+      * inverted indexes, built upon first use, from the values of a
+        settings field to the blocks with those values.
+
+    The blocks of each parent, type or field value are listed in the order
+    of the structure's blocks dict, to match the order of a scan of the
+    structure.
+    """
+    def __init__(self, structure):
+        blocks = structure['blocks']
+        self._blocks = blocks
+
+        parents = defaultdict(list)
+        blocks_by_type = defaultdict(list)
+        for block_key, block_data in blocks.iteritems():
+            blocks_by_type[block_key.type].append(block_key)
+            for child_key in _unique(block_data.fields.get('children', [])):
+                parents[child_key].append(block_key)
+        self._parents = {block_key: tuple(block_parents) for block_key, block_parents in parents.iteritems()}
+        self._blocks_by_type = {block_type: tuple(keys) for block_type, keys in blocks_by_type.iteritems()}
+
+        # Map of each block to its last parent, in structure order. Don't modify it.
+        self.parent_map = {block_key: block_parents[-1] for block_key, block_parents in self._parents.iteritems()}
+
+        self._rooted = frozenset(self._descendants_of(
+            block_key
+            for block_key in blocks
+            if block_key.type in ('course', 'library') and block_key not in self._parents
+        ))
+        self.topological_order = self._topological_order()
+
+        # Map of field name to the map of its values to blocks.
+        self._field_indexes = {}
+
+    def parents(self, block_key):
+        """
+        Returns the keys of all the parents of the given block.
+        """
+        return self._parents.get(block_key, ())
+
+    def blocks_of_type(self, block_type):
+        """
+        Returns the keys of all the blocks of the given type.
+        """
+        return self._blocks_by_type.get(block_type, ())
+
+    def has_path_to_root(self, block_key):
+        """
+        Returns whether the given block has a path to the root course or
+        library block, i.e. whether it is not an orphan.
+        """
+        return block_key in self._rooted
+
+    def blocks_with_field_value(self, field_name, value):
+        """
+        Returns the keys of the blocks whose settings field of the given
+        name is set to the given hashable value, or, for list fields,
+        contains the given value.
+        """
+        field_index = self._field_indexes.get(field_name)
+        if field_index is None:
+            field_index = defaultdict(list)
+            for block_key, block_data in self._blocks.iteritems():
+                if field_name in block_data.fields:
+                    for field_value in set(_hashable_values(block_data.fields[field_name])):
+                        field_index[field_value].append(block_key)
+            # Built idempotently, so concurrent builds are harmless.
+            field_index = {field_value: tuple(keys) for field_value, keys in field_index.iteritems()}
+            self._field_indexes[field_name] = field_index
+        return field_index.get(value, ())
+
+    def _descendants_of(self, block_keys):
+        """
+        Returns the set of the given blocks and all their descendants.
+        """
+        descendants = set()
+        stack = list(block_keys)
+        while stack:
+            block_key = stack.pop()
+            if block_key in descendants or block_key not in self._blocks:
+                continue
+            descendants.add(block_key)
+            stack.extend(self._blocks[block_key].fields.get('children', []))
+        return descendants
+
+    def _topological_order(self):
+        """
+        Returns a tuple of the keys of all blocks, with every block before
+        its children, unless they are in a cycle.
+        """
+        num_parents = {block_key: len(self.parents(block_key)) for block_key in self._blocks}
+        ready = [block_key for block_key in self._blocks if num_parents[block_key] == 0]
+        order = []
+        while ready:
+            block_key = ready.pop()
+            order.append(block_key)
+            for child_key in reversed(_unique(self._blocks[block_key].fields.get('children', []))):
+                if child_key in num_parents:
+                    num_parents[child_key] -= 1
+                    if num_parents[child_key] == 0:
+                        ready.append(child_key)
+
+        if len(order) < len(self._blocks):
+            # Blocks in cycles are added in structure order.
+            ordered = set(order)
+            order.extend(block_key for block_key in self._blocks if block_key not in ordered)
+        return tuple(order)
+
+
+def _unique(block_keys):
+    """
+    Returns a list of the given block keys, without duplicates.
+    """
+    return list(OrderedDict.fromkeys(block_keys))
+
+
+def _hashable_values(value):
+    """
+    Yields the given value, or its elements if it's a list, that are hashable.
+    """
+    if isinstance(value, list):
+        for element in value:
+            for element_value in _hashable_values(element):
+                yield element_value
+    else:
+        try:
+            hash(value)
+        except TypeError:
+            return
+        yield value
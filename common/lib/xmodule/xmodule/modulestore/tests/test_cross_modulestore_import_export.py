@@ -12,11 +12,13 @@ and then for each combination of modulestores, performing the sequence:
 
 """
 
+import filecmp
 import itertools
 import os
 from path import Path as path
 from shutil import rmtree
-from tempfile import mkdtemp
+import tarfile
+from tempfile import mkdtemp, TemporaryFile
 
 import ddt
 from nose.plugins.attrib import attr
@@ -24,7 +26,7 @@ from mock import patch
 
 from xmodule.tests import CourseComparisonTest
 from xmodule.modulestore.xml_importer import import_course_from_xml
-from xmodule.modulestore.xml_exporter import export_course_to_xml
+from xmodule.modulestore.xml_exporter import export_course_to_tar_stream, export_course_to_xml
 from xmodule.modulestore.tests.utils import mock_tab_from_json
 from xmodule.partitions.tests.test_partitions import PartitionTestCase
 from xmodule.modulestore.tests.utils import (
@@ -204,3 +206,46 @@ class CrossStoreXMLRoundtrip(CourseComparisonTest, PartitionTestCase):
                         dest_course = dest_store.get_course(dest_course_key, depth=None, lazy=False)
 
                         self.assertEqual(dest_course.url_name, 'course')
+
+    def test_tar_stream_export(self):
+        with MongoContentstoreBuilder().build() as content_store:
+            with SPLIT_MODULESTORE_SETUP.build(contentstore=content_store) as store:
+                course_key = store.make_course_key('a', 'course', 'course')
+                import_course_from_xml(
+                    store,
+                    'test_user',
+                    TEST_DATA_DIR,
+                    source_dirs=['manual-testing-complete'],
+                    static_content_store=content_store,
+                    target_id=course_key,
+                    raise_on_failure=True,
+                    create_if_not_present=True,
+                )
+
+                export_course_to_xml(store, content_store, course_key, self.export_dir, EXPORTED_COURSE_DIR_NAME)
+
+                with TemporaryFile() as tar_stream:
+                    export_course_to_tar_stream(store, content_store, course_key, tar_stream, 'streamed')
+                    tar_stream.seek(0)
+                    with tarfile.open(fileobj=tar_stream, mode='r:gz') as tar_file:
+                        tar_file.extractall(self.export_dir)
+
+        # The streamed export has the same files as the export to disk.
+        exported_dir = os.path.join(self.export_dir, EXPORTED_COURSE_DIR_NAME)
+        streamed_dir = os.path.join(self.export_dir, 'streamed')
+        exported_files = _relative_file_paths(exported_dir)
+        self.assertTrue(exported_files)
+        self.assertEqual(_relative_file_paths(streamed_dir), exported_files)
+        _, mismatch, errors = filecmp.cmpfiles(exported_dir, streamed_dir, exported_files, shallow=False)
+        self.assertEqual((mismatch, errors), ([], []))
+
+
+def _relative_file_paths(directory):
+    """
+    Returns the set of the paths of all the files under the directory, relative to it.
+    """
+    return set(
+        os.path.relpath(os.path.join(dirpath, filename), directory)
+        for dirpath, _, filenames in os.walk(directory)
+        for filename in filenames
+    )
@@ -10,6 +10,7 @@ import re
 import unittest
 import uuid
 
+from bson.objectid import ObjectId
 import ddt
 from contracts import contract
 from nose.plugins.attrib import attr
@@ -1569,6 +1570,31 @@ class TestItemCrud(SplitModuleTest):
         self.assertEqual(history_info['previous_version'], pre_version_guid)
         self.assertEqual(history_info['edited_by'], self.user_id)
 
+    def test_blocks_changed_between_versions(self):
+        """
+        test that only the updated block is reported as changed between course versions
+        """
+        course_key = CourseLocator(org="testx", course="GreekHero", run="run", branch=BRANCH_NAME_DRAFT)
+        problem = modulestore().get_item(course_key.make_usage_key('problem', 'problem3_2'))
+        pre_version_guid = problem.location.version_guid
+
+        problem.max_attempts = 4
+        problem.save()  # decache above setting into the kvs
+        updated_problem = modulestore().update_item(problem, self.user_id)
+        post_version_guid = updated_problem.location.version_guid
+
+        self.assertEqual(
+            modulestore().get_blocks_changed_between_versions(course_key, pre_version_guid, post_version_guid),
+            [course_key.make_usage_key('problem', 'problem3_2')],
+        )
+        self.assertEqual(
+            modulestore().get_blocks_changed_between_versions(course_key, post_version_guid, post_version_guid),
+            [],
+        )
+        self.assertIsNone(
+            modulestore().get_blocks_changed_between_versions(course_key, pre_version_guid, ObjectId())
+        )
+
     def test_update_children(self):
         """
         test updating an item's children ensuring the definition doesn't version but the course does if it should
@@ -0,0 +1,106 @@
+"""
+Tests for the index of the blocks of split modulestore structures.
+"""
+import unittest
+
+from bson.objectid import ObjectId
+from mock import patch
+
+from xmodule.modulestore import BlockData
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo import structure_index
+from xmodule.modulestore.split_mongo.structure_index import StructureIndex, clear_structure_indexes, get_structure_index
+
+COURSE = BlockKey('course', 'course')
+CHAPTER_1 = BlockKey('chapter', 'chapter_1')
+CHAPTER_2 = BlockKey('chapter', 'chapter_2')
+SEQUENTIAL = BlockKey('sequential', 'sequential')
+PROBLEM = BlockKey('problem', 'problem')
+ORPHAN = BlockKey('problem', 'orphan')
+
+
+def _structure():
+    """
+    Returns a structure in which the sequential is a child of both
+    chapters, and a problem is an orphan.
+    """
+    return {
+        '_id': ObjectId(),
+        'root': COURSE,
+        'blocks': {
+            COURSE: BlockData(block_type='course', fields={'children': [CHAPTER_1, CHAPTER_2]}),
+            CHAPTER_1: BlockData(block_type='chapter', fields={'children': [SEQUENTIAL]}),
+            CHAPTER_2: BlockData(block_type='chapter', fields={'children': [SEQUENTIAL]}),
+            SEQUENTIAL: BlockData(
+                block_type='sequential', fields={'children': [PROBLEM], 'graded': True, 'format': 'Homework'},
+            ),
+            PROBLEM: BlockData(block_type='problem', fields={'group_access': {}, 'tags': ['a', 'b']}),
+            ORPHAN: BlockData(block_type='problem', fields={'tags': ['b']}),
+        },
+    }
+
+
+class TestStructureIndex(unittest.TestCase):
+    """
+    Tests for StructureIndex.
+    """
+    def setUp(self):
+        super(TestStructureIndex, self).setUp()
+        self.structure = _structure()
+        self.index = StructureIndex(self.structure)
+
+    def test_parents(self):
+        self.assertEqual(self.index.parents(COURSE), ())
+        self.assertEqual(set(self.index.parents(SEQUENTIAL)), {CHAPTER_1, CHAPTER_2})
+        self.assertEqual(self.index.parents(PROBLEM), (SEQUENTIAL,))
+        self.assertEqual(self.index.parent_map[PROBLEM], SEQUENTIAL)
+        self.assertNotIn(COURSE, self.index.parent_map)
+
+    def test_blocks_of_type(self):
+        self.assertEqual(set(self.index.blocks_of_type('problem')), {PROBLEM, ORPHAN})
+        self.assertEqual(self.index.blocks_of_type('html'), ())
+
+    def test_has_path_to_root(self):
+        for block_key in (COURSE, CHAPTER_1, CHAPTER_2, SEQUENTIAL, PROBLEM):
+            self.assertTrue(self.index.has_path_to_root(block_key))
+        self.assertFalse(self.index.has_path_to_root(ORPHAN))
+
+    def test_topological_order(self):
+        order = self.index.topological_order
+        self.assertEqual(set(order), set(self.structure['blocks']))
+        for block_key in order:
+            for parent_key in self.index.parents(block_key):
+                self.assertLess(order.index(parent_key), order.index(block_key))
+
+    def test_blocks_with_field_value(self):
+        self.assertEqual(self.index.blocks_with_field_value('graded', True), (SEQUENTIAL,))
+        self.assertEqual(self.index.blocks_with_field_value('format', 'Lab'), ())
+        self.assertEqual(set(self.index.blocks_with_field_value('tags', 'b')), {PROBLEM, ORPHAN})
+        self.assertEqual(self.index.blocks_with_field_value('children', PROBLEM), (SEQUENTIAL,))
+        self.assertEqual(self.index.blocks_with_field_value('group_access', None), ())
+
+
+class TestGetStructureIndex(unittest.TestCase):
+    """
+    Tests for the indexes shared by all users of a structure.
+    """
+    def setUp(self):
+        super(TestGetStructureIndex, self).setUp()
+        clear_structure_indexes()
+        self.addCleanup(clear_structure_indexes)
+
+    def test_shared_by_structure_id(self):
+        structure = _structure()
+        index = get_structure_index(structure)
+        self.assertIs(get_structure_index(dict(structure)), index)
+        self.assertIsNot(get_structure_index(_structure()), index)
+
+    @patch.object(structure_index, 'STRUCTURE_INDEX_CACHE_SIZE', 2)
+    def test_least_recently_used_evicted(self):
+        structures = [_structure() for _ in range(3)]
+        indexes = [get_structure_index(structure) for structure in structures[:2]]
+        get_structure_index(structures[0])
+        get_structure_index(structures[2])
+
+        self.assertIs(get_structure_index(structures[0]), indexes[0])
+        self.assertIsNot(get_structure_index(structures[1]), indexes[1])
@@ -2,6 +2,10 @@
 Tests for XML importer.
 """
 import mock
+from multiprocessing.pool import ThreadPool
+from path import Path as path
+from shutil import rmtree
+from tempfile import mkdtemp
 from opaque_keys.edx.locator import BlockUsageLocator, CourseLocator
 from xblock.fields import String, Scope, ScopeIds, List
 from xblock.runtime import Runtime, KvsFieldData, DictKeyValueStore
@@ -9,7 +13,9 @@ from xmodule.x_module import XModuleMixin
 from opaque_keys.edx.locations import Location
 from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.inheritance import InheritanceMixin
-from xmodule.modulestore.xml_importer import _update_and_import_module, _update_module_location
+from xmodule.modulestore.xml_importer import (
+    _update_and_import_module, _update_module_location, import_static_content
+)
 from xmodule.modulestore.tests.mongo_connection import MONGO_PORT_NUM, MONGO_HOST
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from xmodule.tests import DATA_DIR
@@ -333,3 +339,41 @@ class UpdateLocationTest(ModuleStoreNoSettings):
         # Expect these fields pass "is_set_on" test
         for field in self.CONTENT_FIELDS + self.SETTINGS_FIELDS + self.CHILDREN_FIELDS:
             self.assertTrue(new_version.fields[field].is_set_on(new_version))
+
+
+class ImportStaticContentTest(unittest.TestCase):
+    """
+    Test importing the static files of a course.
+    """
+    def setUp(self):
+        super(ImportStaticContentTest, self).setUp()
+        self.course_data_path = path(mkdtemp())
+        self.addCleanup(rmtree, self.course_data_path)
+        (self.course_data_path / 'static' / 'images').makedirs()
+        for index in range(10):
+            (self.course_data_path / 'static' / 'images' / 'image{}.png'.format(index)).write_bytes('image')
+        (self.course_data_path / 'static' / 'handouts.pdf').write_bytes('handouts')
+        (self.course_data_path / 'static' / '.DS_Store').write_bytes('ignored')
+        self.course_id = CourseLocator('org', 'course', 'run')
+
+    def _import(self, pool=None):
+        """
+        Import the static files with a mock content store, and return the
+        remapping and the paths of the saved files.
+        """
+        content_store = mock.Mock()
+        content_store.generate_thumbnail.return_value = (None, None)
+        remap_dict = import_static_content(self.course_data_path, content_store, self.course_id, pool=pool)
+        saved = sorted(call[0][0].import_path for call in content_store.save.call_args_list)
+        return remap_dict, saved
+
+    def test_import_serially(self):
+        remap_dict, saved = self._import()
+        self.assertEqual(len(saved), 11)
+        self.assertEqual(sorted(remap_dict), saved)
+        self.assertEqual(remap_dict['handouts.pdf'], self.course_id.make_asset_key('asset', 'handouts.pdf'))
+
+    def test_import_with_pool(self):
+        pool = ThreadPool(4)
+        self.addCleanup(pool.terminate)
+        self.assertEqual(self._import(pool), self._import())
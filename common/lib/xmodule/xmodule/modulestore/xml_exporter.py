@@ -2,9 +2,15 @@
 Methods for exporting course data to XML
 """
 
+import calendar
+from cStringIO import StringIO
+import fnmatch
 import logging
 from abc import abstractmethod
 import lxml.etree
+import posixpath
+import tarfile
+import time
 from xblock.fields import Scope, Reference, ReferenceList, ReferenceValueDict
 from xmodule.contentstore.content import StaticContent
 from xmodule.exceptions import NotFoundError
@@ -13,9 +19,9 @@ from xmodule.modulestore import EdxJSONEncoder, ModuleStoreEnum
 from xmodule.modulestore.inheritance import own_metadata
 from xmodule.modulestore.store_utilities import draft_node_constructor, get_draft_subtree_roots
 from xmodule.modulestore import LIBRARY_ROOT
+from fs.errors import NoSysPathError, ResourceNotFoundError, UnsupportedError
 from fs.osfs import OSFS
 from json import dumps
-import os
 
 from xmodule.modulestore.draft_and_published import DIRECT_ONLY_CATEGORIES
 from opaque_keys.edx.locator import CourseLocator, LibraryLocator
@@ -26,6 +32,195 @@ PUBLISHED_DIR = "published"
 DEFAULT_CONTENT_FIELDS = ['metadata', 'data']
 
 
+class TarExportFS(object):
+    """
+    A write-only filesystem, implementing the parts of the pyfilesystem API
+    used by exporters, which adds the files written to it to a tar stream
+    under the `root` directory.
+
+    Each file is kept in memory until it's closed, which is fine for the XML
+    of a block or a policy; large files are streamed with `write_stream`.
+    The files written can't be read back, and have no system path, so the
+    export of a block which needs either fails with an UnsupportedError or
+    a NoSysPathError.
+    """
+    def __init__(self, tar_file, root, paths=None):
+        self.tar_file = tar_file
+        self.root = root
+        # Whether each tar path written so far is a directory, shared by the
+        # filesystems of all the directories of the tar stream.
+        self._paths = {} if paths is None else paths
+
+    def _tar_path(self, path):
+        """
+        Returns the path of the tar member of the given path.
+        """
+        return posixpath.normpath(posixpath.join(self.root, path.lstrip('/')))
+
+    def _add_path(self, tar_path, is_dir):
+        """
+        Records the tar path as written, and its parent directories.
+        """
+        self._paths[tar_path] = is_dir
+        parent = posixpath.dirname(tar_path)
+        while parent and parent != tar_path and parent not in self._paths:
+            self._paths[parent] = True
+            tar_path, parent = parent, posixpath.dirname(parent)
+
+    def exists(self, path):
+        """
+        Returns whether a file or directory was written at the given path.
+        """
+        return self.isdir(path) or self.isfile(path)
+
+    def isdir(self, path):
+        """
+        Returns whether a directory was made at the given path.
+        """
+        tar_path = self._tar_path(path)
+        return tar_path == self.root or self._paths.get(tar_path) is True
+
+    def isfile(self, path):
+        """
+        Returns whether a file was written at the given path.
+        """
+        return self._paths.get(self._tar_path(path)) is False
+
+    def listdir(self, path='./', wildcard=None, full=False, absolute=False, dirs_only=False, files_only=False):
+        """
+        Returns the names of the files and directories written in the given directory.
+        """
+        tar_path = self._tar_path(path)
+        if not self.isdir(path):
+            raise ResourceNotFoundError(path)
+        names = []
+        for member_path, is_dir in self._paths.iteritems():
+            if posixpath.dirname(member_path) != tar_path or (dirs_only and not is_dir) or (files_only and is_dir):
+                continue
+            name = posixpath.basename(member_path)
+            if wildcard is not None and not fnmatch.fnmatch(name, wildcard):
+                continue
+            if full or absolute:
+                name = posixpath.join(path, name)
+                if absolute:
+                    name = '/' + name.lstrip('/')
+            names.append(name)
+        return sorted(names)
+
+    def open(self, path, mode='r', **kwargs):  # pylint: disable=unused-argument
+        """
+        Opens a file to write to the tar stream when it's closed.
+        """
+        if 'w' not in mode:
+            raise UnsupportedError('read', path, msg=u"Files of a tar export can't be read")
+        return _TarExportFile(self, path)
+
+    def setcontents(self, path, data='', encoding=None, errors=None,
+                    chunk_size=None):  # pylint: disable=unused-argument
+        """
+        Writes the data, a string or file-like object, to the file at the given path.
+        """
+        if hasattr(data, 'read'):
+            data = data.read()
+        if isinstance(data, unicode):
+            data = data.encode(encoding or 'utf-8', errors or 'strict')
+        self.write_stream(path, StringIO(data), len(data))
+
+    def createfile(self, path, wipe=False):
+        """
+        Writes an empty file at the given path, unless there is one already and `wipe` is False.
+        """
+        if wipe or not self.isfile(path):
+            self.setcontents(path, '')
+
+    def makedir(self, path, recursive=False, allow_recreate=False):  # pylint: disable=unused-argument
+        """
+        Tar members don't need their directories to be added first, so this only records the directory.
+        """
+        self._add_path(self._tar_path(path), True)
+
+    def makeopendir(self, path, recursive=False):
+        """
+        Makes the given directory, and returns its filesystem.
+        """
+        self.makedir(path, recursive=recursive, allow_recreate=True)
+        return self.opendir(path)
+
+    def opendir(self, path):
+        """
+        Returns the filesystem of the given directory.
+        """
+        if not self.isdir(path):
+            raise ResourceNotFoundError(path)
+        return TarExportFS(self.tar_file, self._tar_path(path), self._paths)
+
+    def hassyspath(self, path):  # pylint: disable=unused-argument
+        """
+        The files of a tar stream aren't on disk.
+        """
+        return False
+
+    def getsyspath(self, path, allow_none=False):
+        """
+        The files of a tar stream aren't on disk, so return None if
+        `allow_none`, or raise a NoSysPathError.
+        """
+        if allow_none:
+            return None
+        raise NoSysPathError(path)
+
+    def write_stream(self, path, stream, size, mtime=None):
+        """
+        Adds `size` bytes read from the file-like `stream` to the tar stream,
+        a block at a time, as the file at `path`, last modified at the
+        `mtime` datetime, if any.
+        """
+        tar_path = self._tar_path(path)
+        tar_info = tarfile.TarInfo(tar_path)
+        tar_info.size = size
+        tar_info.mode = 0o644
+        tar_info.mtime = calendar.timegm(mtime.utctimetuple()) if mtime else int(time.time())
+        self.tar_file.addfile(tar_info, stream)
+        self._add_path(tar_path, False)
+
+
+class _TarExportFile(object):
+    """
+    A file of a `TarExportFS`, added to the tar stream when it's closed.
+    """
+    def __init__(self, export_fs, path):
+        self.export_fs = export_fs
+        self.path = path
+        self._buffer = StringIO()
+
+    def write(self, data):
+        """
+        Writes the data to the file.
+        """
+        self._buffer.write(data)
+
+    def flush(self):
+        """
+        Files are only written to the tar stream when they're closed.
+        """
+        pass
+
+    def close(self):
+        """
+        Adds the file to the tar stream.
+        """
+        if self._buffer is not None:
+            data = self._buffer.getvalue()
+            self._buffer = None
+            self.export_fs.write_stream(self.path, StringIO(data), len(data))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
 def _export_drafts(modulestore, course_key, export_fs, xml_centric_course_key):
     """
     Exports course drafts.
@@ -104,7 +299,7 @@ class ExportManager(object):
     """
     Manages XML exporting for courselike objects.
     """
-    def __init__(self, modulestore, contentstore, courselike_key, root_dir, target_dir):
+    def __init__(self, modulestore, contentstore, courselike_key, root_dir, target_dir, tar_file=None):
         """
         Export all modules from `modulestore` and content from `contentstore` as xml to `root_dir`.
 
@@ -113,12 +308,15 @@ class ExportManager(object):
         `courselike_key`: The Locator of the Descriptor to export
         `root_dir`: The directory to write the exported xml to
         `target_dir`: The name of the directory inside `root_dir` to write the content to
+        `tar_file`: A `tarfile.TarFile` to stream the content to, under `target_dir`, instead of
+            writing it to `root_dir`
         """
         self.modulestore = modulestore
         self.contentstore = contentstore
         self.courselike_key = courselike_key
         self.root_dir = root_dir
         self.target_dir = target_dir
+        self.tar_file = tar_file
 
     @abstractmethod
     def get_key(self):
@@ -148,19 +346,39 @@ class ExportManager(object):
         Get the target courselike object for this export.
         """
 
+    def open_export_fs(self):
+        """
+        Get the filesystem to export the content to.
+        """
+        if self.tar_file is not None:
+            return TarExportFS(self.tar_file, self.target_dir)
+        return OSFS(self.root_dir).makeopendir(self.target_dir)
+
+    def export_assets(self, export_fs):
+        """
+        Export the static assets of the courselike, and their policy.
+        """
+        if self.tar_file is not None:
+            self.contentstore.stream_all_for_course(self.courselike_key, export_fs)
+        else:
+            self.contentstore.export_all_for_course(
+                self.courselike_key,
+                self.root_dir + '/' + self.target_dir + '/static/',
+                self.root_dir + '/' + self.target_dir + '/policies/assets.json',
+            )
+
     def export(self):
         """
         Perform the export given the parameters handed to this class at init.
         """
         with self.modulestore.bulk_operations(self.courselike_key):
 
-            fsm = OSFS(self.root_dir)
             root = lxml.etree.Element('unknown')
 
             # export only the published content
             with self.modulestore.branch_setting(ModuleStoreEnum.Branch.published_only, self.courselike_key):
                 courselike = self.get_courselike()
-                export_fs = courselike.runtime.export_fs = fsm.makeopendir(self.target_dir)
+                export_fs = courselike.runtime.export_fs = self.open_export_fs()
 
                 # change all of the references inside the course to use the xml expected key type w/o version & branch
                 xml_centric_courselike_key = self.get_key()
@@ -171,7 +389,8 @@ class ExportManager(object):
             self.process_root(root, export_fs)
 
             # Process extra items-- drafts, assets, etc
-            root_courselike_dir = self.root_dir + '/' + self.target_dir
+            # There's no root directory when streaming the content to a tar file.
+            root_courselike_dir = self.root_dir + '/' + self.target_dir if self.tar_file is None else None
             self.process_extra(root, courselike, root_courselike_dir, xml_centric_courselike_key, export_fs)
 
             # Any last pass adjustments
@@ -201,26 +420,20 @@ class CourseExportManager(ExportManager):
 
     def process_extra(self, root, courselike, root_courselike_dir, xml_centric_courselike_key, export_fs):
         # Export the modulestore's asset metadata.
-        asset_dir = root_courselike_dir + '/' + AssetMetadata.EXPORTED_ASSET_DIR + '/'
-        if not os.path.isdir(asset_dir):
-            os.makedirs(asset_dir)
         asset_root = lxml.etree.Element(AssetMetadata.ALL_ASSETS_XML_TAG)
         course_assets = self.modulestore.get_all_asset_metadata(self.courselike_key, None)
         for asset_md in course_assets:
             # All asset types are exported using the "asset" tag - but their asset type is specified in each asset key.
             asset = lxml.etree.SubElement(asset_root, AssetMetadata.ASSET_XML_TAG)
             asset_md.to_xml(asset)
-        with OSFS(asset_dir).open(AssetMetadata.EXPORTED_ASSET_FILENAME, 'w') as asset_xml_file:
+        asset_dir = export_fs.makeopendir(AssetMetadata.EXPORTED_ASSET_DIR)
+        with asset_dir.open(AssetMetadata.EXPORTED_ASSET_FILENAME, 'w') as asset_xml_file:
             lxml.etree.ElementTree(asset_root).write(asset_xml_file)
 
         # export the static assets
         policies_dir = export_fs.makeopendir('policies')
         if self.contentstore:
-            self.contentstore.export_all_for_course(
-                self.courselike_key,
-                root_courselike_dir + '/static/',
-                root_courselike_dir + '/policies/assets.json',
-            )
+            self.export_assets(export_fs)
 
             # If we are using the default course image, export it to the
             # legacy location to support backwards compatibility.
@@ -235,10 +448,8 @@ class CourseExportManager(ExportManager):
                 except NotFoundError:
                     pass
                 else:
-                    output_dir = root_courselike_dir + '/static/images/'
-                    if not os.path.isdir(output_dir):
-                        os.makedirs(output_dir)
-                    with OSFS(output_dir).open('course_image.jpg', 'wb') as course_image_file:
+                    export_fs.makedir('static/images', recursive=True, allow_recreate=True)
+                    with export_fs.open('static/images/course_image.jpg', 'wb') as course_image_file:
                         course_image_file.write(course_image.data)
 
         # export the static tabs
@@ -318,11 +529,7 @@ class LibraryExportManager(ExportManager):
         export_fs.makeopendir('policies')
 
         if self.contentstore:
-            self.contentstore.export_all_for_course(
-                self.courselike_key,
-                self.root_dir + '/' + self.target_dir + '/static/',
-                self.root_dir + '/' + self.target_dir + '/policies/assets.json',
-            )
+            self.export_assets(export_fs)
 
     def post_process(self, root, export_fs):
         """
@@ -351,6 +558,24 @@ def export_library_to_xml(modulestore, contentstore, library_key, root_dir, libr
     LibraryExportManager(modulestore, contentstore, library_key, root_dir, library_dir).export()
 
 
+def export_course_to_tar_stream(modulestore, contentstore, course_key, fileobj, course_dir):
+    """
+    Export the course as a .tar.gz stream written to `fileobj`, with its content under
+    `course_dir`, without staging it on disk. See ExportManager for details.
+    """
+    with tarfile.open(fileobj=fileobj, mode='w|gz') as tar_file:
+        CourseExportManager(modulestore, contentstore, course_key, None, course_dir, tar_file=tar_file).export()
+
+
+def export_library_to_tar_stream(modulestore, contentstore, library_key, fileobj, library_dir):
+    """
+    Export the library as a .tar.gz stream written to `fileobj`, with its content under
+    `library_dir`, without staging it on disk. See ExportManager for details.
+    """
+    with tarfile.open(fileobj=fileobj, mode='w|gz') as tar_file:
+        LibraryExportManager(modulestore, contentstore, library_key, None, library_dir, tar_file=tar_file).export()
+
+
 def adapt_references(subtree, destination_course_key, export_fs):
     """
     Map every reference in the subtree into destination_course_key and set it back into the xblock fields
@@ -22,12 +22,17 @@ Modulestore virtual   |          XML physical (draft, published)
 """
 import logging
 from abc import abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import partial
+from multiprocessing.pool import ThreadPool
 from opaque_keys.edx.locator import LibraryLocator
 import os
 import mimetypes
 from path import Path as path
 import json
 import re
+import time
 from lxml import etree
 
 from xmodule.library_tools import LibraryToolsService
@@ -54,11 +59,20 @@ from xmodule.util.misc import escape_invalid_characters
 
 log = logging.getLogger(__name__)
 
+# Default number of threads saving static files to the content store concurrently.
+DEFAULT_STATIC_IMPORT_THREADS = 8
+
 
 def import_static_content(
         course_data_path, static_content_store,
-        target_id, subpath='static', verbose=False):
+        target_id, subpath='static', verbose=False, pool=None):
+    """
+    Import the static files found under `subpath` of the course into the
+    static content store, with the given thread pool if any, and otherwise
+    one at a time.
 
+    Returns a dict mapping the path of each imported file to its asset key.
+    """
     remap_dict = {}
 
     # now import all static assets
@@ -77,6 +91,7 @@ def import_static_content(
     mimetypes.add_type('application/octet-stream', '.srt')
     mimetypes_list = mimetypes.types_map.values()
 
+    content_paths = []
     for dirname, _, filenames in os.walk(static_dir):
         for filename in filenames:
 
@@ -87,63 +102,89 @@ def import_static_content(
                     log.debug('skipping static content %s...', content_path)
                 continue
 
-            if verbose:
-                log.debug('importing static content %s...', content_path)
+            content_paths.append(content_path)
 
-            try:
-                with open(content_path, 'rb') as f:
-                    data = f.read()
-            except IOError:
-                if filename.startswith('._'):
-                    # OS X "companion files". See
-                    # http://www.diigo.com/annotated/0c936fda5da4aa1159c189cea227e174
-                    continue
-                # Not a 'hidden file', then re-raise exception
-                raise
+    import_file = partial(
+        _import_static_file,
+        static_dir=static_dir,
+        static_content_store=static_content_store,
+        target_id=target_id,
+        policy=policy,
+        mimetypes_list=mimetypes_list,
+        verbose=verbose,
+    )
+    imported = pool.map(import_file, content_paths) if pool is not None else map(import_file, content_paths)
+    for result in imported:
+        if result is not None:
+            fullname_with_subpath, asset_key = result
+            # store the remapping information which will be needed
+            # to subsitute in the module data
+            remap_dict[fullname_with_subpath] = asset_key
 
-            # strip away leading path from the name
-            fullname_with_subpath = content_path.replace(static_dir, '')
-            if fullname_with_subpath.startswith('/'):
-                fullname_with_subpath = fullname_with_subpath[1:]
-            asset_key = StaticContent.compute_location(target_id, fullname_with_subpath)
+    return remap_dict
 
-            policy_ele = policy.get(asset_key.path, {})
 
-            # During export display name is used to create files, strip away slashes from name
-            displayname = escape_invalid_characters(
-                name=policy_ele.get('displayname', filename),
-                invalid_char_list=['/', '\\']
-            )
-            locked = policy_ele.get('locked', False)
-            mime_type = policy_ele.get('contentType')
-
-            # Check extracted contentType in list of all valid mimetypes
-            if not mime_type or mime_type not in mimetypes_list:
-                mime_type = mimetypes.guess_type(filename)[0]   # Assign guessed mimetype
-            content = StaticContent(
-                asset_key, displayname, mime_type, data,
-                import_path=fullname_with_subpath, locked=locked
-            )
+def _import_static_file(content_path, static_dir, static_content_store, target_id, policy, mimetypes_list, verbose):
+    """
+    Save the static file at `content_path` to the static content store, with
+    its thumbnail if any, and return its path under `static_dir` and its
+    asset key, or None for unreadable OS X companion files.
+    """
+    filename = os.path.basename(content_path)
 
-            # first let's save a thumbnail so we can get back a thumbnail location
-            thumbnail_content, thumbnail_location = static_content_store.generate_thumbnail(content)
+    if verbose:
+        log.debug('importing static content %s...', content_path)
 
-            if thumbnail_content is not None:
-                content.thumbnail_location = thumbnail_location
+    try:
+        with open(content_path, 'rb') as f:
+            data = f.read()
+    except IOError:
+        if filename.startswith('._'):
+            # OS X "companion files". See
+            # http://www.diigo.com/annotated/0c936fda5da4aa1159c189cea227e174
+            return None
+        # Not a 'hidden file', then re-raise exception
+        raise
+
+    # strip away leading path from the name
+    fullname_with_subpath = content_path.replace(static_dir, '')
+    if fullname_with_subpath.startswith('/'):
+        fullname_with_subpath = fullname_with_subpath[1:]
+    asset_key = StaticContent.compute_location(target_id, fullname_with_subpath)
+
+    policy_ele = policy.get(asset_key.path, {})
+
+    # During export display name is used to create files, strip away slashes from name
+    displayname = escape_invalid_characters(
+        name=policy_ele.get('displayname', filename),
+        invalid_char_list=['/', '\\']
+    )
+    locked = policy_ele.get('locked', False)
+    mime_type = policy_ele.get('contentType')
+
+    # Check extracted contentType in list of all valid mimetypes
+    if not mime_type or mime_type not in mimetypes_list:
+        mime_type = mimetypes.guess_type(filename)[0]   # Assign guessed mimetype
+    content = StaticContent(
+        asset_key, displayname, mime_type, data,
+        import_path=fullname_with_subpath, locked=locked
+    )
 
-            # then commit the content
-            try:
-                static_content_store.save(content)
-            except Exception as err:
-                log.exception(u'Error importing {0}, error={1}'.format(
-                    fullname_with_subpath, err
-                ))
+    # first let's save a thumbnail so we can get back a thumbnail location
+    thumbnail_content, thumbnail_location = static_content_store.generate_thumbnail(content)
 
-            # store the remapping information which will be needed
-            # to subsitute in the module data
-            remap_dict[fullname_with_subpath] = asset_key
+    if thumbnail_content is not None:
+        content.thumbnail_location = thumbnail_location
 
-    return remap_dict
+    # then commit the content
+    try:
+        static_content_store.save(content)
+    except Exception as err:
+        log.exception(u'Error importing {0}, error={1}'.format(
+            fullname_with_subpath, err
+        ))
+
+    return fullname_with_subpath, asset_key
 
 
 class ImportManager(object):
@@ -178,6 +219,12 @@ class ImportManager(object):
             Otherwise, it throws an InvalidLocationError if the courselike does not exist.
 
         default_class, load_error_modules: are arguments for constructing the XMLModuleStore (see its doc)
+
+        static_import_threads: the number of threads saving static files to static_content_store
+            concurrently, in the background of the import of the blocks.
+
+    The time spent in each phase of the import is accumulated in `phase_times`, and logged
+    after each courselike is imported.
     """
     store_class = XMLModuleStore
 
@@ -187,7 +234,7 @@ class ImportManager(object):
             load_error_modules=True, static_content_store=None,
             target_id=None, verbose=False,
             do_import_static=True, create_if_not_present=False,
-            raise_on_failure=False
+            raise_on_failure=False, static_import_threads=DEFAULT_STATIC_IMPORT_THREADS
     ):
         self.store = store
         self.user_id = user_id
@@ -200,17 +247,40 @@ class ImportManager(object):
         self.do_import_static = do_import_static
         self.create_if_not_present = create_if_not_present
         self.raise_on_failure = raise_on_failure
-        self.xml_module_store = self.store_class(
-            data_dir,
-            default_class=default_class,
-            source_dirs=source_dirs,
-            load_error_modules=load_error_modules,
-            xblock_mixins=store.xblock_mixins,
-            xblock_select=store.xblock_select,
-            target_course_id=target_id,
-        )
+        self.static_import_threads = static_import_threads
+        self.phase_times = OrderedDict()
+        self._static_pool = None
+        with self.timed_phase('parse'):
+            self.xml_module_store = self.store_class(
+                data_dir,
+                default_class=default_class,
+                source_dirs=source_dirs,
+                load_error_modules=load_error_modules,
+                xblock_mixins=store.xblock_mixins,
+                xblock_select=store.xblock_select,
+                target_course_id=target_id,
+            )
         self.logger, self.errors = make_error_tracker()
 
+    @contextmanager
+    def timed_phase(self, phase):
+        """
+        Add the wall time spent in the block to the time of the given phase.
+        """
+        start = time.time()
+        try:
+            yield
+        finally:
+            self._add_phase_time(phase, time.time() - start)
+
+    def _add_phase_time(self, phase, seconds):
+        """
+        Add the given seconds to the time of the given phase.
+
+        Only call this from the thread running the import, as phase_times isn't thread-safe.
+        """
+        self.phase_times[phase] = self.phase_times.get(phase, 0) + seconds
+
     def preflight(self):
         """
         Perform any pre-import sanity checks.
@@ -228,7 +298,7 @@ class ImportManager(object):
             # first pass to find everything in /static/
             import_static_content(
                 data_path, self.static_content_store,
-                dest_id, subpath='static', verbose=self.verbose
+                dest_id, subpath='static', verbose=self.verbose, pool=self._static_pool
             )
 
         elif self.verbose and not self.do_import_static:
@@ -251,7 +321,7 @@ class ImportManager(object):
         if os.path.exists(data_path / simport):
             import_static_content(
                 data_path, self.static_content_store,
-                dest_id, subpath=simport, verbose=self.verbose
+                dest_id, subpath=simport, verbose=self.verbose, pool=self._static_pool
             )
 
     def import_asset_metadata(self, data_dir, course_id):
@@ -428,36 +498,74 @@ class ImportManager(object):
         Iterate over the given directories and yield courses.
         """
         self.preflight()
-        for courselike_key in self.xml_module_store.modules.keys():
-            try:
-                dest_id, runtime = self.get_dest_id(courselike_key)
-            except DuplicateCourseError:
-                continue
 
-            # This bulk operation wraps all the operations to populate the published branch.
-            with self.store.bulk_operations(dest_id):
-                # Retrieve the course itself.
-                source_courselike, courselike, data_path = self.get_courselike(courselike_key, runtime, dest_id)
-
-                # Import all static pieces.
-                self.import_static(data_path, dest_id)
-
-                # Import asset metadata stored in XML.
-                self.import_asset_metadata(data_path, dest_id)
+        # Static files are saved by a pool of threads, while a background thread
+        # walks the static directories, so that the static content is imported
+        # while the blocks, which don't depend on it, are written.
+        self._static_pool = ThreadPool(self.static_import_threads) if self.static_import_threads > 1 else None
+        background = ThreadPool(1)
+        try:
+            for courselike_key in self.xml_module_store.modules.keys():
+                try:
+                    dest_id, runtime = self.get_dest_id(courselike_key)
+                except DuplicateCourseError:
+                    continue
 
-                # Import all children
-                self.import_children(source_courselike, courselike, courselike_key, dest_id)
+                # This bulk operation wraps all the operations to populate the published branch.
+                with self.store.bulk_operations(dest_id):
+                    # Retrieve the course itself.
+                    with self.timed_phase('courselike'):
+                        source_courselike, courselike, data_path = self.get_courselike(
+                            courselike_key, runtime, dest_id
+                        )
 
-            # This bulk operation wraps all the operations to populate the draft branch with any items
-            # from the /drafts subdirectory.
-            # Drafts must be imported in a separate bulk operation from published items to import properly,
-            # due to the recursive_build() above creating a draft item for each course block
-            # and then publishing it.
-            with self.store.bulk_operations(dest_id):
-                # Import all draft items into the courselike.
-                courselike = self.import_drafts(courselike, courselike_key, data_path, dest_id)
+                    # Import all static pieces, in the background.
+                    static_import = background.apply_async(self._import_static_timed, (data_path, dest_id))
+
+                    # Import asset metadata stored in XML.
+                    with self.timed_phase('asset_metadata'):
+                        self.import_asset_metadata(data_path, dest_id)
+
+                    # Import all children
+                    with self.timed_phase('children'):
+                        self.import_children(source_courselike, courselike, courselike_key, dest_id)
+
+                    # Wait for the static pieces, and raise their errors, if any.
+                    with self.timed_phase('static_wait'):
+                        static_seconds = static_import.get()
+                    self._add_phase_time('static', static_seconds)
+
+                # This bulk operation wraps all the operations to populate the draft branch with any items
+                # from the /drafts subdirectory.
+                # Drafts must be imported in a separate bulk operation from published items to import properly,
+                # due to the recursive_build() above creating a draft item for each course block
+                # and then publishing it.
+                with self.timed_phase('drafts'):
+                    with self.store.bulk_operations(dest_id):
+                        # Import all draft items into the courselike.
+                        courselike = self.import_drafts(courselike, courselike_key, data_path, dest_id)
+
+                log.info(
+                    u'Imported %s: %s', dest_id,
+                    u', '.join(u'{} {:.2f}s'.format(phase, seconds) for phase, seconds in self.phase_times.items())
+                )
+                yield courselike
+        finally:
+            background.terminate()
+            if self._static_pool is not None:
+                self._static_pool.terminate()
+                self._static_pool = None
+
+    def _import_static_timed(self, data_path, dest_id):
+        """
+        Import all static items into the content store, and return the seconds it took.
 
-            yield courselike
+        This runs in a background thread, so the caller records the time of
+        the 'static' phase.
+        """
+        start = time.time()
+        self.import_static(data_path, dest_id)
+        return time.time() - start
 
 
 class CourseImportManager(ImportManager):
@@ -7,9 +7,12 @@ import lxml.etree
 import mock
 import pytz
 import shutil
+import tarfile
 import unittest
 
+from cStringIO import StringIO
 from datetime import datetime, timedelta, tzinfo
+from fs.errors import NoSysPathError, ResourceNotFoundError, UnsupportedError
 from fs.osfs import OSFS
 from path import Path as path
 from tempfile import mkdtemp
@@ -22,6 +25,7 @@ from xblock.test.tools import blocks_are_equivalent
 from opaque_keys.edx.locations import Location
 from xmodule.modulestore import EdxJSONEncoder
 from xmodule.modulestore.xml import XMLModuleStore
+from xmodule.modulestore.xml_exporter import TarExportFS
 from xmodule.tests import DATA_DIR
 from xmodule.x_module import XModuleMixin
 
@@ -207,3 +211,59 @@ class TestEdxJsonEncoder(unittest.TestCase):
 
         with self.assertRaises(TypeError):
             self.encoder.default({})
+
+
+class TestTarExportFS(unittest.TestCase):
+    """
+    Tests of the filesystem of exports to a tar stream.
+    """
+    def setUp(self):
+        super(TestTarExportFS, self).setUp()
+        self.stream = StringIO()
+        self.tar_file = tarfile.open(fileobj=self.stream, mode='w|')
+        self.export_fs = TarExportFS(self.tar_file, 'course')
+
+    def _members(self):
+        """
+        Returns the contents of the members of the tar stream, by name.
+        """
+        self.tar_file.close()
+        with tarfile.open(fileobj=StringIO(self.stream.getvalue())) as tar_file:
+            return {member.name: tar_file.extractfile(member).read() for member in tar_file.getmembers()}
+
+    def test_write(self):
+        with self.export_fs.open('course.xml', 'w') as course_xml:
+            course_xml.write('<course/>')
+        self.export_fs.setcontents('policies/policy.json', u'{}')
+        problem_dir = self.export_fs.makeopendir('problem')
+        problem_dir.setcontents('p1.xml', '<problem/>')
+        problem_dir.createfile('p1.xml')
+        self.assertEqual(self._members(), {
+            'course/course.xml': '<course/>',
+            'course/policies/policy.json': '{}',
+            'course/problem/p1.xml': '<problem/>',
+        })
+
+    def test_listing(self):
+        self.export_fs.makedir('static/images', recursive=True, allow_recreate=True)
+        self.export_fs.setcontents('static/images/a.png', 'a')
+        self.export_fs.setcontents('course.xml', '<course/>')
+
+        self.assertTrue(self.export_fs.exists('static'))
+        self.assertTrue(self.export_fs.isdir('static/images'))
+        self.assertTrue(self.export_fs.isfile('static/images/a.png'))
+        self.assertFalse(self.export_fs.exists('static/b.png'))
+        self.assertEqual(self.export_fs.listdir(), ['course.xml', 'static'])
+        self.assertEqual(self.export_fs.listdir(files_only=True), ['course.xml'])
+        static_fs = self.export_fs.opendir('static')
+        self.assertEqual(static_fs.listdir('images', full=True), ['images/a.png'])
+        with self.assertRaises(ResourceNotFoundError):
+            self.export_fs.listdir('missing')
+
+    def test_unsupported(self):
+        self.export_fs.setcontents('course.xml', '<course/>')
+        with self.assertRaises(UnsupportedError):
+            self.export_fs.open('course.xml')
+        with self.assertRaises(NoSysPathError):
+            self.export_fs.getsyspath('course.xml')
+        self.assertIsNone(self.export_fs.getsyspath('course.xml', allow_none=True))
@@ -2,7 +2,9 @@
 Grading tests
 """
 
+import random
 import unittest
+from collections import OrderedDict
 from datetime import datetime, timedelta
 
 import ddt
@@ -319,6 +321,114 @@ class GraderTest(unittest.TestCase):
         self.assertIn(expected_error_message, error.exception.message)
 
 
+@ddt.ddt
+class BatchGraderTest(unittest.TestCase):
+    """
+    Tests that grading learners in batch is identical to grading
+    each learner with grade().
+    """
+    ASSIGNMENT_TYPES = ['Homework', 'Lab', 'Midterm', 'Final']
+
+    def _random_grader(self, rng):
+        """
+        Returns a WeightedSubsectionsGrader with random subgraders.
+        """
+        subgraders = []
+        for assignment_type in rng.sample(self.ASSIGNMENT_TYPES, rng.randint(0, len(self.ASSIGNMENT_TYPES))):
+            subgrader = graders.AssignmentFormatGrader(
+                assignment_type,
+                min_count=rng.randint(0, 6),
+                drop_count=rng.randint(0, 4),
+                show_only_average=rng.random() < 0.3,
+                hide_average=rng.random() < 0.3,
+                starting_index=rng.randint(0, 2),
+            )
+            weight = rng.choice([0, 1, 0.1, 0.25, 0.3, 1.5, rng.random()])
+            subgraders.append((subgrader, subgrader.category, weight))
+        return graders.WeightedSubsectionsGrader(subgraders)
+
+    def _random_grade_sheets(self, rng, subsections_by_type):
+        """
+        Returns grade sheets of a random number of learners, with random
+        scores for random subsets of the given subsections.  Scores are
+        often equal, to exercise the order in which ties are dropped.
+        """
+        grade_sheets = []
+        for _ in range(rng.randint(0, 12)):
+            grade_sheet = {}
+            for assignment_type, subsection_keys in subsections_by_type.iteritems():
+                subsection_grades = OrderedDict()
+                for subsection_key in subsection_keys:
+                    if rng.random() < 0.7:
+                        possible = rng.choice([1.0, 2.0, 3.0, 7.0, 10.0, rng.uniform(0.01, 10)])
+                        earned = rng.choice(
+                            [0.0, possible, possible / 2, float(rng.randint(0, 3)), rng.uniform(0, possible)]
+                        )
+                        subsection_grades[subsection_key] = GraderTest.MockGrade(
+                            AggregatedScore(tw_earned=earned, tw_possible=possible, graded=True, first_attempted=None),
+                            display_name=subsection_key.upper(),
+                        )
+                grade_sheet[assignment_type] = subsection_grades
+            grade_sheets.append(grade_sheet)
+        return grade_sheets
+
+    @ddt.data(*range(10))
+    def test_randomized_equivalence(self, seed):
+        rng = random.Random(seed)
+        for _ in range(100):
+            grader = self._random_grader(rng)
+            subsections_by_type = OrderedDict(
+                (assignment_type, [u'{}{}'.format(assignment_type, index) for index in range(rng.randint(0, 8))])
+                for assignment_type in self.ASSIGNMENT_TYPES
+            )
+            grade_sheets = self._random_grade_sheets(rng, subsections_by_type)
+
+            batch_grade_sheet = graders.BatchGradeSheet.from_grade_sheets(grade_sheets, subsections_by_type)
+            batch_result = grader.grade_batch(batch_grade_sheet)
+            for learner_index, grade_sheet in enumerate(grade_sheets):
+                expected = grader.grade(grade_sheet)
+                self.assertEqual(batch_result.grade_result(learner_index), expected)
+                # Compare the representations too, so the results must be
+                # identical rather than merely equal.
+                self.assertEqual(repr(batch_result.grade_result(learner_index)), repr(expected))
+                self.assertEqual(float(batch_result.percents[learner_index]).hex(), float(expected['percent']).hex())
+
+    def test_test_gradesheet(self):
+        grader = graders.grader_from_conf([
+            {'type': "Homework", 'min_count': 12, 'drop_count': 2, 'short_label': "HW", 'weight': 0.25},
+            {'type': "Lab", 'min_count': 7, 'drop_count': 3, 'category': "Labs", 'weight': 0.25},
+            {'type': "Midterm", 'min_count': 0, 'drop_count': 0, 'short_label': "Midterm", 'weight': 0.5},
+        ])
+        grade_sheets = [GraderTest.test_gradesheet, GraderTest.empty_gradesheet, GraderTest.incomplete_gradesheet]
+        subsections_by_type = {
+            assignment_type: subsection_grades.keys()
+            for assignment_type, subsection_grades in GraderTest.test_gradesheet.iteritems()
+        }
+
+        batch_result = grader.grade_batch(graders.BatchGradeSheet.from_grade_sheets(grade_sheets, subsections_by_type))
+        self.assertAlmostEqual(batch_result.percents[0], 0.5106547619047619)
+        for learner_index, grade_sheet in enumerate(grade_sheets):
+            self.assertEqual(batch_result.grade_result(learner_index), grader.grade(grade_sheet))
+
+    def test_absent_subsections(self):
+        # A subsection without a possible score is absent for the learner,
+        # so the learner's later subsections take its place.
+        grader = graders.AssignmentFormatGrader("Homework", 3, 1)
+        batch_grade_sheet = graders.BatchGradeSheet(2)
+        batch_grade_sheet.add_scores(
+            "Homework", [[1, 0, 1], [1, 1, 0]], [[2, 0, 4], [2, 2, 2]], ["hw1", "hw2", "hw3"],
+        )
+        batch_result = grader.grade_batch(batch_grade_sheet)
+        self.assertEqual(batch_result.percents.tolist(), [0.375, 0.5])
+        self.assertEqual(batch_result.section_subsections.tolist(), [[0, 2, -1], [0, 1, 2]])
+        self.assertEqual(batch_result.dropped.tolist(), [[False, False, True], [False, False, True]])
+        self.assertEqual(
+            [section['label'] for section in batch_result.grade_result(0)['section_breakdown']],
+            [u'Homework 01', u'Homework 02', u'Homework 03', u'Homework Avg'],
+        )
+        self.assertIn(u'hw3', batch_result.grade_result(0)['section_breakdown'][1]['detail'])
+
+
 @ddt.ddt
 class ShowCorrectnessTest(unittest.TestCase):
     """
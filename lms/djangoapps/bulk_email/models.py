@@ -2,6 +2,7 @@
 Models for bulk email
 """
 import logging
+import re
 
 import markupsafe
 from config_models.models import ConfigurationModel
@@ -319,6 +320,65 @@ class Optout(models.Model):
 # the location where the email message body is to be inserted.
 COURSE_EMAIL_MESSAGE_BODY_TAG = '{{message_body}}'
 
+# Keys of the context of an email whose values are different for each recipient.
+RECIPIENT_CONTEXT_KEYS = ('name', 'email', 'user_id')
+
+# Key of the anonymous id of a recipient, substituted for the %%USER_ID%% keyword.
+ANONYMOUS_USER_ID_KEY = 'anonymous_user_id'
+
+# Markers of the values of the recipients in compiled messages, using
+# characters of the Unicode private use area, which are not escaped in HTML.
+RECIPIENT_MARKER = u'\ue000{}\ue001'
+RECIPIENT_MARKER_RE = re.compile(u'\ue000(\\w+)\ue001')
+
+
+class CompiledEmailMessage(object):
+    """
+    An email message rendered from a template, message body and context once
+    for all the recipients of an email, but for the values of each recipient,
+    which are substituted by `render`.
+
+    Lines without any value of a recipient are wrapped once, when compiled.
+    """
+    def __init__(self, message, escape_values=False):
+        self.escape_values = escape_values
+        # The keys of the recipients' values used by the message.
+        self.keys = set()
+        # Runs of lines without values of a recipient, and lists of the
+        # text and keys of the values of lines with them, alternately.
+        self._lines = []
+        static_lines = []
+        for line in message.split('\n'):
+            segments = RECIPIENT_MARKER_RE.split(line)
+            if len(segments) == 1:
+                static_lines.append(wrap_message(line))
+                continue
+            if static_lines:
+                self._lines.append(u'\n'.join(static_lines))
+                static_lines = []
+            self._lines.append(segments)
+            self.keys.update(segments[1::2])
+        if static_lines:
+            self._lines.append(u'\n'.join(static_lines))
+
+    def render(self, values):
+        """
+        Return the message for a recipient, given the `values` of its `keys`.
+        """
+        if self.escape_values:
+            values = {
+                key: markupsafe.escape(value) if isinstance(value, basestring) else value
+                for key, value in values.iteritems()
+            }
+        lines = []
+        for line in self._lines:
+            if not isinstance(line, basestring):
+                line = wrap_message(u''.join(
+                    unicode(values[segment]) if index % 2 else segment for index, segment in enumerate(line)
+                ))
+            lines.append(line)
+        return u'\n'.join(lines)
+
 
 class CourseEmailTemplate(models.Model):
     """
@@ -404,6 +464,53 @@ class CourseEmailTemplate(models.Model):
                 context[key] = markupsafe.escape(value)
         return CourseEmailTemplate._render(self.html_template, htmltext, context)
 
+    @staticmethod
+    def _compile(format_string, message_body, context, escape_values):
+        """
+        Create a message using a template, message body and context, as
+        `_render` does, for all the recipients of an email.
+
+        The `context` is that of all recipients, without the values of the
+        RECIPIENT_CONTEXT_KEYS, which are given to the `render` method of the
+        returned CompiledEmailMessage for each recipient.
+        """
+        context = dict(context)
+        context.update((key, RECIPIENT_MARKER.format(key)) for key in RECIPIENT_CONTEXT_KEYS)
+
+        # Substitute all %%-encoded keywords in the message body, but for
+        # the anonymous id of the recipient, which takes a database query.
+        if 'course_id' in context:
+            message_body = message_body.replace('%%USER_ID%%', RECIPIENT_MARKER.format(ANONYMOUS_USER_ID_KEY))
+            message_body = substitute_keywords_with_data(message_body, context)
+
+        result = format_string.format(**context)
+        message_body_tag = COURSE_EMAIL_MESSAGE_BODY_TAG.format()
+        result = result.replace(message_body_tag, message_body, 1)
+        return CompiledEmailMessage(result, escape_values)
+
+    def compile_plaintext(self, plaintext, context):
+        """
+        Create plain text message for all recipients.
+
+        Convert plain text body (`plaintext`) into a CompiledEmailMessage using the
+        stored plain template and the provided `context` dict.
+        """
+        return CourseEmailTemplate._compile(self.plain_template, plaintext, context, escape_values=False)
+
+    def compile_htmltext(self, htmltext, context):
+        """
+        Create HTML text message for all recipients.
+
+        Convert HTML text body (`htmltext`) into a CompiledEmailMessage using the
+        stored HTML template and the provided `context` dict.  String values of
+        the context, and of each recipient, are HTML-escaped.
+        """
+        context = {
+            key: markupsafe.escape(value) if isinstance(value, basestring) else value
+            for key, value in context.iteritems()
+        }
+        return CourseEmailTemplate._compile(self.html_template, htmltext, context, escape_values=True)
+
 
 class CourseAuthorization(models.Model):
     """
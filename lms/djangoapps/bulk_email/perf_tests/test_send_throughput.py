@@ -0,0 +1,188 @@
+"""
+Performance test comparing the throughput of sending bulk email messages
+rendered for each recipient over a single connection, and compiled once and
+sent over a pool of connections, to a local SMTP stub.
+"""
+from __future__ import print_function
+
+import json
+import os
+import SocketServer
+import threading
+import time
+import unittest
+
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.test.utils import override_settings
+
+from ..models import CourseEmailTemplate
+from ..tasks import _EmailConnectionPool
+
+# Number of messages sent in each mode.
+NUM_MESSAGES = 500
+
+# Seconds the SMTP stub takes to accept each message, as a remote server would.
+SMTP_LATENCY = 0.005
+
+# Numbers of connections of the pools to time.
+POOL_SIZES = (1, 4, 8)
+
+CONTEXT = {
+    'course_title': 'Bulk Email Performance',
+    'course_url': 'https://example.com/courses/perf',
+    'course_image_url': 'https://example.com/courses/perf/image.jpg',
+    'email_settings_url': 'https://example.com/dashboard',
+    'platform_name': 'edX',
+    'course_id': 'course-v1:edX+Perf+2017',
+    'course_end_date': 'Dec 31, 2017',
+}
+
+BODY = u"<p>Dear %%USER_FULLNAME%%,</p>" + u"<p>The course %%COURSE_DISPLAY_NAME%% starts next week.</p>" * 50
+
+
+class SMTPStubHandler(SocketServer.StreamRequestHandler):
+    """
+    Accepts any message sent over the connection, after SMTP_LATENCY seconds.
+    """
+    def reply(self, line):
+        """Write a reply line."""
+        self.wfile.write(line + '\r\n')
+        self.wfile.flush()
+
+    def handle(self):
+        self.reply('220 localhost SMTP stub')
+        for line in iter(self.rfile.readline, ''):
+            command = line[:4].upper()
+            if command == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                for data_line in iter(self.rfile.readline, ''):
+                    if data_line == '.\r\n':
+                        break
+                time.sleep(SMTP_LATENCY)
+                with self.server.lock:
+                    self.server.messages += 1
+                self.reply('250 OK')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+class SMTPStub(SocketServer.ThreadingMixIn, SocketServer.TCPServer):
+    """
+    A local SMTP server handling each connection in a thread.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        SocketServer.TCPServer.__init__(self, ('127.0.0.1', 0), SMTPStubHandler)
+        self.lock = threading.Lock()
+        self.messages = 0
+
+
+def load_template():
+    """
+    Returns the default CourseEmailTemplate of the fixture, without a database.
+    """
+    fixture_path = os.path.join(os.path.dirname(__file__), '..', 'fixtures', 'course_email_template.json')
+    with open(fixture_path) as fixture_file:
+        for item in json.load(fixture_file):
+            if item['fields']['name'] is None:
+                return CourseEmailTemplate(**item['fields'])
+
+
+# Eventually, exclude this attribute from regular unittests while running *only* tests
+# with this attribute during regular performance tests.
+# @attr("perf_test")
+@unittest.skip
+class SendThroughputPerf(unittest.TestCase):
+    """
+    This class exists to time sending bulk email messages to a local SMTP
+    stub, rendered and sent one at a time as before, and compiled and sent
+    with pools of connections.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    def setUp(self):
+        super(SendThroughputPerf, self).setUp()
+        self.server = SMTPStub()
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        settings_override = override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST='127.0.0.1',
+            EMAIL_PORT=self.server.server_address[1],
+            EMAIL_HOST_USER='',
+            EMAIL_HOST_PASSWORD='',
+            EMAIL_USE_TLS=False,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.template = load_template()
+        self.recipients = [
+            {'profile__name': u'Learner {}'.format(index), 'email': u'learner{}@example.com'.format(index), 'pk': index}
+            for index in xrange(NUM_MESSAGES)
+        ]
+
+    def _make_message(self, plaintext, html, recipient):
+        """
+        Returns the email message to the recipient.
+        """
+        message = EmailMultiAlternatives('Subject', plaintext, 'course@example.com', [recipient['email']])
+        message.attach_alternative(html, 'text/html')
+        return message
+
+    def _time_rendered(self):
+        """
+        Returns the seconds to render and send each message over a single
+        connection, as `_send_course_email` did.
+        """
+        start = time.time()
+        connection = get_connection()
+        connection.open()
+        for recipient in self.recipients:
+            context = dict(CONTEXT, name=recipient['profile__name'], email=recipient['email'], user_id=recipient['pk'])
+            plaintext = self.template.render_plaintext(BODY, context)
+            html = self.template.render_htmltext(BODY, context)
+            connection.send_messages([self._make_message(plaintext, html, recipient)])
+        connection.close()
+        return time.time() - start
+
+    def _time_compiled(self, pool_size):
+        """
+        Returns the seconds to send the messages compiled once, with a pool of connections.
+        """
+        start = time.time()
+        plaintext_message = self.template.compile_plaintext(BODY, CONTEXT)
+        html_message = self.template.compile_htmltext(BODY, CONTEXT)
+        connections = _EmailConnectionPool(pool_size)
+        messages = []
+        for recipient in self.recipients:
+            values = {'name': recipient['profile__name'], 'email': recipient['email'], 'user_id': recipient['pk']}
+            messages.append(
+                self._make_message(plaintext_message.render(values), html_message.render(values), recipient)
+            )
+        results = connections.send(messages, CONTEXT['course_title'])
+        connections.close()
+        self.assertEqual(results, [None] * NUM_MESSAGES)
+        return time.time() - start
+
+    def test_send_throughput(self):
+        results = [('rendered', self._time_rendered())]
+        for pool_size in POOL_SIZES:
+            results.append(('compiled/{}'.format(pool_size), self._time_compiled(pool_size)))
+        self.assertEqual(self.server.messages, NUM_MESSAGES * (1 + len(POOL_SIZES)))
+
+        print('\nMessages: {}, SMTP latency: {} s'.format(NUM_MESSAGES, SMTP_LATENCY))
+        print('{:<14}{:>12}{:>18}'.format('mode', 'total (s)', 'messages/s'))
+        for mode, seconds in results:
+            print('{:<14}{:>12.2f}{:>18.1f}'.format(mode, seconds, NUM_MESSAGES / seconds))
@@ -7,9 +7,12 @@ import json
 import logging
 import random
 import re
+import threading
 from collections import Counter
+from multiprocessing.pool import ThreadPool
+from Queue import Empty, Queue
 from smtplib import SMTPConnectError, SMTPDataError, SMTPException, SMTPServerDisconnected
-from time import sleep
+from time import sleep, time
 
 from boto.exception import AWSConnectionError
 from boto.ses.exceptions import (
@@ -36,7 +39,7 @@ from django.utils.translation import ugettext as _
 from markupsafe import escape
 
 import dogstats_wrapper as dog_stats_api
-from bulk_email.models import CourseEmail, Optout
+from bulk_email.models import ANONYMOUS_USER_ID_KEY, CourseEmail, Optout
 from courseware.courses import get_course
 from lms.djangoapps.instructor_task.models import InstructorTask
 from lms.djangoapps.instructor_task.subtasks import (
@@ -48,6 +51,7 @@ from lms.djangoapps.instructor_task.subtasks import (
 from openedx.core.djangoapps.site_configuration import helpers as configuration_helpers
 from openedx.core.lib.courses import course_image_url
 from util.date_utils import get_default_time_display
+from util.keyword_substitution import anonymous_id_from_user_id
 
 log = logging.getLogger('edx.celery.task')
 
@@ -419,6 +423,111 @@ def _get_source_address(course_id, course_title, course_language, truncate=True)
     return from_addr
 
 
+# Number of messages of a batch to send with each connection to the email backend.
+MESSAGES_PER_CONNECTION_BATCH = 10
+
+# Result of a message that wasn't sent because sending another message of the
+# same batch failed in a way that ends the task.
+NOT_SENT = object()
+
+
+def _is_single_email_failure(exc):
+    """
+    Returns whether an exception raised when sending a message means that just
+    that message failed to be sent, so that the task goes on with the next ones.
+
+    According to SMTP spec, we'll retry error codes in the 4xx range.  5xx range indicates hard failure.
+    """
+    if isinstance(exc, SMTPDataError):
+        return not 400 <= exc.smtp_code < 500
+    return isinstance(exc, SINGLE_EMAIL_FAILURE_ERRORS)
+
+
+class _EmailConnectionPool(object):
+    """
+    Open connections to the email backend, each used by a thread of its own to
+    send messages, one at a time, waiting at least `send_interval` seconds
+    between sends of all the connections.
+    """
+    def __init__(self, size, send_interval=0):
+        self.send_interval = send_interval
+        self._next_send_time = 0
+        self._lock = threading.Lock()
+        self._connections = []
+        self._threads = ThreadPool(size) if size > 1 else None
+        try:
+            for _ in xrange(size):
+                connection = get_connection()
+                self._connections.append(connection)
+                connection.open()
+        except Exception:
+            self.close()
+            raise
+
+    def send(self, messages, course_title):
+        """
+        Sends the messages with the connections, and returns, in the order of the
+        messages, None for those sent, the exception raised by the backend for
+        those that failed, or NOT_SENT for those that weren't sent, because
+        sending another message failed with an error that isn't a single email
+        failure.  Once such an error is raised, the other connections finish
+        sending their current message but don't send any more.
+        """
+        results = [NOT_SENT] * len(messages)
+        pending = Queue()
+        for index in xrange(len(messages)):
+            pending.put(index)
+        stopped = threading.Event()
+
+        def send_with(connection):
+            """
+            Sends pending messages with the connection until none are left, or sending is stopped.
+            """
+            while not stopped.is_set():
+                try:
+                    index = pending.get_nowait()
+                except Empty:
+                    return
+                self._wait_for_turn()
+                try:
+                    with dog_stats_api.timer('course_email.single_send.time.overall', tags=[_statsd_tag(course_title)]):
+                        connection.send_messages([messages[index]])
+                except Exception as exc:  # pylint: disable=broad-except
+                    results[index] = exc
+                    if not _is_single_email_failure(exc):
+                        stopped.set()
+                else:
+                    results[index] = None
+
+        if self._threads is None:
+            send_with(self._connections[0])
+        else:
+            self._threads.map(send_with, self._connections)
+        return results
+
+    def close(self):
+        """
+        Closes the connections, and stops their threads.
+        """
+        if self._threads is not None:
+            self._threads.terminate()
+        for connection in self._connections:
+            connection.close()
+
+    def _wait_for_turn(self):
+        """
+        Sleeps until `send_interval` seconds after the previous send of any connection.
+        """
+        if not self.send_interval:
+            return
+        with self._lock:
+            now = time()
+            send_time = max(now, self._next_send_time)
+            self._next_send_time = send_time + self.send_interval
+        if send_time > now:
+            sleep(send_time - now)
+
+
 def _send_course_email(entry_id, email_id, to_list, global_email_context, subtask_status):
     """
     Performs the email sending task.
@@ -439,6 +548,8 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
 
     Sends to all addresses contained in to_list that are not also in the Optout table.
     Emails are sent multi-part, in both plain text and html.
+    The messages are rendered once for all recipients, but for the values of each recipient,
+    and sent in batches with settings.BULK_EMAIL_CONNECTIONS_PER_TASK connections in parallel.
 
     Returns a tuple of two values:
       * First value is a SubtaskStatus object which represents current progress at the end of this call.
@@ -494,51 +605,69 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
 
     # use the CourseEmailTemplate that was associated with the CourseEmail
     course_email_template = course_email.get_template()
+    connections = None
     try:
-        connection = get_connection()
-        connection.open()
-
-        # Define context values to use in all course emails:
-        email_context = {'name': '', 'email': ''}
-        email_context.update(global_email_context)
+        # Render the messages once, with the context values to use in all course
+        # emails, leaving only the values of each recipient to substitute.
+        email_context = dict(global_email_context, course_id=course_email.course_id)
+        plaintext_message = course_email_template.compile_plaintext(course_email.text_message, email_context)
+        html_message = course_email_template.compile_htmltext(course_email.html_message, email_context)
+        recipient_keys = plaintext_message.keys | html_message.keys
+
+        # Throttle if we have gotten the rate limiter.  This is not very high-tech,
+        # but if a task has been retried for rate-limiting reasons, then we sleep
+        # for a period of time between all emails within this task.  Choice of
+        # the value depends on the number of workers that might be sending email in
+        # parallel, and what the SES throttle rate is.
+        send_interval = 0
+        if settings.BULK_EMAIL_MAX_SENDS_PER_SECOND:
+            send_interval = 1.0 / settings.BULK_EMAIL_MAX_SENDS_PER_SECOND
+        if subtask_status.retried_nomax > 0:
+            send_interval = max(send_interval, settings.BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS)
+        connections = _EmailConnectionPool(settings.BULK_EMAIL_CONNECTIONS_PER_TASK, send_interval)
+        batch_size = settings.BULK_EMAIL_CONNECTIONS_PER_TASK * MESSAGES_PER_CONNECTION_BATCH
 
         while to_list:
-            # Update context with user-specific values from the user at the end of the list.
-            # At the end of processing this user, they will be popped off of the to_list.
-            # That way, the to_list will always contain the recipients remaining to be emailed.
-            # This is convenient for retries, which will need to send to those who haven't
-            # yet been emailed, but not send to those who have already been sent to.
-            recipient_num += 1
-            current_recipient = to_list[-1]
-            email = current_recipient['email']
-            email_context['email'] = email
-            email_context['name'] = current_recipient['profile__name']
-            email_context['user_id'] = current_recipient['pk']
-            email_context['course_id'] = course_email.course_id
-
-            # Construct message content using templates and context:
-            plaintext_msg = course_email_template.render_plaintext(course_email.text_message, email_context)
-            html_msg = course_email_template.render_htmltext(course_email.html_message, email_context)
-
-            # Create email:
-            email_msg = EmailMultiAlternatives(
-                course_email.subject,
-                plaintext_msg,
-                from_addr,
-                [email],
-                connection=connection
-            )
-            email_msg.attach_alternative(html_msg, 'text/html')
-
-            # Throttle if we have gotten the rate limiter.  This is not very high-tech,
-            # but if a task has been retried for rate-limiting reasons, then we sleep
-            # for a period of time between all emails within this task.  Choice of
-            # the value depends on the number of workers that might be sending email in
-            # parallel, and what the SES throttle rate is.
-            if subtask_status.retried_nomax > 0:
-                sleep(settings.BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS)
-
-            try:
+            # Send to a batch of the recipients at the end of the list, starting with the last one.
+            # Only once their messages are built and sent, they are removed from the to_list, so that
+            # it always contains the recipients remaining to be emailed, even if an error is raised.
+            # This is convenient for retries, which will need to send to those who haven't yet been
+            # emailed, but not send to those who have already been sent to.
+            batch = to_list[-batch_size:][::-1]
+
+            email_msgs = []
+            for current_recipient in batch:
+                recipient_values = {
+                    'name': current_recipient['profile__name'],
+                    'email': current_recipient['email'],
+                    'user_id': current_recipient['pk'],
+                }
+                if ANONYMOUS_USER_ID_KEY in recipient_keys:
+                    recipient_values[ANONYMOUS_USER_ID_KEY] = anonymous_id_from_user_id(current_recipient['pk'])
+
+                # Create email:
+                email_msg = EmailMultiAlternatives(
+                    course_email.subject,
+                    plaintext_message.render(recipient_values),
+                    from_addr,
+                    [current_recipient['email']],
+                )
+                email_msg.attach_alternative(html_message.render(recipient_values), 'text/html')
+                email_msgs.append(email_msg)
+
+            results = connections.send(email_msgs, course_title)
+
+            # Recipients that weren't sent to go back at the end of the list, in their order, and the
+            # first error that ends the task is raised, to be handled below.
+            unsent_recipients = []
+            error = None
+            for current_recipient, result in zip(batch, results):
+                email = current_recipient['email']
+                if result is NOT_SENT:
+                    unsent_recipients.append(current_recipient)
+                    continue
+
+                recipient_num += 1
                 log.info(
                     "BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Recipient num: %s/%s, \
                     Recipient name: %s, Email address: %s",
@@ -550,82 +679,88 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
                     current_recipient['profile__name'],
                     email
                 )
-                with dog_stats_api.timer('course_email.single_send.time.overall', tags=[_statsd_tag(course_title)]):
-                    connection.send_messages([email_msg])
-
-            except SMTPDataError as exc:
-                # According to SMTP spec, we'll retry error codes in the 4xx range.  5xx range indicates hard failure.
-                total_recipients_failed += 1
-                log.error(
-                    "BulkEmail ==> Status: Failed(SMTPDataError), Task: %s, SubTask: %s, EmailId: %s, \
-                    Recipient num: %s/%s, Email address: %s",
-                    parent_task_id,
-                    task_id,
-                    email_id,
-                    recipient_num,
-                    total_recipients,
-                    email
-                )
-                if exc.smtp_code >= 400 and exc.smtp_code < 500:
-                    # This will cause the outer handler to catch the exception and retry the entire task.
-                    raise exc
-                else:
+
+                if isinstance(result, SMTPDataError):
+                    total_recipients_failed += 1
+                    log.error(
+                        "BulkEmail ==> Status: Failed(SMTPDataError), Task: %s, SubTask: %s, EmailId: %s, \
+                        Recipient num: %s/%s, Email address: %s",
+                        parent_task_id,
+                        task_id,
+                        email_id,
+                        recipient_num,
+                        total_recipients,
+                        email
+                    )
+                    if not _is_single_email_failure(result):
+                        # This will cause the outer handler to catch the exception and retry the entire task.
+                        unsent_recipients.append(current_recipient)
+                        error = error or result
+                        continue
+                    else:
+                        # This will fall through and not retry the message.
+                        log.warning(
+                            'BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Recipient num: %s/%s, \
+                            Email not delivered to %s due to error %s',
+                            parent_task_id,
+                            task_id,
+                            email_id,
+                            recipient_num,
+                            total_recipients,
+                            email,
+                            result.smtp_error
+                        )
+                        dog_stats_api.increment('course_email.error', tags=[_statsd_tag(course_title)])
+                        subtask_status.increment(failed=1)
+
+                elif isinstance(result, SINGLE_EMAIL_FAILURE_ERRORS):
                     # This will fall through and not retry the message.
-                    log.warning(
-                        'BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Recipient num: %s/%s, \
-                        Email not delivered to %s due to error %s',
+                    total_recipients_failed += 1
+                    log.error(
+                        "BulkEmail ==> Status: Failed(SINGLE_EMAIL_FAILURE_ERRORS), Task: %s, SubTask: %s, \
+                        EmailId: %s, Recipient num: %s/%s, Email address: %s, Exception: %s",
                         parent_task_id,
                         task_id,
                         email_id,
                         recipient_num,
                         total_recipients,
                         email,
-                        exc.smtp_error
+                        result
                     )
                     dog_stats_api.increment('course_email.error', tags=[_statsd_tag(course_title)])
                     subtask_status.increment(failed=1)
 
-            except SINGLE_EMAIL_FAILURE_ERRORS as exc:
-                # This will fall through and not retry the message.
-                total_recipients_failed += 1
-                log.error(
-                    "BulkEmail ==> Status: Failed(SINGLE_EMAIL_FAILURE_ERRORS), Task: %s, SubTask: %s, \
-                    EmailId: %s, Recipient num: %s/%s, Email address: %s, Exception: %s",
-                    parent_task_id,
-                    task_id,
-                    email_id,
-                    recipient_num,
-                    total_recipients,
-                    email,
-                    exc
-                )
-                dog_stats_api.increment('course_email.error', tags=[_statsd_tag(course_title)])
-                subtask_status.increment(failed=1)
+                elif result is not None:
+                    # This will cause the outer handler to catch the exception.
+                    unsent_recipients.append(current_recipient)
+                    error = error or result
+                    continue
 
-            else:
-                total_recipients_successful += 1
-                log.info(
-                    "BulkEmail ==> Status: Success, Task: %s, SubTask: %s, EmailId: %s, \
-                    Recipient num: %s/%s, Email address: %s,",
-                    parent_task_id,
-                    task_id,
-                    email_id,
-                    recipient_num,
-                    total_recipients,
-                    email
-                )
-                dog_stats_api.increment('course_email.sent', tags=[_statsd_tag(course_title)])
-                if settings.BULK_EMAIL_LOG_SENT_EMAILS:
-                    log.info('Email with id %s sent to %s', email_id, email)
                 else:
-                    log.debug('Email with id %s sent to %s', email_id, email)
-                subtask_status.increment(succeeded=1)
+                    total_recipients_successful += 1
+                    log.info(
+                        "BulkEmail ==> Status: Success, Task: %s, SubTask: %s, EmailId: %s, \
+                        Recipient num: %s/%s, Email address: %s,",
+                        parent_task_id,
+                        task_id,
+                        email_id,
+                        recipient_num,
+                        total_recipients,
+                        email
+                    )
+                    dog_stats_api.increment('course_email.sent', tags=[_statsd_tag(course_title)])
+                    if settings.BULK_EMAIL_LOG_SENT_EMAILS:
+                        log.info('Email with id %s sent to %s', email_id, email)
+                    else:
+                        log.debug('Email with id %s sent to %s', email_id, email)
+                    subtask_status.increment(succeeded=1)
+
+                recipients_info[email] += 1
 
-            # Pop the user that was emailed off the end of the list only once they have
-            # successfully been processed.  (That way, if there were a failure that
-            # needed to be retried, the user is still on the list.)
-            recipients_info[email] += 1
-            to_list.pop()
+            del to_list[-len(batch):]
+            to_list.extend(reversed(unsent_recipients))
+            if error is not None:
+                raise error
 
         log.info(
             "BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Total Successful Recipients: %s/%s, \
@@ -706,7 +841,8 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
         return subtask_status, None
     finally:
         # Clean up at the end.
-        connection.close()
+        if connections is not None:
+            connections.close()
 
 
 def _get_current_task():
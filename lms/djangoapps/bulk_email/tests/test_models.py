@@ -11,6 +11,8 @@ from nose.plugins.attrib import attr
 from opaque_keys.edx.keys import CourseKey
 
 from bulk_email.models import (
+    ANONYMOUS_USER_ID_KEY,
+    RECIPIENT_CONTEXT_KEYS,
     SEND_TO_COHORT,
     SEND_TO_STAFF,
     SEND_TO_TRACK,
@@ -223,6 +225,48 @@ class CourseEmailTemplateTest(TestCase):
         self.assertIn(context['course_title'], message)
         self.assertIn(context['name'], message)
 
+    def _get_recipient_values(self, context):
+        """Split the values of the recipient out of the context."""
+        return {key: context.pop(key) for key in RECIPIENT_CONTEXT_KEYS if key in context}
+
+    def test_compile_plain(self):
+        template = CourseEmailTemplate.get_template()
+        context = self._add_xss_fields(self._get_sample_plain_context())
+        body = "Dear %%USER_FULLNAME%%, thanks for enrolling in %%COURSE_DISPLAY_NAME%%."
+        message = template.render_plaintext(body, dict(context))
+        recipient_values = self._get_recipient_values(context)
+        compiled_message = template.compile_plaintext(body, context)
+        self.assertIn('name', compiled_message.keys)
+        self.assertEqual(compiled_message.render(recipient_values), message)
+
+    def test_compile_html(self):
+        template = CourseEmailTemplate.get_template()
+        context = self._add_xss_fields(self._get_sample_html_context())
+        body = "Dear %%USER_FULLNAME%%, thanks for enrolling in %%COURSE_DISPLAY_NAME%%."
+        message = template.render_htmltext(body, dict(context))
+        recipient_values = self._get_recipient_values(context)
+        compiled_message = template.compile_htmltext(body, context)
+        self.assertEqual(compiled_message.render(recipient_values), message)
+        self.assertNotIn("<script>", message)
+
+    def test_compile_anonymous_user_id(self):
+        template = CourseEmailTemplate.get_template()
+        context = self._add_xss_fields(self._get_sample_plain_context())
+        compiled_message = template.compile_plaintext("Your id is %%USER_ID%%.", context)
+        self.assertIn(ANONYMOUS_USER_ID_KEY, compiled_message.keys)
+        recipient_values = self._get_recipient_values(context)
+        recipient_values[ANONYMOUS_USER_ID_KEY] = 'abcdef'
+        self.assertIn("Your id is abcdef.", compiled_message.render(recipient_values))
+
+    def test_compile_long_lines(self):
+        template = CourseEmailTemplate.get_template()
+        context = self._add_xss_fields(self._get_sample_plain_context())
+        body = "%%USER_FULLNAME%% " * 100
+        message = template.render_plaintext(body, dict(context))
+        recipient_values = self._get_recipient_values(context)
+        compiled_message = template.compile_plaintext(body, context)
+        self.assertEqual(compiled_message.render(recipient_values), message)
+
 
 @attr(shard=1)
 class CourseAuthorizationTest(TestCase):
@@ -26,6 +26,7 @@ from boto.ses.exceptions import (
 from celery.states import FAILURE, SUCCESS  # pylint: disable=no-name-in-module, import-error
 from django.conf import settings
 from django.core.management import call_command
+from django.test.utils import override_settings
 from mock import Mock, patch
 from nose.plugins.attrib import attr
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
@@ -259,6 +260,49 @@ class TestBulkEmailInstructorTask(InstructorTaskCourseTestCase):
                 send_bulk_course_email, 'emailed', num_emails, expected_succeeds, failed=expected_fails
             )
 
+    @override_settings(BULK_EMAIL_CONNECTIONS_PER_TASK=3)
+    def test_successful_with_connection_pool(self):
+        num_emails = settings.BULK_EMAIL_EMAILS_PER_TASK
+        # We also send email to the instructor:
+        self._create_students(num_emails - 1)
+        with patch('bulk_email.tasks.get_connection', autospec=True) as get_conn:
+            get_conn.return_value.send_messages.side_effect = cycle([None])
+            self._test_run_with_task(send_bulk_course_email, 'emailed', num_emails, num_emails)
+        self.assertEqual(get_conn.call_count, 3)
+        self.assertEqual(get_conn.return_value.close.call_count, 3)
+
+    @override_settings(BULK_EMAIL_CONNECTIONS_PER_TASK=3)
+    def test_email_address_failures_with_connection_pool(self):
+        self._test_email_address_failures(SMTPDataError(554, "Email address is blacklisted"))
+
+    @override_settings(BULK_EMAIL_CONNECTIONS_PER_TASK=3)
+    def test_retry_with_connection_pool(self):
+        num_emails = settings.BULK_EMAIL_EMAILS_PER_TASK
+        # We also send email to the instructor:
+        self._create_students(num_emails - 1)
+        with patch('bulk_email.tasks.get_connection', autospec=True) as get_conn:
+            # Fail the first send only: the recipients not yet sent to are sent to on retry.
+            get_conn.return_value.send_messages.side_effect = chain(
+                [SMTPServerDisconnected(425, "Disconnecting")], repeat(None)
+            )
+            self._test_run_with_task(
+                send_bulk_course_email, 'emailed', num_emails, num_emails, retried_withmax=1
+            )
+        # No recipient was sent to twice.
+        self.assertEqual(get_conn.return_value.send_messages.call_count, num_emails + 1)
+
+    @override_settings(BULK_EMAIL_MAX_SENDS_PER_SECOND=10)
+    def test_max_sends_per_second(self):
+        num_emails = 3
+        # We also send email to the instructor:
+        self._create_students(num_emails - 1)
+        with patch('bulk_email.tasks.get_connection', autospec=True) as get_conn:
+            get_conn.return_value.send_messages.side_effect = cycle([None])
+            with patch('bulk_email.tasks.sleep') as mock_sleep:
+                self._test_run_with_task(send_bulk_course_email, 'emailed', num_emails, num_emails)
+        # The first message is sent right away.
+        self.assertEqual(mock_sleep.call_count, num_emails - 1)
+
     def test_smtp_blacklisted_user(self):
         # Test that celery handles permanent SMTPDataErrors by failing and not retrying.
         self._test_email_address_failures(SMTPDataError(554, "Email address is blacklisted"))
@@ -322,6 +366,22 @@ class TestBulkEmailInstructorTask(InstructorTaskCourseTestCase):
                     retried_withmax=(settings.BULK_EMAIL_MAX_RETRIES + 1)
                 )
 
+    def test_max_retry_after_render_error(self):
+        # Recipients whose messages couldn't be built stay on the list, so they're all counted as failed.
+        num_emails = 10
+        # We also send email to the instructor:
+        self._create_students(num_emails - 1)
+        with patch('bulk_email.tasks.EmailMultiAlternatives', side_effect=TestTaskFailure):
+            with patch('bulk_email.tasks.update_subtask_status', my_update_subtask_status):
+                self._test_run_with_task(
+                    send_bulk_course_email,
+                    'emailed',
+                    num_emails,
+                    0,
+                    failed=num_emails,
+                    retried_withmax=(settings.BULK_EMAIL_MAX_RETRIES + 1)
+                )
+
     def test_retry_after_smtp_disconnect(self):
         self._test_retry_after_limited_retry_error(SMTPServerDisconnected(425, "Disconnecting"))
 
@@ -0,0 +1,20 @@
+"""
+This module contains various configuration settings via
+waffle switches for the Courseware app.
+"""
+from openedx.core.djangoapps.waffle_utils import WaffleSwitchNamespace
+
+# Namespace
+WAFFLE_NAMESPACE = u'courseware'
+
+# Switches
+BLOCK_STRUCTURE_FIELD_DATA_PREFETCH = u'block_structure_field_data_prefetch'
+USER_STATE_WRITE_BEHIND = u'user_state_write_behind'
+MATERIALIZED_GRADE_HISTOGRAMS = u'materialized_grade_histograms'
+
+
+def waffle():
+    """
+    Returns the namespaced, cached, audited Waffle class for Courseware.
+    """
+    return WaffleSwitchNamespace(name=WAFFLE_NAMESPACE, log_prefix=u'Courseware: ')
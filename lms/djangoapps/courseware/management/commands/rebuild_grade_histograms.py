@@ -0,0 +1,58 @@
+"""
+Command to rebuild the materialized grade histograms of courses.
+"""
+from __future__ import print_function, unicode_literals
+
+from django.core.management.base import BaseCommand, CommandError
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+
+from courseware.models import StudentModuleGradeCount
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+
+
+class Command(BaseCommand):
+    """
+    Command to recount the grades of the StudentModules of courses, to
+    backfill the grade counts that staff debug histograms are read from,
+    or to correct them after StudentModules were changed without a
+    problem score change signal.
+
+    Example:
+    ./manage.py lms rebuild_grade_histograms course-v1:edX+DemoX+Demo_Course
+    ./manage.py lms rebuild_grade_histograms --all
+    """
+    help = 'Recount the grades of the StudentModules of courses for their grade histograms.'
+
+    def add_arguments(self, parser):
+        """
+        Add arguments to the command parser.
+        """
+        parser.add_argument(
+            'course_ids',
+            nargs='*',
+            help='IDs of the courses whose grade histograms to rebuild',
+        )
+
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            dest='all',
+            default=False,
+            help='Rebuild the grade histograms of all courses.',
+        )
+
+    def handle(self, *args, **options):
+        if options['all']:
+            course_keys = CourseOverview.get_all_course_keys()
+        elif options['course_ids']:
+            try:
+                course_keys = [CourseKey.from_string(course_id) for course_id in options['course_ids']]
+            except InvalidKeyError as error:
+                raise CommandError("Invalid key: {}".format(error))
+        else:
+            raise CommandError("Specify course IDs or --all.")
+
+        for course_key in course_keys:
+            StudentModuleGradeCount.rebuild(course_key)
+            print("Rebuilt the grade histograms of {}.".format(course_key))
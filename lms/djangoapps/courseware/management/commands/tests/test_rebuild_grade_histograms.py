@@ -0,0 +1,44 @@
+"""
+Tests for the `rebuild_grade_histograms` management command
+"""
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from opaque_keys.edx.locator import CourseLocator
+
+from courseware.models import StudentModule, StudentModuleGradeCount
+from courseware.tests.factories import StudentModuleFactory
+
+
+class TestRebuildGradeHistogramsCommand(TestCase):
+    """
+    Tests for the `rebuild_grade_histograms` management command
+    """
+    def setUp(self):
+        super(TestRebuildGradeHistogramsCommand, self).setUp()
+        self.course_key = CourseLocator('org', 'course', 'run')
+        self.problem_key = self.course_key.make_usage_key('problem', 'problem')
+        for grade in (1, 1, 0):
+            StudentModuleFactory.create(course_id=self.course_key, module_state_key=self.problem_key, grade=grade)
+        StudentModuleGradeCount.rebuild(self.course_key)
+        # Grades changed without updating the grade counts.
+        StudentModule.objects.filter(grade=0).update(grade=2)
+
+    def test_rebuild_course(self):
+        self.assertEqual(
+            StudentModuleGradeCount.get_histograms([self.problem_key]),
+            {self.problem_key: [(0.0, 1), (1.0, 2)]},
+        )
+        call_command('rebuild_grade_histograms', unicode(self.course_key))
+        self.assertEqual(
+            StudentModuleGradeCount.get_histograms([self.problem_key]),
+            {self.problem_key: [(1.0, 2), (2.0, 1)]},
+        )
+
+    def test_no_courses(self):
+        with self.assertRaises(CommandError):
+            call_command('rebuild_grade_histograms')
+
+    def test_invalid_course(self):
+        with self.assertRaises(CommandError):
+            call_command('rebuild_grade_histograms', 'not a course')
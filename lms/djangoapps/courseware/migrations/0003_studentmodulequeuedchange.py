@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.db import migrations, models
+from openedx.core.djangoapps.xmodule_django.models import CourseKeyField, UsageKeyField
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('courseware', '0002_studentmodulegradecount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentModuleQueuedChange',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('course_id', CourseKeyField(max_length=255)),
+                ('module_state_key', UsageKeyField(max_length=255, db_column='module_id')),
+                ('state', models.TextField()),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('student', models.ForeignKey(to=settings.AUTH_USER_MODEL, db_constraint=False)),
+            ],
+        ),
+    ]
@@ -31,14 +31,15 @@ from django.db import DatabaseError, IntegrityError, transaction
 from opaque_keys.edx.asides import AsideUsageKeyV1, AsideUsageKeyV2
 from opaque_keys.edx.block_types import BlockTypeKeyV1
 from opaque_keys.edx.keys import CourseKey, UsageKey
-from xblock.core import XBlockAside
+from xblock.core import XBlock, XBlockAside
 from xblock.exceptions import InvalidScopeError, KeyValueMultiSaveError
 from xblock.fields import Scope, UserScope
 from xblock.runtime import KeyValueStore
 
-from courseware.user_state_client import DjangoXBlockUserStateClient
+from courseware.user_state_client import DjangoXBlockUserStateClient, WriteBehindXBlockUserStateClient
 from xmodule.modulestore.django import modulestore
 
+from .config.waffle import USER_STATE_WRITE_BEHIND, waffle
 from .models import StudentModule, XModuleStudentInfoField, XModuleStudentPrefsField, XModuleUserStateSummaryField
 
 log = logging.getLogger(__name__)
@@ -56,13 +57,21 @@ def _all_usage_keys(descriptors, aside_types):
     Return a set of all usage_ids for the `descriptors` and for
     as all asides in `aside_types` for those descriptors.
     """
+    return _usage_keys_with_asides((descriptor.scope_ids.usage_id for descriptor in descriptors), aside_types)
+
+
+def _usage_keys_with_asides(usage_keys, aside_types):
+    """
+    Return a set of all the `usage_keys` and of the usage keys of all
+    asides in `aside_types` for those usage keys.
+    """
     usage_ids = set()
-    for descriptor in descriptors:
-        usage_ids.add(descriptor.scope_ids.usage_id)
+    for usage_key in usage_keys:
+        usage_ids.add(usage_key)
 
         for aside_type in aside_types:
-            usage_ids.add(AsideUsageKeyV1(descriptor.scope_ids.usage_id, aside_type))
-            usage_ids.add(AsideUsageKeyV2(descriptor.scope_ids.usage_id, aside_type))
+            usage_ids.add(AsideUsageKeyV1(usage_key, aside_type))
+            usage_ids.add(AsideUsageKeyV2(usage_key, aside_type))
 
     return usage_ids
 
@@ -72,9 +81,20 @@ def _all_block_types(descriptors, aside_types):
     Return a set of all block_types for the supplied `descriptors` and for
     the asides types in `aside_types` associated with those descriptors.
     """
+    return _block_types_with_asides(
+        ((descriptor.entry_point, descriptor.scope_ids.block_type) for descriptor in descriptors),
+        aside_types,
+    )
+
+
+def _block_types_with_asides(entry_points_and_block_types, aside_types):
+    """
+    Return a set of the block_types for the supplied (entry_point, block_type)
+    pairs and for the aside types in `aside_types`.
+    """
     block_types = set()
-    for descriptor in descriptors:
-        block_types.add(BlockTypeKeyV1(descriptor.entry_point, descriptor.scope_ids.block_type))
+    for entry_point, block_type in entry_points_and_block_types:
+        block_types.add(BlockTypeKeyV1(entry_point, block_type))
 
     for aside_type in aside_types:
         block_types.add(BlockTypeKeyV1(XBlockAside.entry_point, aside_type))
@@ -175,6 +195,18 @@ class DjangoOrmFieldCache(object):
         for field_object in self._read_objects(fields, xblocks, aside_types):
             self._cache[self._cache_key_for_field_object(field_object)] = field_object
 
+    def cache_all_fields(self, usage_keys, block_types):
+        """
+        Load all fields, whatever their names, stored for the supplied
+        ``usage_keys`` and ``block_types`` into this cache, with a single query.
+
+        Arguments:
+            usage_keys (set of :class:`UsageKey`): Usages, including asides, to cache fields for.
+            block_types (set of :class:`BlockTypeKeyV1`): Block types, including asides, to cache fields for.
+        """
+        for field_object in self._read_all_objects(usage_keys, block_types):
+            self._cache[self._cache_key_for_field_object(field_object)] = field_object
+
     @contract(kvs_key=DjangoKeyValueStore.Key)
     def get(self, kvs_key):
         """
@@ -320,6 +352,19 @@ class DjangoOrmFieldCache(object):
         """
         raise NotImplementedError()
 
+    @abstractmethod
+    def _read_all_objects(self, usage_keys, block_types):
+        """
+        Return an iterator for all objects stored in the underlying datastore
+        for any field on the ``usage_keys`` or ``block_types``, using a
+        single query.
+
+        Arguments:
+            usage_keys (set of :class:`UsageKey`): Usages, including asides, to load fields for
+            block_types (set of :class:`BlockTypeKeyV1`): Block types, including asides, to load fields for
+        """
+        raise NotImplementedError()
+
     @abstractmethod
     def _cache_key_for_field_object(self, field_object):
         """
@@ -349,7 +394,10 @@ class UserStateCache(object):
         self._cache = defaultdict(dict)
         self.course_id = course_id
         self.user = user
-        self._client = DjangoXBlockUserStateClient(self.user)
+        if waffle().is_enabled(USER_STATE_WRITE_BEHIND):
+            self._client = WriteBehindXBlockUserStateClient(self.user)
+        else:
+            self._client = DjangoXBlockUserStateClient(self.user)
 
     def cache_fields(self, fields, xblocks, aside_types):  # pylint: disable=unused-argument
         """
@@ -368,6 +416,18 @@ class UserStateCache(object):
         for user_state in block_field_state:
             self._cache[user_state.block_key] = user_state.state
 
+    def cache_all_fields(self, usage_keys, block_types):  # pylint: disable=unused-argument
+        """
+        Load the state of the supplied ``usage_keys`` into this cache.
+
+        Arguments:
+            usage_keys (set of :class:`UsageKey`): Usages, including asides, to cache state for.
+            block_types (set of :class:`BlockTypeKeyV1`): Unused, as user state is stored per usage.
+        """
+        block_field_state = self._client.get_many(self.user.username, list(usage_keys))
+        for user_state in block_field_state:
+            self._cache[user_state.block_key] = user_state.state
+
     @contract(kvs_key=DjangoKeyValueStore.Key)
     def set(self, kvs_key, value):
         """
@@ -535,6 +595,17 @@ class UserStateSummaryCache(DjangoOrmFieldCache):
             field_name__in=set(field.name for field in fields),
         )
 
+    def _read_all_objects(self, usage_keys, block_types):
+        """
+        Return an iterator for all objects stored in the underlying datastore
+        for any field on the ``usage_keys``, using a single query.
+
+        Arguments:
+            usage_keys (set of :class:`UsageKey`): Usages, including asides, to load fields for
+            block_types (set of :class:`BlockTypeKeyV1`): Unused, as these fields are stored per usage
+        """
+        return XModuleUserStateSummaryField.objects.filter(usage_id__in=usage_keys)
+
     def _cache_key_for_field_object(self, field_object):
         """
         Return the key used in this DjangoOrmFieldCache to store the specified field_object.
@@ -598,6 +669,17 @@ class PreferencesCache(DjangoOrmFieldCache):
             field_name__in=set(field.name for field in fields),
         )
 
+    def _read_all_objects(self, usage_keys, block_types):
+        """
+        Return an iterator for all objects stored in the underlying datastore
+        for any field on the ``block_types``, using a single query.
+
+        Arguments:
+            usage_keys (set of :class:`UsageKey`): Unused, as preferences are stored per block type
+            block_types (set of :class:`BlockTypeKeyV1`): Block types, including asides, to load fields for
+        """
+        return XModuleStudentPrefsField.objects.filter(module_type__in=block_types, student=self.user.pk)
+
     def _cache_key_for_field_object(self, field_object):
         """
         Return the key used in this DjangoOrmFieldCache to store the specified field_object.
@@ -658,6 +740,17 @@ class UserInfoCache(DjangoOrmFieldCache):
             field_name__in=set(field.name for field in fields),
         )
 
+    def _read_all_objects(self, usage_keys, block_types):
+        """
+        Return an iterator for all objects stored in the underlying datastore
+        for any field of the user.
+
+        Arguments:
+            usage_keys (set of :class:`UsageKey`): Unused, as user info is stored per user
+            block_types (set of :class:`BlockTypeKeyV1`): Unused, as user info is stored per user
+        """
+        return XModuleStudentInfoField.objects.filter(student=self.user.pk)
+
     def _cache_key_for_field_object(self, field_object):
         """
         Return the key used in this DjangoOrmFieldCache to store the specified field_object.
@@ -793,6 +886,73 @@ class FieldDataCache(object):
         cache.add_descriptor_descendents(descriptor, depth, descriptor_filter)
         return cache
 
+    def add_block_structure_descendents(self, block_structure, usage_key, depth=None):
+        """
+        Add the block identified by `usage_key` and its descendants in the
+        given collected `block_structure` to this FieldDataCache.
+
+        Unlike add_descriptor_descendents, the usage keys of the descendants
+        are read from the block structure rather than by loading the
+        descriptors from the modulestore, and all the stored fields of each
+        scope are fetched with a single query for the entire subtree.
+
+        Arguments:
+            block_structure: A collected BlockStructure of the course
+            usage_key: The usage key of the root of the subtree
+            depth is the number of levels of descendant modules to load StudentModules for, in addition to
+                the supplied block. If depth is None, load all descendant StudentModules
+        """
+        if not self.user.is_authenticated():
+            return
+
+        usage_keys = self._block_structure_descendents(block_structure, usage_key, depth)
+        self.scorable_locations.update(
+            block_key for block_key in usage_keys if block_structure.get_xblock_field(block_key, 'has_score', False)
+        )
+        all_usage_keys = _usage_keys_with_asides(usage_keys, self.asides)
+        all_block_types = _block_types_with_asides(
+            ((XBlock.entry_point, block_key.block_type) for block_key in usage_keys),
+            self.asides,
+        )
+        for scope_cache in self.cache.itervalues():
+            scope_cache.cache_all_fields(all_usage_keys, all_block_types)
+
+    @classmethod
+    def cache_for_block_structure_descendents(cls, course_id, user, block_structure, usage_key, depth=None,
+                                              asides=None, read_only=False):
+        """
+        course_id: the course in the context of which we want StudentModules.
+        user: the django user for whom to load modules.
+        block_structure: A collected BlockStructure of the course
+        usage_key: The usage key of the root of the subtree to load StudentModules for
+        depth is the number of levels of descendant modules to load StudentModules for, in addition to
+            the supplied block. If depth is None, load all descendant StudentModules
+        """
+        cache = FieldDataCache([], course_id, user, asides=asides, read_only=read_only)
+        cache.add_block_structure_descendents(block_structure, usage_key, depth)
+        return cache
+
+    @staticmethod
+    def _block_structure_descendents(block_structure, usage_key, depth):
+        """
+        Return a list of the given `usage_key` and of the usage keys of its
+        descendants in the `block_structure`, down to the specified depth.
+        """
+        usage_keys = [usage_key]
+        visited = {usage_key}
+        level = [usage_key]
+        while level and (depth is None or depth > 0):
+            depth = depth - 1 if depth is not None else depth
+            next_level = []
+            for block_key in level:
+                for child_key in block_structure.get_children(block_key):
+                    if child_key not in visited:
+                        visited.add(child_key)
+                        next_level.append(child_key)
+            usage_keys.extend(next_level)
+            level = next_level
+        return usage_keys
+
     def _fields_to_cache(self, descriptors):
         """
         Returns a map of scopes to fields in that scope that should be cached
@@ -956,15 +1116,21 @@ class ScoresClient(object):
             course_id=self.course_key,
             module_state_key__in=set(locations),
         )
+        self._add_scores(scores_qset.values_list('module_state_key', 'grade', 'max_grade', 'created'))
+        self._has_fetched = True
+
+    def _add_scores(self, score_values):
+        """
+        Adds the given (location, correct, total, created) score values
+        to our lookup.
+        """
         # Locations in StudentModule don't necessarily have course key info
         # attached to them (since old mongo identifiers don't include runs).
         # So we have to add that info back in before we put it into our lookup.
         self._locations_to_scores.update({
             UsageKey.from_string(location).map_into_course(self.course_key): self.Score(correct, total, created)
-            for location, correct, total, created
-            in scores_qset.values_list('module_state_key', 'grade', 'max_grade', 'created')
+            for location, correct, total, created in score_values
         })
-        self._has_fetched = True
 
     def get(self, location):
         """
@@ -988,6 +1154,31 @@ class ScoresClient(object):
         client.fetch_scores(scorable_locations)
         return client
 
+    @classmethod
+    def create_for_users(cls, course_id, user_ids, scorable_locations):
+        """
+        Create ScoresClients with pre-fetched data for the given locations
+        for each of the given users, using a single query for all users.
+
+        Returns a dict of user_id to ScoresClient.
+        """
+        clients = {user_id: cls(course_id, user_id) for user_id in user_ids}
+        scores_qset = StudentModule.objects.filter(
+            student_id__in=clients.keys(),
+            course_id=course_id,
+            module_state_key__in=set(scorable_locations),
+        )
+        scores_by_user = defaultdict(list)
+        for user_id, location, correct, total, created in scores_qset.values_list(
+                'student_id', 'module_state_key', 'grade', 'max_grade', 'created',
+        ):
+            scores_by_user[user_id].append((location, correct, total, created))
+
+        for user_id, client in clients.iteritems():
+            client._add_scores(scores_by_user[user_id])  # pylint: disable=protected-access
+            client._has_fetched = True  # pylint: disable=protected-access
+        return clients
+
 
 # @contract(user_id=int, usage_key=UsageKey, score="number|None", max_score="number|None")
 def set_score(user_id, usage_key, score, max_score):
@@ -17,12 +17,18 @@ import logging
 
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count
 from django.db.models.signals import post_save
 from model_utils.models import TimeStampedModel
 
 import coursewarehistoryextended
-from openedx.core.djangoapps.xmodule_django.models import BlockTypeKeyField, CourseKeyField, LocationKeyField
+from openedx.core.djangoapps.xmodule_django.models import (
+    BlockTypeKeyField,
+    CourseKeyField,
+    LocationKeyField,
+    UsageKeyField
+)
 
 log = logging.getLogger("edx.courseware")
 
@@ -233,6 +239,95 @@ class StudentModuleHistory(BaseStudentModuleHistory):
         post_save.connect(save_history, sender=StudentModule)
 
 
+class StudentModuleQueuedChange(models.Model):
+    """
+    A change to the state of a StudentModule that is queued, by the
+    write-behind user state client, to be stored asynchronously.
+
+    The state holds only the changed fields, which are overlaid over the
+    stored state, in the order of the ids of the queued changes.
+
+    The queued changes are kept in the 'user_state_write_queue' database,
+    if it's configured, so there's no constraint on the student.
+    """
+    class Meta(object):
+        app_label = "courseware"
+
+    student = models.ForeignKey(User, db_index=True, db_constraint=False)
+    course_id = CourseKeyField(max_length=255)
+    module_state_key = UsageKeyField(max_length=255, db_column='module_id')
+    state = models.TextField()
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+
+
+class StudentModuleGradeCount(models.Model):
+    """
+    The number of StudentModules of a module with each grade, including
+    those without a grade, i.e. the histogram of the grades of the module,
+    recounted by a task scheduled as the scores of the module change, so that
+    it needn't be aggregated from them when it's read.
+
+    Counts follow the scores changed through PROBLEM_WEIGHTED_SCORE_CHANGED,
+    but not StudentModules changed otherwise, which can be corrected with the
+    rebuild_grade_histograms management command.
+    """
+    class Meta(object):
+        app_label = "courseware"
+        unique_together = (('module_state_key', 'grade'),)
+
+    course_id = CourseKeyField(max_length=255, db_index=True)
+    module_state_key = UsageKeyField(max_length=255, db_column='module_id')
+    grade = models.FloatField(null=True)
+    count = models.IntegerField(default=0)
+
+    @classmethod
+    def get_histograms(cls, module_state_keys):
+        """
+        Returns a dict of the grade histograms of the given modules, each a
+        list of (grade, count) tuples sorted by grade, in one query.
+
+        As with grade_histogram, the histogram of a module with any
+        StudentModule without a grade is empty.
+        """
+        histograms = {module_state_key: [] for module_state_key in module_state_keys}
+        # Keys of old mongo courses may or may not have a run, so match them by their serialization.
+        keys_by_id = {unicode(module_state_key): module_state_key for module_state_key in histograms}
+        ungraded_keys = set()
+        grade_counts = cls.objects.filter(
+            module_state_key__in=list(histograms), count__gt=0
+        ).order_by('grade').values_list('module_state_key', 'grade', 'count')
+        for module_id, grade, count in grade_counts:
+            module_state_key = keys_by_id[unicode(module_id)]
+            if grade is None:
+                ungraded_keys.add(module_state_key)
+            else:
+                histograms[module_state_key].append((grade, count))
+        for module_state_key in ungraded_keys:
+            histograms[module_state_key] = []
+        return histograms
+
+    @classmethod
+    def rebuild(cls, course_id, module_state_keys=None):
+        """
+        Recounts the grades of the StudentModules of the course, or only of
+        the given modules of the course.
+        """
+        student_modules = StudentModule.objects.filter(course_id=course_id)
+        grade_counts = cls.objects.filter(course_id=course_id)
+        if module_state_keys is not None:
+            student_modules = student_modules.filter(module_state_key__in=module_state_keys)
+            grade_counts = grade_counts.filter(module_state_key__in=module_state_keys)
+
+        with transaction.atomic():
+            grade_counts.delete()
+            cls.objects.bulk_create(
+                cls(course_id=course_id, module_state_key=module_state_key, grade=grade, count=count)
+                for module_state_key, grade, count in student_modules.values_list(
+                    'module_state_key', 'grade'
+                ).annotate(count=Count('id')).order_by()
+            )
+
+
 class XBlockFieldBase(models.Model):
     """
     Base class for all XBlock field storage.
@@ -0,0 +1,80 @@
+"""
+This module contains tasks for asynchronous execution of courseware updates.
+"""
+from datetime import timedelta
+from logging import getLogger
+
+from celery import task
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.utils import DatabaseError
+from django.utils.timezone import now
+from opaque_keys.edx.keys import CourseKey, UsageKey
+
+from .models import StudentModuleGradeCount
+from .user_state_client import UserStateWriteQueue, WriteBehindXBlockUserStateClient
+
+log = getLogger(__name__)
+
+# Delay, in seconds, before the grade counts of a module are recounted, so that
+# the StudentModule changes they follow are committed first.
+UPDATE_GRADE_COUNTS_DELAY = 2
+
+
+@task(bind=True, default_retry_delay=settings.USER_STATE_WRITE_BEHIND_DELAY, max_retries=5)
+def flush_user_state_writes(self, username):
+    """
+    Stores the queued user state changes of the specified user.
+    """
+    try:
+        WriteBehindXBlockUserStateClient().flush(username)
+    except DatabaseError as exc:
+        log.warning(u'Courseware: Failed to flush user state writes of user %s, retrying: %r', username, exc)
+        raise self.retry(exc=exc)
+
+
+@task(name=u'courseware.flush_stale_user_state_writes')
+def flush_stale_user_state_writes():
+    """
+    Schedules the flush of the queued user state changes of every user whose
+    changes should have been stored already, e.g. because their flush failed
+    on every retry, or was never scheduled.
+    """
+    queued_before = now() - timedelta(seconds=settings.USER_STATE_WRITE_BEHIND_SWEEP_INTERVAL)
+    user_ids = UserStateWriteQueue.stale_user_ids(queued_before)
+    for username in User.objects.filter(id__in=user_ids).values_list('username', flat=True):
+        log.info(u'Courseware: Flushing stale user state writes of user %s', username)
+        flush_user_state_writes.apply_async(args=(username,), routing_key=settings.USER_STATE_WRITE_BEHIND_ROUTING_KEY)
+
+
+def schedule_grade_count_rebuild(course_id, module_state_key):
+    """
+    Schedules recounting the grades of the StudentModules of the specified
+    module, unless a recount that follows the current changes is already
+    scheduled, so that the changes to a module are recounted together.
+
+    The key held while a recount is scheduled expires UPDATE_GRADE_COUNTS_DELAY
+    seconds before the recount runs, so the changes which found it held are
+    committed by then.
+    """
+    scheduled_key = u'courseware.grade_counts.scheduled.{}'.format(module_state_key)
+    if cache.add(scheduled_key, True, UPDATE_GRADE_COUNTS_DELAY):
+        rebuild_grade_counts.apply_async(
+            kwargs=dict(course_id=unicode(course_id), module_state_key=unicode(module_state_key)),
+            countdown=2 * UPDATE_GRADE_COUNTS_DELAY,
+        )
+
+
+@task(bind=True, default_retry_delay=UPDATE_GRADE_COUNTS_DELAY, max_retries=5)
+def rebuild_grade_counts(self, course_id, module_state_key):
+    """
+    Recounts the grades of the StudentModules of the specified module.
+    """
+    course_key = CourseKey.from_string(course_id)
+    usage_key = UsageKey.from_string(module_state_key).map_into_course(course_key)
+    try:
+        StudentModuleGradeCount.rebuild(course_key, [usage_key])
+    except DatabaseError as exc:
+        log.warning(u'Courseware: Failed to rebuild grade counts of module %s, retrying: %r', module_state_key, exc)
+        raise self.retry(exc=exc)
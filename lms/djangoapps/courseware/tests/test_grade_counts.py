@@ -0,0 +1,119 @@
+"""
+Tests for the grade counts of StudentModules.
+"""
+from mock import patch
+from opaque_keys.edx.locations import Location, SlashSeparatedCourseKey
+from opaque_keys.edx.locator import CourseLocator
+
+from courseware.models import StudentModule, StudentModuleGradeCount
+from courseware.tasks import UPDATE_GRADE_COUNTS_DELAY, schedule_grade_count_rebuild
+from courseware.tests.factories import StudentModuleFactory
+from lms.djangoapps.grades.constants import ScoreDatabaseTableEnum
+from lms.djangoapps.grades.signals.handlers import enqueue_grade_count_update
+from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
+from openedx.core.lib.xblock_utils import grade_histogram
+
+
+class StudentModuleGradeCountTestCase(CacheIsolationTestCase):
+    """
+    Tests that grade counts follow the grades of StudentModules.
+    """
+    ENABLED_CACHES = ['default']
+
+    def setUp(self):
+        super(StudentModuleGradeCountTestCase, self).setUp()
+        self.course_key = CourseLocator('org', 'course', 'run')
+        self.problem_key = self.course_key.make_usage_key('problem', 'problem')
+
+    def _create_student_module(self, grade):
+        """
+        Creates a StudentModule of the problem with the given grade.
+        """
+        return StudentModuleFactory.create(
+            course_id=self.course_key,
+            module_state_key=self.problem_key,
+            grade=grade,
+        )
+
+    def _score_changed(self, score_db_table=ScoreDatabaseTableEnum.courseware_student_module):
+        """
+        Handles a PROBLEM_WEIGHTED_SCORE_CHANGED signal of the problem.
+        """
+        enqueue_grade_count_update(
+            sender=None,
+            course_id=unicode(self.course_key),
+            usage_id=unicode(self.problem_key),
+            score_db_table=score_db_table,
+        )
+
+    def assert_histogram(self, expected):
+        """
+        Asserts that the grade histogram of the problem is the expected one,
+        and the same as the one aggregated by grade_histogram.
+        """
+        self.assertEqual(StudentModuleGradeCount.get_histograms([self.problem_key]), {self.problem_key: expected})
+        self.assertEqual(grade_histogram(self.problem_key), expected)
+
+    def test_score_changed(self):
+        self._create_student_module(1)
+        self._create_student_module(1)
+        self._create_student_module(0.5)
+        self._score_changed()
+        self.assert_histogram([(0.5, 1), (1.0, 2)])
+
+    def test_ungraded(self):
+        student_module = self._create_student_module(1)
+        self._create_student_module(None)
+        self._score_changed()
+        self.assert_histogram([])
+
+        self.clear_caches()
+        StudentModule.objects.filter(grade__isnull=True).update(grade=0)
+        self._score_changed()
+        self.assert_histogram([(0.0, 1), (1.0, 1)])
+
+        self.clear_caches()
+        student_module.delete()
+        self._score_changed()
+        self.assert_histogram([(0.0, 1)])
+
+    def test_submissions_score_changed(self):
+        with patch('courseware.tasks.rebuild_grade_counts.apply_async') as mock_rebuild:
+            self._score_changed(score_db_table=ScoreDatabaseTableEnum.submissions)
+        self.assertFalse(mock_rebuild.called)
+
+    def test_rebuilds_grouped(self):
+        with patch('courseware.tasks.rebuild_grade_counts.apply_async') as mock_rebuild:
+            for _ in range(3):
+                self._score_changed()
+            other_problem_key = self.course_key.make_usage_key('problem', 'other')
+            schedule_grade_count_rebuild(self.course_key, other_problem_key)
+        self.assertEqual(
+            [call[1] for call in mock_rebuild.call_args_list],
+            [
+                dict(
+                    kwargs=dict(course_id=unicode(self.course_key), module_state_key=unicode(problem_key)),
+                    countdown=2 * UPDATE_GRADE_COUNTS_DELAY,
+                )
+                for problem_key in (self.problem_key, other_problem_key)
+            ],
+        )
+
+    def test_rebuild_idempotent(self):
+        self._create_student_module(1)
+        self._create_student_module(0)
+        StudentModule.objects.filter(grade=0).update(grade=1)
+        StudentModuleGradeCount.rebuild(self.course_key, [self.problem_key])
+        StudentModuleGradeCount.rebuild(self.course_key, [self.problem_key])
+        self.assert_histogram([(1.0, 2)])
+
+    def test_old_mongo_keys(self):
+        course_key = SlashSeparatedCourseKey('org', 'course', 'run')
+        problem_key = course_key.make_usage_key('problem', 'problem')
+        StudentModuleFactory.create(course_id=course_key, module_state_key=problem_key, grade=1)
+        StudentModuleGradeCount.rebuild(course_key)
+        problem_key_without_run = Location('org', 'course', None, 'problem', 'problem')
+        self.assertEqual(
+            StudentModuleGradeCount.get_histograms([problem_key_without_run]),
+            {problem_key_without_run: [(1.0, 1)]},
+        )
@@ -10,7 +10,7 @@ from mock import Mock, patch
 from nose.plugins.attrib import attr
 from xblock.core import XBlock
 from xblock.exceptions import KeyValueMultiSaveError
-from xblock.fields import BlockScope, Scope, ScopeIds
+from xblock.fields import BlockScope, Scope, ScopeIds, UserScope
 
 from courseware.model_data import DjangoKeyValueStore, FieldDataCache, InvalidScopeError
 from courseware.models import (
@@ -27,7 +27,10 @@ from courseware.tests.factories import (
     course_id,
     location
 )
+from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
 from student.tests.factories import UserFactory
+from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 
 
 def mock_field(scope, name):
@@ -434,3 +437,77 @@ class TestStudentInfoStorage(OtherUserFailureTestMixin, StorageTestBase, TestCas
     storage_class = XModuleStudentInfoField
     other_key_factory = partial(DjangoKeyValueStore.Key, Scope.user_info, 2, 'mock_problem')  # user_id=2, not 1
     existing_field_name = "existing_field"
+
+
+@attr(shard=1)
+class TestBlockStructurePrefetch(SharedModuleStoreTestCase):
+    """
+    Tests for prefetching the field data of the blocks of a subtree of
+    a collected block structure.
+    """
+    @classmethod
+    def setUpClass(cls):
+        super(TestBlockStructurePrefetch, cls).setUpClass()
+        cls.course = CourseFactory.create()
+        with cls.store.bulk_operations(cls.course.id):
+            cls.chapter = ItemFactory.create(parent=cls.course, category='chapter')
+            cls.sequential = ItemFactory.create(parent=cls.chapter, category='sequential')
+            cls.problems = [
+                ItemFactory.create(parent=cls.sequential, category='problem') for _ in range(3)
+            ]
+
+    def setUp(self):
+        super(TestBlockStructurePrefetch, self).setUp()
+        self.user = UserFactory.create()
+        for problem in self.problems:
+            StudentModuleFactory.create(
+                student=self.user,
+                course_id=self.course.id,
+                module_state_key=problem.location,
+                state=json.dumps({'attempts': 1}),
+            )
+            UserStateSummaryFactory.create(usage_id=problem.location)
+        StudentPrefsFactory.create(student=self.user, module_type='problem')
+        self.block_structure = get_course_in_cache(self.course.id)
+
+    def _kvs_get(self, field_data_cache, scope, block_scope_id, field_name):
+        """
+        Returns the value of the given field from the given FieldDataCache.
+        """
+        user_id = self.user.id if scope.user == UserScope.ONE else None
+        return DjangoKeyValueStore(field_data_cache).get(
+            DjangoKeyValueStore.Key(scope, user_id, block_scope_id, field_name)
+        )
+
+    def test_prefetch_query_counts(self):
+        # One query for each of the user_state, user_state_summary,
+        # preferences and user_info scopes.
+        with self.assertNumQueries(4):
+            field_data_cache = FieldDataCache.cache_for_block_structure_descendents(
+                self.course.id, self.user, self.block_structure, self.course.location,
+            )
+
+        with self.assertNumQueries(0):
+            for problem in self.problems:
+                self.assertEqual(
+                    self._kvs_get(field_data_cache, Scope.user_state, problem.location, 'attempts'), 1,
+                )
+                self.assertEqual(
+                    self._kvs_get(field_data_cache, Scope.user_state_summary, problem.location, 'existing_field'),
+                    'old_value',
+                )
+            self.assertEqual(
+                self._kvs_get(field_data_cache, Scope.preferences, 'problem', 'existing_field'), 'old_value',
+            )
+        self.assertEqual(field_data_cache.scorable_locations, {problem.location for problem in self.problems})
+
+    def test_prefetch_depth(self):
+        field_data_cache = FieldDataCache.cache_for_block_structure_descendents(
+            self.course.id, self.user, self.block_structure, self.chapter.location, depth=1,
+        )
+        with self.assertRaises(KeyError):
+            self._kvs_get(field_data_cache, Scope.user_state, self.problems[0].location, 'attempts')
+
+        with self.assertNumQueries(4):
+            field_data_cache.add_block_structure_descendents(self.block_structure, self.sequential.location)
+        self.assertEqual(self._kvs_get(field_data_cache, Scope.user_state, self.problems[0].location, 'attempts'), 1)
@@ -3,14 +3,22 @@ Black-box tests of the DjangoUserStateClient against the semantics
 defined in edx_user_state_client.
 """
 
+import json
 from collections import defaultdict
 from unittest import skip
 
+from django.db import DatabaseError
 from django.test import TestCase
+from django.test.utils import override_settings
 from edx_user_state_client.tests import UserStateClientTestBase
+from mock import ANY, patch
+from opaque_keys.edx.locator import BlockUsageLocator, CourseLocator
 
+from courseware.models import StudentModule, StudentModuleQueuedChange
+from courseware.tasks import flush_stale_user_state_writes
 from courseware.tests.factories import UserFactory
-from courseware.user_state_client import DjangoXBlockUserStateClient
+from courseware.user_state_client import DjangoXBlockUserStateClient, WriteBehindXBlockUserStateClient
+from openedx.core.djangolib.testing.utils import CacheIsolationMixin, CacheIsolationTestCase
 
 
 class TestDjangoUserStateClient(UserStateClientTestBase, TestCase):
@@ -67,3 +75,120 @@ class TestDjangoUserStateClient(UserStateClientTestBase, TestCase):
     @skip("Not supported by DjangoXBlockUserStateClient")
     def test_iter_course_many_users(self):
         pass
+
+
+class TestWriteBehindUserStateClient(CacheIsolationMixin, TestDjangoUserStateClient):
+    """
+    Tests of the WriteBehindXBlockUserStateClient backend, whose queued
+    changes are stored immediately since celery tasks run eagerly in tests.
+    """
+    ENABLED_CACHES = ['default']
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestWriteBehindUserStateClient, cls).setUpClass()
+        cls.start_cache_isolation()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.end_cache_isolation()
+        super(TestWriteBehindUserStateClient, cls).tearDownClass()
+
+    def setUp(self):
+        super(TestWriteBehindUserStateClient, self).setUp()
+        self.clear_caches()
+        self.client = WriteBehindXBlockUserStateClient()
+
+
+class TestUserStateWriteBehind(CacheIsolationTestCase):
+    """
+    Tests of the queueing of user state changes by the WriteBehindXBlockUserStateClient.
+    """
+    ENABLED_CACHES = ['default']
+    multi_db = True
+
+    def setUp(self):
+        super(TestUserStateWriteBehind, self).setUp()
+        self.user = UserFactory.create()
+        self.client = WriteBehindXBlockUserStateClient(self.user)
+        self.block_key = BlockUsageLocator(CourseLocator('org', 'course', 'run'), 'problem', 'block')
+
+        patcher = patch('courseware.tasks.flush_user_state_writes.apply_async')
+        self.mock_schedule_flush = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _set_twice(self):
+        """
+        Sets two fields of the block's state, one at a time.
+        """
+        self.client.set(self.user.username, self.block_key, {'attempts': 1})
+        self.client.set(self.user.username, self.block_key, {'done': True})
+
+    def test_read_your_writes(self):
+        # One insert into the queue for each change.
+        with self.assertNumQueries(2):
+            self._set_twice()
+        self.assertEqual(self.mock_schedule_flush.call_count, 1)
+        self.assertFalse(StudentModule.objects.filter(student=self.user).exists())
+        self.assertEqual(StudentModuleQueuedChange.objects.filter(student=self.user).count(), 2)
+        self.assertEqual(
+            self.client.get(self.user.username, self.block_key).state,
+            {'attempts': 1, 'done': True},
+        )
+
+    def test_flush_coalesces_writes(self):
+        self._set_twice()
+        self.client.flush(self.user.username)
+
+        student_module = StudentModule.objects.get(student=self.user)
+        self.assertEqual(json.loads(student_module.state), {'attempts': 1, 'done': True})
+        self.assertFalse(StudentModuleQueuedChange.objects.filter(student=self.user).exists())
+        history = list(self.client.get_history(self.user.username, self.block_key))
+        self.assertEqual(len(history), 1)
+
+    def test_delete_after_queued_writes(self):
+        self._set_twice()
+        self.client.delete(self.user.username, self.block_key, fields=['attempts'])
+        self.assertEqual(self.client.get(self.user.username, self.block_key).state, {'done': True})
+
+    def test_failed_flush_keeps_writes_queued(self):
+        self._set_twice()
+        with patch.object(DjangoXBlockUserStateClient, 'set_many', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.client.flush(self.user.username)
+
+        self.client.set(self.user.username, self.block_key, {'attempts': 2})
+        self.assertEqual(
+            self.client.get(self.user.username, self.block_key).state,
+            {'attempts': 2, 'done': True},
+        )
+
+        self.client.flush(self.user.username)
+        student_module = StudentModule.objects.get(student=self.user)
+        self.assertEqual(json.loads(student_module.state), {'attempts': 2, 'done': True})
+
+    def test_flush_before_direct_write(self):
+        self._set_twice()
+        self.client.flush(self.user.username)
+        self.client.set(self.user.username, self.block_key, {'attempts': 2})
+
+        # A direct write, such as resetting the attempts, flushes the queue first.
+        self.client.flush(self.user.username)
+        student_module = StudentModule.objects.get(student=self.user)
+        student_module.state = json.dumps({'attempts': 0, 'done': True})
+        student_module.save()
+
+        self.client.flush(self.user.username)
+        self.assertEqual(self.client.get(self.user.username, self.block_key).state, {'attempts': 0, 'done': True})
+
+    def test_flush_stale_writes(self):
+        self._set_twice()
+        self.mock_schedule_flush.reset_mock()
+
+        with override_settings(USER_STATE_WRITE_BEHIND_SWEEP_INTERVAL=60):
+            flush_stale_user_state_writes()
+        self.assertFalse(self.mock_schedule_flush.called)
+
+        with override_settings(USER_STATE_WRITE_BEHIND_SWEEP_INTERVAL=0):
+            flush_stale_user_state_writes()
+        self.mock_schedule_flush.assert_called_once_with(args=(self.user.username,), routing_key=ANY)
@@ -8,14 +8,16 @@ import logging
 from operator import attrgetter
 from time import time
 
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.db import transaction
+from django.core.cache import cache
+from django.db import router, transaction
 from django.db.utils import IntegrityError
 from edx_user_state_client.interface import XBlockUserState, XBlockUserStateClient
 from xblock.fields import Scope
 
 import dogstats_wrapper as dog_stats_api
-from courseware.models import BaseStudentModuleHistory, StudentModule
+from courseware.models import BaseStudentModuleHistory, StudentModule, StudentModuleQueuedChange
 from openedx.core.djangoapps import monitoring_utils
 
 try:
@@ -459,3 +461,245 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         if scope != Scope.user_state:
             raise ValueError("Only Scope.user_state is supported")
         raise NotImplementedError()
+
+
+class UserStateWriteQueue(object):
+    """
+    A durable queue, kept in the StudentModuleQueuedChange table, of the
+    user state changes of a single user that are not yet stored.
+
+    Each change is inserted as a row of its own, so concurrent changes are
+    never lost. Repeated changes to the state of the same XBlock usage are
+    coalesced when the queue is flushed, so each usage's state is stored
+    once per flush.
+
+    The table is kept in the 'user_state_write_queue' database, if it's
+    configured, rather than in the database of StudentModule. Queues whose
+    scheduled flush was lost are found with :meth:`stale_user_ids`.
+    """
+    SCHEDULED_KEY_PREFIX = u'courseware.user_state_write_queue.scheduled'
+
+    def __init__(self, user):
+        self.user = user
+
+    def add(self, block_keys_to_state):
+        """
+        Queue the changes in ``block_keys_to_state``, a dict mapping UsageKeys
+        to state dicts, to be overlaid over any already queued changes.
+
+        Returns whether a flush of the queue needs to be scheduled.
+        """
+        StudentModuleQueuedChange.objects.bulk_create([
+            StudentModuleQueuedChange(
+                student_id=self.user.id,
+                course_id=usage_key.course_key,
+                module_state_key=usage_key,
+                state=json.dumps(state),
+            )
+            for usage_key, state in block_keys_to_state.iteritems()
+        ])
+
+        # Only the first change within the flush delay schedules a flush.
+        # The key is only a hint to avoid scheduling redundant flushes, as
+        # the changes themselves are kept in the database.
+        return cache.add(self._scheduled_key(), True, settings.USER_STATE_WRITE_BEHIND_DELAY)
+
+    def pending(self):
+        """
+        Return the queued changes, as a dict mapping UsageKeys to dicts with
+        the coalesced 'state' changes and the time they were last 'updated'.
+        """
+        return _coalesce_changes(self._queued_changes())
+
+    def flush(self, store):
+        """
+        Store the queued changes by calling ``store`` with a dict mapping
+        UsageKeys to state dicts, and remove them from the queue, in a
+        single transaction.
+
+        The queued changes are locked while they are stored, so concurrent
+        flushes of the queue store each change only once. If storing fails,
+        the changes remain queued and the error is raised.
+
+        Returns whether more changes were queued during the flush, so a
+        flush of the queue needs to be scheduled again.
+        """
+        with transaction.atomic(using=router.db_for_write(StudentModuleQueuedChange)):
+            queued_changes = list(self._queued_changes().select_for_update())
+            if queued_changes:
+                changes = _coalesce_changes(queued_changes)
+                store({usage_key: change['state'] for usage_key, change in changes.iteritems()})
+                StudentModuleQueuedChange.objects.filter(
+                    id__in=[queued_change.id for queued_change in queued_changes],
+                ).delete()
+
+        return self._queued_changes().exists() and cache.add(
+            self._scheduled_key(), True, settings.USER_STATE_WRITE_BEHIND_DELAY,
+        )
+
+    @staticmethod
+    def stale_user_ids(queued_before):
+        """
+        Return the ids of the users with changes queued before the given
+        datetime, whose queues should have been flushed already.
+        """
+        return set(
+            StudentModuleQueuedChange.objects.filter(created__lt=queued_before).values_list('student_id', flat=True)
+        )
+
+    def _queued_changes(self):
+        """
+        Return a queryset of the queued changes, in the order they were made.
+        """
+        return StudentModuleQueuedChange.objects.filter(student_id=self.user.id).order_by('id')
+
+    def _scheduled_key(self):
+        return u'{}.{}'.format(self.SCHEDULED_KEY_PREFIX, self.user.id)
+
+
+def _coalesce_changes(queued_changes):
+    """
+    Return the given StudentModuleQueuedChanges overlaid in order, as a dict
+    mapping UsageKeys to dicts with the 'state' changes and the time they
+    were last 'updated'.
+    """
+    changes = {}
+    for queued_change in queued_changes:
+        usage_key = queued_change.module_state_key.map_into_course(queued_change.course_id)
+        change = changes.setdefault(usage_key, {'state': {}})
+        change['state'].update(json.loads(queued_change.state))
+        change['updated'] = queued_change.created
+    return changes
+
+
+class WriteBehindXBlockUserStateClient(DjangoXBlockUserStateClient):
+    """
+    A DjangoXBlockUserStateClient that queues the changes made with
+    `set_many` in a :class:`UserStateWriteQueue` and stores them
+    asynchronously, after USER_STATE_WRITE_BEHIND_DELAY seconds, rather
+    than writing to StudentModule synchronously.
+
+    Reads through this client overlay the queued changes over the stored
+    state, so a user always reads their own writes. Deletes and history
+    reads first flush the queued changes, so they apply in order.
+
+    Code that writes StudentModule state directly, rather than through a
+    user state client, must call :meth:`flush` first, so that queued
+    changes aren't stored over its own changes later.
+    """
+
+    def get_many(self, username, block_keys, scope=Scope.user_state, fields=None):
+        """
+        Retrieve the stored XBlock state, overlaid with the queued changes,
+        for the specified XBlock usages.
+
+        See :meth:`DjangoXBlockUserStateClient.get_many`.
+        """
+        pending = self._queue(username).pending() if scope == Scope.user_state else {}
+        block_keys = list(block_keys)
+
+        for user_state in super(WriteBehindXBlockUserStateClient, self).get_many(username, block_keys, scope):
+            change = pending.pop(user_state.block_key, None)
+            if change is None:
+                yield self._filter_fields(user_state, fields)
+            else:
+                state = dict(user_state.state)
+                state.update(change['state'])
+                yield self._filter_fields(
+                    XBlockUserState(username, user_state.block_key, state, change['updated'], scope), fields,
+                )
+
+        for block_key in block_keys:
+            change = pending.get(block_key)
+            if change is not None and change['state']:
+                yield self._filter_fields(
+                    XBlockUserState(username, block_key, change['state'], change['updated'], scope), fields,
+                )
+
+    def set_many(self, username, block_keys_to_state, scope=Scope.user_state):
+        """
+        Queue changes to the fields of the specified XBlocks, to be stored
+        asynchronously.
+
+        See :meth:`DjangoXBlockUserStateClient.set_many`.
+        """
+        if scope != Scope.user_state:
+            raise ValueError("Only Scope.user_state is supported")
+
+        queue = self._queue(username)
+        if queue.user.is_anonymous():
+            # Anonymous users cannot be persisted to the database, so let's just use
+            # what we have.
+            return
+
+        self._nr_stat_increment('set_many', 'queued')
+        if queue.add(block_keys_to_state):
+            self._schedule_flush(username)
+
+    def delete_many(self, username, block_keys, scope=Scope.user_state, fields=None):
+        """
+        Delete the stored XBlock state for many xblock usages, after storing
+        any queued changes.
+
+        See :meth:`DjangoXBlockUserStateClient.delete_many`.
+        """
+        self.flush(username)
+        super(WriteBehindXBlockUserStateClient, self).delete_many(username, block_keys, scope, fields)
+
+    def get_history(self, username, block_key, scope=Scope.user_state):
+        """
+        Retrieve the history of state changes of the specified XBlock usage,
+        after storing any queued changes.
+
+        See :meth:`DjangoXBlockUserStateClient.get_history`.
+        """
+        self.flush(username)
+        return super(WriteBehindXBlockUserStateClient, self).get_history(username, block_key, scope)
+
+    def flush(self, username):
+        """
+        Store all the queued changes of the specified user, in a single
+        transaction.
+        """
+        def _store(block_keys_to_state):
+            """
+            Store the coalesced changes to the state of the user's XBlocks.
+            """
+            super(WriteBehindXBlockUserStateClient, self).set_many(username, block_keys_to_state)
+
+        if self._queue(username).flush(_store):
+            self._schedule_flush(username)
+
+    def _queue(self, username):
+        """
+        Return the UserStateWriteQueue of the specified user.
+        """
+        if self.user is not None and self.user.username == username:
+            return UserStateWriteQueue(self.user)
+        return UserStateWriteQueue(User.objects.get(username=username))
+
+    @staticmethod
+    def _filter_fields(user_state, fields):
+        """
+        Return the given XBlockUserState with its state restricted to the given fields.
+        """
+        if fields is None:
+            return user_state
+        return user_state._replace(state={
+            field: user_state.state[field]
+            for field in fields
+            if field in user_state.state
+        })
+
+    @staticmethod
+    def _schedule_flush(username):
+        """
+        Schedule the asynchronous flush of the queued changes of the given user.
+        """
+        # Imported here, since the tasks module depends on this one.
+        from courseware.tasks import flush_user_state_writes
+        flush_user_state_writes.apply_async(
+            args=(username,),
+            countdown=settings.USER_STATE_WRITE_BEHIND_DELAY,
+            routing_key=settings.USER_STATE_WRITE_BEHIND_ROUTING_KEY,
+        )
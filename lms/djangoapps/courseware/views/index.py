@@ -26,6 +26,7 @@ from edxmako.shortcuts import render_to_response, render_to_string
 from lms.djangoapps.courseware.exceptions import CourseAccessRedirect
 from lms.djangoapps.gating.api import get_entrance_exam_score_ratio, get_entrance_exam_usage_key
 from lms.djangoapps.grades.new.course_grade_factory import CourseGradeFactory
+from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
 from openedx.core.djangoapps.crawlers.models import CrawlersConfig
 from openedx.core.djangoapps.lang_pref import LANGUAGE_KEY
 from openedx.core.djangoapps.monitoring_utils import set_custom_metrics_for_course_key
@@ -42,6 +43,7 @@ from xmodule.x_module import STUDENT_VIEW
 
 from ..access import has_access
 from ..access_utils import in_preview_mode, is_course_open_for_learner
+from ..config.waffle import BLOCK_STRUCTURE_FIELD_DATA_PREFETCH, waffle as courseware_waffle
 from ..courses import get_course_with_access, get_current_child, get_studio_url
 from ..entrance_exams import (
     course_has_entrance_exam,
@@ -278,13 +280,23 @@ class CoursewareIndex(View):
         Prefetches all descendant data for the requested section and
         sets up the runtime, which binds the request user to the section.
         """
-        self.field_data_cache = FieldDataCache.cache_for_descriptor_descendents(
-            self.course_key,
-            self.effective_user,
-            self.course,
-            depth=CONTENT_DEPTH,
-            read_only=CrawlersConfig.is_crawler(request),
-        )
+        if courseware_waffle().is_enabled(BLOCK_STRUCTURE_FIELD_DATA_PREFETCH):
+            self.field_data_cache = FieldDataCache.cache_for_block_structure_descendents(
+                self.course_key,
+                self.effective_user,
+                get_course_in_cache(self.course_key),
+                self.course.location,
+                depth=CONTENT_DEPTH,
+                read_only=CrawlersConfig.is_crawler(request),
+            )
+        else:
+            self.field_data_cache = FieldDataCache.cache_for_descriptor_descendents(
+                self.course_key,
+                self.effective_user,
+                self.course,
+                depth=CONTENT_DEPTH,
+                read_only=CrawlersConfig.is_crawler(request),
+            )
 
         self.course = get_module_for_descriptor(
             self.effective_user,
@@ -302,7 +314,12 @@ class CoursewareIndex(View):
         """
         # Pre-fetch all descendant data
         self.section = modulestore().get_item(self.section.location, depth=None, lazy=False)
-        self.field_data_cache.add_descriptor_descendents(self.section, depth=None)
+        if courseware_waffle().is_enabled(BLOCK_STRUCTURE_FIELD_DATA_PREFETCH):
+            self.field_data_cache.add_block_structure_descendents(
+                get_course_in_cache(self.course_key), self.section.location, depth=None,
+            )
+        else:
+            self.field_data_cache.add_descriptor_descendents(self.section, depth=None)
 
         # Bind section to user
         self.section = get_module_for_descriptor(
@@ -326,11 +326,14 @@ def single_thread(request, course_key, discussion_id, thread_id):
 
     if request.is_ajax():
         cc_user = cc.User.from_django_user(request.user)
-        user_info = cc_user.to_dict()
         is_staff = has_permission(request.user, 'openclose_thread', course.id)
 
-        thread = _find_thread(request, course, discussion_id=discussion_id, thread_id=thread_id)
-        if not thread:
+        # The user and the thread are independent, so fetch them concurrently.
+        user_info, thread = cc.perform_concurrently(
+            cc_user.to_dict,
+            lambda: _retrieve_thread(request, thread_id),
+        )
+        if not (thread and _can_see_thread(request, course, discussion_id, thread)):
             raise Http404
 
         with newrelic_function_trace("get_annotated_content_infos"):
@@ -368,8 +371,22 @@ def _find_thread(request, course, discussion_id, thread_id):
     Returns:
         The thread in question if the user can see it, else None.
     """
+    thread = _retrieve_thread(request, thread_id)
+    if thread and _can_see_thread(request, course, discussion_id, thread):
+        return thread
+    return None
+
+
+def _retrieve_thread(request, thread_id):
+    """
+    Retrieves the discussion thread with the specified ID from the comments
+    service, with its responses for AJAX requests.
+
+    Returns:
+        The thread in question, or None if it doesn't exist.
+    """
     try:
-        thread = cc.Thread.find(thread_id).retrieve(
+        return cc.Thread.find(thread_id).retrieve(
             with_responses=request.is_ajax(),
             recursive=request.is_ajax(),
             user_id=request.user.id,
@@ -379,10 +396,15 @@ def _find_thread(request, course, discussion_id, thread_id):
     except cc.utils.CommentClientRequestError:
         return None
 
+
+def _can_see_thread(request, course, discussion_id, thread):
+    """
+    Returns whether the user can see the given thread of the discussion.
+    """
     # Verify that the student has access to this thread if belongs to a course discussion module
     thread_context = getattr(thread, "context", "course")
     if thread_context == "course" and not utils.discussion_category_id_access(course, request.user, discussion_id):
-        return None
+        return False
 
     # verify that the thread belongs to the requesting student's group
     is_moderator = has_permission(request.user, "see_all_cohorts", course.id)
@@ -390,9 +412,9 @@ def _find_thread(request, course, discussion_id, thread_id):
     if is_commentable_divided(course.id, discussion_id, course_discussion_settings) and not is_moderator:
         user_group_id = get_group_id_for_user(request.user, course_discussion_settings)
         if getattr(thread, "group_id", None) is not None and user_group_id != thread.group_id:
-            return None
+            return False
 
-    return thread
+    return True
 
 
 def _create_base_discussion_view_context(request, course_key):
@@ -25,7 +25,7 @@ from discussion_api.permissions import (
 )
 from discussion_api.serializers import CommentSerializer, DiscussionTopicSerializer, ThreadSerializer, get_context
 from django_comment_client.base.views import track_comment_created_event, track_thread_created_event, track_voted_event
-from django_comment_client.utils import get_accessible_discussion_xblocks, get_group_id_for_user, is_commentable_divided
+from django_comment_client.utils import get_accessible_discussion_index, get_group_id_for_user, is_commentable_divided
 from django_comment_common.signals import (
     thread_followed,
     thread_unfollowed,
@@ -220,41 +220,41 @@ def get_courseware_topics(request, course_key, course, topic_ids):
     courseware_topics = []
     existing_topic_ids = set()
 
-    def get_xblock_sort_key(xblock):
+    def get_entry_sort_key(entry):
         """
-        Get the sort key for the xblock (falling back to the discussion_target
-        setting if absent)
+        Get the sort key for the discussion index entry (falling back to the
+        discussion_target setting if absent)
         """
-        return xblock.sort_key or xblock.discussion_target
+        return entry["sort_key"] or entry["target"]
 
-    def get_sorted_xblocks(category):
-        """Returns key sorted xblocks by category"""
-        return sorted(xblocks_by_category[category], key=get_xblock_sort_key)
+    def get_sorted_entries(category):
+        """Returns key sorted discussion index entries by category"""
+        return sorted(entries_by_category[category], key=get_entry_sort_key)
 
-    discussion_xblocks = get_accessible_discussion_xblocks(course, request.user)
-    xblocks_by_category = defaultdict(list)
-    for xblock in discussion_xblocks:
-        xblocks_by_category[xblock.discussion_category].append(xblock)
+    discussion_entries = get_accessible_discussion_index(course, request.user)
+    entries_by_category = defaultdict(list)
+    for entry in discussion_entries:
+        entries_by_category[entry["category"]].append(entry)
 
-    for category in sorted(xblocks_by_category.keys()):
+    for category in sorted(entries_by_category.keys()):
         children = []
-        for xblock in get_sorted_xblocks(category):
-            if not topic_ids or xblock.discussion_id in topic_ids:
+        for entry in get_sorted_entries(category):
+            if not topic_ids or entry["id"] in topic_ids:
                 discussion_topic = DiscussionTopic(
-                    xblock.discussion_id,
-                    xblock.discussion_target,
-                    get_thread_list_url(request, course_key, [xblock.discussion_id]),
+                    entry["id"],
+                    entry["target"],
+                    get_thread_list_url(request, course_key, [entry["id"]]),
                 )
                 children.append(discussion_topic)
 
-                if topic_ids and xblock.discussion_id in topic_ids:
-                    existing_topic_ids.add(xblock.discussion_id)
+                if topic_ids and entry["id"] in topic_ids:
+                    existing_topic_ids.add(entry["id"])
 
         if not topic_ids or children:
             discussion_topic = DiscussionTopic(
                 None,
                 category,
-                get_thread_list_url(request, course_key, [item.discussion_id for item in get_sorted_xblocks(category)]),
+                get_thread_list_url(request, course_key, [item["id"] for item in get_sorted_entries(category)]),
                 children,
             )
             courseware_topics.append(DiscussionTopicSerializer(discussion_topic).data)
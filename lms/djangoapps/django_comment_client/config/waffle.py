@@ -0,0 +1,18 @@
+"""
+This module contains various configuration settings via
+waffle switches for the Discussions app.
+"""
+from openedx.core.djangoapps.waffle_utils import WaffleSwitchNamespace
+
+# Namespace
+WAFFLE_NAMESPACE = u'discussions'
+
+# Switches
+BLOCK_STRUCTURE_DISCUSSION_INDEX = u'block_structure_discussion_index'
+
+
+def waffle():
+    """
+    Returns the namespaced, cached, audited Waffle class for Discussions.
+    """
+    return WaffleSwitchNamespace(name=WAFFLE_NAMESPACE, log_prefix=u'Discussions: ')
@@ -15,6 +15,7 @@ from course_modes.models import CourseMode
 from course_modes.tests.factories import CourseModeFactory
 from courseware.tabs import get_course_tab_list
 from courseware.tests.factories import InstructorFactory
+from django_comment_client.config.waffle import BLOCK_STRUCTURE_DISCUSSION_INDEX, waffle
 from django_comment_client.constants import TYPE_ENTRY, TYPE_SUBCATEGORY
 from django_comment_client.tests.factories import RoleFactory
 from django_comment_client.tests.unicode import UnicodeTestMixin
@@ -29,12 +30,13 @@ from openedx.core.djangoapps.course_groups import cohorts
 from openedx.core.djangoapps.course_groups.cohorts import set_course_cohorted
 from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory, config_course_cohorts
 from openedx.core.djangoapps.util.testing import ContentGroupTestCase
+from request_cache.middleware import RequestCache
 from student.roles import CourseStaffRole
 from student.tests.factories import AdminFactory, CourseEnrollmentFactory, UserFactory
 from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.tests.django_utils import TEST_DATA_MIXED_MODULESTORE, ModuleStoreTestCase
-from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory, ToyCourseFactory
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory, ToyCourseFactory, check_mongo_calls
 
 
 @attr(shard=1)
@@ -342,6 +344,48 @@ class CachedDiscussionIdMapTestCase(ModuleStoreTestCase):
         self.assertFalse(utils.discussion_category_id_access(self.course, user, 'private_discussion_id'))
 
 
+@attr(shard=3)
+class DiscussionIndexIdMapTestCase(CachedDiscussionIdMapTestCase):
+    """
+    Tests that reading the discussion index from the course's block structure has the same behavior as searching
+    through the course.
+    """
+    def setUp(self):
+        super(DiscussionIndexIdMapTestCase, self).setUp()
+        switch_override = waffle().override(BLOCK_STRUCTURE_DISCUSSION_INDEX, active=True)
+        switch_override.__enter__()
+        self.addCleanup(switch_override.__exit__, None, None, None)
+
+    def test_no_xblock_loads(self):
+        # Load the block structure once, as the first forum request after a publish would.
+        utils.get_discussion_id_map(self.course, self.user)
+        RequestCache.clear_request_cache()
+
+        with check_mongo_calls(0):
+            metadata = utils.get_cached_discussion_id_map(self.course, ['test_discussion_id'], self.user)
+            self.assertTrue(utils.discussion_category_id_access(self.course, self.user, 'test_discussion_id_2'))
+        self.assertEqual(metadata.keys(), ['test_discussion_id'])
+
+    def test_category_map(self):
+        category_map = utils.get_discussion_category_map(self.course, self.user, exclude_unstarted=False)
+        self.assertEqual(
+            sorted(category_map['subcategories']),
+            ['Chapter', 'Chapter 2', 'Chapter 3'],
+        )
+        self.assertEqual(
+            category_map['subcategories']['Chapter 3']['entries']['Beta Testing']['id'],
+            'private_discussion_id',
+        )
+
+    def test_categories_ids_include_all(self):
+        self.assertItemsEqual(
+            utils.get_discussion_categories_ids(self.course, None, include_all=True),
+            self.course.top_level_discussion_topic_ids + [
+                'test_discussion_id', 'test_discussion_id_2', 'private_discussion_id'
+            ],
+        )
+
+
 class CategoryMapTestMixin(object):
     """
     Provides functionality for classes that test
@@ -1709,7 +1753,7 @@ class ClientConfigurationTestCase(TestCase):
         with self.assertRaises(CommentClientMaintenanceError):
             perform_request('GET', 'http://www.google.com')
 
-    @patch('requests.request')
+    @patch('lms.lib.comment_client.utils.http_request')
     def test_enabled(self, mock_request):
         """Ensures that requests proceed normally when forums are enabled."""
         config = ForumsConfig.current()
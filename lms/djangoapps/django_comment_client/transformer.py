@@ -0,0 +1,89 @@
+"""
+Discussion Index Transformer
+"""
+from openedx.core.djangoapps.content.block_structure.transformer import BlockStructureTransformer
+
+# Block types of the xblocks holding a course's inline discussions.
+DISCUSSION_BLOCK_TYPES = ('discussion', 'discussion-forum')
+
+
+class DiscussionIndexTransformer(BlockStructureTransformer):
+    """
+    The DiscussionIndexTransformer collects the metadata of the discussion
+    xblocks of a course, so that its discussion category map and discussion
+    id map can be built from the course's block structure, without loading
+    the xblocks.
+
+    The following value is stored as a transformer_block_field for each
+    discussion block which has a discussion_id, discussion_category and
+    discussion_target:
+
+        entry: (dict) the block's discussion index entry, as returned
+            by index_entry.
+
+    Whether a user can access the discussion blocks, per their start
+    dates, visibility and group access, is enforced by the course blocks
+    access transformers, so no runtime transformations are performed.
+    """
+    WRITE_VERSION = 1
+    READ_VERSION = 1
+    SUPPORTS_INCREMENTAL_COLLECT = True
+
+    ENTRY = 'entry'
+
+    # Fields a discussion xblock needs to be in the index.
+    REQUIRED_KEYS = ('discussion_id', 'discussion_category', 'discussion_target')
+
+    @classmethod
+    def name(cls):
+        """
+        Unique identifier for the transformer's class;
+        same identifier used in setup.py.
+        """
+        return u'discussion_index'
+
+    @classmethod
+    def collect(cls, block_structure):
+        """
+        Collects the discussion index entry of each discussion block.
+        """
+        for block_key in block_structure.topological_traversal():
+            if block_key.block_type not in DISCUSSION_BLOCK_TYPES:
+                continue
+            xblock = block_structure.get_xblock(block_key)
+            if all(getattr(xblock, key, None) is not None for key in cls.REQUIRED_KEYS):
+                block_structure.set_transformer_block_field(block_key, cls, cls.ENTRY, cls.index_entry(xblock))
+
+    def transform(self, usage_info, block_structure):
+        """
+        Perform no transformations.
+        """
+        pass
+
+    @staticmethod
+    def index_entry(xblock):
+        """
+        Returns the discussion index entry of the given discussion xblock: a
+        dict with its discussion id, category, target, sort key and start
+        date.  Entries read from the index also have the block's location.
+        """
+        return {
+            'id': xblock.discussion_id,
+            'category': xblock.discussion_category,
+            'target': xblock.discussion_target,
+            'sort_key': xblock.sort_key,
+            'start': xblock.start,
+        }
+
+    @classmethod
+    def get_entries(cls, block_structure):
+        """
+        Returns the discussion index entries of the blocks of the given
+        block structure, in course order.
+        """
+        entries = []
+        for block_key in block_structure.topological_traversal():
+            entry = block_structure.get_transformer_block_field(block_key, cls, cls.ENTRY)
+            if entry is not None:
+                entries.append(dict(entry, location=block_key))
+        return entries
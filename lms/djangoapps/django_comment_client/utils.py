@@ -15,12 +15,15 @@ from django.core.urlresolvers import reverse
 from django.db import connection
 from django.http import HttpResponse
 from django.utils.timezone import UTC
+from django_comment_client.config.waffle import BLOCK_STRUCTURE_DISCUSSION_INDEX, waffle
 from django_comment_client.constants import TYPE_ENTRY, TYPE_SUBCATEGORY
 from django_comment_client.permissions import check_permissions_by_view, has_permission, get_team
 from django_comment_client.settings import MAX_COMMENT_DEPTH
+from django_comment_client.transformer import DiscussionIndexTransformer
 from django_comment_common.models import FORUM_ROLE_STUDENT, CourseDiscussionSettings, Role
 from django_comment_common.utils import get_course_discussion_settings
 from edxmako import lookup_template
+from lms.djangoapps.course_blocks.api import get_course_blocks
 from opaque_keys.edx.keys import CourseKey
 from opaque_keys.edx.locations import i4xEncoder
 from request_cache.middleware import request_cached
@@ -29,6 +32,7 @@ from xmodule.modulestore.django import modulestore
 from xmodule.partitions.partitions import ENROLLMENT_TRACK_PARTITION_ID
 from xmodule.partitions.partitions_service import PartitionService
 
+from openedx.core.djangoapps.content.block_structure.api import get_block_structure_manager
 from openedx.core.djangoapps.content.course_structures.models import CourseStructure
 from openedx.core.djangoapps.course_groups.cohorts import get_cohort_id, get_cohort_names, is_course_cohorted, \
     get_cohort_by_id
@@ -142,15 +146,57 @@ def get_accessible_discussion_xblocks(course, user, include_all=False):  # pylin
     ]
 
 
+def get_accessible_discussion_index(course, user, include_all=False):
+    """
+    Return the discussion index entries, as returned by
+    DiscussionIndexTransformer.index_entry along with their location, of all
+    valid discussion xblocks in this course that are accessible to the given user.
+
+    When the discussions.block_structure_discussion_index switch is enabled,
+    the entries are read from the course's block structure instead of the xblocks.
+    """
+    if waffle().is_enabled(BLOCK_STRUCTURE_DISCUSSION_INDEX):
+        return _get_block_structure_discussion_index(course.id, None if include_all else user)
+
+    return [
+        dict(DiscussionIndexTransformer.index_entry(xblock), location=xblock.location)
+        for xblock in get_accessible_discussion_xblocks(course, user, include_all=include_all)
+    ]
+
+
+@request_cached
+def _get_block_structure_discussion_index(course_key, user):
+    """
+    Return the discussion index entries of the blocks of the course's block
+    structure that are accessible to the given user, or of all its blocks
+    if user is None.
+    """
+    if user is None:
+        block_structure = get_block_structure_manager(course_key).get_collected()
+    else:
+        block_structure = get_course_blocks(user, modulestore().make_course_usage_key(course_key))
+    return DiscussionIndexTransformer.get_entries(block_structure)
+
+
 def get_discussion_id_map_entry(xblock):
     """
     Returns a tuple of (discussion_id, metadata) suitable for inclusion in the results of get_discussion_id_map().
     """
+    return get_discussion_index_id_map_entry(
+        dict(DiscussionIndexTransformer.index_entry(xblock), location=xblock.location)
+    )
+
+
+def get_discussion_index_id_map_entry(entry):
+    """
+    Returns a tuple of (discussion_id, metadata) suitable for inclusion in the results of get_discussion_id_map(),
+    for the given discussion index entry.
+    """
     return (
-        xblock.discussion_id,
+        entry["id"],
         {
-            "location": xblock.location,
-            "title": xblock.discussion_category.split("/")[-1].strip() + (" / " + xblock.discussion_target if xblock.discussion_target else "")
+            "location": entry["location"],
+            "title": entry["category"].split("/")[-1].strip() + (" / " + entry["target"] if entry["target"] else "")
         }
     )
 
@@ -182,6 +228,14 @@ def get_cached_discussion_id_map(course, discussion_ids, user):
     Returns a dict mapping discussion_ids to respective discussion xblock metadata if it is cached and visible to the
     user. If not, returns the result of get_discussion_id_map
     """
+    if waffle().is_enabled(BLOCK_STRUCTURE_DISCUSSION_INDEX):
+        discussion_ids = set(discussion_ids)
+        return dict(
+            get_discussion_index_id_map_entry(entry)
+            for entry in get_accessible_discussion_index(course, user)
+            if entry["id"] in discussion_ids
+        )
+
     try:
         entries = []
         for discussion_id in discussion_ids:
@@ -202,7 +256,7 @@ def get_discussion_id_map(course, user):
     Transform the list of this course's discussion xblocks (visible to a given user) into a dictionary of metadata keyed
     by discussion_id.
     """
-    return dict(map(get_discussion_id_map_entry, get_accessible_discussion_xblocks(course, user)))
+    return dict(map(get_discussion_index_id_map_entry, get_accessible_discussion_index(course, user)))
 
 
 def _filter_unstarted_categories(category_map, course):
@@ -311,19 +365,19 @@ def get_discussion_category_map(course, user, divided_only_if_explicit=False, ex
     """
     unexpanded_category_map = defaultdict(list)
 
-    xblocks = get_accessible_discussion_xblocks(course, user)
+    entries = get_accessible_discussion_index(course, user)
 
     discussion_settings = get_course_discussion_settings(course.id)
     discussion_division_enabled = course_discussion_division_enabled(discussion_settings)
     divided_discussion_ids = discussion_settings.divided_discussions
 
-    for xblock in xblocks:
-        discussion_id = xblock.discussion_id
-        title = xblock.discussion_target
-        sort_key = xblock.sort_key
-        category = " / ".join([x.strip() for x in xblock.discussion_category.split("/")])
-        # Handle case where xblock.start is None
-        entry_start_date = xblock.start if xblock.start else datetime.max.replace(tzinfo=pytz.UTC)
+    for index_entry in entries:
+        discussion_id = index_entry["id"]
+        title = index_entry["target"]
+        sort_key = index_entry["sort_key"]
+        category = " / ".join([x.strip() for x in index_entry["category"].split("/")])
+        # Handle case where the xblock's start is None
+        entry_start_date = index_entry["start"] if index_entry["start"] else datetime.max.replace(tzinfo=pytz.UTC)
         unexpanded_category_map[category].append({"title": title,
                                                   "id": discussion_id,
                                                   "sort_key": sort_key,
@@ -410,6 +464,8 @@ def discussion_category_id_access(course, user, discussion_id, xblock=None):
     """
     if discussion_id in course.top_level_discussion_topic_ids:
         return True
+    if not xblock and waffle().is_enabled(BLOCK_STRUCTURE_DISCUSSION_INDEX):
+        return any(entry["id"] == discussion_id for entry in get_accessible_discussion_index(course, user))
     try:
         if not xblock:
             key = get_cached_discussion_key(course.id, discussion_id)
@@ -433,7 +489,7 @@ def get_discussion_categories_ids(course, user, include_all=False):
 
     """
     accessible_discussion_ids = [
-        xblock.discussion_id for xblock in get_accessible_discussion_xblocks(course, user, include_all=include_all)
+        entry["id"] for entry in get_accessible_discussion_index(course, user, include_all=include_all)
     ]
     return course.top_level_discussion_topic_ids + accessible_discussion_ids
 
@@ -0,0 +1,177 @@
+"""
+GradesBulkContext Class
+"""
+from collections import defaultdict
+from logging import getLogger
+
+from django.db import IntegrityError, transaction
+from lazy import lazy
+from submissions.models import ScoreSummary
+
+from courseware.model_data import ScoresClient
+from lms.djangoapps.grades.config import should_persist_grades
+from lms.djangoapps.grades.models import PersistentCourseGrade, PersistentSubsectionGrade, VisibleBlocks
+from lms.djangoapps.grades.scores import possibly_scored
+from student.models import anonymous_id_for_user
+
+from .subsection_grade import SubsectionGrade
+
+log = getLogger(__name__)
+
+
+class GradesBulkContext(object):
+    """
+    Grading data for a chunk of users in a course, retrieved with a few
+    set-based queries for the entire chunk rather than with separate
+    queries for each user.
+
+    Also collects the new subsection grades computed for the users in
+    the chunk, so they can be created together with a single bulk insert,
+    and the course grades, to be saved only after those are created.
+    """
+    def __init__(self, course_data, users):
+        self.course_data = course_data
+        self.users = users
+        self._unsaved_subsection_grades = []
+        self._unsaved_course_grades = {}
+
+    def csm_scores(self, user):
+        """
+        Returns the ScoresClient, with the scores stored in the user
+        state (in CSM), for the given user.
+        """
+        return self._csm_scores_by_user[user.id]
+
+    def submissions_scores(self, user):
+        """
+        Returns the scores stored by the Submissions API for the given user.
+        """
+        return self._submissions_scores_by_user[user.id]
+
+    def persisted_course_grade(self, user):
+        """
+        Returns the persisted course grade of the given user.
+
+        Raises PersistentCourseGrade.DoesNotExist if the user has none.
+        """
+        try:
+            return self._course_grades_by_user[user.id]
+        except KeyError:
+            raise PersistentCourseGrade.DoesNotExist
+
+    def subsection_grades(self, user):
+        """
+        Returns the persisted subsection grades of the given user,
+        keyed by subsection usage key.
+        """
+        return dict(self._subsection_grades_by_user[user.id])
+
+    def add_unsaved_subsection_grades(self, user, subsection_grades):
+        """
+        Adds the given not yet persisted subsection grades of the given
+        user to be created with the next call to bulk_create_unsaved.
+        """
+        self._unsaved_subsection_grades.extend((user, subsection_grade) for subsection_grade in subsection_grades)
+
+    def add_unsaved_course_grade(self, user, save_course_grade):
+        """
+        Adds the function saving the course grade of the given user,
+        to be called once the unsaved subsection grades are created.
+        """
+        self._unsaved_course_grades[user.id] = save_course_grade
+
+    def pop_unsaved_course_grade(self, user):
+        """
+        Removes and returns the function saving the course grade of the
+        given user, or None if there is none.
+        """
+        return self._unsaved_course_grades.pop(user.id, None)
+
+    def bulk_create_unsaved(self):
+        """
+        Bulk creates the unsaved subsection grades of all users.
+        """
+        if not self._unsaved_subsection_grades:
+            return
+
+        course_key = self.course_data.course_key
+        try:
+            with transaction.atomic():
+                SubsectionGrade.bulk_create_models_for_students(self._unsaved_subsection_grades, course_key)
+        except IntegrityError:
+            # A grade was concurrently created by another process since
+            # the persisted grades were read.  Fall back to updating the
+            # grades one at a time.  Any visible blocks created within
+            # the rolled back transaction are no longer valid in the cache.
+            log.warning(u'Grades: GBC.bulk_create_unsaved, course: %s, falling back to update', course_key)
+            VisibleBlocks.clear_cache(course_key)
+            for user, subsection_grade in self._unsaved_subsection_grades:
+                subsection_grade.update_or_create_model(user)
+        self._unsaved_subsection_grades = []
+
+    @lazy
+    def _course_grades_by_user(self):
+        """
+        Queries and returns the persisted course grades of all users.
+        """
+        if not should_persist_grades(self.course_data.course_key):
+            return {}
+        return {
+            grade.user_id: grade
+            for grade in PersistentCourseGrade.objects.filter(
+                user_id__in=[user.id for user in self.users], course_id=self.course_data.course_key,
+            )
+        }
+
+    @lazy
+    def _csm_scores_by_user(self):
+        """
+        Queries and returns all the scores stored in the user state (in
+        CSM) for the course, for all users.
+        """
+        collected_structure = self.course_data.collected_structure
+        scorable_locations = [block_key for block_key in collected_structure if possibly_scored(block_key)]
+        return ScoresClient.create_for_users(
+            self.course_data.course_key, [user.id for user in self.users], scorable_locations,
+        )
+
+    @lazy
+    def _submissions_scores_by_user(self):
+        """
+        Queries and returns the scores stored by the Submissions API for
+        the course, for all users, in the format returned by the
+        Submissions API's get_scores.
+        """
+        course_key = self.course_data.course_key
+        user_ids_by_anonymous_id = {
+            anonymous_id_for_user(user, course_key, save=False): user.id
+            for user in self.users
+        }
+        score_summaries = ScoreSummary.objects.filter(
+            student_item__course_id=str(course_key),
+            student_item__student_id__in=user_ids_by_anonymous_id.keys(),
+        ).select_related('latest', 'student_item')
+
+        scores_by_user = {user.id: {} for user in self.users}
+        for summary in score_summaries:
+            if not summary.latest.is_hidden():
+                user_id = user_ids_by_anonymous_id[summary.student_item.student_id]
+                scores_by_user[user_id][summary.student_item.item_id] = {
+                    'points_earned': summary.latest.points_earned,
+                    'points_possible': summary.latest.points_possible,
+                    'created_at': summary.latest.created_at,
+                }
+        return scores_by_user
+
+    @lazy
+    def _subsection_grades_by_user(self):
+        """
+        Queries and returns all the persisted subsection grades for
+        the course, for all users.
+        """
+        grades_by_user = defaultdict(dict)
+        for record in PersistentSubsectionGrade.bulk_read_grades_for_users(
+                [user.id for user in self.users], self.course_data.course_key,
+        ):
+            grades_by_user[record.user_id][record.full_usage_key] = record
+        return grades_by_user
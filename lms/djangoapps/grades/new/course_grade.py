@@ -4,6 +4,7 @@ CourseGrade Class
 from abc import abstractmethod
 from collections import OrderedDict, defaultdict
 
+import numpy
 from django.conf import settings
 from lazy import lazy
 
@@ -199,8 +200,11 @@ class CourseGrade(CourseGradeBase):
     Course Grade class when grades are updated or read from storage.
     """
     def __init__(self, user, course_data, *args, **kwargs):
+        bulk_context = kwargs.pop('bulk_context', None)
         super(CourseGrade, self).__init__(user, course_data, *args, **kwargs)
-        self._subsection_grade_factory = SubsectionGradeFactory(user, course_data=course_data)
+        self._subsection_grade_factory = SubsectionGradeFactory(
+            user, course_data=course_data, bulk_context=bulk_context,
+        )
 
     def update(self):
         """
@@ -232,6 +236,24 @@ class CourseGrade(CourseGradeBase):
         else:
             return self._subsection_grade_factory.create(subsection, read_only=True)
 
+    @classmethod
+    def compute_batch(cls, grade_cutoffs, grader_percents):
+        """
+        Computes the grade percentages, letter grades and passed values
+        of many learners at once, given an array of the percents computed
+        by the course grader for the learners, such as the percents of the
+        result of the grader's grade_batch.  The values are identical to
+        those computed by update for each learner.
+
+        Returns a tuple of (percents array, letter grades list, passed list).
+        """
+        percents = cls._compute_percents_batch(numpy.asarray(grader_percents, dtype=float))
+        return (
+            percents,
+            cls._compute_letter_grades_batch(grade_cutoffs, percents),
+            cls._compute_passed_batch(grade_cutoffs, percents),
+        )
+
     @staticmethod
     def _compute_percent(grader_result):
         """
@@ -267,3 +289,46 @@ class CourseGrade(CourseGradeBase):
         nonzero_cutoffs = [cutoff for cutoff in grade_cutoffs.values() if cutoff > 0]
         success_cutoff = min(nonzero_cutoffs) if nonzero_cutoffs else None
         return success_cutoff and percent >= success_cutoff
+
+    @staticmethod
+    def _compute_percents_batch(grader_percents):
+        """
+        Batch equivalent of _compute_percent, for an array of the
+        percents computed by the grader.
+        """
+        values = grader_percents * 100 + 0.05
+
+        # Python 2's round rounds halfway values away from zero, unlike
+        # numpy's round, so round the magnitudes to the nearest integer
+        # explicitly.  Subtracting the floor of a non-negative value is exact.
+        magnitudes = numpy.absolute(values)
+        floors = numpy.floor(magnitudes)
+        rounded = numpy.where(magnitudes - floors >= 0.5, floors + 1, floors)
+
+        # round keeps the sign of the value, including for values rounded to zero.
+        return numpy.copysign(rounded, values) / 100
+
+    @staticmethod
+    def _compute_letter_grades_batch(grade_cutoffs, percents):
+        """
+        Batch equivalent of _compute_letter_grade, for an array of percents.
+        """
+        letter_grades = [None] * len(percents)
+        descending_grades = sorted(grade_cutoffs, key=lambda x: grade_cutoffs[x], reverse=True)
+        for possible_grade in reversed(descending_grades):
+            # Assign from the lowest to the highest grade, so the highest
+            # grade reached by each percent is the one that remains.
+            for index in numpy.flatnonzero(percents >= grade_cutoffs[possible_grade]):
+                letter_grades[index] = possible_grade
+        return letter_grades
+
+    @staticmethod
+    def _compute_passed_batch(grade_cutoffs, percents):
+        """
+        Batch equivalent of _compute_passed, for an array of percents.
+        """
+        nonzero_cutoffs = [cutoff for cutoff in grade_cutoffs.values() if cutoff > 0]
+        success_cutoff = min(nonzero_cutoffs) if nonzero_cutoffs else None
+        if not success_cutoff:
+            return [success_cutoff] * len(percents)
+        return (percents >= success_cutoff).tolist()
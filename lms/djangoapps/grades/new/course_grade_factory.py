@@ -1,5 +1,7 @@
 from collections import namedtuple
 from contextlib import contextmanager
+from functools import partial
+from itertools import islice
 from logging import getLogger
 
 import dogstats_wrapper as dog_stats_api
@@ -7,8 +9,9 @@ import dogstats_wrapper as dog_stats_api
 from openedx.core.djangoapps.signals.signals import COURSE_GRADE_CHANGED, COURSE_GRADE_NOW_PASSED
 
 from ..config import assume_zero_if_absent, should_persist_grades
-from ..config.waffle import WRITE_ONLY_IF_ENGAGED, waffle
+from ..config.waffle import BULK_COMPUTE_GRADES, WRITE_ONLY_IF_ENGAGED, waffle
 from ..models import PersistentCourseGrade, VisibleBlocks
+from .bulk_context import GradesBulkContext
 from .course_data import CourseData
 from .course_grade import CourseGrade, ZeroCourseGrade
 
@@ -21,6 +24,9 @@ class CourseGradeFactory(object):
     """
     GradeResult = namedtuple('GradeResult', ['student', 'course_grade', 'error'])
 
+    # Number of students graded together when grades are computed in bulk.
+    BULK_CHUNK_SIZE = 100
+
     def create(self, user, course=None, collected_block_structure=None, course_structure=None, course_key=None):
         """
         Returns the CourseGrade for the given user in the course.
@@ -33,17 +39,7 @@ class CourseGradeFactory(object):
         or course_key should be provided.
         """
         course_data = CourseData(user, course, collected_block_structure, course_structure, course_key)
-        try:
-            course_grade, read_policy_hash = self._read(user, course_data)
-            if read_policy_hash == course_data.grading_policy_hash:
-                return course_grade
-            read_only = False  # update the persisted grade since the policy changed; TODO(TNL-6786) remove soon
-        except PersistentCourseGrade.DoesNotExist:
-            if assume_zero_if_absent(course_data.course_key):
-                return self._create_zero(user, course_data)
-            read_only = True  # keep the grade un-persisted; TODO(TNL-6786) remove once all grades are backfilled
-
-        return self._update(user, course_data, read_only)
+        return self._create(user, course_data)
 
     def read(self, user, course=None, collected_block_structure=None, course_structure=None, course_key=None):
         """
@@ -109,6 +105,10 @@ class CourseGradeFactory(object):
 
         If an error occurred, course_grade will be None and err_msg will be an
         exception message. If there was no error, err_msg is an empty string.
+
+        If the BULK_COMPUTE_GRADES switch is enabled, students are graded in
+        chunks, for which scores and persisted grades are read, and new
+        subsection grades are created, together.
         """
         # Pre-fetch the collected course_structure so:
         # 1. Correctness: the same version of the course is used to
@@ -120,9 +120,39 @@ class CourseGradeFactory(object):
         )
         stats_tags = [u'action:{}'.format(course_data.course_key)]
         with self._course_transaction(course_data.course_key):
-            for user in users:
-                with dog_stats_api.timer('lms.grades.CourseGradeFactory.iter', tags=stats_tags):
-                    yield self._iter_grade_result(user, course_data, force_update)
+            if waffle().is_enabled(BULK_COMPUTE_GRADES):
+                for result in self._iter_bulk(users, course_data, force_update, stats_tags):
+                    yield result
+            else:
+                for user in users:
+                    with dog_stats_api.timer('lms.grades.CourseGradeFactory.iter', tags=stats_tags):
+                        yield self._iter_grade_result(user, course_data, force_update)
+
+    def _iter_bulk(self, users, course_data, force_update, stats_tags):
+        """
+        Yields a GradeResult for every student, grading the students
+        in chunks of BULK_CHUNK_SIZE.
+
+        The course grades of a chunk are saved, and their signals sent,
+        only once the chunk's subsection grades are created.
+        """
+        users = iter(users)
+        while True:
+            users_chunk = list(islice(users, self.BULK_CHUNK_SIZE))
+            if not users_chunk:
+                break
+
+            with dog_stats_api.timer('lms.grades.CourseGradeFactory.iter_bulk', tags=stats_tags):
+                bulk_context = GradesBulkContext(course_data, users_chunk)
+                results = [
+                    self._iter_bulk_grade_result(user, course_data, force_update, bulk_context)
+                    for user in users_chunk
+                ]
+                bulk_context.bulk_create_unsaved()
+                results = [self._save_bulk_grade_result(result, course_data, bulk_context) for result in results]
+
+            for result in results:
+                yield result
 
     def _iter_grade_result(self, user, course_data, force_update):
         try:
@@ -149,6 +179,70 @@ class CourseGradeFactory(object):
             )
             return self.GradeResult(user, None, exc)
 
+    def _iter_bulk_grade_result(self, user, course_data, force_update, bulk_context):
+        """
+        Returns the GradeResult for the given student, using the data
+        prefetched in the given bulk context.
+        """
+        try:
+            user_course_data = CourseData(
+                user,
+                course=course_data.course,
+                collected_block_structure=course_data.collected_structure,
+                course_key=course_data.course_key,
+            )
+            if force_update:
+                course_grade = self._update(
+                    user, user_course_data, read_only=False, force_update_subsections=True, bulk_context=bulk_context,
+                )
+            else:
+                course_grade = self._create(user, user_course_data, bulk_context)
+            return self.GradeResult(user, course_grade, None)
+        except Exception as exc:  # pylint: disable=broad-except
+            log.exception(
+                'Cannot grade student %s in course %s because of exception: %s',
+                user.id,
+                course_data.course_key,
+                exc.message
+            )
+            return self.GradeResult(user, None, exc)
+
+    def _save_bulk_grade_result(self, result, course_data, bulk_context):
+        """
+        Saves the course grade of the given GradeResult, whose saving was
+        deferred by the given bulk context, and returns the GradeResult.
+        """
+        save_course_grade = bulk_context.pop_unsaved_course_grade(result.student)
+        if save_course_grade is None:
+            return result
+        try:
+            save_course_grade()
+            return result
+        except Exception as exc:  # pylint: disable=broad-except
+            log.exception(
+                'Cannot grade student %s in course %s because of exception: %s',
+                result.student.id,
+                course_data.course_key,
+                exc.message
+            )
+            return self.GradeResult(result.student, None, exc)
+
+    def _create(self, user, course_data, bulk_context=None):
+        """
+        Returns the CourseGrade for the given user, as described in create.
+        """
+        try:
+            course_grade, read_policy_hash = self._read(user, course_data, bulk_context)
+            if read_policy_hash == course_data.grading_policy_hash:
+                return course_grade
+            read_only = False  # update the persisted grade since the policy changed; TODO(TNL-6786) remove soon
+        except PersistentCourseGrade.DoesNotExist:
+            if assume_zero_if_absent(course_data.course_key):
+                return self._create_zero(user, course_data)
+            read_only = True  # keep the grade un-persisted; TODO(TNL-6786) remove once all grades are backfilled
+
+        return self._update(user, course_data, read_only, bulk_context=bulk_context)
+
     @staticmethod
     def _create_zero(user, course_data):
         """
@@ -158,7 +252,7 @@ class CourseGradeFactory(object):
         return ZeroCourseGrade(user, course_data)
 
     @staticmethod
-    def _read(user, course_data):
+    def _read(user, course_data, bulk_context=None):
         """
         Returns a CourseGrade object based on stored grade information
         for the given user and course.
@@ -166,27 +260,33 @@ class CourseGradeFactory(object):
         if not should_persist_grades(course_data.course_key):
             raise PersistentCourseGrade.DoesNotExist
 
-        persistent_grade = PersistentCourseGrade.read(user.id, course_data.course_key)
+        if bulk_context:
+            persistent_grade = bulk_context.persisted_course_grade(user)
+        else:
+            persistent_grade = PersistentCourseGrade.read(user.id, course_data.course_key)
         course_grade = CourseGrade(
             user,
             course_data,
             persistent_grade.percent_grade,
             persistent_grade.letter_grade,
             persistent_grade.passed_timestamp is not None,
+            bulk_context=bulk_context,
         )
         log.info(u'Grades: Read, %s, User: %s, %s', unicode(course_data), user.id, persistent_grade)
 
         return course_grade, persistent_grade.grading_policy_hash
 
     @staticmethod
-    def _update(user, course_data, read_only, force_update_subsections=False):
+    def _update(user, course_data, read_only, force_update_subsections=False, bulk_context=None):
         """
         Computes, saves, and returns a CourseGrade object for the
         given user and course.
-        Sends a COURSE_GRADE_CHANGED signal to listeners and a
-        COURSE_GRADE_NOW_PASSED if learner has passed course.
+        Within a bulk context, saving is deferred until the bulk context's
+        subsection grades are created.
         """
-        course_grade = CourseGrade(user, course_data, force_update_subsections=force_update_subsections)
+        course_grade = CourseGrade(
+            user, course_data, force_update_subsections=force_update_subsections, bulk_context=bulk_context,
+        )
         course_grade.update()
 
         should_persist = (
@@ -196,6 +296,22 @@ class CourseGradeFactory(object):
         )
         if should_persist:
             course_grade._subsection_grade_factory.bulk_create_unsaved()
+
+        save_course_grade = partial(CourseGradeFactory._save, user, course_data, course_grade, should_persist)
+        if bulk_context:
+            bulk_context.add_unsaved_course_grade(user, save_course_grade)
+        else:
+            save_course_grade()
+        return course_grade
+
+    @staticmethod
+    def _save(user, course_data, course_grade, should_persist):
+        """
+        Saves the given CourseGrade object, if should_persist.
+        Sends a COURSE_GRADE_CHANGED signal to listeners and a
+        COURSE_GRADE_NOW_PASSED if learner has passed course.
+        """
+        if should_persist:
             PersistentCourseGrade.update_or_create(
                 user_id=user.id,
                 course_id=course_data.course_key,
@@ -225,5 +341,3 @@ class CourseGradeFactory(object):
             u'Grades: Update, %s, User: %s, %s, persisted: %s',
             course_data.full_string(), user.id, course_grade, should_persist,
         )
-
-        return course_grade
@@ -138,9 +138,23 @@ class SubsectionGrade(SubsectionGradeBase):
         """
         Saves the subsection grade in a persisted model.
         """
-        subsection_grades = filter(lambda subs_grade: subs_grade._should_persist_per_attempted, subsection_grades)
+        return cls.bulk_create_models_for_students(
+            [(student, subsection_grade) for subsection_grade in subsection_grades],
+            course_key,
+        )
+
+    @classmethod
+    def bulk_create_models_for_students(cls, student_subsection_grades, course_key):
+        """
+        Saves the subsection grades, given as (student, subsection_grade)
+        tuples for any number of students, in persisted models.
+        """
         return PersistentSubsectionGrade.bulk_create_grades(
-            [subsection_grade._persisted_model_params(student) for subsection_grade in subsection_grades],  # pylint: disable=protected-access
+            [
+                subsection_grade._persisted_model_params(student)  # pylint: disable=protected-access
+                for student, subsection_grade in student_subsection_grades
+                if subsection_grade._should_persist_per_attempted  # pylint: disable=protected-access
+            ],
             course_key,
         )
 
@@ -21,9 +21,10 @@ class SubsectionGradeFactory(object):
     """
     Factory for Subsection Grades.
     """
-    def __init__(self, student, course=None, course_structure=None, course_data=None):
+    def __init__(self, student, course=None, course_structure=None, course_data=None, bulk_context=None):
         self.student = student
         self.course_data = course_data or CourseData(student, course=course, structure=course_structure)
+        self._bulk_context = bulk_context
 
         self._cached_subsection_grades = None
         self._unsaved_subsection_grades = OrderedDict()
@@ -57,10 +58,15 @@ class SubsectionGradeFactory(object):
     def bulk_create_unsaved(self):
         """
         Bulk creates all the unsaved subsection_grades to this point.
-        """
-        SubsectionGrade.bulk_create_models(
-            self.student, self._unsaved_subsection_grades.values(), self.course_data.course_key
-        )
+        If created within a bulk context, the grades are created later
+        along with those of the other users in the context.
+        """
+        if self._bulk_context:
+            self._bulk_context.add_unsaved_subsection_grades(self.student, self._unsaved_subsection_grades.values())
+        else:
+            SubsectionGrade.bulk_create_models(
+                self.student, self._unsaved_subsection_grades.values(), self.course_data.course_key
+            )
         self._unsaved_subsection_grades.clear()
 
     def update(self, subsection, only_if_higher=None):
@@ -93,8 +99,13 @@ class SubsectionGradeFactory(object):
                     ):
                         return orig_subsection_grade
 
-            grade_model = calculated_grade.update_or_create_model(self.student)
-            self._update_saved_subsection_grade(subsection.location, grade_model)
+            if self._bulk_context and subsection.location not in self._get_bulk_cached_subsection_grades():
+                # No grade is persisted for this subsection yet, so leave it to
+                # be created in bulk, along with the other unsaved grades.
+                self._unsaved_subsection_grades[subsection.location] = calculated_grade
+            else:
+                grade_model = calculated_grade.update_or_create_model(self.student)
+                self._update_saved_subsection_grade(subsection.location, grade_model)
 
         return calculated_grade
 
@@ -104,6 +115,8 @@ class SubsectionGradeFactory(object):
         Lazily queries and returns all the scores stored in the user
         state (in CSM) for the course, while caching the result.
         """
+        if self._bulk_context:
+            return self._bulk_context.csm_scores(self.student)
         scorable_locations = [block_key for block_key in self.course_data.structure if possibly_scored(block_key)]
         return ScoresClient.create_for_locations(self.course_data.course_key, self.student.id, scorable_locations)
 
@@ -113,6 +126,8 @@ class SubsectionGradeFactory(object):
         Lazily queries and returns the scores stored by the
         Submissions API for the course, while caching the result.
         """
+        if self._bulk_context:
+            return self._bulk_context.submissions_scores(self.student)
         anonymous_user_id = anonymous_id_for_user(self.student, self.course_data.course_key)
         return submissions_api.get_scores(str(self.course_data.course_key), anonymous_user_id)
 
@@ -136,7 +151,9 @@ class SubsectionGradeFactory(object):
         Returns and caches (for future access) the results of
         a bulk retrieval of all subsection grades in the course.
         """
-        if self._cached_subsection_grades is None:
+        if self._cached_subsection_grades is None and self._bulk_context:
+            self._cached_subsection_grades = self._bulk_context.subsection_grades(self.student)
+        elif self._cached_subsection_grades is None:
             self._cached_subsection_grades = {
                 record.full_usage_key: record
                 for record in PersistentSubsectionGrade.bulk_read_grades(self.student.id, self.course_data.course_key)
@@ -0,0 +1,109 @@
+"""
+Performance test comparing the per-user and bulk computation of
+course grades for many users.
+"""
+from __future__ import print_function
+
+import time
+import unittest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from capa.tests.response_xml_factory import MultipleChoiceResponseXMLFactory
+from courseware.models import StudentModule
+from student.models import CourseEnrollment
+from student.tests.factories import UserFactory
+from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+from ..config.waffle import BULK_COMPUTE_GRADES, waffle
+from ..models import PersistentCourseGrade, PersistentSubsectionGrade
+from ..new.course_grade_factory import CourseGradeFactory
+
+# Number of chapters, sequentials per chapter and problems per sequential
+# in the generated course.
+COURSE_SHAPE = (5, 4, 5)
+
+# Number of enrolled users to grade.
+NUM_USERS = 500
+
+
+# Eventually, exclude this attribute from regular unittests while running *only* tests
+# with this attribute during regular performance tests.
+# @attr("perf_test")
+@unittest.skip
+class CourseGradeIterPerf(SharedModuleStoreTestCase):
+    """
+    This class exists to time the computation of the grades of all
+    users in a course, per user and in bulk, and to compare the
+    number of queries made.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    @classmethod
+    def setUpClass(cls):
+        super(CourseGradeIterPerf, cls).setUpClass()
+        cls.course = CourseFactory.create()
+        cls.problems = []
+        problem_xml = MultipleChoiceResponseXMLFactory().build_xml(
+            question_text='The correct answer is Choice 3',
+            choices=[False, False, True, False],
+            choice_names=['choice_0', 'choice_1', 'choice_2', 'choice_3']
+        )
+        with cls.store.bulk_operations(cls.course.id):
+            for _ in range(COURSE_SHAPE[0]):
+                chapter = ItemFactory.create(parent=cls.course, category='chapter')
+                for _ in range(COURSE_SHAPE[1]):
+                    sequential = ItemFactory.create(
+                        parent=chapter, category='sequential', graded=True, format='Homework',
+                    )
+                    for _ in range(COURSE_SHAPE[2]):
+                        cls.problems.append(
+                            ItemFactory.create(parent=sequential, category='problem', data=problem_xml)
+                        )
+
+    def setUp(self):
+        super(CourseGradeIterPerf, self).setUp()
+        self.users = [UserFactory.create() for _ in range(NUM_USERS)]
+        student_modules = []
+        for index, user in enumerate(self.users):
+            CourseEnrollment.enroll(user, self.course.id)
+            for problem in self.problems[:index % len(self.problems)]:
+                student_modules.append(StudentModule(
+                    student=user,
+                    course_id=self.course.id,
+                    module_state_key=problem.location,
+                    module_type='problem',
+                    grade=1,
+                    max_grade=1,
+                ))
+        StudentModule.objects.bulk_create(student_modules)
+
+    def _time_iter(self, bulk):
+        """
+        Returns the wall time, in seconds, and the number of queries
+        made to compute and persist the grades of all users.
+        """
+        PersistentSubsectionGrade.objects.all().delete()
+        PersistentCourseGrade.objects.all().delete()
+        with waffle().override(BULK_COMPUTE_GRADES, active=bulk):
+            with CaptureQueriesContext(connection) as queries:
+                start = time.time()
+                for result in CourseGradeFactory().iter(users=self.users, course=self.course, force_update=True):
+                    self.assertIsNone(result.error)
+                elapsed = time.time() - start
+        return elapsed, len(queries)
+
+    def test_iter_timings(self):
+        results = [
+            ('per-user',) + self._time_iter(bulk=False),
+            ('bulk',) + self._time_iter(bulk=True),
+        ]
+
+        print('\nUsers: {}, Problems: {}'.format(len(self.users), len(self.problems)))
+        print('{:<10}{:>12}{:>12}'.format('mode', 'time (s)', 'queries'))
+        for result in results:
+            print('{:<10}{:>12.2f}{:>12}'.format(*result))
@@ -9,6 +9,7 @@ from django.dispatch import receiver
 from xblock.scorable import ScorableXBlockMixin, Score
 
 from courseware.model_data import get_score, set_score
+from courseware.tasks import schedule_grade_count_rebuild
 from eventtracking import tracker
 from openedx.core.lib.grade_utils import is_score_higher_or_equal
 from student.models import user_by_anonymous_id
@@ -237,6 +238,16 @@ def enqueue_subsection_update(sender, **kwargs):  # pylint: disable=unused-argum
     )
 
 
+@receiver(PROBLEM_WEIGHTED_SCORE_CHANGED)
+def enqueue_grade_count_update(sender, **kwargs):  # pylint: disable=unused-argument
+    """
+    Handles the PROBLEM_WEIGHTED_SCORE_CHANGED signal of scores stored in
+    StudentModule by scheduling a recount of the grade counts of the problem.
+    """
+    if kwargs['score_db_table'] == ScoreDatabaseTableEnum.courseware_student_module:
+        schedule_grade_count_rebuild(kwargs['course_id'], kwargs['usage_id'])
+
+
 @receiver(SUBSECTION_SCORE_CHANGED)
 def recalculate_course_grade(sender, course, course_structure, user, **kwargs):  # pylint: disable=unused-argument
     """
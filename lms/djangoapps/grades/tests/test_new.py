@@ -5,10 +5,14 @@ Test saved subsection grade functionality.
 
 import datetime
 import itertools
+import random
+from unittest import TestCase
 
 import ddt
 import pytz
 from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from mock import patch
 
 from capa.tests.response_xml_factory import MultipleChoiceResponseXMLFactory
@@ -16,6 +20,7 @@ from courseware.access import has_access
 from courseware.tests.test_submitting_problems import ProblemSubmissionTestMixin
 from lms.djangoapps.course_blocks.api import get_course_blocks
 from lms.djangoapps.grades.config.tests.utils import persistent_grades_feature_flags
+from openedx.core.djangoapps.signals.signals import COURSE_GRADE_CHANGED
 from openedx.core.djangolib.testing.utils import get_mock_request
 from student.models import CourseEnrollment
 from student.tests.factories import UserFactory
@@ -24,14 +29,14 @@ from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 from xmodule.modulestore.tests.utils import TEST_DATA_DIR
 from xmodule.modulestore.xml_importer import import_course_from_xml
 
-from ..config.waffle import ASSUME_ZERO_GRADE_IF_ABSENT, WRITE_ONLY_IF_ENGAGED, waffle
-from ..models import PersistentSubsectionGrade
+from ..config.waffle import ASSUME_ZERO_GRADE_IF_ABSENT, BULK_COMPUTE_GRADES, WRITE_ONLY_IF_ENGAGED, waffle
+from ..models import PersistentCourseGrade, PersistentSubsectionGrade
 from ..new.course_data import CourseData
 from ..new.course_grade import CourseGrade, ZeroCourseGrade
 from ..new.course_grade_factory import CourseGradeFactory
 from ..new.subsection_grade import SubsectionGrade, ZeroSubsectionGrade
 from ..new.subsection_grade_factory import SubsectionGradeFactory
-from .utils import mock_get_score, mock_get_submissions_score
+from .utils import answer_problem, mock_get_score, mock_get_submissions_score
 
 
 class GradeTestBase(SharedModuleStoreTestCase):
@@ -260,6 +265,120 @@ class TestCourseGradeFactory(GradeTestBase):
         self.assertTrue(desired_call.called)
         self.assertFalse(undesired_call.called)
 
+    def _iter_grades(self, users, force_update, bulk):
+        """
+        Returns the course grades, keyed by user id, computed by iter
+        with the given options, along with the number of queries made.
+        """
+        with waffle().override(BULK_COMPUTE_GRADES, active=bulk):
+            with CaptureQueriesContext(connection) as queries:
+                results = list(CourseGradeFactory().iter(users=users, course=self.course, force_update=force_update))
+        self.assertFalse([result.error for result in results if result.error])
+        return {result.student.id: result.course_grade for result in results}, len(queries)
+
+    def _persisted_subsection_grades(self, users):
+        """
+        Returns the persisted subsection grade values of the given users.
+        """
+        return {
+            (grade.user_id, grade.usage_key, grade.earned_all, grade.possible_all, grade.visible_blocks_id)
+            for grade in PersistentSubsectionGrade.objects.filter(user_id__in=[user.id for user in users])
+        }
+
+    @ddt.data(True, False)
+    def test_iter_bulk(self, force_update):
+        users = [self.request.user] + [UserFactory() for _ in range(4)]
+        for user in users[1:]:
+            CourseEnrollment.enroll(user, self.course.id)
+        answer_problem(self.course, get_mock_request(users[1]), self.problem)
+        answer_problem(self.course, get_mock_request(users[2]), self.problem2, score=1, max_value=2)
+        answer_problem(self.course, get_mock_request(users[3]), self.problem)
+        answer_problem(self.course, get_mock_request(users[3]), self.problem2)
+
+        expected_grades, per_user_queries = self._iter_grades(users, force_update, bulk=False)
+        expected_subsection_grades = self._persisted_subsection_grades(users)
+        PersistentSubsectionGrade.objects.all().delete()
+        PersistentCourseGrade.objects.all().delete()
+
+        with patch.object(CourseGradeFactory, 'BULK_CHUNK_SIZE', 3):
+            actual_grades, bulk_queries = self._iter_grades(users, force_update, bulk=True)
+
+        self.assertLess(bulk_queries, per_user_queries)
+        self.assertEqual(self._persisted_subsection_grades(users), expected_subsection_grades)
+        for user in users:
+            self.assertEqual(actual_grades[user.id].percent, expected_grades[user.id].percent)
+            self.assertEqual(actual_grades[user.id].letter_grade, expected_grades[user.id].letter_grade)
+            self.assertEqual(
+                [grade.graded_total for grade in actual_grades[user.id].subsection_grades.values()],
+                [grade.graded_total for grade in expected_grades[user.id].subsection_grades.values()],
+            )
+
+    def test_iter_bulk_existing_grades(self):
+        answer_problem(self.course, self.request, self.problem)
+        CourseGradeFactory().update(self.request.user, self.course)
+        answer_problem(self.course, self.request, self.problem2)
+
+        with waffle().override(BULK_COMPUTE_GRADES, active=True):
+            results = list(CourseGradeFactory().iter(users=[self.request.user], course=self.course, force_update=True))
+        self.assertIsNone(results[0].error)
+        self.assertEqual(results[0].course_grade.percent, 1.0)
+        self.assertEqual(
+            {
+                grade.usage_key: grade.earned_all
+                for grade in PersistentSubsectionGrade.bulk_read_grades(self.request.user.id, self.course.id)
+            },
+            {self.sequence.location: 1.0, self.sequence2.location: 1.0},
+        )
+
+    def test_iter_bulk_saves_course_grades_after_subsection_grades(self):
+        users = [self.request.user, UserFactory()]
+        CourseEnrollment.enroll(users[1], self.course.id)
+        answer_problem(self.course, self.request, self.problem)
+        answer_problem(self.course, get_mock_request(users[1]), self.problem2)
+        PersistentSubsectionGrade.objects.all().delete()
+        PersistentCourseGrade.objects.all().delete()
+
+        subsection_grades_when_saved = {}
+
+        def _record_subsection_grades(sender, user, **kwargs):  # pylint: disable=unused-argument
+            subsection_grades_when_saved[user.id] = PersistentSubsectionGrade.objects.filter(user_id=user.id).count()
+
+        COURSE_GRADE_CHANGED.connect(_record_subsection_grades)
+        try:
+            self._iter_grades(users, force_update=True, bulk=True)
+        finally:
+            COURSE_GRADE_CHANGED.disconnect(_record_subsection_grades)
+
+        self.assertEqual(subsection_grades_when_saved, {users[0].id: 2, users[1].id: 2})
+
+
+@ddt.ddt
+class TestCourseGradeComputeBatch(TestCase):
+    """
+    Tests that computing course grade values in batch is identical
+    to computing them for each learner.
+    """
+    @ddt.data(
+        {'A': 0.9, 'B': 0.8, 'C': 0.6},
+        {'Pass': 0.5},
+        {'Pass': 0.5, 'Also Pass': 0.5},
+        {'Fail': 0},
+        {},
+    )
+    def test_randomized_equivalence(self, grade_cutoffs):
+        rng = random.Random(0)
+        grader_percents = [rng.random() for _ in range(1000)]
+        # Include percents that are halfway between rounded values.
+        grader_percents += [(index + 0.45) / 100 for index in range(100)]
+        grader_percents += [0.0, 1.0, 1.5, -0.0055]
+
+        percents, letter_grades, passed = CourseGrade.compute_batch(grade_cutoffs, grader_percents)
+        for index, grader_percent in enumerate(grader_percents):
+            percent = CourseGrade._compute_percent({'percent': grader_percent})
+            self.assertEqual(float(percents[index]).hex(), percent.hex())
+            self.assertEqual(letter_grades[index], CourseGrade._compute_letter_grade(grade_cutoffs, percent))
+            self.assertIs(passed[index], CourseGrade._compute_passed(grade_cutoffs, percent))
+
 
 @ddt.ddt
 class TestSubsectionGradeFactory(ProblemSubmissionTestMixin, GradeTestBase):
@@ -17,6 +17,7 @@ from django.utils.translation import override as override_language
 
 from course_modes.models import CourseMode
 from courseware.models import StudentModule
+from courseware.user_state_client import WriteBehindXBlockUserStateClient
 from edxmako.shortcuts import render_to_string
 from eventtracking import tracker
 from lms.djangoapps.grades.constants import ScoreDatabaseTableEnum
@@ -265,6 +266,10 @@ def reset_student_attempts(course_id, student, module_state_key, requesting_user
             module_state_key.to_deprecated_string(),
         )
 
+    # Store any queued changes to the student's state first, so that
+    # they aren't stored over the reset state later.
+    WriteBehindXBlockUserStateClient(student).flush(student.username)
+
     module_to_reset = StudentModule.objects.get(
         student_id=student.id,
         course_id=course_id,
@@ -35,6 +35,8 @@ from bulk_email.models import BulkEmailFlag, CourseEmail, CourseEmailTemplate
 from certificates.models import CertificateStatuses
 from certificates.tests.factories import GeneratedCertificateFactory
 from course_modes.models import CourseMode
+from courseware.config.waffle import MATERIALIZED_GRADE_HISTOGRAMS
+from courseware.config.waffle import waffle as courseware_waffle
 from courseware.models import StudentFieldOverride, StudentModule
 from courseware.tests.factories import (
     BetaTesterFactory,
@@ -57,7 +59,7 @@ from lms.djangoapps.instructor_task.api_helper import AlreadyRunningError
 from openedx.core.djangoapps.course_groups.cohorts import set_course_cohorted
 from openedx.core.djangoapps.site_configuration import helpers as configuration_helpers
 from openedx.core.djangoapps.site_configuration.tests.mixins import SiteMixin
-from openedx.core.lib.xblock_utils import grade_histogram
+from openedx.core.lib.xblock_utils import grade_histogram, grade_histograms
 from shoppingcart.models import (
     Coupon,
     CouponRedemption,
@@ -3393,6 +3395,28 @@ class TestEntranceExamInstructorAPIRegradeTask(SharedModuleStoreTestCase, LoginE
         self.assertEqual(grades[0], (50.0, 1))
         self.assertEqual(grades[1], (100.0, 1))
 
+    @ddt.data(ModuleStoreEnum.Type.split, ModuleStoreEnum.Type.mongo)
+    def test_materialized_grade_histograms(self, store):
+        """
+        Verify that the histograms of several problems are read in one query.
+        """
+        course = CourseFactory.create(default_store=store)
+
+        usage_keys = [course.id.make_usage_key('problem', name) for name in ('first_problem', 'second_problem')]
+        for student_id, grade in ((1, 100), (2, 50), (3, None)):
+            for usage_key in usage_keys:
+                StudentModule.objects.create(
+                    student_id=student_id,
+                    grade=grade,
+                    module_state_key=usage_key
+                )
+
+        with courseware_waffle().override(MATERIALIZED_GRADE_HISTOGRAMS, active=True):
+            with self.assertNumQueries(1):
+                histograms = grade_histograms(usage_keys)
+        for usage_key in usage_keys:
+            self.assertEqual(histograms[usage_key], [(50.0, 1), (100.0, 1)])
+
     def test_reset_entrance_exam_student_attempts_delete_all(self):
         """ Make sure no one can delete all students state on entrance exam. """
         url = reverse('reset_student_attempts_for_entrance_exam',
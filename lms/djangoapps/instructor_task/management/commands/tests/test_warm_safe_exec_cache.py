@@ -0,0 +1,83 @@
+"""
+Tests for the `warm_safe_exec_cache` management command
+"""
+import json
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from mock import patch
+
+from capa.safe_exec import safe_exec
+from capa.safe_exec.cache import TieredCache
+from capa.safe_exec.tests.test_safe_exec import DictCache
+from capa.tests.response_xml_factory import OptionResponseXMLFactory
+from courseware.models import StudentModule
+from lms.djangoapps.instructor_task.tests.test_base import InstructorTaskModuleTestCase
+from xmodule.modulestore.tests.factories import ItemFactory
+
+
+class TestWarmSafeExecCacheCommand(InstructorTaskModuleTestCase):
+    """
+    Tests for the `warm_safe_exec_cache` management command
+    """
+    def setUp(self):
+        super(TestWarmSafeExecCacheCommand, self).setUp()
+        self.initialize_course()
+        self.problem = ItemFactory.create(
+            parent=self.problem_section,
+            category='problem',
+            display_name='scripted',
+            data=OptionResponseXMLFactory().build_xml(
+                question_text='The correct answer is Option 1',
+                options=['Option 1', 'Option 2'],
+                correct_option='Option 1',
+                script='x = 1',
+            ),
+        )
+        self.unscripted_problem = ItemFactory.create(
+            parent=self.problem_section,
+            category='problem',
+            display_name='unscripted',
+            data=OptionResponseXMLFactory().build_xml(
+                question_text='The correct answer is Option 1',
+                options=['Option 1', 'Option 2'],
+                correct_option='Option 1',
+            ),
+        )
+        for username, state in [('u1', {'seed': 1}), ('u2', {'seed': 2}), ('u3', {})]:
+            student = self.create_student(username)
+            for problem in (self.problem, self.unscripted_problem):
+                StudentModule.objects.create(
+                    student=student,
+                    course_id=self.course.id,
+                    module_type='problem',
+                    module_state_key=problem.location,
+                    state=json.dumps(state),
+                )
+
+        self.cache = {}
+        patcher = patch('util.sandboxing._SAFE_EXEC_CACHE', TieredCache(DictCache(self.cache)))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_warm_course(self):
+        with patch('capa.capa_problem.safe_exec', wraps=safe_exec) as mock_safe_exec:
+            call_command('warm_safe_exec_cache', unicode(self.course.id))
+        self.assertEqual(
+            sorted(call[1]['random_seed'] for call in mock_safe_exec.call_args_list),
+            [1, 2],
+        )
+        self.assertEqual(len(self.cache), 2)
+
+    def test_warm_problem(self):
+        with patch('capa.capa_problem.safe_exec', wraps=safe_exec) as mock_safe_exec:
+            call_command(
+                'warm_safe_exec_cache', unicode(self.course.id),
+                '--problem', unicode(self.unscripted_problem.location),
+            )
+        self.assertFalse(mock_safe_exec.called)
+        self.assertEqual(self.cache, {})
+
+    def test_invalid_course(self):
+        with self.assertRaises(CommandError):
+            call_command('warm_safe_exec_cache', 'not a course')
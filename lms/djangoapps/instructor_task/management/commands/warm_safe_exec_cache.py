@@ -0,0 +1,98 @@
+"""
+Command to warm the cache of safe_exec results before rescoring a course.
+"""
+from __future__ import print_function, unicode_literals
+
+import json
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey, UsageKey
+
+from courseware.models import StudentModule
+from lms.djangoapps.instructor_task.tasks_helper.module_state import _get_module_instance_for_task
+from xmodule.modulestore.django import modulestore
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Command to pre-execute the Python scripts of the problems of a course
+    for each student who has a seed for the problem, so the results of the
+    scripts are cached for rescoring.
+
+    Example:
+    ./manage.py lms warm_safe_exec_cache course-v1:edX+DemoX+Demo_Course \
+        --problem block-v1:edX+DemoX+Demo_Course+type@problem+block@some_problem
+    """
+    help = 'Pre-execute the scripts of the problems of a course for the seeds of its students.'
+
+    def add_arguments(self, parser):
+        """
+        Add arguments to the command parser.
+        """
+        parser.add_argument(
+            'course_id',
+            type=str,
+            help='ID of the course whose problem scripts to pre-execute',
+        )
+
+        parser.add_argument(
+            '--problem',
+            action='append',
+            dest='problems',
+            default=[],
+            help='Usage key of a problem to pre-execute the script of, instead of all problems of the course.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            course_key = CourseKey.from_string(options['course_id'])
+            problem_keys = [
+                UsageKey.from_string(problem).map_into_course(course_key) for problem in options['problems']
+            ]
+        except InvalidKeyError as error:
+            raise CommandError("Invalid key: {}".format(error))
+
+        store = modulestore()
+        with store.bulk_operations(course_key):
+            if problem_keys:
+                problems = [store.get_item(problem_key) for problem_key in problem_keys]
+            else:
+                problems = store.get_items(course_key, qualifiers={'category': 'problem'})
+
+            for problem in problems:
+                if '<script' not in problem.data:
+                    continue
+                executed = self._execute_scripts(course_key, problem)
+                print("Executed the script of {problem} for {executed} students.".format(
+                    problem=problem.location,
+                    executed=executed,
+                ))
+
+    @staticmethod
+    def _execute_scripts(course_key, problem):
+        """
+        Executes the script of the given problem for each student with a seed
+        for the problem, by loading the problem for the student as rescoring
+        does, and returns the number of students it was executed for.
+        """
+        executed = 0
+        student_modules = StudentModule.objects.filter(
+            course_id=course_key,
+            module_state_key=problem.location,
+        ).select_related('student')
+        for student_module in student_modules.iterator():
+            if 'seed' not in json.loads(student_module.state or '{}'):
+                continue
+            try:
+                _get_module_instance_for_task(course_key, student_module.student, problem)
+            except Exception:  # pylint: disable=broad-except
+                log.exception(
+                    'Could not execute the script of %s for student %s', problem.location, student_module.student_id,
+                )
+            else:
+                executed += 1
+        return executed
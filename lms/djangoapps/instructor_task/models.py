@@ -16,11 +16,13 @@ import csv
 import hashlib
 import json
 import os.path
+import shutil
+from tempfile import SpooledTemporaryFile
 from uuid import uuid4
 
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.core.files.base import ContentFile
+from django.core.files.base import File
 from django.db import models, transaction
 
 from openedx.core.djangoapps.xmodule_django.models import CourseKeyField
@@ -225,6 +227,10 @@ class DjangoStorageReportStore(ReportStore):
     """
     ReportStore implementation that delegates to django's storage api.
     """
+    # Size in bytes above which the csv data being stored is spooled to a
+    # temporary file on disk rather than kept in memory.
+    SPOOL_MAX_SIZE = 5 * 1024 * 1024
+
     def __init__(self, storage_class=None, storage_kwargs=None):
         if storage_kwargs is None:
             storage_kwargs = {}
@@ -259,16 +265,31 @@ class DjangoStorageReportStore(ReportStore):
         path = self.path_to(course_id, filename)
         self.storage.save(path, buff)
 
-    def store_rows(self, course_id, filename, rows):
+    def store_rows(self, course_id, filename, rows, parts=None):
         """
         Given a course_id, filename, and rows (each row is an iterable of
         strings), write the rows to the storage backend in csv format.
+
+        `rows` may be a generator, as the csv data is written to a spooled
+        temporary file rather than to an in-memory buffer. The contents of
+        any `parts`, the filenames of csv files previously stored for the
+        course, are appended after the rows.
+        """
+        with SpooledTemporaryFile(max_size=self.SPOOL_MAX_SIZE) as output_buffer:
+            csvwriter = csv.writer(output_buffer)
+            csvwriter.writerows(self._get_utf8_encoded_rows(rows))
+            for part in parts or []:
+                with self.storage.open(self.path_to(course_id, part)) as part_file:
+                    shutil.copyfileobj(part_file, output_buffer)
+            output_buffer.seek(0)
+            self.store(course_id, filename, File(output_buffer))
+
+    def delete(self, course_id, filename):
+        """
+        Delete the file named `filename` stored for the given course, if it
+        exists.
         """
-        output_buffer = ContentFile('')
-        csvwriter = csv.writer(output_buffer)
-        csvwriter.writerows(self._get_utf8_encoded_rows(rows))
-        output_buffer.seek(0)
-        self.store(course_id, filename, output_buffer)
+        self.storage.delete(self.path_to(course_id, filename))
 
     def links_for(self, course_id):
         """
@@ -169,10 +169,38 @@ def calculate_grades_csv(entry_id, xmodule_instance_args):
         xmodule_instance_args.get('task_id'), entry_id, action_name
     )
 
-    task_fn = partial(CourseGradeReport.generate, xmodule_instance_args)
+    task_fn = partial(CourseGradeReport.generate, xmodule_instance_args, shard_task=calculate_grades_csv_shard)
     return run_main_task(entry_id, task_fn, action_name)
 
 
+@task(routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
+def calculate_grades_csv_shard(entry_id, xmodule_instance_args, shard, subtask_status_dict):
+    """
+    Grade the users of a single shard of a course grade report that is
+    generated in parallel.
+
+    `shard` is a dict with the range of user ids of the shard, and with the
+    number of shards and the id of the subtask merging them, which is
+    queued once all the shards are done.
+    """
+    # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
+    action_name = ugettext_noop('graded')
+    CourseGradeReport.generate_shard(
+        xmodule_instance_args, entry_id, shard, subtask_status_dict, action_name, merge_grades_csv_shards,
+    )
+
+
+@task(routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
+def merge_grades_csv_shards(entry_id, xmodule_instance_args, num_shards, subtask_status_dict):
+    """
+    Merge the shards of a course grade report that is generated in parallel,
+    and push the report to an S3 bucket for download.
+    """
+    # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
+    action_name = ugettext_noop('graded')
+    CourseGradeReport.merge_shards(xmodule_instance_args, entry_id, num_shards, subtask_status_dict, action_name)
+
+
 @task(base=BaseInstructorTask, routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
 def calculate_problem_grade_report(entry_id, xmodule_instance_args):
     """
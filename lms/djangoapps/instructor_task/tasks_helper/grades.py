@@ -1,13 +1,17 @@
 """
 Functionality for generating grade reports.
 """
+import json
 import logging
 import re
 from collections import OrderedDict
 from datetime import datetime
 from itertools import chain, izip, izip_longest
 from time import time
+from uuid import uuid4
 
+from celery.states import FAILURE, READY_STATES, SUCCESS
+from django.conf import settings
 from lazy import lazy
 from pytz import UTC
 
@@ -18,6 +22,14 @@ from instructor_analytics.csvs import format_dictlist
 from lms.djangoapps.grades.context import grading_context, grading_context_for_course
 from lms.djangoapps.grades.models import PersistentCourseGrade
 from lms.djangoapps.grades.new.course_grade_factory import CourseGradeFactory
+from lms.djangoapps.instructor_task.config.models import GradeReportSetting
+from lms.djangoapps.instructor_task.models import QUEUING, InstructorTask
+from lms.djangoapps.instructor_task.subtasks import (
+    SubtaskStatus,
+    check_subtask_is_valid,
+    initialize_subtask_info,
+    update_subtask_status
+)
 from lms.djangoapps.teams.models import CourseTeamMembership
 from lms.djangoapps.verify_student.models import SoftwareSecurePhotoVerification
 from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
@@ -25,12 +37,13 @@ from openedx.core.djangoapps.course_groups.cohorts import bulk_cache_cohorts, ge
 from openedx.core.djangoapps.user_api.course_tag.api import BulkCourseTags
 from student.models import CourseEnrollment
 from student.roles import BulkRoleCache
+from util.db import outer_atomic
 from xmodule.modulestore.django import modulestore
 from xmodule.partitions.partitions_service import PartitionService
 from xmodule.split_test_module import get_split_user_partitions
 
 from .runner import TaskProgress
-from .utils import upload_csv_to_report_store
+from .utils import ReportCheckpoint, upload_csv_to_report_store
 
 TASK_LOG = logging.getLogger('edx.celery.task')
 
@@ -75,6 +88,8 @@ class _CourseGradeReportContext(object):
         )
         self.action_name = action_name
         self.course_id = course_id
+        self.entry_id = _entry_id
+        self.xmodule_instance_args = _xmodule_instance_args
         self.task_progress = TaskProgress(self.action_name, total=None, start_time=time())
 
     @lazy
@@ -191,32 +206,260 @@ class CourseGradeReport(object):
     # Batch size for chunking the list of enrollees in the course.
     USER_BATCH_SIZE = 100
 
+    # Maximum number of shards that a grade report generated in parallel
+    # is split into.
+    MAX_SHARDS = 32
+
     @classmethod
-    def generate(cls, _xmodule_instance_args, _entry_id, course_id, _task_input, action_name):
+    def generate(cls, _xmodule_instance_args, _entry_id, course_id, _task_input, action_name, shard_task=None):
         """
         Public method to generate a grade report.
+
+        If a `shard_task` is given and parallel grade reports are enabled in
+        GradeReportSetting, the users are split into shards of consecutive
+        user ids, and a `shard_task` subtask is queued for each shard.
         """
         with modulestore().bulk_operations(course_id):
             context = _CourseGradeReportContext(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name)
+            if shard_task is not None and GradeReportSetting.current().enabled:
+                return CourseGradeReport()._queue_shards(context, shard_task)
             return CourseGradeReport()._generate(context)
 
+    @classmethod
+    def generate_shard(cls, _xmodule_instance_args, entry_id, shard, subtask_status_dict, action_name, merge_task):
+        """
+        Public method to compute the rows of a single shard of a grade
+        report generated in parallel.  Once all shards are done, queues the
+        `merge_task` subtask that merges them into the report.
+        """
+        subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+        check_subtask_is_valid(entry_id, subtask_status.task_id, subtask_status)
+        entry = InstructorTask.objects.get(pk=entry_id)
+        context = _CourseGradeReportContext(
+            _xmodule_instance_args, entry_id, entry.course_id, json.loads(entry.task_input), action_name,
+        )
+        try:
+            with modulestore().bulk_operations(context.course_id):
+                CourseGradeReport()._generate_shard(context, shard)
+        except Exception:  # pylint: disable=broad-except
+            TASK_LOG.exception(
+                u'%s, Task type: %s, Failed to grade shard %s', context.task_info_string, action_name, shard,
+            )
+            subtask_status.increment(
+                succeeded=context.task_progress.succeeded, failed=context.task_progress.failed, state=FAILURE,
+            )
+        else:
+            subtask_status.increment(
+                succeeded=context.task_progress.succeeded, failed=context.task_progress.failed, state=SUCCESS,
+            )
+        update_subtask_status(entry_id, subtask_status.task_id, subtask_status)
+        cls._queue_merge_when_done(_xmodule_instance_args, entry_id, shard, merge_task)
+
+    @classmethod
+    def merge_shards(cls, _xmodule_instance_args, entry_id, num_shards, subtask_status_dict, action_name):
+        """
+        Public method to merge the shards of a grade report generated in
+        parallel into the report, and to record the time taken by each shard
+        in the task output.
+        """
+        subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+        check_subtask_is_valid(entry_id, subtask_status.task_id, subtask_status)
+        entry = InstructorTask.objects.get(pk=entry_id)
+        context = _CourseGradeReportContext(
+            _xmodule_instance_args, entry_id, entry.course_id, json.loads(entry.task_input), action_name,
+        )
+        try:
+            with modulestore().bulk_operations(context.course_id):
+                CourseGradeReport()._merge_shards(context, entry, num_shards, subtask_status.task_id)
+        except Exception:  # pylint: disable=broad-except
+            TASK_LOG.exception(
+                u'%s, Task type: %s, Failed to merge grade report shards', context.task_info_string, action_name,
+            )
+            subtask_status.increment(state=FAILURE)
+        else:
+            subtask_status.increment(state=SUCCESS)
+        update_subtask_status(entry_id, subtask_status.task_id, subtask_status)
+
+    @classmethod
+    def _queue_merge_when_done(cls, _xmodule_instance_args, entry_id, shard, merge_task):
+        """
+        Queues the subtask merging the shards of the report, if all the
+        shards are done.  When the last shards complete at the same time,
+        the merge may be queued more than once, in which case all but one
+        of the merge subtasks are rejected by check_subtask_is_valid.
+        """
+        entry = InstructorTask.objects.get(pk=entry_id)
+        subtask_states = {
+            subtask_id: subtask_status['state']
+            for subtask_id, subtask_status in json.loads(entry.subtasks)['status'].iteritems()
+        }
+        merge_subtask_id = shard['merge_subtask_id']
+        merge_state = subtask_states.pop(merge_subtask_id)
+        if merge_state == QUEUING and all(state in READY_STATES for state in subtask_states.itervalues()):
+            merge_task.subtask(
+                (
+                    entry_id,
+                    _xmodule_instance_args,
+                    shard['num_shards'],
+                    SubtaskStatus.create(merge_subtask_id).to_dict(),
+                ),
+                task_id=merge_subtask_id,
+                routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY,
+            ).apply_async()
+
     def _generate(self, context):
         """
         Internal method for generating a grade report for the given context.
+
+        The rows of each batch of users are stored as soon as they are
+        computed, so the memory used does not grow with the number of
+        users, and so the report can be resumed after the last completed
+        batch if the task is interrupted.
         """
         context.update_status(u'Starting grades')
         success_headers = self._success_headers(context)
         error_headers = self._error_headers()
-        batched_rows = self._batched_rows(context)
+        checkpoint = ReportCheckpoint(context.course_id, 'grade_report', context.entry_id)
+        self._log_resume(context, checkpoint)
+        batched_rows = self._batched_rows(context, checkpoint.last_user_id)
 
         context.update_status(u'Compiling grades')
-        success_rows, error_rows = self._compile(context, batched_rows)
+        self._compile(context, batched_rows, checkpoint)
 
         context.update_status(u'Uploading grades')
-        self._upload(context, success_headers, success_rows, error_headers, error_rows)
+        self._upload(context, success_headers, error_headers, [checkpoint])
+        checkpoint.delete()
 
         return context.update_status(u'Completed grades')
 
+    def _queue_shards(self, context, shard_task):
+        """
+        Internal method for splitting the grade report for the given context
+        into shards, and queueing a `shard_task` subtask for each of them.
+        """
+        entry = InstructorTask.objects.get(pk=context.entry_id)
+        if entry.subtasks:
+            # The task was requeued after its subtasks were queued, for
+            # instance because of a lost connection to the broker.
+            TASK_LOG.warning(
+                u'%s, Task type: %s, Grade report shards were already queued',
+                context.task_info_string,
+                context.action_name,
+            )
+            return json.loads(entry.task_output)
+
+        context.update_status(u'Starting grades')
+        user_ids = list(self._users(context).values_list('id', flat=True))
+        if not user_ids:
+            return self._generate(context)
+
+        shard_ranges = self._shard_ranges(user_ids, GradeReportSetting.current().batch_size)
+        shard_subtask_ids = [str(uuid4()) for _ in shard_ranges]
+        merge_subtask_id = str(uuid4())
+        with outer_atomic():
+            progress = initialize_subtask_info(
+                entry, context.action_name, len(user_ids), shard_subtask_ids + [merge_subtask_id],
+            )
+
+        TASK_LOG.info(
+            u'%s, Task type: %s, Queueing %s shards to grade %s users',
+            context.task_info_string,
+            context.action_name,
+            len(shard_ranges),
+            len(user_ids),
+        )
+        for index, (subtask_id, (after_user_id, last_user_id)) in enumerate(izip(shard_subtask_ids, shard_ranges)):
+            shard = {
+                'index': index,
+                'after_user_id': after_user_id,
+                'last_user_id': last_user_id,
+                'num_shards': len(shard_ranges),
+                'merge_subtask_id': merge_subtask_id,
+            }
+            shard_task.subtask(
+                (context.entry_id, context.xmodule_instance_args, shard, SubtaskStatus.create(subtask_id).to_dict()),
+                task_id=subtask_id,
+                routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY,
+            ).apply_async()
+        return progress
+
+    def _shard_ranges(self, user_ids, shard_size):
+        """
+        Returns a list of (after_user_id, last_user_id) ranges splitting the
+        given sorted user ids into at most MAX_SHARDS shards of at least
+        `shard_size` users.  The first and last ranges are open-ended, so
+        users who enroll while the report is generated are not missed.
+        """
+        shard_size = max(shard_size, -(-len(user_ids) // self.MAX_SHARDS))
+        boundaries = [user_ids[index - 1] for index in xrange(shard_size, len(user_ids), shard_size)]
+        return zip([None] + boundaries, boundaries + [None])
+
+    def _generate_shard(self, context, shard):
+        """
+        Internal method for computing the rows of the given shard of the
+        grade report for the given context.
+        """
+        checkpoint = self._shard_checkpoint(context, shard['index'])
+        self._log_resume(context, checkpoint)
+        after_user_id = checkpoint.last_user_id if checkpoint.last_user_id is not None else shard['after_user_id']
+        batched_rows = self._batched_rows(context, after_user_id, shard['last_user_id'])
+        self._compile(context, batched_rows, checkpoint)
+
+    def _merge_shards(self, context, entry, num_shards, merge_subtask_id):
+        """
+        Internal method for uploading the grade report for the given context
+        from the rows of its shards, once all of them are done.
+        """
+        checkpoints = [self._shard_checkpoint(context, index) for index in xrange(num_shards)]
+        subtask_statuses = json.loads(entry.subtasks)['status']
+        failed_shards = [
+            subtask_id for subtask_id, subtask_status in subtask_statuses.iteritems()
+            if subtask_id != merge_subtask_id and subtask_status['state'] != SUCCESS
+        ]
+        try:
+            if failed_shards:
+                raise ValueError(u'Grade report shards failed: {}'.format(failed_shards))
+
+            context.update_status(u'Uploading grades')
+            self._upload(context, self._success_headers(context), self._error_headers(), checkpoints)
+            self._record_shard_durations(
+                context.entry_id, [checkpoint.progress.get('duration_ms', 0) for checkpoint in checkpoints],
+            )
+        finally:
+            for checkpoint in checkpoints:
+                checkpoint.delete()
+
+    def _shard_checkpoint(self, context, index):
+        """
+        Returns the checkpoint storing the rows of the shard with the given
+        index.
+        """
+        return ReportCheckpoint(context.course_id, u'grade_report_shard{:03d}'.format(index), context.entry_id)
+
+    def _record_shard_durations(self, entry_id, durations):
+        """
+        Records the given time, in milliseconds, taken by each shard in the
+        output of the InstructorTask.
+        """
+        with outer_atomic():
+            entry = InstructorTask.objects.select_for_update().get(pk=entry_id)
+            task_output = json.loads(entry.task_output)
+            task_output['shard_duration_ms'] = durations
+            entry.task_output = InstructorTask.create_output_for_success(task_output)
+            entry.save()
+
+    def _log_resume(self, context, checkpoint):
+        """
+        Logs when the given checkpoint is resumed.
+        """
+        if checkpoint.last_user_id is not None:
+            TASK_LOG.info(
+                u'%s, Task type: %s, Resuming after user %s',
+                context.task_info_string,
+                context.action_name,
+                checkpoint.last_user_id,
+            )
+
     def _success_headers(self, context):
         """
         Returns a list of all applicable column headers for this grade report.
@@ -238,40 +481,56 @@ class CourseGradeReport(object):
         """
         return ["Student ID", "Username", "Error"]
 
-    def _batched_rows(self, context):
+    def _batched_rows(self, context, after_user_id=None, last_user_id=None):
         """
-        A generator of batches of (success_rows, error_rows) for this report.
+        A generator of batches of (last_user_id, success_rows, error_rows)
+        for this report, for the users after the given user id, up to the
+        given last user id.
         """
-        for users in self._batch_users(context):
+        for users in self._batch_users(context, after_user_id, last_user_id):
             users = filter(lambda u: u is not None, users)
-            yield self._rows_for_users(context, users)
-
-    def _compile(self, context, batched_rows):
-        """
-        Compiles and returns the complete list of (success_rows, error_rows) for
-        the given batched_rows and context.
-        """
-        # partition and chain successes and errors
-        success_rows, error_rows = izip(*batched_rows)
-        success_rows = list(chain(*success_rows))
-        error_rows = list(chain(*error_rows))
-
-        # update metrics on task status
-        context.task_progress.succeeded = len(success_rows)
-        context.task_progress.failed = len(error_rows)
-        context.task_progress.attempted = context.task_progress.succeeded + context.task_progress.failed
-        context.task_progress.total = context.task_progress.attempted
-        return success_rows, error_rows
-
-    def _upload(self, context, success_headers, success_rows, error_headers, error_rows):
-        """
-        Creates and uploads a CSV for the given headers and rows.
+            success_rows, error_rows = self._rows_for_users(context, users)
+            yield users[-1].id, success_rows, error_rows
+
+    def _compile(self, context, batched_rows, checkpoint):
+        """
+        Adds the rows of each of the given batched_rows to the checkpoint,
+        updating the task status after each batch.
+        """
+        task_progress = context.task_progress
+        task_progress.succeeded = checkpoint.progress.get('succeeded', 0)
+        task_progress.failed = checkpoint.progress.get('failed', 0)
+        task_progress.attempted = task_progress.succeeded + task_progress.failed
+
+        for last_user_id, success_rows, error_rows in batched_rows:
+            # update metrics on task status
+            task_progress.succeeded += len(success_rows)
+            task_progress.failed += len(error_rows)
+            task_progress.attempted = task_progress.succeeded + task_progress.failed
+            checkpoint.add_batch(
+                {'grade_report': success_rows, 'grade_report_err': error_rows},
+                last_user_id,
+                {
+                    'succeeded': task_progress.succeeded,
+                    'failed': task_progress.failed,
+                    'duration_ms': int((time() - task_progress.start_time) * 1000),
+                },
+            )
+            context.update_status(u'Compiled grades for {} users'.format(task_progress.attempted))
+
+        task_progress.total = task_progress.attempted
+
+    def _upload(self, context, success_headers, error_headers, checkpoints):
+        """
+        Creates and uploads the CSVs for the given headers and the rows
+        added to the given checkpoints, in order.
         """
         date = datetime.now(UTC)
-        upload_csv_to_report_store([success_headers] + success_rows, 'grade_report', context.course_id, date)
-        if len(error_rows) > 0:
-            error_rows = [error_headers] + error_rows
-            upload_csv_to_report_store(error_rows, 'grade_report_err', context.course_id, date)
+        success_parts = _flatten(checkpoint.parts('grade_report') for checkpoint in checkpoints)
+        error_parts = _flatten(checkpoint.parts('grade_report_err') for checkpoint in checkpoints)
+        upload_csv_to_report_store([success_headers], 'grade_report', context.course_id, date, parts=success_parts)
+        if error_parts:
+            upload_csv_to_report_store([error_headers], 'grade_report_err', context.course_id, date, parts=error_parts)
 
     def _grades_header(self, context):
         """
@@ -285,16 +544,28 @@ class CourseGradeReport(object):
             grades_header.append(assignment_info['average_header'])
         return grades_header
 
-    def _batch_users(self, context):
+    def _users(self, context, after_user_id=None, last_user_id=None):
         """
-        Returns a generator of batches of users.
+        Returns a queryset of the users enrolled in the course, ordered by
+        id, after the given user id and up to the given last user id.
+        """
+        users = CourseEnrollment.objects.users_enrolled_in(context.course_id, include_inactive=True)
+        if after_user_id is not None:
+            users = users.filter(id__gt=after_user_id)
+        if last_user_id is not None:
+            users = users.filter(id__lte=last_user_id)
+        return users.order_by('id')
+
+    def _batch_users(self, context, after_user_id=None, last_user_id=None):
+        """
+        Returns a generator of batches of users, ordered by id, after the
+        given user id and up to the given last user id.
         """
         def grouper(iterable, chunk_size=self.USER_BATCH_SIZE, fillvalue=None):
             args = [iter(iterable)] * chunk_size
             return izip_longest(*args, fillvalue=fillvalue)
 
-        users = CourseEnrollment.objects.users_enrolled_in(context.course_id, include_inactive=True)
-        users = users.select_related('profile__allow_certificate')
+        users = self._users(context, after_user_id, last_user_id).select_related('profile__allow_certificate')
         return grouper(users)
 
     def _user_grade_results(self, course_grade, context):
@@ -14,6 +14,7 @@ from capa.responsetypes import LoncapaProblemError, ResponseError, StudentInputE
 from courseware.courses import get_course_by_id, get_problems_in_section
 from courseware.model_data import DjangoKeyValueStore, FieldDataCache
 from courseware.models import StudentModule
+from courseware.user_state_client import WriteBehindXBlockUserStateClient
 from courseware.module_render import get_module_for_descriptor_internal
 from track.event_transaction_utils import create_new_event_transaction_id, set_event_transaction_type
 from track.views import task_track
@@ -226,6 +227,7 @@ def reset_attempts_module_state(xmodule_instance_args, _module_descriptor, stude
     that are being reset, and UPDATE_STATUS_SKIPPED otherwise.
     """
     update_status = UPDATE_STATUS_SKIPPED
+    _flush_queued_state(student_module)
     problem_state = json.loads(student_module.state) if student_module.state else {}
     if 'attempts' in problem_state:
         old_number_of_attempts = problem_state["attempts"]
@@ -251,6 +253,7 @@ def delete_problem_module_state(xmodule_instance_args, _module_descriptor, stude
 
     Always returns UPDATE_STATUS_SUCCEEDED, indicating success, if it doesn't raise an exception due to database error.
     """
+    _flush_queued_state(student_module)
     student_module.delete()
     # get request-related tracking information from args passthrough,
     # and supplement with task-specific information:
@@ -327,3 +330,14 @@ def _get_task_id_from_xmodule_args(xmodule_instance_args):
         return UNKNOWN_TASK_ID
     else:
         return xmodule_instance_args.get('task_id', UNKNOWN_TASK_ID)
+
+
+def _flush_queued_state(student_module):
+    """
+    Stores any queued changes to the state of the student of the given
+    StudentModule and reloads it, so that they aren't stored over the
+    changes made by the task later.
+    """
+    student = student_module.student
+    WriteBehindXBlockUserStateClient(student).flush(student.username)
+    student_module.refresh_from_db()
@@ -1,3 +1,8 @@
+import json
+import os.path
+from uuid import uuid4
+
+from django.core.files.base import ContentFile
 from eventtracking import tracker
 from lms.djangoapps.instructor_task.models import ReportStore
 from util.file import course_filename_prefix_generator
@@ -12,8 +17,12 @@ UPDATE_STATUS_SUCCEEDED = 'succeeded'
 UPDATE_STATUS_FAILED = 'failed'
 UPDATE_STATUS_SKIPPED = 'skipped'
 
+# directory, within a course's report directory, of the parts of reports
+# that are still being generated
+PARTIAL_REPORTS_DIR = 'partial'
+
 
-def upload_csv_to_report_store(rows, csv_name, course_id, timestamp, config_name='GRADES_DOWNLOAD'):
+def upload_csv_to_report_store(rows, csv_name, course_id, timestamp, config_name='GRADES_DOWNLOAD', parts=None):
     """
     Upload data as a CSV using ReportStore.
 
@@ -24,8 +33,11 @@ def upload_csv_to_report_store(rows, csv_name, course_id, timestamp, config_name
                 [row1_colum1, row1_colum2, ...],
                 ...
             ]
+            Any iterable of rows is accepted, including a generator.
         csv_name: Name of the resulting CSV
         course_id: ID of the course
+        parts: Filenames of previously stored CSV files, whose rows are
+            appended after the given rows.
     """
     report_store = ReportStore.from_config(config_name)
     report_store.store_rows(
@@ -35,7 +47,8 @@ def upload_csv_to_report_store(rows, csv_name, course_id, timestamp, config_name
             csv_name=csv_name,
             timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
         ),
-        rows
+        rows,
+        parts=parts,
     )
     tracker_emit(csv_name)
 
@@ -45,3 +58,99 @@ def tracker_emit(report_name):
     Emits a 'report.requested' event for the given report.
     """
     tracker.emit(REPORT_REQUESTED_EVENT_NAME, {"report_type": report_name, })
+
+
+class ReportCheckpoint(object):
+    """
+    Durable record of the progress of a report that is generated in
+    batches of users.
+
+    The rows of each completed batch are stored as CSV parts in the report
+    store, along with the id of the last user in the batch and the task
+    progress so far.  When a report task is run again for the same
+    InstructorTask, for instance after its worker was killed, it resumes
+    after the last completed batch.  The parts are concatenated into the
+    final CSVs with `upload_csv_to_report_store`.
+    """
+    STATE_FILENAME = 'checkpoint.json'
+
+    def __init__(self, course_id, report_name, entry_id=None, config_name='GRADES_DOWNLOAD'):
+        self.course_id = course_id
+        self.report_store = ReportStore.from_config(config_name)
+        self.directory = os.path.join(
+            PARTIAL_REPORTS_DIR,
+            u'{}_{}'.format(report_name, entry_id if entry_id is not None else uuid4().hex),
+        )
+        # A report that is not run for an InstructorTask has nothing to resume.
+        self.state = self._load() if entry_id is not None else None
+        if self.state is None:
+            self.state = {'batches': 0, 'last_user_id': None, 'progress': {}, 'parts': {}}
+
+    @property
+    def last_user_id(self):
+        """
+        Returns the id of the last user of the last completed batch, or
+        None if no batch was completed yet.
+        """
+        return self.state['last_user_id']
+
+    @property
+    def progress(self):
+        """
+        Returns the task progress recorded with the last completed batch.
+        """
+        return self.state['progress']
+
+    def parts(self, csv_name):
+        """
+        Returns the filenames of the parts stored for the given CSV, in
+        order.
+        """
+        return self.state['parts'].get(csv_name, [])
+
+    def add_batch(self, rows_by_csv_name, last_user_id, progress):
+        """
+        Stores the given rows of a completed batch, keyed by the name of
+        the CSV they belong to, and records the batch as completed.
+        """
+        batch_index = self.state['batches']
+        for csv_name, rows in rows_by_csv_name.iteritems():
+            if rows:
+                part = os.path.join(self.directory, u'{}_{:06d}.csv'.format(csv_name, batch_index))
+                # A previous run may have stored the part before being
+                # interrupted, without recording the batch as completed.
+                self.report_store.delete(self.course_id, part)
+                self.report_store.store_rows(self.course_id, part, rows)
+                self.state['parts'].setdefault(csv_name, []).append(part)
+        self.state.update(batches=batch_index + 1, last_user_id=last_user_id, progress=progress)
+        self._save()
+
+    def delete(self):
+        """
+        Deletes the stored parts and state, once the report is complete.
+        """
+        for parts in self.state['parts'].itervalues():
+            for part in parts:
+                self.report_store.delete(self.course_id, part)
+        self.report_store.delete(self.course_id, self._state_filename)
+
+    @property
+    def _state_filename(self):
+        return os.path.join(self.directory, self.STATE_FILENAME)
+
+    def _load(self):
+        """
+        Returns the stored state, or None if there is none.
+        """
+        path = self.report_store.path_to(self.course_id, self._state_filename)
+        if not self.report_store.storage.exists(path):
+            return None
+        with self.report_store.storage.open(path) as state_file:
+            return json.loads(state_file.read())
+
+    def _save(self):
+        """
+        Stores the state, replacing any previously stored state.
+        """
+        self.report_store.delete(self.course_id, self._state_filename)
+        self.report_store.store(self.course_id, self._state_filename, ContentFile(json.dumps(self.state)))
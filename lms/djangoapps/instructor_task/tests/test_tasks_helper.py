@@ -8,14 +8,17 @@ Unit tests for LMS instructor-initiated background tasks helper functions.
 
 """
 
+import json
 import os
 import shutil
 import tempfile
 import urllib
 from datetime import datetime
+from uuid import uuid4
 
 import ddt
 import unicodecsv
+from celery.states import SUCCESS
 from django.conf import settings
 from django.core.urlresolvers import reverse
 from django.test.utils import override_settings
@@ -33,6 +36,9 @@ from courseware.tests.factories import InstructorFactory
 from instructor_analytics.basic import UNAVAILABLE
 from lms.djangoapps.grades.models import PersistentCourseGrade
 from lms.djangoapps.grades.transformer import GradesTransformer
+from lms.djangoapps.instructor_task.config.models import GradeReportSetting
+from lms.djangoapps.instructor_task.models import InstructorTask
+from lms.djangoapps.instructor_task.tasks import calculate_grades_csv_shard
 from lms.djangoapps.instructor_task.tasks_helper.certs import generate_students_certificates
 from lms.djangoapps.instructor_task.tasks_helper.enrollments import (
     upload_enrollment_report,
@@ -52,6 +58,7 @@ from lms.djangoapps.instructor_task.tasks_helper.misc import (
     upload_course_survey_report,
     upload_ora2_data
 )
+from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from lms.djangoapps.instructor_task.tests.test_base import (
     InstructorTaskCourseTestCase,
     InstructorTaskModuleTestCase,
@@ -83,7 +90,7 @@ from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory, chec
 from xmodule.partitions.partitions import Group, UserPartition
 
 from ..models import ReportStore
-from ..tasks_helper.utils import UPDATE_STATUS_FAILED, UPDATE_STATUS_SUCCEEDED
+from ..tasks_helper.utils import UPDATE_STATUS_FAILED, UPDATE_STATUS_SUCCEEDED, ReportCheckpoint
 
 
 class InstructorGradeReportTestCase(TestReportMixin, InstructorTaskCourseTestCase):
@@ -422,6 +429,133 @@ class TestInstructorGradeReport(InstructorGradeReportTestCase):
             {'attempted': expected_students, 'succeeded': expected_students, 'failed': 0}, result
         )
 
+    def _report_usernames(self):
+        """
+        Returns the usernames in the rows of the last grade report.
+        """
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        report_csv_filename = report_store.links_for(self.course.id)[0][0]
+        report_path = report_store.path_to(self.course.id, report_csv_filename)
+        with report_store.storage.open(report_path) as csv_file:
+            return [row['Username'] for row in unicodecsv.DictReader(csv_file)]
+
+    @patch.object(CourseGradeReport, 'USER_BATCH_SIZE', 2)
+    def test_batched_status_updates(self):
+        """
+        Test that the task status is updated after each batch of users,
+        and that the parts stored for each batch are cleaned up.
+        """
+        usernames = [u'student{}'.format(index) for index in range(5)]
+        for username in usernames:
+            self.create_student(username, u'{}@example.com'.format(username))
+
+        with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task') as mock_current_task:
+            result = CourseGradeReport.generate(None, 1, self.course.id, None, 'graded')
+
+        self.assertDictContainsSubset({'attempted': 5, 'succeeded': 5, 'failed': 0, 'total': 5}, result)
+        self.assertEqual(self._report_usernames(), usernames)
+        steps = [call[1]['meta']['step'] for call in mock_current_task.return_value.update_state.call_args_list]
+        self.assertEqual(
+            [step for step in steps if step.startswith(u'Compiled grades')],
+            [u'Compiled grades for 2 users', u'Compiled grades for 4 users', u'Compiled grades for 5 users'],
+        )
+        self.assertIsNone(ReportCheckpoint(self.course.id, 'grade_report', 1).last_user_id)
+
+    @patch.object(CourseGradeReport, 'USER_BATCH_SIZE', 2)
+    def test_resume_from_checkpoint(self):
+        """
+        Test that a grade report that is interrupted resumes after the last
+        completed batch of users when run again for the same task.
+        """
+        usernames = [u'student{}'.format(index) for index in range(5)]
+        users = [self.create_student(username, u'{}@example.com'.format(username)) for username in usernames]
+
+        graded_users = []
+        interrupt = [True]
+        rows_for_users = CourseGradeReport._rows_for_users
+
+        def _rows_for_users(report, context, batch_users):
+            """
+            Computes the rows for the given users, failing for the second
+            batch of the first run.
+            """
+            if len(graded_users) == 2 and interrupt[0]:
+                raise Exception('Worker killed')
+            graded_users.extend(batch_users)
+            return rows_for_users(report, context, batch_users)
+
+        with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'):
+            with patch.object(CourseGradeReport, '_rows_for_users', autospec=True, side_effect=_rows_for_users):
+                with self.assertRaises(Exception):
+                    CourseGradeReport.generate(None, 1, self.course.id, None, 'graded')
+                self.assertEqual(ReportCheckpoint(self.course.id, 'grade_report', 1).last_user_id, users[1].id)
+
+                interrupt[0] = False
+                result = CourseGradeReport.generate(None, 1, self.course.id, None, 'graded')
+
+        self.assertEqual(graded_users, users)
+        self.assertDictContainsSubset({'attempted': 5, 'succeeded': 5, 'failed': 0}, result)
+        self.assertEqual(self._report_usernames(), usernames)
+
+    def _generate_in_parallel(self, num_users):
+        """
+        Generates the grade report for the given number of new users in
+        shards of 2 users, and returns the usernames and the InstructorTask.
+        """
+        usernames = [u'student{}'.format(index) for index in range(num_users)]
+        for username in usernames:
+            self.create_student(username, u'{}@example.com'.format(username))
+        GradeReportSetting.objects.create(enabled=True, batch_size=2)
+        entry = InstructorTaskFactory.create(course_id=self.course.id, task_type='grade_course', task_id=str(uuid4()))
+
+        with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'):
+            CourseGradeReport.generate(
+                None, entry.id, self.course.id, {}, 'graded', shard_task=calculate_grades_csv_shard,
+            )
+        return usernames, InstructorTask.objects.get(pk=entry.id)
+
+    @ddt.data(
+        ([], 2, [(None, None)]),
+        ([1, 2, 3], 5, [(None, None)]),
+        ([1, 3, 5, 7], 2, [(None, 3), (3, None)]),
+        ([1, 3, 5, 7, 9], 2, [(None, 3), (3, 7), (7, None)]),
+        (range(1, 101), 1, [(None, 25), (25, 50), (50, 75), (75, None)]),
+    )
+    @ddt.unpack
+    @patch.object(CourseGradeReport, 'MAX_SHARDS', 4)
+    def test_shard_ranges(self, user_ids, shard_size, expected_ranges):
+        self.assertEqual(CourseGradeReport()._shard_ranges(user_ids, shard_size), expected_ranges)
+
+    def test_parallel_report(self):
+        """
+        Test that a grade report generated in parallel contains the rows of
+        all shards, and records the time taken by each shard.
+        """
+        usernames, entry = self._generate_in_parallel(5)
+
+        self.assertEqual(entry.task_state, SUCCESS)
+        task_output = json.loads(entry.task_output)
+        self.assertDictContainsSubset({'attempted': 5, 'succeeded': 5, 'failed': 0, 'total': 5}, task_output)
+        self.assertEqual(len(task_output['shard_duration_ms']), 3)
+        self.assertEqual(json.loads(entry.subtasks)['succeeded'], 4)
+        self.assertEqual(self._report_usernames(), usernames)
+        for index in range(3):
+            checkpoint = ReportCheckpoint(self.course.id, u'grade_report_shard{:03d}'.format(index), entry.id)
+            self.assertIsNone(checkpoint.last_user_id)
+
+    @patch.object(CourseGradeReport, '_rows_for_users', Mock(side_effect=Exception('Cannot grade users')))
+    def test_parallel_report_failed_shards(self):
+        """
+        Test that no grade report is uploaded when shards fail.
+        """
+        _, entry = self._generate_in_parallel(3)
+
+        # The merge fails along with the shards.
+        self.assertEqual(json.loads(entry.subtasks)['failed'], 3)
+        self.assertNotIn('shard_duration_ms', json.loads(entry.task_output))
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        self.assertEqual(report_store.links_for(self.course.id), [])
+
 
 class TestTeamGradeReport(InstructorGradeReportTestCase):
     """ Test that teams appear correctly in the grade report when it is enabled for the course. """
@@ -223,6 +223,12 @@ if 'loc_cache' not in CACHES:
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'edx_location_mem_cache',
     }
+# Shared cache of safe_exec results. A result never changes for its key, so
+# it is kept without a timeout. Unless CACHES configures it otherwise (e.g. a
+# DatabaseCache table), it uses the shared memcache tier of the default cache,
+# under its own key prefix.
+if 'safe_exec' not in CACHES:
+    CACHES['safe_exec'] = dict(CACHES['default'], KEY_PREFIX='safe_exec', TIMEOUT=None)
 
 # Email overrides
 DEFAULT_FROM_EMAIL = ENV_TOKENS.get('DEFAULT_FROM_EMAIL', DEFAULT_FROM_EMAIL)
@@ -260,6 +266,8 @@ BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS = ENV_TOKENS.get(
     'BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS',
     BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS
 )
+BULK_EMAIL_CONNECTIONS_PER_TASK = ENV_TOKENS.get('BULK_EMAIL_CONNECTIONS_PER_TASK', BULK_EMAIL_CONNECTIONS_PER_TASK)
+BULK_EMAIL_MAX_SENDS_PER_SECOND = ENV_TOKENS.get('BULK_EMAIL_MAX_SENDS_PER_SECOND', BULK_EMAIL_MAX_SENDS_PER_SECOND)
 # We want Bulk Email running on the high-priority queue, so we define the
 # routing key that points to it. At the moment, the name is the same.
 # We have to reset the value here, since we have changed the value of the queue name.
@@ -272,6 +280,22 @@ BULK_EMAIL_ROUTING_KEY_SMALL_JOBS = ENV_TOKENS.get('BULK_EMAIL_ROUTING_KEY_SMALL
 # Queue to use for updating persistent grades
 RECALCULATE_GRADES_ROUTING_KEY = ENV_TOKENS.get('RECALCULATE_GRADES_ROUTING_KEY', LOW_PRIORITY_QUEUE)
 
+# Delay before queued user state changes are stored
+USER_STATE_WRITE_BEHIND_DELAY = ENV_TOKENS.get('USER_STATE_WRITE_BEHIND_DELAY', USER_STATE_WRITE_BEHIND_DELAY)
+
+# Queue to use for storing queued user state changes
+USER_STATE_WRITE_BEHIND_ROUTING_KEY = ENV_TOKENS.get('USER_STATE_WRITE_BEHIND_ROUTING_KEY', HIGH_PRIORITY_QUEUE)
+
+# Flush the queued user state changes whose flush was lost or failed
+USER_STATE_WRITE_BEHIND_SWEEP_INTERVAL = ENV_TOKENS.get(
+    'USER_STATE_WRITE_BEHIND_SWEEP_INTERVAL', USER_STATE_WRITE_BEHIND_SWEEP_INTERVAL
+)
+if USER_STATE_WRITE_BEHIND_SWEEP_INTERVAL is not None:
+    CELERYBEAT_SCHEDULE['flush-stale-user-state-writes'] = {
+        'task': 'courseware.flush_stale_user_state_writes',
+        'schedule': datetime.timedelta(seconds=USER_STATE_WRITE_BEHIND_SWEEP_INTERVAL),
+    }
+
 # Queue to use for updating persistent social engagements
 RECALCULATE_SOCIAL_ENGAGEMENT_ROUTING_KEY = ENV_TOKENS.get(
     'RECALCULATE_SOCIAL_ENGAGEMENT_ROUTING_KEY',
@@ -357,6 +381,7 @@ VIRTUAL_UNIVERSITIES = ENV_TOKENS.get('VIRTUAL_UNIVERSITIES', [])
 META_UNIVERSITIES = ENV_TOKENS.get('META_UNIVERSITIES', {})
 COMMENTS_SERVICE_URL = ENV_TOKENS.get("COMMENTS_SERVICE_URL", '')
 COMMENTS_SERVICE_KEY = ENV_TOKENS.get("COMMENTS_SERVICE_KEY", '')
+COMMENTS_SERVICE_POOL_SIZE = ENV_TOKENS.get("COMMENTS_SERVICE_POOL_SIZE", COMMENTS_SERVICE_POOL_SIZE)
 CERT_QUEUE = ENV_TOKENS.get("CERT_QUEUE", 'test-pull')
 ZENDESK_URL = ENV_TOKENS.get('ZENDESK_URL', ZENDESK_URL)
 ZENDESK_CUSTOM_FIELDS = ENV_TOKENS.get('ZENDESK_CUSTOM_FIELDS', ZENDESK_CUSTOM_FIELDS)
@@ -383,6 +408,7 @@ for name, value in ENV_TOKENS.get("CODE_JAIL", {}).items():
         CODE_JAIL[name] = value
 
 COURSES_WITH_UNSAFE_CODE = ENV_TOKENS.get("COURSES_WITH_UNSAFE_CODE", [])
+SAFE_EXEC_LOCAL_CACHE_MAX_BYTES = ENV_TOKENS.get('SAFE_EXEC_LOCAL_CACHE_MAX_BYTES', SAFE_EXEC_LOCAL_CACHE_MAX_BYTES)
 
 ASSET_IGNORE_REGEX = ENV_TOKENS.get('ASSET_IGNORE_REGEX', ASSET_IGNORE_REGEX)
 
@@ -827,6 +853,10 @@ COURSE_ABOUT_VISIBILITY_PERMISSION = ENV_TOKENS.get(
 
 # Enrollment API Cache Timeout
 ENROLLMENT_COURSE_DETAILS_CACHE_TIMEOUT = ENV_TOKENS.get('ENROLLMENT_COURSE_DETAILS_CACHE_TIMEOUT', 60)
+ENROLLMENT_COUNT_STRICT_MARGIN = ENV_TOKENS.get('ENROLLMENT_COUNT_STRICT_MARGIN', ENROLLMENT_COUNT_STRICT_MARGIN)
+ENROLLMENT_COUNT_RECONCILE_INTERVAL = ENV_TOKENS.get(
+    'ENROLLMENT_COUNT_RECONCILE_INTERVAL', ENROLLMENT_COUNT_RECONCILE_INTERVAL
+)
 
 # PDF RECEIPT/INVOICE OVERRIDES
 PDF_RECEIPT_TAX_ID = ENV_TOKENS.get('PDF_RECEIPT_TAX_ID', PDF_RECEIPT_TAX_ID)
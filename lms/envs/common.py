@@ -57,6 +57,10 @@ DISCUSSION_SETTINGS = {
     'MAX_COMMENT_DEPTH': 2,
 }
 
+# Number of connections to the comments service kept alive by each process,
+# and of threads making concurrent requests to it.
+COMMENTS_SERVICE_POOL_SIZE = 4
+
 LMS_ROOT_URL = "http://localhost:8000"
 
 # Features
@@ -472,6 +476,7 @@ STATUS_MESSAGE_PATH = ENV_ROOT / "status_message.json"
 
 DATABASE_ROUTERS = [
     'openedx.core.lib.django_courseware_routers.StudentModuleHistoryExtendedRouter',
+    'openedx.core.lib.django_courseware_routers.UserStateWriteQueueRouter',
 ]
 
 ############################ OpenID Provider  ##################################
@@ -849,6 +854,13 @@ CODE_JAIL = {
         # How many CPU seconds can jailed code use?
         'CPU': 1,
     },
+
+    # Keep a pool of warm sandboxed interpreters to execute code in, instead
+    # of starting an interpreter for each execution.  A size of 0 disables it.
+    # Each execution runs in a new process forked from a pool interpreter.
+    'worker_pool': {
+        'size': 0,
+    },
 }
 
 # Some courses are allowed to run unsafe code. This is a list of regexes, one
@@ -861,6 +873,11 @@ CODE_JAIL = {
 #   ]
 COURSES_WITH_UNSAFE_CODE = []
 
+# Maximum size, in bytes, of the safe_exec results cached in each process, in
+# front of the "safe_exec" cache shared by all hosts, which is configured in
+# CACHES, e.g. as a DatabaseCache table or on the shared memcache tier.
+SAFE_EXEC_LOCAL_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
 ############################### DJANGO BUILT-INS ###############################
 # Change DEBUG in your environment settings files, not here
 DEBUG = False
@@ -1893,6 +1910,11 @@ BLOCK_STRUCTURES_SETTINGS = dict(
     # Maximum number of retries per task.
     TASK_MAX_RETRIES=5,
 
+    # Maximum total size, in bytes, of the serialized block structures
+    # kept in each process' local cache.  The local cache is enabled
+    # with the block_structure.process_local_cache waffle switch.
+    LOCAL_CACHE_MAX_BYTES=50 * 1024 * 1024,
+
     # Backend storage
     # STORAGE_CLASS='storages.backends.s3boto.S3BotoStorage',
     # STORAGE_KWARGS=dict(bucket='nim-beryl-test'),
@@ -1943,11 +1965,35 @@ BULK_EMAIL_LOG_SENT_EMAILS = False
 # parallel, and what the SES rate is.
 BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS = 0.02
 
+# Number of connections to the email backend that each bulk email task sends
+# messages with, in parallel.
+BULK_EMAIL_CONNECTIONS_PER_TASK = 1
+
+# Maximum number of messages that each bulk email task sends per second, with
+# all its connections, or 0 for no maximum.
+BULK_EMAIL_MAX_SENDS_PER_SECOND = 0
+
 ############################# Persistent Grades ####################################
 
 # Queue to use for updating persistent grades
 RECALCULATE_GRADES_ROUTING_KEY = LOW_PRIORITY_QUEUE
 
+############################# User State Write-Behind ##############################
+
+# Delay, in seconds, before the user state changes of XBlocks that are
+# queued, when the courseware.user_state_write_behind waffle switch is
+# enabled, are stored.
+USER_STATE_WRITE_BEHIND_DELAY = 5
+
+# Queue to use for storing queued user state changes
+USER_STATE_WRITE_BEHIND_ROUTING_KEY = HIGH_PRIORITY_QUEUE
+
+# Interval, in seconds, at which queued user state changes older than the
+# interval, whose flush was lost or failed, are flushed by a periodic task.
+# The queue is kept in the 'user_state_write_queue' database, if it's
+# configured in DATABASES, rather than in the default database.
+USER_STATE_WRITE_BEHIND_SWEEP_INTERVAL = 5 * 60
+
 ####################### Persistent Social Engagement ##############################
 
 # Queue to use for updating persistent social engagements
@@ -2875,6 +2921,13 @@ COURSE_ABOUT_VISIBILITY_PERMISSION = 'see_exists'
 # Enrollment API Cache Timeout
 ENROLLMENT_COURSE_DETAILS_CACHE_TIMEOUT = 60
 
+# Enrollment counters, read when the student.enrollment_counters waffle switch is enabled.
+# Capacity checks recount enrollments, under a lock of the course's counters, when they
+# are within this many enrollments of the maximum; None to always trust the counters.
+ENROLLMENT_COUNT_STRICT_MARGIN = None
+# Seconds between reconciliations of a course's enrollment counters with its enrollments.
+ENROLLMENT_COUNT_RECONCILE_INTERVAL = 15 * 60
+
 
 OAUTH_ID_TOKEN_EXPIRATION = 60 * 60
 
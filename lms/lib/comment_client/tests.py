@@ -1,13 +1,22 @@
 """ Unit tests for comment_client package"""
 
+import json
+import threading
+import time
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from SocketServer import ThreadingMixIn
+
 import ddt
 import mock
 from datetime import datetime
 from django.test import TestCase
+from django.utils import translation
 
+from django_comment_client.tests.utils import ForumsEnableMixin
 from opaque_keys.edx.locator import CourseLocator
-from lms.lib.comment_client import User, CommentClientRequestError
+from lms.lib.comment_client import User, CommentClientRequestError, perform_concurrently
 from lms.lib.comment_client.user import get_user_social_stats
+from lms.lib.comment_client.utils import perform_request
 
 TEST_ORG = 'test_org'
 TEST_COURSE_ID = 'test_id'
@@ -93,3 +102,104 @@ class UtilityTests(TestCase):
             patched_url_for_social_stats.assert_called_with(user_id)
             patched_perform_request.assert_called_with('get', expected_url, expected_data)
             self.assertEqual(result, expected_result)
+
+
+class StubCommentsServiceHandler(BaseHTTPRequestHandler):
+    """
+    Responds to GET requests with the path and Accept-Language header of the
+    request, after sleeping for the `delay` query parameter, if any, and with
+    a 404 for paths under /missing.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        self.server.connections += 1
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        path = self.path.split('?')[0]
+        if 'delay=' in self.path:
+            time.sleep(float(self.path.split('delay=')[1].split('&')[0]))
+        status = 404 if path.startswith('/missing') else 200
+        body = json.dumps({'path': path, 'language': self.headers.get('Accept-Language')})
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+class StubCommentsService(ThreadingMixIn, HTTPServer):
+    """
+    Stub comments service counting the connections made to it.
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), StubCommentsServiceHandler)
+        self.connections = 0
+
+
+class PooledRequestTests(ForumsEnableMixin, TestCase):
+    """ Tests for requests made to a stub comments service """
+    def setUp(self):
+        super(PooledRequestTests, self).setUp()
+        server = StubCommentsService()
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.server = server
+        self.url = 'http://127.0.0.1:{}'.format(server.server_address[1])
+
+    def test_connection_kept_alive(self):
+        for index in range(3):
+            result = perform_request('get', '{}/threads/{}'.format(self.url, index))
+            self.assertEqual(result['path'], '/threads/{}'.format(index))
+        self.assertEqual(self.server.connections, 1)
+
+    def test_perform_concurrently(self):
+        paths = ['/threads/1', '/users/2', '/commentables/3']
+        start = time.time()
+        results = perform_concurrently(*[
+            lambda path=path: perform_request('get', self.url + path, {'delay': 0.5})
+            for path in paths
+        ])
+        self.assertLess(time.time() - start, 1)
+        self.assertEqual([result['path'] for result in results], paths)
+
+    def test_perform_concurrently_language(self):
+        with translation.override('eo'):
+            results = perform_concurrently(
+                lambda: perform_request('get', self.url + '/threads/1'),
+                lambda: perform_request('get', self.url + '/users/2'),
+            )
+        self.assertEqual([result['language'] for result in results], ['eo', 'eo'])
+
+    def test_perform_concurrently_error(self):
+        calls = []
+
+        def call(path):
+            """ Returns a function requesting the given path. """
+            def request():
+                calls.append(path)
+                return perform_request('get', self.url + path)
+            return request
+
+        with self.assertRaises(CommentClientRequestError) as context:
+            perform_concurrently(call('/threads/1'), call('/missing/2'), call('/users/3'))
+        self.assertEqual(context.exception.status_code, 404)
+        self.assertItemsEqual(calls, ['/threads/1', '/missing/2', '/users/3'])
+
+    @mock.patch('lms.lib.comment_client.utils.dog_stats_api.timer')
+    def test_perform_concurrently_timed(self, mock_timer):
+        perform_concurrently(
+            lambda: perform_request('get', self.url + '/threads/1', metric_action='model.retrieve'),
+            lambda: perform_request('get', self.url + '/users/2', metric_action='model.retrieve'),
+        )
+        timed = [args for args, _ in mock_timer.call_args_list if args[0] == 'comment_client.request.time']
+        self.assertEqual(len(timed), 2)
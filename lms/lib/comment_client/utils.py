@@ -1,16 +1,37 @@
 """" Common utilities for comment client wrapper """
 import logging
+import os
+import sys
+import threading
 from contextlib import contextmanager
+from cookielib import DefaultCookiePolicy
+from multiprocessing.pool import ThreadPool
 from time import time
 from uuid import uuid4
 
 import requests
+import six
+from django.conf import settings
 from django.utils.translation import get_language
+from requests.adapters import HTTPAdapter
 
 import dogstats_wrapper as dog_stats_api
 
 log = logging.getLogger(__name__)
 
+# Default number of connections to the comments service kept alive by each
+# process, and of threads making concurrent requests to it.
+DEFAULT_POOL_SIZE = 4
+
+_lock = threading.Lock()
+_pool_pid = None
+_session = None
+_threads = None
+
+# The forums config and language of the request that started concurrent
+# calls, for the threads making them.
+_call_context = threading.local()
+
 
 def strip_none(dic):
     return dict([(k, v) for k, v in dic.iteritems() if v is not None])
@@ -52,11 +73,99 @@ def request_timer(request_id, method, url, tags=None):
     )
 
 
-def perform_request(method, url, data_or_params=None, raw=False,
-                    metric_action=None, metric_tags=None, paged_results=False):
+class _NoCookiesPolicy(DefaultCookiePolicy):
+    """
+    Cookie policy which doesn't keep cookies set by the comments service, so
+    that requests made over the shared session don't depend on each other.
+    """
+    def set_ok(self, cookie, request):
+        return False
+
+
+def _get_pool():
+    """
+    Return the session and the thread pool of this process, creating them
+    first if needed, e.g. in a new process forked from the one which did.
+    """
+    global _pool_pid, _session, _threads  # pylint: disable=global-statement
+    with _lock:
+        if _pool_pid != os.getpid():
+            pool_size = getattr(settings, 'COMMENTS_SERVICE_POOL_SIZE', DEFAULT_POOL_SIZE)
+            session = requests.Session()
+            session.cookies.set_policy(_NoCookiesPolicy())
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session, _threads, _pool_pid = session, ThreadPool(pool_size), os.getpid()
+        return _session, _threads
+
+
+def http_request(method, url, **kwargs):
+    """
+    Make an HTTP request to the comments service, as `requests.request` does,
+    reusing the connections kept alive by this process.
+    """
+    session, _ = _get_pool()
+    return session.request(method, url, **kwargs)
+
+
+def _call_in_context(config, language, func):
+    """
+    Call `func`, in a thread of the pool, with the forums config and language
+    of the request that started it, and return its result or exception info.
+    """
+    _call_context.config, _call_context.language = config, language
+    try:
+        return func(), None
+    except Exception:  # pylint: disable=broad-except
+        return None, sys.exc_info()
+    finally:
+        del _call_context.config, _call_context.language
+
+
+def perform_concurrently(*funcs):
+    """
+    Call the given functions, which make independent comments service
+    requests, concurrently, and return the list of their results in order.
+
+    The first function is called in the current thread, and the others in
+    threads of a pool, so they shouldn't use the database.  Once they all
+    returned, the exception raised by the first which failed, if any, is
+    raised.  Requests are timed by `perform_request` as usual.
+    """
+    if len(funcs) < 2 or getattr(_call_context, 'config', None) is not None:
+        return [func() for func in funcs]
+
     # To avoid dependency conflict
     from django_comment_common.models import ForumsConfig
     config = ForumsConfig.current()
+    language = get_language()
+    _, threads = _get_pool()
+    async_results = [
+        threads.apply_async(_call_in_context, (config, language, func))
+        for func in funcs[1:]
+    ]
+    try:
+        outcomes = [(funcs[0](), None)]
+    except Exception:  # pylint: disable=broad-except
+        outcomes = [(None, sys.exc_info())]
+    outcomes.extend(async_result.get() for async_result in async_results)
+
+    for _, exc_info in outcomes:
+        if exc_info is not None:
+            six.reraise(*exc_info)
+    return [result for result, _ in outcomes]
+
+
+def perform_request(method, url, data_or_params=None, raw=False,
+                    metric_action=None, metric_tags=None, paged_results=False):
+    config = getattr(_call_context, 'config', None)
+    language = getattr(_call_context, 'language', None)
+    if config is None:
+        # To avoid dependency conflict
+        from django_comment_common.models import ForumsConfig
+        config = ForumsConfig.current()
+        language = get_language()
 
     if not config.enabled:
         raise CommentClientMaintenanceError('service disabled')
@@ -72,7 +181,7 @@ def perform_request(method, url, data_or_params=None, raw=False,
         data_or_params = {}
     headers = {
         'X-Edx-Api-Key': config.api_key,
-        'Accept-Language': get_language(),
+        'Accept-Language': language,
     }
     request_id = uuid4()
     request_id_dict = {'request_id': request_id}
@@ -84,7 +193,7 @@ def perform_request(method, url, data_or_params=None, raw=False,
         data = None
         params = merge_dict(data_or_params, request_id_dict)
     with request_timer(request_id, method, url, metric_tags):
-        response = requests.request(
+        response = http_request(
             method,
             url,
             data=data,
@@ -31,6 +31,7 @@ from edx_solutions_projects.scope_resolver import GroupProjectParticipantsScopeR
 from edx_notifications.scopes import register_user_scope_resolver
 from edx_notifications.namespaces import register_namespace_resolver
 from util.namespace_resolver import CourseNamespaceResolver
+from util.sandboxing import configure_safe_exec_worker_pool
 from edx_notifications import startup
 
 from microsite_configuration import microsite
@@ -98,6 +99,9 @@ def run():
     xmodule.x_module.descriptor_global_handler_url = lms_xblock.runtime.handler_url
     xmodule.x_module.descriptor_global_local_resource_url = lms_xblock.runtime.local_resource_url
 
+    # Execute sandboxed code in a pool of warm interpreters, if enabled.
+    configure_safe_exec_worker_pool()
+
     # Set the version of docs that help-tokens will go to.
     settings.HELP_TOKENS_LANGUAGE_CODE = settings.LANGUAGE_CODE
     settings.HELP_TOKENS_VERSION = doc_version()
@@ -16,6 +16,9 @@ INVALIDATE_CACHE_ON_PUBLISH = u'invalidate_cache_on_publish'
 STORAGE_BACKING_FOR_CACHE = u'storage_backing_for_cache'
 RAISE_ERROR_WHEN_NOT_FOUND = u'raise_error_when_not_found'
 PRUNE_OLD_VERSIONS = u'prune_old_versions'
+COMPACT_SERIALIZATION = u'compact_serialization'
+PROCESS_LOCAL_CACHE = u'process_local_cache'
+INCREMENTAL_UPDATE = u'incremental_update'
 
 
 def waffle():
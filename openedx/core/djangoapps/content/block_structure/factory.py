@@ -1,6 +1,8 @@
 """
 Module for factory class for BlockStructure objects.
 """
+from xmodule.modulestore.exceptions import ItemNotFoundError
+
 from .block_structure import BlockStructureModulestoreData, BlockStructureBlockData
 
 
@@ -57,6 +59,141 @@ class BlockStructureFactory(object):
         build_block_structure(root_xblock)
         return block_structure
 
+    @classmethod
+    def create_partial_from_modulestore(cls, previous_block_structure, changed_block_keys, modulestore):
+        """
+        Creates and returns a partial block structure from the modulestore,
+        containing only the subtrees of the given changed blocks along with
+        all of their ancestors.
+
+        Changed blocks that no longer exist in the modulestore are ignored.
+        The ancestors of the changed subtrees are found using the relations
+        in the previous block structure, which are still valid for any
+        ancestor that is not itself a changed block.
+
+        Arguments:
+            previous_block_structure (BlockStructureBlockData) - The
+                previously collected block structure.
+
+            changed_block_keys (set(UsageKey)) - The usage keys of the
+                blocks that were added, removed or modified in the
+                modulestore since the previous block structure was
+                collected.
+
+            modulestore (ModuleStoreRead) - The modulestore that
+                contains the current data for the xBlocks.
+
+        Returns:
+            (BlockStructureModulestoreData, set(UsageKey)) - The partial
+                block structure, and the usage keys of the blocks in the
+                changed subtrees that are reachable from its root.
+        """
+        root_block_usage_key = previous_block_structure.root_block_usage_key
+        block_structure = BlockStructureModulestoreData(root_block_usage_key)
+        subtree_block_keys = set()
+
+        def build_subtree(xblock):
+            """
+            Recursively update the block structure with the given xBlock
+            and its descendants.
+            """
+            if xblock.location in subtree_block_keys:
+                return
+
+            subtree_block_keys.add(xblock.location)
+            block_structure._add_xblock(xblock.location, xblock)  # pylint: disable=protected-access
+            for child in xblock.get_children():
+                block_structure._add_relation(xblock.location, child.location)  # pylint: disable=protected-access
+                build_subtree(child)
+
+        # Only previously existing blocks can be the roots of changed
+        # subtrees, since any added block has a changed parent.
+        for block_key in changed_block_keys:
+            if block_key in previous_block_structure:
+                try:
+                    build_subtree(modulestore.get_item(block_key, depth=None, lazy=False))
+                except ItemNotFoundError:
+                    pass
+
+        # Add the unchanged ancestors of the changed subtrees.
+        blocks_to_visit = list(subtree_block_keys)
+        ancestor_block_keys = set()
+        while blocks_to_visit:
+            block_key = blocks_to_visit.pop()
+            for parent_key in previous_block_structure.get_parents(block_key):
+                if parent_key in changed_block_keys:
+                    continue
+                block_structure._add_relation(parent_key, block_key)  # pylint: disable=protected-access
+                if parent_key not in subtree_block_keys and parent_key not in ancestor_block_keys:
+                    ancestor_block_keys.add(parent_key)
+                    # pylint: disable=protected-access
+                    block_structure._add_xblock(parent_key, modulestore.get_item(parent_key))
+                    blocks_to_visit.append(parent_key)
+
+        if root_block_usage_key not in ancestor_block_keys:
+            block_structure._add_xblock(  # pylint: disable=protected-access
+                root_block_usage_key, modulestore.get_item(root_block_usage_key),
+            )
+
+        reachable_block_keys = set(block_structure.topological_traversal())
+        return block_structure, subtree_block_keys & reachable_block_keys
+
+    @classmethod
+    def create_merged(cls, previous_block_structure, partial_block_structure, updated_block_keys):
+        """
+        Returns a new block structure that merges the relations and the
+        collected data of the given updated blocks from the given partial
+        block structure into the given previous block structure.
+
+        Arguments:
+            previous_block_structure (BlockStructureBlockData) - The
+                previously collected block structure.
+
+            partial_block_structure (BlockStructureBlockData) - A partial
+                block structure, as created by
+                create_partial_from_modulestore, with newly collected data.
+
+            updated_block_keys (set(UsageKey)) - The usage keys of the
+                blocks whose relations and data are to be taken from the
+                partial block structure.
+
+        The data of all other blocks, including the ancestors of the
+        updated blocks, is kept from the previous block structure. So
+        this is only valid for transformers whose collected data does
+        not depend on a block's descendants.
+        """
+        def get_children(block_key):
+            """
+            Returns the current children of the given block.
+            """
+            if block_key in updated_block_keys:
+                return partial_block_structure.get_children(block_key)
+            return previous_block_structure.get_children(block_key)
+
+        root_block_usage_key = previous_block_structure.root_block_usage_key
+        block_structure = BlockStructureBlockData(root_block_usage_key)
+        blocks_to_visit = [root_block_usage_key]
+        visited_block_keys = {root_block_usage_key}
+        while blocks_to_visit:
+            block_key = blocks_to_visit.pop()
+            for child_key in get_children(block_key):
+                block_structure._add_relation(block_key, child_key)  # pylint: disable=protected-access
+                if child_key not in visited_block_keys:
+                    visited_block_keys.add(child_key)
+                    blocks_to_visit.append(child_key)
+
+        for block_key in visited_block_keys:
+            source_block_structure = (
+                partial_block_structure if block_key in updated_block_keys else previous_block_structure
+            )
+            block_data = source_block_structure._block_data_map.get(block_key)  # pylint: disable=protected-access
+            if block_data is not None:
+                block_structure._block_data_map[block_key] = block_data  # pylint: disable=protected-access
+
+        block_structure.transformer_data = previous_block_structure.transformer_data
+        block_structure.transformer_data.update(partial_block_structure.transformer_data)
+        return block_structure
+
     @classmethod
     def create_from_store(cls, root_block_usage_key, block_structure_store):
         """
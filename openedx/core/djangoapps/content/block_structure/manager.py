@@ -3,6 +3,7 @@ Top-level module for the Block Structure framework with a class for managing
 BlockStructures.
 """
 from contextlib import contextmanager
+from logging import getLogger
 
 from . import config
 from .exceptions import UsageKeyNotInBlockStructure, TransformerDataIncompatible, BlockStructureNotFound
@@ -11,6 +12,9 @@ from .store import BlockStructureStore
 from .transformers import BlockStructureTransformers
 
 
+logger = getLogger(__name__)  # pylint: disable=invalid-name
+
+
 class BlockStructureManager(object):
     """
     Top-level class for managing Block Structures.
@@ -120,14 +124,77 @@ class BlockStructureManager(object):
         the modulestore.
         """
         with self._bulk_operations():
-            block_structure = BlockStructureFactory.create_from_modulestore(
-                self.root_block_usage_key,
-                self.modulestore,
-            )
-            BlockStructureTransformers.collect(block_structure)
+            block_structure = None
+            if config.waffle().is_enabled(config.INCREMENTAL_UPDATE):
+                block_structure = self._collect_incrementally()
+
+            if block_structure is None:
+                block_structure = BlockStructureFactory.create_from_modulestore(
+                    self.root_block_usage_key,
+                    self.modulestore,
+                )
+                BlockStructureTransformers.collect(block_structure)
+
             self.store.add(block_structure)
             return block_structure
 
+    def _collect_incrementally(self):
+        """
+        Returns a block structure with newly collected transformers data
+        for only the blocks that changed in the modulestore since the
+        stored block structure was collected, merged with the stored
+        data for all other blocks.
+
+        Returns None if an incremental update is not possible, in which
+        case data needs to be collected for the entire structure.
+        """
+        if not BlockStructureTransformers.supports_incremental_collect():
+            return None
+
+        previous_version = self.store.get_data_version(self.root_block_usage_key)
+        get_changed_block_keys = getattr(self.modulestore, 'get_blocks_changed_between_versions', None)
+        if previous_version is None or get_changed_block_keys is None:
+            return None
+
+        root_block = self.modulestore.get_item(self.root_block_usage_key)
+        current_version = getattr(root_block, 'course_version', None)
+        if current_version is None:
+            return None
+
+        changed_block_keys = get_changed_block_keys(
+            self.root_block_usage_key.course_key, previous_version, current_version,
+        )
+        if changed_block_keys is None:
+            return None
+        changed_block_keys = set(changed_block_keys)
+        if self.root_block_usage_key in changed_block_keys:
+            return None
+
+        try:
+            previous_block_structure = self.store.get(self.root_block_usage_key)
+        except BlockStructureNotFound:
+            return None
+        if not BlockStructureTransformers.is_collected_with_current_versions(previous_block_structure):
+            return None
+
+        partial_block_structure, updated_block_keys = BlockStructureFactory.create_partial_from_modulestore(
+            previous_block_structure,
+            changed_block_keys,
+            self.modulestore,
+        )
+        BlockStructureTransformers.collect(partial_block_structure)
+        logger.info(
+            u'BlockStructure: Collected incrementally; %s, changed blocks: %d, updated blocks: %d.',
+            self.root_block_usage_key,
+            len(changed_block_keys),
+            len(updated_block_keys),
+        )
+        return BlockStructureFactory.create_merged(
+            previous_block_structure,
+            partial_block_structure,
+            updated_block_keys,
+        )
+
     def clear(self):
         """
         Removes data for the block structure associated with the given
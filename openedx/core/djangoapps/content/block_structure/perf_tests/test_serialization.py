@@ -0,0 +1,130 @@
+"""
+Performance test comparing the legacy and compact serialization formats
+of block structures.
+"""
+# pylint: disable=protected-access
+from __future__ import print_function
+
+import timeit
+import unittest
+from uuid import uuid4
+
+from opaque_keys.edx.locator import BlockUsageLocator, CourseLocator
+
+from openedx.core.lib.cache_utils import zpickle, zunpickle
+
+from .. import serialization
+from ..block_structure import BlockStructureBlockData
+from ..tests.helpers import MockTransformer
+
+# Number of chapters, sequentials per chapter, verticals per sequential
+# and problems per vertical in the generated course, for 3,000+ blocks.
+COURSE_SHAPE = (10, 10, 5, 6)
+
+# Number of times to repeat each timed operation.
+NUM_REPEATS = 10
+
+
+def _create_course_block_structure():
+    """
+    Returns a block structure for a generated course of the shape
+    described by COURSE_SHAPE, with xBlock fields and transformer data
+    similar to those collected by the registered transformers.
+    """
+    course_key = CourseLocator('org', 'course', unicode(uuid4()))
+    root_key = BlockUsageLocator(course_key, 'course', 'course')
+    block_structure = BlockStructureBlockData(root_key)
+    block_structure._add_transformer(MockTransformer)
+
+    def _add_children(parent_key, depth, block_types):
+        """
+        Recursively adds generated children of the given parent.
+        """
+        if not block_types:
+            return
+        for index in range(COURSE_SHAPE[depth]):
+            child_key = BlockUsageLocator(course_key, block_types[0], '{}_{}'.format(parent_key.block_id, index))
+            block_structure._add_relation(parent_key, child_key)
+            block_data = block_structure._get_or_create_block(child_key)
+            block_data.display_name = u'Block {}'.format(child_key.block_id)
+            block_data.graded = block_types[0] == 'sequential'
+            block_data.format = u'Homework'
+            block_structure.set_transformer_block_field(child_key, MockTransformer, 'merged_start_date', None)
+            block_structure.set_transformer_block_field(
+                child_key, MockTransformer, 'merged_visible_to_staff_only', False
+            )
+            block_structure.set_transformer_block_field(child_key, MockTransformer, 'max_score', float(index))
+            _add_children(child_key, depth + 1, block_types[1:])
+
+    _add_children(root_key, 0, ['chapter', 'sequential', 'vertical', 'problem'])
+    return block_structure
+
+
+def _legacy_serialize(block_structure):
+    """
+    Returns the legacy serialization of the given block structure.
+    """
+    return zpickle((
+        block_structure._block_relations,
+        block_structure.transformer_data,
+        block_structure._block_data_map,
+    ))
+
+
+def _get_first_transformer_field(block_data_map):
+    """
+    Accesses the transformer data of a single block, as a transform
+    phase would.
+    """
+    block_data = next(block_data_map.itervalues())
+    return block_data.transformer_data[MockTransformer].max_score
+
+
+# Eventually, exclude this attribute from regular unittests while running *only* tests
+# with this attribute during regular performance tests.
+# @attr("perf_test")
+@unittest.skip
+class BlockStructureSerializationPerf(unittest.TestCase):
+    """
+    This class exists to time the serialization of a large block
+    structure in the legacy and compact formats, and to compare the
+    resulting payload sizes.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    def _time(self, func):
+        """
+        Returns the average wall time of the given function, in milliseconds.
+        """
+        return timeit.timeit(func, number=NUM_REPEATS) * 1000 / NUM_REPEATS
+
+    def test_serialization_timings(self):
+        block_structure = _create_course_block_structure()
+        legacy_data = _legacy_serialize(block_structure)
+        compact_data = serialization.encode(block_structure)
+
+        results = [
+            (
+                'legacy',
+                len(legacy_data),
+                self._time(lambda: _legacy_serialize(block_structure)),
+                self._time(lambda: zunpickle(legacy_data)),
+                self._time(lambda: _get_first_transformer_field(zunpickle(legacy_data)[2])),
+            ),
+            (
+                'compact',
+                len(compact_data),
+                self._time(lambda: serialization.encode(block_structure)),
+                self._time(lambda: serialization.decode(compact_data)),
+                self._time(lambda: _get_first_transformer_field(serialization.decode(compact_data)[2])),
+            ),
+        ]
+
+        print('\nBlocks: {}'.format(len(block_structure)))
+        print('{:<10}{:>12}{:>16}{:>18}{:>22}'.format(
+            'format', 'size (B)', 'serialize (ms)', 'deserialize (ms)', 'deserialize+1 (ms)'
+        ))
+        for result in results:
+            print('{:<10}{:>12}{:>16.2f}{:>18.2f}{:>22.2f}'.format(*result))
@@ -0,0 +1,328 @@
+"""
+Module for the compact serialization of BlockStructure data.
+
+The legacy serialization format zlib-compresses a single pickle of the
+structure's block relations, transformer data and block data map. Every
+read therefore pays for unpickling all the collected data, including the
+data of transformers that are not used by the request.
+
+The compact format implemented here is:
+
+  * Versioned - serialized data starts with a header containing a magic
+    prefix and the format version, so data in the legacy format can
+    still be recognized and read.
+
+  * Interned - each usage key is stored only once, in a list of keys.
+    All relations and block data refer to blocks by their integer index
+    in that list.
+
+  * Columnar - collected xBlock fields and transformer block fields are
+    stored as a column per field name: a list of block indices and a
+    corresponding list of values.
+
+  * Lazy - the block data of each transformer is compressed into its own
+    section, which is only decompressed and unpickled when that
+    transformer's block data is first accessed.
+"""
+# pylint: disable=protected-access
+from copy import deepcopy
+from itertools import izip
+import cPickle as pickle
+import struct
+import zlib
+
+from .block_structure import _BlockRelations, BlockData, TransformerData, TransformerDataMap
+
+
+# The latest version of the compact serialization format. Update this
+# value whenever the layout of the serialized data changes, while
+# keeping support for reading previous versions.
+FORMAT_VERSION = 1
+
+# Prefix of all data in the compact format. Legacy zlib streams always
+# start with a compression method byte of 0x?8, so they never start
+# with a null byte.
+_MAGIC = b'\x00BS'
+
+# Header: magic prefix, format version and the length of the
+# compressed structure data that follows the header.
+_HEADER = struct.Struct('>3sBI')
+
+
+def is_compact_format(serialized_data):
+    """
+    Returns whether the given serialized data is in the compact format.
+    """
+    return serialized_data[:len(_MAGIC)] == _MAGIC
+
+
+def encode(block_structure):
+    """
+    Returns the compact serialization of the block relations, transformer
+    data and block data map of the given block structure.
+    """
+    keys = []
+    key_indices = {}
+
+    def _index_of(usage_key):
+        """
+        Returns the index of the given usage key in the list of
+        interned keys, adding it if needed.
+        """
+        try:
+            return key_indices[usage_key]
+        except KeyError:
+            key_indices[usage_key] = len(keys)
+            keys.append(usage_key)
+            return key_indices[usage_key]
+
+    relation_blocks, children, parents = [], [], []
+    for usage_key, relations in block_structure._block_relations.iteritems():
+        relation_blocks.append(_index_of(usage_key))
+        children.append(tuple(_index_of(child) for child in relations.children))
+        parents.append(tuple(_index_of(parent) for parent in relations.parents))
+
+    data_blocks = []
+    xblock_fields = {}
+    transformer_columns = {}
+    for usage_key, block_data in block_structure._block_data_map.iteritems():
+        block_index = _index_of(usage_key)
+        data_blocks.append(block_index)
+        _add_to_columns(xblock_fields, block_index, block_data.fields)
+        for transformer_name, transformer_block_data in block_data.transformer_data.iteritems():
+            section = transformer_columns.setdefault(transformer_name, {'blocks': [], 'fields': {}})
+            section['blocks'].append(block_index)
+            _add_to_columns(section['fields'], block_index, transformer_block_data.fields)
+
+    sections = {}
+    section_payloads = []
+    offset = 0
+    for transformer_name, section in transformer_columns.iteritems():
+        payload = _dumps(section)
+        sections[transformer_name] = (offset, len(payload))
+        section_payloads.append(payload)
+        offset += len(payload)
+
+    structure_payload = _dumps({
+        'keys': keys,
+        'relation_blocks': relation_blocks,
+        'children': children,
+        'parents': parents,
+        'data_blocks': data_blocks,
+        'xblock_fields': xblock_fields,
+        'transformer_data': dict(block_structure.transformer_data),
+        'sections': sections,
+    })
+    return b''.join(
+        [_HEADER.pack(_MAGIC, FORMAT_VERSION, len(structure_payload)), structure_payload] + section_payloads
+    )
+
+
+def decode(serialized_data):
+    """
+    Returns a tuple of the block relations, transformer data and block
+    data map parsed from the given compact serialization.
+
+    The block data of each transformer is decoded lazily, upon first
+    access.
+    """
+    magic, version, structure_length = _HEADER.unpack_from(serialized_data)
+    if magic != _MAGIC or version > FORMAT_VERSION:
+        raise ValueError('Unsupported block structure serialization format: {}'.format(version))
+
+    structure_start = _HEADER.size
+    sections_start = structure_start + structure_length
+    structure = _loads(serialized_data[structure_start:sections_start])
+    keys = structure['keys']
+
+    block_relations = {}
+    for block_index, children, parents in izip(
+            structure['relation_blocks'], structure['children'], structure['parents'],
+    ):
+        relations = _BlockRelations()
+        relations.children = [keys[child] for child in children]
+        relations.parents = [keys[parent] for parent in parents]
+        block_relations[keys[block_index]] = relations
+
+    blocks_by_index = {}
+    transformer_sections = _TransformerSections(
+        serialized_data[sections_start:], structure['sections'], blocks_by_index,
+    )
+    block_data_map = {}
+    for block_index in structure['data_blocks']:
+        block_data = BlockData(keys[block_index])
+        block_data.transformer_data = _LazyTransformerDataMap(transformer_sections)
+        blocks_by_index[block_index] = block_data
+        block_data_map[keys[block_index]] = block_data
+
+    for field_name, (indices, values) in structure['xblock_fields'].iteritems():
+        for block_index, value in izip(indices, values):
+            blocks_by_index[block_index].fields[field_name] = value
+
+    transformer_data = TransformerDataMap()
+    transformer_data.update(structure['transformer_data'])
+
+    return block_relations, transformer_data, block_data_map
+
+
+def _add_to_columns(columns, block_index, fields):
+    """
+    Appends the given block's field values to the given columns.
+    """
+    for field_name, value in fields.iteritems():
+        indices, values = columns.setdefault(field_name, ([], []))
+        indices.append(block_index)
+        values.append(value)
+
+
+def _dumps(data):
+    """
+    Returns a zlib compressed pickled serialization of the given data.
+    """
+    return zlib.compress(pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+
+
+def _loads(zdata):
+    """
+    Returns the data deserialized from the given zlib compressed pickle.
+    """
+    return pickle.loads(zlib.decompress(zdata))
+
+
+class _TransformerSections(object):
+    """
+    Not-yet-decoded transformer block data sections that are shared by
+    all the blocks of a single deserialized block structure.
+    """
+    def __init__(self, payload, locations, blocks_by_index):
+        # Concatenated compressed sections.
+        self._payload = payload
+
+        # Map of transformer name to the (offset, length) of its
+        # section in the payload, for sections not yet decoded.
+        self._pending = dict(locations)
+
+        # Map of block index to its BlockData.
+        self._blocks_by_index = blocks_by_index
+
+    def load(self, transformer_name):
+        """
+        Decodes the section of the given transformer, if still
+        pending, into the transformer data maps of all blocks.
+        """
+        location = self._pending.pop(transformer_name, None)
+        if location is None:
+            return
+
+        offset, length = location
+        section = _loads(self._payload[offset:offset + length])
+        for block_index in section['blocks']:
+            dict.__setitem__(self._blocks_by_index[block_index].transformer_data, transformer_name, TransformerData())
+        for field_name, (indices, values) in section['fields'].iteritems():
+            for block_index, value in izip(indices, values):
+                transformer_data_map = self._blocks_by_index[block_index].transformer_data
+                dict.__getitem__(transformer_data_map, transformer_name).fields[field_name] = value
+
+        if not self._pending:
+            # Release the payload once everything is decoded.
+            self._payload = None
+
+    def load_all(self):
+        """
+        Decodes all pending sections.
+        """
+        for transformer_name in list(self._pending):
+            self.load(transformer_name)
+
+
+class _LazyTransformerDataMap(TransformerDataMap):
+    """
+    A TransformerDataMap for a single block that decodes a transformer's
+    data section on first access to that transformer's data.
+
+    Any access that needs the entire map (iteration, copying, pickling)
+    decodes all pending sections.
+    """
+    def __init__(self, transformer_sections):
+        super(_LazyTransformerDataMap, self).__init__()
+        self._transformer_sections = transformer_sections
+
+    def __getitem__(self, key):
+        self._load(key)
+        return super(_LazyTransformerDataMap, self).__getitem__(key)
+
+    def __setitem__(self, key, value):
+        self._load(key)
+        super(_LazyTransformerDataMap, self).__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._load(key)
+        super(_LazyTransformerDataMap, self).__delitem__(key)
+
+    def __contains__(self, key):
+        self._load(key)
+        return dict.__contains__(self, self._translate_key(key))
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __iter__(self):
+        self._transformer_sections.load_all()
+        return dict.__iter__(self)
+
+    def __len__(self):
+        self._transformer_sections.load_all()
+        return dict.__len__(self)
+
+    def keys(self):
+        self._transformer_sections.load_all()
+        return dict.keys(self)
+
+    def values(self):
+        self._transformer_sections.load_all()
+        return dict.values(self)
+
+    def items(self):
+        self._transformer_sections.load_all()
+        return dict.items(self)
+
+    def iterkeys(self):
+        self._transformer_sections.load_all()
+        return dict.iterkeys(self)
+
+    def itervalues(self):
+        self._transformer_sections.load_all()
+        return dict.itervalues(self)
+
+    def iteritems(self):
+        self._transformer_sections.load_all()
+        return dict.iteritems(self)
+
+    def __deepcopy__(self, memo):
+        """
+        Copies into a regular TransformerDataMap, so the copy does not
+        share or hold on to the pending sections.
+        """
+        self._transformer_sections.load_all()
+        copied = TransformerDataMap()
+        memo[id(self)] = copied
+        for key, value in dict.iteritems(self):
+            dict.__setitem__(copied, key, deepcopy(value, memo))
+        return copied
+
+    def __reduce__(self):
+        """
+        Pickles as a regular TransformerDataMap.
+        """
+        self._transformer_sections.load_all()
+        return TransformerDataMap, (), None, None, dict.iteritems(self)
+
+    def _load(self, key):
+        """
+        Decodes the data section of the transformer identified by the
+        given key, if not already decoded.
+        """
+        self._transformer_sections.load(self._translate_key(key))
@@ -4,9 +4,12 @@ Module for the Storage of BlockStructure objects.
 # pylint: disable=protected-access
 from logging import getLogger
 
-from openedx.core.lib.cache_utils import zpickle, zunpickle
+from django.conf import settings
 
-from . import config
+from openedx.core.djangoapps import monitoring_utils
+from openedx.core.lib.cache_utils import memoized, SizeBoundedLRUCache, zpickle, zunpickle
+
+from . import config, serialization
 from .block_structure import BlockStructureBlockData
 from .exceptions import BlockStructureNotFound
 from .factory import BlockStructureFactory
@@ -16,6 +19,10 @@ from .transformer_registry import TransformerRegistry
 
 logger = getLogger(__name__)  # pylint: disable=C0103
 
+# Default maximum total size, in bytes, of the serialized block
+# structures kept in the per-process cache.
+DEFAULT_LOCAL_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
 
 class StubModel(object):
     """
@@ -65,6 +72,7 @@ class BlockStructureStore(object):
 
         bs_model = self._update_or_create_model(block_structure, serialized_data)
         self._add_to_cache(serialized_data, bs_model)
+        self._add_to_local_cache(serialized_data, bs_model)
 
     def get(self, root_block_usage_key):
         """
@@ -89,10 +97,13 @@ class BlockStructureStore(object):
         """
         bs_model = self._get_model(root_block_usage_key)
 
-        try:
-            serialized_data = self._get_from_cache(bs_model)
-        except BlockStructureNotFound:
-            serialized_data = self._get_from_store(bs_model)
+        serialized_data = self._get_from_local_cache(bs_model)
+        if serialized_data is None:
+            try:
+                serialized_data = self._get_from_cache(bs_model)
+            except BlockStructureNotFound:
+                serialized_data = self._get_from_store(bs_model)
+            self._add_to_local_cache(serialized_data, bs_model)
 
         return self._deserialize(serialized_data, root_block_usage_key)
 
@@ -105,11 +116,24 @@ class BlockStructureStore(object):
             root_block_usage_key (UsageKey) - The usage_key for the root
                 of the block structure that is to be removed.
         """
+        self.evict_from_local_cache(root_block_usage_key)
         bs_model = self._get_model(root_block_usage_key)
         self._cache.delete(self._encode_root_cache_key(bs_model))
         bs_model.delete()
         logger.info("BlockStructure: Deleted from cache and store; %s.", bs_model)
 
+    @staticmethod
+    def evict_from_local_cache(root_block_usage_key):
+        """
+        Removes the block structure for the given root_block_usage_key
+        from the cache of the current process only.
+
+        Arguments:
+            root_block_usage_key (UsageKey) - The usage_key for the root
+                of the block structure that is to be evicted.
+        """
+        get_local_cache().delete(unicode(root_block_usage_key))
+
     def is_up_to_date(self, root_block_usage_key, modulestore):
         """
         Returns whether the data in storage for the given key is
@@ -125,6 +149,29 @@ class BlockStructureStore(object):
 
         return False
 
+    def get_data_version(self, root_block_usage_key):
+        """
+        Returns the version of the modulestore data from which the
+        stored block structure for the given key was collected.
+
+        Returns None if the version is unknown, which is the case when
+        storage backing is disabled, or if the stored block structure
+        was written with a different schema than the current one.
+        """
+        if not _is_storage_backing_enabled():
+            return None
+        try:
+            bs_model = self._get_model(root_block_usage_key)
+        except BlockStructureNotFound:
+            return None
+
+        stored_version_data = self._version_data_of_model(bs_model)
+        current_version_data = self._version_data_of_block(None)
+        for field_name in ('transformers_schema_version', 'block_structure_schema_version'):
+            if stored_version_data[field_name] != current_version_data[field_name]:
+                return None
+        return stored_version_data['data_version']
+
     def _get_model(self, root_block_usage_key):
         """
         Returns the model associated with the given key.
@@ -176,6 +223,43 @@ class BlockStructureStore(object):
             logger.info("BlockStructure: Read from cache; %s, size: %d", bs_model, len(serialized_data))
         return serialized_data
 
+    def _add_to_local_cache(self, serialized_data, bs_model):
+        """
+        Adds the given serialized_data for the given BlockStructureModel
+        to the per-process cache, along with its version-specific
+        cache key.
+        """
+        if not _is_local_cache_enabled():
+            return
+
+        local_cache = get_local_cache()
+        evictions_before = local_cache.evictions
+        local_cache.set(
+            unicode(bs_model.data_usage_key),
+            (self._encode_root_cache_key(bs_model), serialized_data),
+        )
+        monitoring_utils.accumulate(
+            'block_structure.local_cache.evictions', local_cache.evictions - evictions_before,
+        )
+
+    def _get_from_local_cache(self, bs_model):
+        """
+        Returns the serialized data for the given BlockStructureModel
+        from the per-process cache, if found with a matching version.
+        Otherwise, returns None.
+        """
+        if not _is_local_cache_enabled():
+            return None
+
+        cached_key, serialized_data = get_local_cache().get(unicode(bs_model.data_usage_key), (None, None))
+        if cached_key != self._encode_root_cache_key(bs_model):
+            monitoring_utils.increment('block_structure.local_cache.misses')
+            return None
+
+        monitoring_utils.increment('block_structure.local_cache.hits')
+        logger.info("BlockStructure: Read from local cache; %s, size: %d", bs_model, len(serialized_data))
+        return serialized_data
+
     def _get_from_store(self, bs_model):
         """
         Returns the serialized data for the given BlockStructureModel
@@ -191,7 +275,13 @@ class BlockStructureStore(object):
     def _serialize(self, block_structure):
         """
         Serializes the data for the given block_structure.
+
+        Uses the compact serialization format when enabled. Otherwise,
+        the data is pickled and compressed as a whole.
         """
+        if config.waffle().is_enabled(config.COMPACT_SERIALIZATION):
+            return serialization.encode(block_structure)
+
         data_to_cache = (
             block_structure._block_relations,
             block_structure.transformer_data,
@@ -202,8 +292,14 @@ class BlockStructureStore(object):
     def _deserialize(self, serialized_data, root_block_usage_key):
         """
         Deserializes the given data and returns the parsed block_structure.
+
+        Data in either the compact or the legacy pickled format is
+        supported, regardless of the format currently used for writing.
         """
-        block_relations, transformer_data, block_data_map = zunpickle(serialized_data)
+        if serialization.is_compact_format(serialized_data):
+            block_relations, transformer_data, block_data_map = serialization.decode(serialized_data)
+        else:
+            block_relations, transformer_data, block_data_map = zunpickle(serialized_data)
         return BlockStructureFactory.create_new(
             root_block_usage_key,
             block_relations,
@@ -250,6 +346,30 @@ class BlockStructureStore(object):
         }
 
 
+@memoized
+def get_local_cache():
+    """
+    Returns the per-process cache of serialized block structures,
+    shared by all BlockStructureStore instances in the process.
+    """
+    return SizeBoundedLRUCache(
+        max_size=settings.BLOCK_STRUCTURES_SETTINGS.get('LOCAL_CACHE_MAX_BYTES', DEFAULT_LOCAL_CACHE_MAX_BYTES),
+        get_size=lambda entry: len(entry[1]),
+    )
+
+
+def _is_local_cache_enabled():
+    """
+    Returns whether the per-process cache for Block Structures is enabled.
+
+    Since other processes may update the stored block structure, the
+    per-process cache is only used when storage backing is enabled. The
+    cache key of a storage-backed block structure includes the version
+    data of the structure, as recorded in its BlockStructureModel.
+    """
+    return config.waffle().is_enabled(config.PROCESS_LOCAL_CACHE) and _is_storage_backing_enabled()
+
+
 def _is_storage_backing_enabled():
     """
     Returns whether storage backing for Block Structures is enabled.
@@ -65,3 +65,35 @@ class TestBlockStructureFactory(TestCase, ChildrenMapTestMixin):
             block_structure._block_data_map,  # pylint: disable=protected-access
         )
         self.assert_block_structure(new_structure, self.children_map)
+
+    def test_partial_from_modulestore_and_merged(self):
+        previous_structure = BlockStructureFactory.create_from_modulestore(
+            root_block_usage_key=0, modulestore=self.modulestore
+        )
+
+        # Block 4 is moved from block 1 to block 2.
+        new_children_map = [[1, 2], [3], [4], [], []]
+        new_modulestore = MockModulestoreFactory.create(new_children_map, self.block_key_factory)
+        partial_structure, updated_block_keys = BlockStructureFactory.create_partial_from_modulestore(
+            previous_structure, {1, 2}, new_modulestore,
+        )
+        self.assertEqual(updated_block_keys, {1, 2, 3, 4})
+        self.assert_block_structure(partial_structure, new_children_map)
+
+        merged_structure = BlockStructureFactory.create_merged(
+            previous_structure, partial_structure, updated_block_keys,
+        )
+        self.assert_block_structure(merged_structure, new_children_map)
+
+    def test_partial_from_modulestore_with_unchanged_ancestors(self):
+        children_map = self.LINEAR_CHILDREN_MAP
+        modulestore = MockModulestoreFactory.create(children_map, self.block_key_factory)
+        previous_structure = BlockStructureFactory.create_from_modulestore(
+            root_block_usage_key=0, modulestore=modulestore
+        )
+        partial_structure, updated_block_keys = BlockStructureFactory.create_partial_from_modulestore(
+            previous_structure, {2}, modulestore,
+        )
+        self.assertEqual(updated_block_keys, {2, 3})
+        self.assert_block_structure(partial_structure, children_map)
+        self.assertEqual(set(partial_structure._xblock_map), {0, 1, 2, 3})  # pylint: disable=protected-access
@@ -2,11 +2,12 @@
 Tests for manager.py
 """
 import ddt
+from mock import patch
 from nose.plugins.attrib import attr
 from unittest import TestCase
 
 from ..block_structure import BlockStructureBlockData
-from ..config import RAISE_ERROR_WHEN_NOT_FOUND, STORAGE_BACKING_FOR_CACHE, waffle
+from ..config import INCREMENTAL_UPDATE, RAISE_ERROR_WHEN_NOT_FOUND, STORAGE_BACKING_FOR_CACHE, waffle
 from ..exceptions import UsageKeyNotInBlockStructure, BlockStructureNotFound
 from ..manager import BlockStructureManager
 from ..transformers import BlockStructureTransformers
@@ -89,6 +90,23 @@ class TestTransformer1(MockTransformer):
         return data_key + 't1.val1.' + unicode(block_key)
 
 
+class TestIncrementalTransformer(TestTransformer1):
+    """
+    Test Transformer class that supports incremental collection and
+    records the blocks it collected data for.
+    """
+    SUPPORTS_INCREMENTAL_COLLECT = True
+    collected_block_keys = set()
+
+    @classmethod
+    def collect(cls, block_structure):
+        """
+        Collects block data for the block structure.
+        """
+        super(TestIncrementalTransformer, cls).collect(block_structure)
+        cls.collected_block_keys = set(block_structure.topological_traversal())
+
+
 @attr(shard=2)
 @ddt.ddt
 class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
@@ -219,3 +237,32 @@ class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, Test
         self.bs_manager.clear()
         self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
         self.assertEquals(TestTransformer1.collect_call_count, 2)
+
+    @ddt.data(True, False)
+    def test_update_collected_incrementally(self, supports_incremental_collect):
+        transformer_class = TestIncrementalTransformer if supports_incremental_collect else TestTransformer1
+        transformer_class.collect_call_count = 0
+        self.registered_transformers = [transformer_class()]
+
+        with waffle().override(INCREMENTAL_UPDATE, active=True):
+            with mock_registered_transformers(self.registered_transformers):
+                self.bs_manager.update_collected_if_needed()
+
+                # Block 1 changes in a new version of the course.
+                self.modulestore.blocks[self.block_key_factory(0)].field_map['course_version'] = 'new_version'
+                self.modulestore.get_blocks_changed_between_versions = lambda *args: [self.block_key_factory(1)]
+                TestIncrementalTransformer.collected_block_keys = set()
+                with patch.object(self.bs_manager.store, 'get_data_version', return_value='previous_version'):
+                    self.bs_manager._update_collected()  # pylint: disable=protected-access
+
+                block_structure = self.bs_manager.get_collected()
+
+        if supports_incremental_collect:
+            # Only the changed subtree and its ancestors are collected.
+            self.assertEquals(
+                TestIncrementalTransformer.collected_block_keys,
+                {self.block_key_factory(block_id) for block_id in (0, 1, 3, 4)},
+            )
+        self.assertEquals(transformer_class.collect_call_count, 2)
+        self.assert_block_structure(block_structure, self.children_map)
+        transformer_class.assert_collected(block_structure)
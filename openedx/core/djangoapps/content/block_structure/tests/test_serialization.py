@@ -0,0 +1,106 @@
+"""
+Tests for serialization.py
+"""
+# pylint: disable=protected-access
+from copy import deepcopy
+import cPickle as pickle
+from nose.plugins.attrib import attr
+from unittest import TestCase
+
+from openedx.core.lib.cache_utils import zpickle
+
+from .. import serialization
+from ..block_structure import TransformerDataMap
+from .helpers import ChildrenMapTestMixin, MockTransformer, MockFilteringTransformer
+
+
+@attr(shard=2)
+class TestCompactSerialization(ChildrenMapTestMixin, TestCase):
+    """
+    Tests for the compact serialization of block structures.
+    """
+    def setUp(self):
+        super(TestCompactSerialization, self).setUp()
+        self.children_map = self.DAG_CHILDREN_MAP
+        self.block_structure = self.create_block_structure(self.children_map)
+        for transformer in [MockTransformer, MockFilteringTransformer]:
+            self.block_structure._add_transformer(transformer)
+            self.block_structure.set_transformer_data(transformer, 'global', transformer.name())
+            for block_key in self.block_structure:
+                self.block_structure.set_transformer_block_field(
+                    block_key, transformer, 'value', (transformer.name(), block_key),
+                )
+        for block_key in self.block_structure:
+            self.block_structure._get_or_create_block(block_key).display_name = u'Block {}'.format(block_key)
+
+    def _round_trip(self):
+        """
+        Returns the decoded data of the encoded block structure.
+        """
+        return serialization.decode(serialization.encode(self.block_structure))
+
+    def test_format_detection(self):
+        self.assertTrue(serialization.is_compact_format(serialization.encode(self.block_structure)))
+        self.assertFalse(serialization.is_compact_format(zpickle((
+            self.block_structure._block_relations,
+            self.block_structure.transformer_data,
+            self.block_structure._block_data_map,
+        ))))
+
+    def test_unsupported_version(self):
+        serialized_data = bytearray(serialization.encode(self.block_structure))
+        serialized_data[3] = serialization.FORMAT_VERSION + 1
+        with self.assertRaises(ValueError):
+            serialization.decode(bytes(serialized_data))
+
+    def test_round_trip(self):
+        block_relations, transformer_data, block_data_map = self._round_trip()
+
+        for block_key, relations in self.block_structure._block_relations.iteritems():
+            self.assertEqual(block_relations[block_key].children, relations.children)
+            self.assertEqual(block_relations[block_key].parents, relations.parents)
+
+        for transformer in [MockTransformer, MockFilteringTransformer]:
+            self.assertEqual(
+                transformer_data[transformer].fields,
+                self.block_structure.transformer_data[transformer].fields,
+            )
+
+        for block_key, block_data in block_data_map.iteritems():
+            self.assertEqual(block_data.location, block_key)
+            self.assertEqual(block_data.display_name, u'Block {}'.format(block_key))
+            for transformer in [MockTransformer, MockFilteringTransformer]:
+                self.assertEqual(block_data.transformer_data[transformer].value, (transformer.name(), block_key))
+
+    def test_lazy_decoding(self):
+        _, _, block_data_map = self._round_trip()
+        transformer_data_map = block_data_map[0].transformer_data
+        self.assertEqual(dict.__len__(transformer_data_map), 0)
+
+        self.assertEqual(transformer_data_map[MockTransformer].value, (MockTransformer.name(), 0))
+        self.assertEqual(
+            dict.keys(block_data_map[1].transformer_data),
+            [MockTransformer.name()],
+        )
+        self.assertEqual(
+            set(block_data_map[1].transformer_data.keys()),
+            {MockTransformer.name(), MockFilteringTransformer.name()},
+        )
+
+    def test_set_before_decoding(self):
+        _, _, block_data_map = self._round_trip()
+        block_data_map[0].transformer_data.get_or_create(MockTransformer).other = 'new'
+        self.assertEqual(block_data_map[0].transformer_data[MockTransformer].value, (MockTransformer.name(), 0))
+        self.assertEqual(block_data_map[0].transformer_data[MockTransformer].other, 'new')
+
+    def test_copy_and_pickle(self):
+        _, _, block_data_map = self._round_trip()
+        for copied in (
+                deepcopy(block_data_map),
+                pickle.loads(pickle.dumps(block_data_map, pickle.HIGHEST_PROTOCOL)),
+        ):
+            self.assertIs(type(copied[2].transformer_data), TransformerDataMap)
+            self.assertEqual(
+                copied[2].transformer_data[MockFilteringTransformer].value,
+                (MockFilteringTransformer.name(), 2),
+            )
@@ -71,6 +71,12 @@ class CourseBlocksSignalTest(ModuleStoreTestCase):
 
         self.assertFalse(is_course_in_block_structure_cache(self.course.id, self.store))
 
+    @patch('openedx.core.djangoapps.content.block_structure.store.BlockStructureStore.evict_from_local_cache')
+    def test_local_cache_eviction(self, mock_evict):
+        self.course.display_name = "Sith 101"
+        self.store.update_item(self.course, self.user.id)
+        mock_evict.assert_called_with(self.course_usage_key)
+
     @ddt.data(
         (CourseLocator(org='org', course='course', run='run'), True),
         (LibraryLocator(org='org', course='course'), False),
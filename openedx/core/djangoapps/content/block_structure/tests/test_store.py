@@ -2,14 +2,15 @@
 Tests for block_structure/cache.py
 """
 import ddt
+import itertools
 from nose.plugins.attrib import attr
 
 from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
 
-from ..config import STORAGE_BACKING_FOR_CACHE, waffle
+from ..config import COMPACT_SERIALIZATION, PROCESS_LOCAL_CACHE, STORAGE_BACKING_FOR_CACHE, waffle
 from ..config.models import BlockStructureConfiguration
 from ..exceptions import BlockStructureNotFound
-from ..store import BlockStructureStore
+from ..store import BlockStructureStore, get_local_cache
 from .helpers import ChildrenMapTestMixin, UsageKeyFactoryMixin, MockCache, MockTransformer
 
 
@@ -31,6 +32,9 @@ class TestBlockStructureStore(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheI
         self.mock_cache = MockCache()
         self.store = BlockStructureStore(self.mock_cache)
 
+        get_local_cache.cache.clear()
+        self.addCleanup(get_local_cache.cache.clear)
+
     def add_transformers(self):
         """
         Add each registered transformer to the block structure.
@@ -67,6 +71,19 @@ class TestBlockStructureStore(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheI
             with self.assertRaises(BlockStructureNotFound):
                 self.store.get(self.block_structure.root_block_usage_key)
 
+    @ddt.data(*itertools.product((True, False), repeat=2))
+    @ddt.unpack
+    def test_serialization_formats(self, compact_on_write, compact_on_read):
+        with waffle().override(COMPACT_SERIALIZATION, active=compact_on_write):
+            self.store.add(self.block_structure)
+        with waffle().override(COMPACT_SERIALIZATION, active=compact_on_read):
+            stored_value = self.store.get(self.block_structure.root_block_usage_key)
+        self.assert_block_structure(stored_value, self.children_map)
+        self.assertEqual(
+            stored_value.get_transformer_block_field(self.block_key_factory(0), MockTransformer, 'test'),
+            '{} val'.format(MockTransformer.name()),
+        )
+
     def test_uncached_without_storage(self):
         self.store.add(self.block_structure)
         self.mock_cache.map.clear()
@@ -90,3 +107,40 @@ class TestBlockStructureStore(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheI
         self.assertEquals(self.mock_cache.timeout_from_last_call, 0)
         self.store.add(self.block_structure)
         self.assertEquals(self.mock_cache.timeout_from_last_call, timeout)
+
+    @ddt.data(True, False)
+    def test_local_cache(self, with_storage_backing):
+        with waffle().override(STORAGE_BACKING_FOR_CACHE, active=with_storage_backing):
+            with waffle().override(PROCESS_LOCAL_CACHE, active=True):
+                self.store.add(self.block_structure)
+                self.mock_cache.map.clear()
+                if with_storage_backing:
+                    stored_value = self.store.get(self.block_structure.root_block_usage_key)
+                    self.assert_block_structure(stored_value, self.children_map)
+                    self.assertEquals(get_local_cache().hits, 1)
+                else:
+                    # Without storage backing, the version of the
+                    # structure is unknown, so the local cache is unused.
+                    with self.assertRaises(BlockStructureNotFound):
+                        self.store.get(self.block_structure.root_block_usage_key)
+                    self.assertEquals(len(get_local_cache()), 0)
+
+    def test_local_cache_outdated_version(self):
+        with waffle().override(STORAGE_BACKING_FOR_CACHE, active=True):
+            with waffle().override(PROCESS_LOCAL_CACHE, active=True):
+                self.store.add(self.block_structure)
+                root_key = self.block_structure.root_block_usage_key
+                cached_key, serialized_data = get_local_cache().get(unicode(root_key))
+                get_local_cache().set(unicode(root_key), (cached_key + u'outdated', serialized_data))
+
+                self.store.get(root_key)
+                self.assertEquals(get_local_cache().get(unicode(root_key))[0], cached_key)
+
+    def test_local_cache_delete(self):
+        with waffle().override(STORAGE_BACKING_FOR_CACHE, active=True):
+            with waffle().override(PROCESS_LOCAL_CACHE, active=True):
+                self.store.add(self.block_structure)
+                self.store.delete(self.block_structure.root_block_usage_key)
+                self.assertEquals(len(get_local_cache()), 0)
+                with self.assertRaises(BlockStructureNotFound):
+                    self.store.get(self.block_structure.root_block_usage_key)
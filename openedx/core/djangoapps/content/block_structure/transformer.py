@@ -55,6 +55,31 @@ class BlockStructureTransformer(object):
     WRITE_VERSION = 0
     READ_VERSION = 0
 
+    # Whether the transformer's collect method supports incremental
+    # updates, in which it is called on a partial block structure.
+    #
+    # When a course is re-published, the block structure may be updated
+    # by collecting data only for the subtrees of the blocks that changed
+    # since the previous collection. In that case, collect is called on a
+    # partial block structure that contains the changed subtrees along
+    # with all of their ancestors. The collected block data of the
+    # blocks in the changed subtrees is then merged into the previously
+    # collected block structure, while the data of all other blocks is
+    # kept as is.
+    #
+    # A transformer can support incremental updates only if the data
+    # it collects for a block depends solely on the block itself and
+    # its ancestors - and not on its descendants, its siblings or any
+    # other blocks. The data of an unchanged ancestor of a changed
+    # subtree is kept from the previous collection, so any data derived
+    # from its descendants would become stale. Its structure-wide data
+    # may only depend on the root block, since it replaces the
+    # previously collected structure-wide data.
+    #
+    # An incremental update is made only if all registered transformers
+    # support it. Otherwise, data is collected for the entire structure.
+    SUPPORTS_INCREMENTAL_COLLECT = False
+
     @classmethod
     def name(cls):
         """
@@ -82,6 +82,29 @@ class BlockStructureTransformers(object):
         # Collect all fields that were requested by the transformers.
         block_structure._collect_requested_xblock_fields()  # pylint: disable=protected-access
 
+    @classmethod
+    def supports_incremental_collect(cls):
+        """
+        Returns whether all registered transformers support
+        incremental collection of their data.
+        """
+        return all(
+            transformer.SUPPORTS_INCREMENTAL_COLLECT
+            for transformer in TransformerRegistry.get_registered_transformers()
+        )
+
+    @classmethod
+    def is_collected_with_current_versions(cls, block_structure):
+        """
+        Returns whether the collected data in the block structure was
+        written by the current version of each registered Transformer.
+        """
+        # pylint: disable=protected-access
+        return all(
+            block_structure._get_transformer_data_version(transformer) == transformer.WRITE_VERSION
+            for transformer in TransformerRegistry.get_registered_transformers()
+        )
+
     @classmethod
     def verify_versions(cls, block_structure):
         """
@@ -94,7 +117,8 @@ class BlockStructureTransformers(object):
         """
         outdated_transformers = []
         for transformer in TransformerRegistry.get_registered_transformers():
-            version_in_block_structure = block_structure._get_transformer_data_version(transformer)  # pylint: disable=protected-access
+            # pylint: disable=protected-access
+            version_in_block_structure = block_structure._get_transformer_data_version(transformer)
             if transformer.READ_VERSION > version_in_block_structure:
                 outdated_transformers.append(transformer)
 
@@ -6,6 +6,7 @@ import logging
 from urlparse import urlparse, urlunparse
 
 from django.conf import settings
+from django.core.cache import cache
 from django.db import models, transaction
 from django.db.models.fields import BooleanField, DateTimeField, DecimalField, TextField, FloatField, IntegerField, \
     CharField
@@ -25,9 +26,21 @@ from xmodule.course_module import CourseDescriptor, DEFAULT_START_DATE
 from xmodule.error_module import ErrorDescriptor
 from xmodule.modulestore.django import modulestore
 from openedx.core.djangoapps.xmodule_django.models import CourseKeyField, UsageKeyField
+from openedx.core.lib.cache_utils import SizeBoundedLRUCache
 
 log = logging.getLogger(__name__)
 
+# Maximum number of CourseOverviews kept in the cache of each process.
+PROCESS_CACHE_MAX_SIZE = 5000
+
+# Seconds during which a CourseOverview isn't scheduled for regeneration again.
+REGENERATION_TIMEOUT = 5 * 60
+
+# CourseOverviews, with their tabs and image sets, cached in the process by
+# id.  They are shared by all the threads of the process, so must not be
+# modified, and are only used while they weren't modified in the database since.
+PROCESS_CACHE = SizeBoundedLRUCache(PROCESS_CACHE_MAX_SIZE, get_size=lambda course_overview: 1)
+
 
 class CourseOverview(TimeStampedModel):
     """
@@ -320,6 +333,68 @@ class CourseOverview(TimeStampedModel):
             )
         }
 
+    @classmethod
+    def get_from_ids(cls, course_ids):
+        """
+        Return a dict mapping course_ids to CourseOverviews, with their tabs
+        and image sets, in a constant number of queries.
+
+        CourseOverviews are kept in the cache of the process until they are
+        modified in the database, so only those which were are loaded again.
+
+        Unlike get_from_id, this method doesn't generate CourseOverviews
+        inline: missing and outdated CourseOverviews, and those without
+        thumbnail images, are regenerated by a background task.  Meanwhile,
+        outdated CourseOverviews are returned, but missing ones aren't, so
+        callers should fall back to get_from_id if they need to guarantee
+        CourseOverview generation.
+        """
+        course_ids = set(course_ids)
+        if not course_ids:
+            return {}
+
+        modified_by_id = dict(cls.objects.filter(id__in=course_ids).values_list('id', 'modified'))
+        course_overviews = {}
+        for course_id, modified in modified_by_id.iteritems():
+            course_overview = PROCESS_CACHE.get(course_id)
+            if course_overview is not None and course_overview.modified == modified:
+                course_overviews[course_id] = course_overview
+        ids_to_load = [course_id for course_id in modified_by_id if course_id not in course_overviews]
+        if ids_to_load:
+            loaded = list(
+                cls.objects.select_related('image_set').prefetch_related('tabs').filter(id__in=ids_to_load)
+            )
+            for course_overview in loaded:
+                PROCESS_CACHE.set(course_overview.id, course_overview)
+            course_overviews.update((course_overview.id, course_overview) for course_overview in loaded)
+
+        thumbnails_enabled = CourseOverviewImageConfig.current().enabled
+        ids_to_regenerate = course_ids.difference(course_overviews)
+        for course_id, course_overview in course_overviews.iteritems():
+            if course_overview.version < cls.VERSION:
+                ids_to_regenerate.add(course_id)
+            elif thumbnails_enabled and not hasattr(course_overview, 'image_set'):
+                ids_to_regenerate.add(course_id)
+        if ids_to_regenerate:
+            cls._regenerate_in_background(ids_to_regenerate)
+        return course_overviews
+
+    @staticmethod
+    def _regenerate_in_background(course_ids):
+        """
+        Schedule a task regenerating the CourseOverviews of the given ids,
+        except those already scheduled recently.
+        """
+        # Imported here, as the tasks module imports this one.
+        from .tasks import regenerate_course_overviews
+
+        course_ids = [
+            course_id for course_id in sorted(unicode(course_id) for course_id in course_ids)
+            if cache.add(u'course_overviews.regenerate.{}'.format(course_id), True, REGENERATION_TIMEOUT)
+        ]
+        if course_ids:
+            regenerate_course_overviews.delay(course_ids)
+
     def clean_id(self, padding_char='='):
         """
         Returns a unique deterministic base32-encoded ID for the course.
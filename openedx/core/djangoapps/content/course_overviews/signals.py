@@ -3,7 +3,7 @@ Signal handler for invalidating cached course overviews
 """
 from django.dispatch.dispatcher import receiver
 
-from .models import CourseOverview
+from .models import PROCESS_CACHE, CourseOverview
 from xmodule.modulestore.django import SignalHandler
 
 
@@ -13,6 +13,7 @@ def listen_for_course_publish(sender, course_key, **kwargs):  # pylint: disable=
     Catches the signal that a course has been published in Studio and
     updates the corresponding CourseOverview cache entry.
     """
+    PROCESS_CACHE.delete(course_key)
     CourseOverview.load_from_module_store(course_key)
 
 
@@ -23,6 +24,7 @@ def _listen_for_course_delete(sender, course_key, **kwargs):  # pylint: disable=
     invalidates the corresponding CourseOverview cache entry if one exists.
     """
     CourseOverview.objects.filter(id=course_key).delete()
+    PROCESS_CACHE.delete(course_key)
     # import CourseAboutSearchIndexer inline due to cyclic import
     from cms.djangoapps.contentstore.courseware_index import CourseAboutSearchIndexer
     # Delete course entry from Course About Search_index
@@ -0,0 +1,26 @@
+"""
+Asynchronous tasks related to the course_overviews app.
+"""
+import logging
+
+from celery.task import task
+from opaque_keys.edx.keys import CourseKey
+
+from .models import CourseOverview
+
+log = logging.getLogger('edx.celery.task')
+
+
+@task()
+def regenerate_course_overviews(course_ids):
+    """
+    Regenerates the missing or outdated CourseOverviews, and thumbnail images,
+    of the courses of the given ids.
+    """
+    for course_id in course_ids:
+        try:
+            CourseOverview.get_from_id(CourseKey.from_string(course_id))
+        except CourseOverview.DoesNotExist:
+            log.warning('Course %s not found while regenerating its overview.', course_id)
+        except Exception:  # pylint: disable=broad-except
+            log.exception('An error occurred while regenerating the course overview for %s.', course_id)
@@ -11,8 +11,9 @@ from nose.plugins.attrib import attr
 import pytz
 
 from django.conf import settings
+from django.db import connection
 from django.db.utils import IntegrityError
-from django.test.utils import override_settings
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.utils import timezone
 from PIL import Image
 
@@ -35,7 +36,7 @@ from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory, check_mongo_calls, check_mongo_calls_range
 
-from .models import CourseOverview, CourseOverviewImageSet, CourseOverviewImageConfig
+from .models import PROCESS_CACHE, CourseOverview, CourseOverviewImageSet, CourseOverviewImageConfig
 
 
 @attr(shard=3)
@@ -545,6 +546,77 @@ class CourseOverviewTestCase(ModuleStoreTestCase):
         self.assertEqual(len(course_ids_to_overviews), 1)
         self.assertIn(course_with_overview_1.id, course_ids_to_overviews)
 
+    @mock.patch('openedx.core.djangoapps.content.course_overviews.tasks.regenerate_course_overviews.delay')
+    def test_get_from_ids(self, mock_regenerate):
+        PROCESS_CACHE.clear()
+        self.addCleanup(PROCESS_CACHE.clear)
+        course_with_overview_1 = CourseFactory.create(emit_signals=True)
+        course_with_overview_2 = CourseFactory.create(emit_signals=True)
+        course_without_overview = CourseFactory.create(emit_signals=False)
+        courses = [course_with_overview_1, course_with_overview_2, course_without_overview]
+
+        # The missing CourseOverview is regenerated in the background, rather than returned.
+        course_ids_to_overviews = CourseOverview.get_from_ids(course.id for course in courses)
+        self.assertEqual(
+            set(course_ids_to_overviews),
+            {course_with_overview_1.id, course_with_overview_2.id},
+        )
+        mock_regenerate.assert_called_once_with([unicode(course_without_overview.id)])
+
+        # An outdated CourseOverview is returned, but regenerated in the background.
+        mock_regenerate.reset_mock()
+        overview_2 = course_ids_to_overviews[course_with_overview_2.id]
+        overview_2.version = CourseOverview.VERSION - 1
+        overview_2.save()
+        course_ids_to_overviews = CourseOverview.get_from_ids(
+            [course_with_overview_1.id, course_with_overview_2.id]
+        )
+        self.assertEqual(course_ids_to_overviews[course_with_overview_2.id].version, CourseOverview.VERSION - 1)
+        mock_regenerate.assert_called_once_with([unicode(course_with_overview_2.id)])
+
+        # It isn't scheduled for regeneration again while being regenerated.
+        mock_regenerate.reset_mock()
+        CourseOverview.get_from_ids([course_with_overview_2.id])
+        self.assertFalse(mock_regenerate.called)
+
+    @mock.patch('openedx.core.djangoapps.content.course_overviews.tasks.regenerate_course_overviews.delay')
+    def test_get_from_ids_num_queries(self, _mock_regenerate):
+        PROCESS_CACHE.clear()
+        self.addCleanup(PROCESS_CACHE.clear)
+        course_ids = [CourseFactory.create(emit_signals=True).id for _ in range(5)]
+        CourseOverviewImageConfig.current()
+
+        with CaptureQueriesContext(connection) as few_courses_queries:
+            CourseOverview.get_from_ids(course_ids[:2])
+        PROCESS_CACHE.clear()
+        with CaptureQueriesContext(connection) as many_courses_queries:
+            course_ids_to_overviews = CourseOverview.get_from_ids(course_ids)
+        self.assertEqual(len(few_courses_queries), len(many_courses_queries))
+
+        # The tabs are loaded with the overviews.
+        with self.assertNumQueries(0):
+            for course_overview in course_ids_to_overviews.values():
+                list(course_overview.tabs.all())
+
+        # Only the modification times are read for cached overviews.
+        with CaptureQueriesContext(connection) as cached_queries:
+            self.assertEqual(CourseOverview.get_from_ids(course_ids), course_ids_to_overviews)
+        self.assertLess(len(cached_queries), len(many_courses_queries))
+
+    def test_get_from_ids_published(self):
+        PROCESS_CACHE.clear()
+        self.addCleanup(PROCESS_CACHE.clear)
+        course = CourseFactory.create(emit_signals=True)
+        course_overview = CourseOverview.get_from_ids([course.id])[course.id]
+
+        # Publishing the course again invalidates the cached overview.
+        with self.store.branch_setting(ModuleStoreEnum.Branch.draft_preferred):
+            course.display_name = 'Updated name'
+            self.store.update_item(course, ModuleStoreEnum.UserID.test)
+        updated_overview = CourseOverview.get_from_ids([course.id])[course.id]
+        self.assertIsNot(updated_overview, course_overview)
+        self.assertEqual(updated_overview.display_name, 'Updated name')
+
 
 @attr(shard=3)
 @ddt.ddt
@@ -4,6 +4,7 @@ Utilities related to caching.
 import collections
 import cPickle as pickle
 import functools
+import threading
 import zlib
 
 from xblock.core import XBlock
@@ -84,6 +85,102 @@ class memoized(object):  # pylint: disable=invalid-name
         return functools.partial(self.__call__, obj)
 
 
+class SizeBoundedLRUCache(object):
+    """
+    A thread-safe, in-process, least-recently-used cache whose capacity
+    is bounded by the total size of its values rather than by the number
+    of its entries.
+
+    Keeps cumulative hit, miss and eviction counters for the lifetime
+    of the cache.
+
+    WARNING: The cache is not shared across processes, so it is up to the
+    caller to include the version of the cached data in its keys or to
+    otherwise invalidate stale entries.
+    """
+    def __init__(self, max_size, get_size=len):
+        """
+        Arguments:
+            max_size (int) - The maximum total size of the values in
+                the cache.
+            get_size (function) - Returns the size of a given value;
+                the default returns its len, which for strings is its
+                size in bytes.
+        """
+        self.max_size = max_size
+        self._get_size = get_size
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """
+        Returns the value for the given key, marking it as the most
+        recently used; returns default if not found.
+        """
+        with self._lock:
+            try:
+                value, size = self._entries.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self._entries[key] = (value, size)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """
+        Associates the given key with the given value, evicting the least
+        recently used entries as needed to stay within max_size.
+
+        Values larger than max_size are not cached.
+        """
+        size = self._get_size(value)
+        with self._lock:
+            self._pop(key)
+            if size > self.max_size:
+                return
+            while self.size + size > self.max_size:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+                self.evictions += 1
+            self._entries[key] = (value, size)
+            self.size += size
+
+    def delete(self, key):
+        """
+        Removes the given key from the cache, if present.
+        """
+        with self._lock:
+            self._pop(key)
+
+    def clear(self):
+        """
+        Removes all entries from the cache, but keeps the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _pop(self, key):
+        """
+        Removes the given key, if present, updating the total size.
+        Must be called with the lock held.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+
 def hashvalue(arg):
     """
     If arg is an xblock, use its location. otherwise just turn it into a string
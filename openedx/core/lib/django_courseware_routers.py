@@ -1,6 +1,7 @@
 """
-Database Routers for use with the coursewarehistoryextended django app.
+Database Routers for use with the coursewarehistoryextended and courseware django apps.
 """
+from django.conf import settings
 
 
 class StudentModuleHistoryExtendedRouter(object):
@@ -57,3 +58,59 @@ class StudentModuleHistoryExtendedRouter(object):
             return False
 
         return None
+
+
+class UserStateWriteQueueRouter(object):
+    """
+    A Database Router that separates StudentModuleQueuedChange, the queue of
+    the write-behind user state client, into its own database, if one is
+    configured in DATABASES.
+    """
+
+    DATABASE_NAME = 'user_state_write_queue'
+
+    def _is_queue(self, model):
+        """
+        Return True if ``model`` is courseware.StudentModuleQueuedChange.
+        """
+        return (
+            model._meta.app_label == 'courseware' and  # pylint: disable=protected-access
+            model.__name__ == 'StudentModuleQueuedChange'
+        )
+
+    def _database(self):
+        """
+        Return UserStateWriteQueueRouter.DATABASE_NAME if it's configured, else None.
+        """
+        return self.DATABASE_NAME if self.DATABASE_NAME in settings.DATABASES else None
+
+    def db_for_read(self, model, **hints):  # pylint: disable=unused-argument
+        """
+        Use the UserStateWriteQueueRouter.DATABASE_NAME, if configured, if the model is StudentModuleQueuedChange.
+        """
+        if self._is_queue(model):
+            return self._database()
+        else:
+            return None
+
+    def db_for_write(self, model, **hints):  # pylint: disable=unused-argument
+        """
+        Use the UserStateWriteQueueRouter.DATABASE_NAME, if configured, if the model is StudentModuleQueuedChange.
+        """
+        if self._is_queue(model):
+            return self._database()
+        else:
+            return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):  # pylint: disable=unused-argument
+        """
+        Only sync StudentModuleQueuedChange to UserStateWriteQueueRouter.DATABASE_NAME, if configured
+        """
+        if model_name is not None:
+            model = hints.get('model')
+            if model is not None and self._is_queue(model):
+                return db == (self._database() or 'default')
+        if db == self.DATABASE_NAME:
+            return False
+
+        return None
@@ -6,7 +6,7 @@ from unittest import TestCase
 import ddt
 from mock import MagicMock
 
-from openedx.core.lib.cache_utils import memoize_in_request_cache
+from openedx.core.lib.cache_utils import memoize_in_request_cache, SizeBoundedLRUCache
 
 
 @ddt.ddt
@@ -63,3 +63,52 @@ class TestMemoizeInRequestCache(TestCase):
                 func_to_memoize(*arg_list2)
 
             self.assertEquals(self.func_to_count.call_count, 2)
+
+
+class TestSizeBoundedLRUCache(TestCase):
+    """
+    Test the SizeBoundedLRUCache class.
+    """
+    def setUp(self):
+        super(TestSizeBoundedLRUCache, self).setUp()
+        self.cache = SizeBoundedLRUCache(max_size=10)
+
+    def test_get_and_set(self):
+        self.assertIsNone(self.cache.get('a'))
+        self.cache.set('a', 'aaa')
+        self.assertEquals(self.cache.get('a'), 'aaa')
+        self.assertEquals((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertEquals(self.cache.size, 3)
+
+    def test_replace(self):
+        self.cache.set('a', 'aaa')
+        self.cache.set('a', 'aaaaa')
+        self.assertEquals(self.cache.size, 5)
+        self.assertEquals(len(self.cache), 1)
+
+    def test_evicts_least_recently_used(self):
+        self.cache.set('a', 'aaaa')
+        self.cache.set('b', 'bbbb')
+        self.cache.get('a')
+        self.cache.set('c', 'cccc')
+        self.assertIn('a', self.cache)
+        self.assertNotIn('b', self.cache)
+        self.assertIn('c', self.cache)
+        self.assertEquals(self.cache.evictions, 1)
+        self.assertEquals(self.cache.size, 8)
+
+    def test_value_too_large(self):
+        self.cache.set('a', 'a' * 11)
+        self.assertNotIn('a', self.cache)
+        self.assertEquals(self.cache.size, 0)
+
+    def test_delete_and_clear(self):
+        self.cache.set('a', 'aaa')
+        self.cache.set('b', 'bbb')
+        self.cache.delete('a')
+        self.cache.delete('missing')
+        self.assertNotIn('a', self.cache)
+        self.assertEquals(self.cache.size, 3)
+        self.cache.clear()
+        self.assertEquals(len(self.cache), 0)
+        self.assertEquals(self.cache.size, 0)
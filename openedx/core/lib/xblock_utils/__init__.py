@@ -7,6 +7,7 @@ import json
 import logging
 import markupsafe
 import re
+import request_cache
 import static_replace
 import uuid
 from lxml import html, etree
@@ -23,6 +24,8 @@ from xblock.core import XBlock
 from xblock.exceptions import InvalidScopeError
 from xblock.fragment import Fragment
 
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.seq_module import SequenceModule
 from xmodule.vertical_block import VerticalBlock
 from xmodule.x_module import shim_xmodule_js, XModuleDescriptor, XModule, PREVIEW_VIEWS, STUDIO_VIEW
@@ -254,6 +257,24 @@ def replace_static_urls(data_dir, block, view, frag, context, course_id=None, st
     ))
 
 
+def replace_urls(course_id, jump_to_id_base_url, data_dir, block, view, frag,  # pylint: disable=unused-argument
+                 context, static_asset_path=''):  # pylint: disable=unused-argument
+    """
+    Updates the supplied module with a new get_html function that wraps
+    the old get_html function and substitutes its /static/..., /course/...
+    and /jump_to_id/... urls in a single pass, as replace_static_urls,
+    replace_course_urls and replace_jump_to_id_urls would in turn.
+    """
+    return wrap_fragment(frag, static_replace.replace_urls(
+        frag.content,
+        course_id,
+        jump_to_id_base_url,
+        data_dir,
+        static_asset_path=static_asset_path,
+        course_version=getattr(block, 'course_version', None),
+    ))
+
+
 def grade_histogram(module_id):
     '''
     Print out a histogram of grades on a given problem in staff member debug info.
@@ -281,6 +302,52 @@ def grade_histogram(module_id):
     return grades
 
 
+def grade_histograms(module_ids):
+    """
+    Returns a dict of the grade histograms of the given modules.
+
+    When the courseware.materialized_grade_histograms waffle switch is
+    enabled, the histograms of the graded students are read from the grade
+    counts recounted as problem scores change, in one query.  Otherwise,
+    the histograms are aggregated by grade_histogram.
+    """
+    # Imported here, since courseware isn't installed in Studio.
+    from courseware.models import StudentModuleGradeCount
+
+    if _materialized_grade_histograms_enabled():
+        return StudentModuleGradeCount.get_histograms(module_ids)
+    return {module_id: grade_histogram(module_id) for module_id in module_ids}
+
+
+def _materialized_grade_histograms_enabled():
+    """
+    Returns whether grade histograms are read from the materialized grade counts.
+    """
+    from courseware.config.waffle import MATERIALIZED_GRADE_HISTOGRAMS, waffle
+    return waffle().is_enabled(MATERIALIZED_GRADE_HISTOGRAMS)
+
+
+def _unit_grade_histogram(block):
+    """
+    Returns the grade histogram of the block.  Materialized histograms are
+    fetched with those of the other blocks of the block's unit, once per
+    request.
+    """
+    if not _materialized_grade_histograms_enabled():
+        return grade_histogram(block.location)
+
+    histograms = request_cache.get_cache('xblock_utils.grade_histograms')
+    if block.location not in histograms:
+        module_ids = {block.location}
+        if block.parent:
+            try:
+                module_ids.update(modulestore().get_item(block.parent).children)
+            except ItemNotFoundError:
+                pass
+        histograms.update(grade_histograms(module_ids))
+    return histograms[block.location]
+
+
 def sanitize_html_id(html_id):
     """
     Template uses element_id in js function names, so can't allow dashes and colons.
@@ -325,7 +392,7 @@ def add_staff_markup(user, has_instructor_access, disable_staff_debug_info, bloc
 
     block_id = block.location
     if block.has_score and settings.FEATURES.get('DISPLAY_HISTOGRAMS_TO_STAFF'):
-        histogram = grade_histogram(block_id)
+        histogram = _unit_grade_histogram(block)
         render_histogram = len(histogram) > 0
     else:
         histogram = None